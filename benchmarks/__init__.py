@@ -0,0 +1,17 @@
+"""
+Benchmarks de los caminos calientes: decodificación, logging, adquisición
+contra el simulador ELM327 y tiempo de frame de la UI (Qt offscreen).
+
+No necesita hardware. Uso desde la raíz del repositorio:
+
+    python -m benchmarks                      # corre todo e imprime la tabla
+    python -m benchmarks -k decode            # solo los casos que contienen 'decode'
+    python -m benchmarks --guardar            # benchmarks/baselines/<host>.json
+    python -m benchmarks --comparar --tolerancia 0.2
+    python -m benchmarks --comparar otra_maquina.json
+    python -m benchmarks.importtime           # -X importtime del dashboard vs presupuesto
+    python -m benchmarks.recuperacion         # recuperación ante fallas del adaptador
+
+Con ``--comparar`` el proceso termina con código 1 si algún caso quedó más
+de ``tolerancia`` por debajo de la línea base (regresión).
+"""
@@ -0,0 +1,353 @@
+"""
+Casos de benchmark. Cada uno mide solo su bucle caliente y devuelve
+(operaciones, segundos). Los de UI corren con Qt en modo offscreen.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .suite import Omitido, benchmark
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCANNER = os.path.join(RAIZ, "ob2_nuevo7junio", "scanner-obd2")
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+RESPUESTAS = {
+    "010C": "41 0C 1A F8",
+    "010D": "41 0D 3C",
+    "0105": "41 05 7B",
+    "0111": "41 11 40",
+}
+
+
+@contextlib.contextmanager
+def _directorio_temporal():
+    """Los loggers escriben en rutas relativas (logs/, obd_log.db)."""
+    anterior = os.getcwd()
+    ruta = tempfile.mkdtemp(prefix="bench_obd_")
+    os.chdir(ruta)
+    try:
+        yield ruta
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(ruta, ignore_errors=True)
+
+
+def _qt_app(modulo: str):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        widgets = __import__(f"{modulo}.QtWidgets", fromlist=["QApplication"])
+    except ImportError as e:
+        raise Omitido(f"{modulo} no instalado") from e
+    return widgets.QApplication.instance() or widgets.QApplication([])
+
+
+# ----------------------------------------------------------------------
+# Decodificación
+# ----------------------------------------------------------------------
+@benchmark("decode.pid_decoder", n=100000, unidad="respuestas")
+def decode_pid_decoder(n):
+    """PIDDecoder: bytes de la respuesta + fórmula."""
+    from src.obd.pid_decoder import PIDDecoder
+
+    decoder = PIDDecoder()
+    pids = list(RESPUESTAS.items())
+    t0 = time.perf_counter()
+    for i in range(n):
+        pid, resp = pids[i & 3]
+        decoder.decode(pid, PIDDecoder.parse_pid_response(pid, resp))
+    return n, time.perf_counter() - t0
+
+
+@benchmark("decode.pid_parser", n=50000, unidad="respuestas")
+def decode_pid_parser(n):
+    """PIDParser.parse_response con definiciones cargadas."""
+    from src.obd.pid_parser import PIDDefinition, PIDParser
+
+    parser = PIDParser()
+    parser.logger.setLevel(logging.CRITICAL)
+    parser.pids["010D"] = PIDDefinition("010D", "Velocidad", "", 1, "A", 0, 255, "km/h")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        parser.parse_response("010D", "41 0D 3C")
+    return n, time.perf_counter() - t0
+
+
+@benchmark("decode.decodificador", n=100000, unidad="respuestas")
+def decode_decodificador(n):
+    """Decodificador del daemon (líneas del cliente asyncio)."""
+    from src.obd.decodificador import Decodificador
+
+    dec = Decodificador()
+    pids = [(pid, [resp]) for pid, resp in RESPUESTAS.items()]
+    t0 = time.perf_counter()
+    for i in range(n):
+        pid, lineas = pids[i & 3]
+        dec.decodificar(pid, lineas)
+    return n, time.perf_counter() - t0
+
+
+@benchmark("decode.dashboard_parse_response", n=100000, unidad="respuestas")
+def decode_dashboard_parse_response(n):
+    """OptimizedELM327Connection.parse_response del dashboard WiFi."""
+    try:
+        from dashboard_optimizado_wifi_final import OptimizedELM327Connection
+    except ImportError as e:
+        raise Omitido(f"dashboard no importable: {e}") from e
+    conexion = OptimizedELM327Connection()
+    pids = [(pid, resp + "\r\r>") for pid, resp in RESPUESTAS.items()]
+    t0 = time.perf_counter()
+    for i in range(n):
+        pid, resp = pids[i & 3]
+        conexion.parse_response(resp, pid)
+    return n, time.perf_counter() - t0
+
+
+@benchmark("decode.catalogo_pids", n=200, unidad="cargas")
+def decode_catalogo_pids(n):
+    """Cargar el catálogo unificado de PIDs desde la caché marshal (sin memo)."""
+    from src.obd import catalogo_pids
+
+    catalogo_pids.cargar_catalogo()  # asegura la caché en disco
+    t0 = time.perf_counter()
+    for _ in range(n):
+        catalogo_pids._MEMO.clear()
+        catalogo_pids.cargar_catalogo()
+    return n, time.perf_counter() - t0
+
+
+# ----------------------------------------------------------------------
+# Logging
+# ----------------------------------------------------------------------
+@benchmark("log.datalogger_csv", n=5000, unidad="filas")
+def log_datalogger_csv(n):
+    """DataLogger del dashboard: una fila de 4 PIDs por llamada a log_data."""
+    from data_logger import DataLogger
+
+    fila = {pid: {"name": pid, "value": 100, "unit": ""} for pid in RESPUESTAS}
+    with _directorio_temporal():
+        logger = DataLogger()
+        logger.start_logging()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            logger.log_data(fila)
+        segundos = time.perf_counter() - t0
+        logger.close()
+    return n, segundos
+
+
+@benchmark("log.sqlite_lecturas", n=2000, unidad="filas")
+def log_sqlite_lecturas(n):
+    """storage.logger.DataLogger: una fila JSON por lectura (commit por fila)."""
+    from src.storage.logger import DataLogger
+
+    with _directorio_temporal():
+        logger = DataLogger("obd_log.db")
+        t0 = time.perf_counter()
+        for i in range(n):
+            logger.log({"rpm": 800 + i, "vel": 40, "temp": 90})
+        segundos = time.perf_counter() - t0
+        logger.close()
+    return n, segundos
+
+
+@benchmark("log.sesiones_sqlite", n=100000, unidad="muestras")
+def log_sesiones_sqlite(n):
+    """SessionStore.agregar_muestras en lotes de 500 (con rollups)."""
+    from src.storage.sesiones import SessionStore
+
+    with _directorio_temporal():
+        store = SessionStore("sesiones.db")
+        pids = list(RESPUESTAS)
+        lote = 500
+        t0 = time.perf_counter()
+        for inicio in range(0, n, lote):
+            store.agregar_muestras("bench", [
+                (1000.0 + (inicio + i) * 0.01, pids[i & 3], float(i)) for i in range(min(lote, n - inicio))
+            ])
+        segundos = time.perf_counter() - t0
+        store.cerrar()
+    return n, segundos
+
+
+# ----------------------------------------------------------------------
+# Adquisición de punta a punta
+# ----------------------------------------------------------------------
+@benchmark("e2e.simulador_elm327", n=2000, unidad="pids")
+def e2e_simulador(n):
+    """ClienteELM327Async + Decodificador contra el simulador TCP local (ciclo WLTP)."""
+    from src.obd.decodificador import Decodificador
+    from src.obd.elm327_asyncio import ClienteELM327Async
+    from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+    async def _run():
+        async with SimuladorELM327(puerto=0, vehiculo=VehiculoSimulado(semilla=0, ciclo="wltp")) as sim:
+            cliente = ClienteELM327Async(host="127.0.0.1", puerto=sim.puerto)
+            await cliente.conectar()
+            dec = Decodificador()
+            pids = list(RESPUESTAS)
+            t0 = time.perf_counter()
+            for i in range(n):
+                pid = pids[i & 3]
+                dec.decodificar(pid, await cliente.comando(pid))
+            segundos = time.perf_counter() - t0
+            await cliente.cerrar()
+            return segundos
+
+    return n, asyncio.run(_run())
+
+
+@benchmark("emu.flota_paso", n=200, unidad="vehículo-pasos")
+def emu_flota_paso(n):
+    """EmuladorFlota: un paso de 10 000 vehículos (con diésel) y su muestra con ruido."""
+    try:
+        from src.obd.emulador_flota import EmuladorFlota
+    except ImportError as e:
+        raise Omitido(f"NumPy no instalado: {e}") from e
+
+    flota = EmuladorFlota(10000, semilla=0)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        flota.avanzar(0.1)
+        flota.instantanea()
+    return n * flota.n, time.perf_counter() - t0
+
+
+# ----------------------------------------------------------------------
+# Arranque: importación en frío (-X importtime) y hasta el primer frame
+# ----------------------------------------------------------------------
+_PRIMER_FRAME = """
+import time
+t0 = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+app = QApplication([])
+import dashboard_optimizado_wifi_final as dash
+
+class _Dashboard(dash.HighSpeedOBDDashboard):
+    def show_startup_dialog(self):
+        self.startup_mode = "generic"
+
+ventana = _Dashboard()
+ventana.show()
+app.processEvents()
+print(time.perf_counter() - t0)
+"""
+
+
+def _importacion(modulo, n):
+    from .importtime import medir, total_s
+
+    segundos = 0.0
+    for _ in range(n):
+        try:
+            segundos += total_s(medir(modulo), modulo)
+        except RuntimeError as e:
+            raise Omitido(str(e)) from e
+    return n, segundos
+
+
+@benchmark("startup.import_dashboard", n=3, unidad="arranques")
+def startup_import_dashboard(n):
+    """Importar el dashboard WiFi en un intérprete nuevo (-X importtime)."""
+    return _importacion("dashboard_optimizado_wifi_final", n)
+
+
+@benchmark("startup.import_daemon", n=3, unidad="arranques")
+def startup_import_daemon(n):
+    """Importar el daemon de adquisición en un intérprete nuevo (-X importtime)."""
+    return _importacion("src.daemon.adquisicion", n)
+
+
+@benchmark("startup.dashboard_primer_frame", n=3, unidad="arranques")
+def startup_dashboard_primer_frame(n):
+    """Proceso nuevo hasta la ventana del dashboard pintada (Qt offscreen)."""
+    import subprocess
+
+    segundos = 0.0
+    with _directorio_temporal():
+        for _ in range(n):
+            proceso = subprocess.run(
+                [sys.executable, "-c", _PRIMER_FRAME], capture_output=True, text=True,
+                env=dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPATH=RAIZ),
+            )
+            if proceso.returncode != 0:
+                raise Omitido((proceso.stderr.strip().splitlines() or ["?"])[-1])
+            segundos += float(proceso.stdout.strip().splitlines()[-1])
+    return n, segundos
+
+
+# ----------------------------------------------------------------------
+# UI (Qt offscreen): un frame = actualizar widgets y pintarlos
+# ----------------------------------------------------------------------
+@benchmark("ui.dashboard_frame", n=200, unidad="frames")
+def ui_dashboard_frame(n):
+    """HighSpeedOBDDashboard: consumir la cola, actualizar labels y pintar."""
+    app = _qt_app("PyQt6")
+    try:
+        import dashboard_optimizado_wifi_final as dash
+    except ImportError as e:
+        raise Omitido(f"dashboard no importable: {e}") from e
+
+    class _Dashboard(dash.HighSpeedOBDDashboard):
+        def show_startup_dialog(self):  # sin diálogo modal
+            self.startup_mode = "generic"
+
+    with _directorio_temporal():
+        ventana = _Dashboard()
+        ventana.elm327._mode = dash.OPERATION_MODES["EMULATOR"]
+        ventana.elm327.connect()
+        ventana.selected_fast_pids = list(RESPUESTAS)
+        ventana._refresh_pid_labels()
+        ventana.show()
+        app.processEvents()
+        datos = [{pid: {"name": pid, "value": (i * 7 + j) % 120, "unit": ""}
+                  for j, pid in enumerate(RESPUESTAS)} for i in range(n)]
+        t0 = time.perf_counter()
+        for fila in datos:
+            ventana.data_queue.put((time.perf_counter(), fila))
+            ventana.read_fast_data()
+            app.processEvents()
+            ventana.grab()
+        segundos = time.perf_counter() - t0
+        ventana.close()
+    return n, segundos
+
+
+@benchmark("ui.data_visualizer_frame", n=200, unidad="frames")
+def ui_data_visualizer_frame(n):
+    """DataVisualizer (scanner-obd2): gauges + gráfico en tiempo real y pintado."""
+    app = _qt_app("PySide6")
+    for ruta in (SCANNER, os.path.join(SCANNER, "src")):
+        if ruta not in sys.path:
+            sys.path.insert(0, ruta)
+    try:
+        from src.ui.data_visualizer import DataVisualizer
+    except Exception as e:  # pyqtgraph, rutas absolutas de pids_ext, etc.
+        raise Omitido(f"DataVisualizer no importable: {e}") from e
+
+    valores = {"RPM": 800, "Velocidad": 40, "Temp Agua": 90}
+
+    def obtener():
+        valores["RPM"] = (valores["RPM"] + 37) % 6000
+        return dict(valores)
+
+    visor = DataVisualizer(obtener)
+    visor.timer.stop()
+    visor.tabs.setCurrentWidget(visor.tab_graphs)  # el gráfico se crea al abrir la pestaña
+    visor.show()
+    app.processEvents()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        visor.update_data()
+        visor.update_graphs()
+        app.processEvents()
+        visor.grab()
+    segundos = time.perf_counter() - t0
+    visor.close()
+    return n, segundos
@@ -0,0 +1,93 @@
+"""
+Informe de tiempo de importación (``python -X importtime``) y presupuesto
+de arranque.
+
+Cada medición corre en un proceso nuevo, así que refleja un arranque en frío
+del intérprete (con los .pyc ya compilados). Uso desde la raíz:
+
+    python -m benchmarks.importtime                         # dashboard WiFi
+    python -m benchmarks.importtime src.daemon.adquisicion --top 10
+    python -m benchmarks.importtime --presupuesto 0.5        # código 1 si se pasa
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULO_POR_DEFECTO = "dashboard_optimizado_wifi_final"
+PRESUPUESTO_S = 1.0  # arranque en frío hasta el primer frame, en la laptop del auto
+
+_LINEA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+@dataclass
+class Importacion:
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    nivel: int
+
+
+def medir(modulo: str = MODULO_POR_DEFECTO, cwd: str = RAIZ,
+          python: Optional[str] = None) -> List[Importacion]:
+    """Importa ``modulo`` en un proceso nuevo y parsea la salida de -X importtime."""
+    proceso = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=cwd, capture_output=True, text=True,
+        env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    if proceso.returncode != 0:
+        ultima = (proceso.stderr.strip().splitlines() or ["?"])[-1]
+        raise RuntimeError(f"no se pudo importar {modulo}: {ultima}")
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            filas.append(Importacion(m.group(4), int(m.group(1)), int(m.group(2)),
+                                     (len(m.group(3)) - 1) // 2))
+    return filas
+
+
+def total_s(filas: List[Importacion], modulo: str = MODULO_POR_DEFECTO) -> float:
+    """Tiempo acumulado de importar ``modulo`` (incluye todas sus dependencias)."""
+    for fila in reversed(filas):
+        if fila.modulo == modulo and fila.nivel == 0:
+            return fila.acumulado_us / 1e6
+    return sum(f.propio_us for f in filas) / 1e6
+
+
+def informe(filas: List[Importacion], top: int = 15) -> str:
+    """Los paquetes de primer nivel que más tardan, por tiempo acumulado."""
+    lineas = [f"{'acumulado ms':>12} {'propio ms':>10}  módulo"]
+    for fila in sorted((f for f in filas if f.nivel <= 1), key=lambda f: -f.acumulado_us)[:top]:
+        lineas.append(f"{fila.acumulado_us / 1000:>12.1f} {fila.propio_us / 1000:>10.1f}  "
+                      f"{'  ' * fila.nivel}{fila.modulo}")
+    return "\n".join(lineas)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.importtime",
+                                     description="Tiempo de importación en frío")
+    parser.add_argument("modulo", nargs="?", default=MODULO_POR_DEFECTO)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--presupuesto", type=float, default=PRESUPUESTO_S,
+                        help="segundos; el proceso termina con código 1 si se supera")
+    args = parser.parse_args(argv)
+
+    try:
+        filas = medir(args.modulo)
+    except RuntimeError as e:
+        print(f"[IMPORT] {e}")
+        return 2
+    total = total_s(filas, args.modulo)
+    print(informe(filas, args.top))
+    print(f"[IMPORT] {args.modulo}: {total * 1000:.1f} ms (presupuesto {args.presupuesto * 1000:.0f} ms)")
+    return 1 if total > args.presupuesto else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Tiempo de recuperación ante fallas del adaptador, por pila de adquisición.
+
+Cada escenario levanta el simulador ELM327 con un corte programado de un
+tipo de falla (ver src/obd/fallas_elm327.py) y deja correr una pila de
+adquisición contra él, anotando el instante de cada lectura válida:
+
+- ``daemon``: AdquisidorVehiculo (asyncio, reconexión con backoff del daemon).
+- ``connection_base``: OBD2WiFiConnection.send_command con ``reconnect()``
+  cuando la escritura falla o la respuesta llega vacía.
+- ``dashboard``: el bucle de OptimizedELM327Connection.query_pid del
+  dashboard WiFi (se omite si PyQt6 no está instalado).
+
+Por escenario y pila se informa la tasa nominal (antes del corte), el tiempo
+de recuperación (primera lectura válida después del fin del corte) y las
+muestras perdidas respecto de la tasa nominal. Uso desde la raíz:
+
+    python -m benchmarks.recuperacion
+    python -m benchmarks.recuperacion -k desconexion --pila daemon
+    python -m benchmarks.recuperacion --json recuperacion.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.obd.fallas_elm327 import TIPOS, InyectorFallas
+from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+from .suite import Omitido
+
+INICIO_CORTE = 2.0  # segundos de lectura nominal antes del corte
+DURACION_CORTE = 1.0
+CALENTAMIENTO = 0.5  # se excluye de la tasa nominal (conexión e inicialización)
+LATENCIA_PICO = 0.8  # segundos extra por petición durante un corte de latencia
+PID = "010C"
+
+
+@dataclass
+class Resultado:
+    escenario: str
+    pila: str
+    nominal_hz: float
+    recuperacion_s: Optional[float]  # None: no volvió a leer antes del final
+    muestras_perdidas: int
+    lecturas: int
+    omitido: Optional[str] = None
+
+
+def evaluar(escenario: str, pila: str, tiempos: List[float], inicio: float,
+            fin: float, total: float) -> Resultado:
+    """
+    Métricas a partir de los instantes (s desde el arranque) de cada lectura
+    válida. Sin recuperación, las muestras perdidas se cuentan hasta ``total``.
+    """
+    previas = [t for t in tiempos if CALENTAMIENTO <= t < inicio]
+    nominal = len(previas) / (inicio - CALENTAMIENTO)
+    posteriores = [t for t in tiempos if t >= fin]
+    if posteriores:
+        recuperado = posteriores[0]
+        recuperacion = round(recuperado - fin, 3)
+    else:
+        recuperado, recuperacion = total, None
+    durante = sum(1 for t in tiempos if inicio <= t < recuperado)
+    perdidas = max(0, round(nominal * (recuperado - inicio)) - durante)
+    return Resultado(escenario, pila, round(nominal, 1), recuperacion, perdidas, len(tiempos))
+
+
+# ----------------------------------------------------------------------
+# Pilas: cada una corre hasta ``parar`` y agrega a ``anotar`` cada lectura válida
+# ----------------------------------------------------------------------
+
+async def _pila_daemon(puerto: int, anotar: Callable[[], None], parar: asyncio.Event):
+    from src.daemon.adquisicion import CONFIG_POR_DEFECTO, AdquisidorVehiculo
+
+    class _Contador:
+        """Uplink mínimo: solo marca el instante de cada muestra."""
+
+        def agregar(self, pid, valor):
+            anotar()
+
+        def nueva_sesion(self, nombre):
+            pass
+
+        def sellar(self):
+            pass
+
+    with tempfile.TemporaryDirectory() as directorio:
+        vehiculo = AdquisidorVehiculo(
+            "bench", {"host": "127.0.0.1", "puerto": puerto, "timeout": 2.0}, {"rpm": 0.01},
+            {"directorio": directorio, "intervalo": 1.0}, CONFIG_POR_DEFECTO["reconexion"],
+            uplink=_Contador(),
+        )
+        await vehiculo.ejecutar(parar)
+
+
+def _pila_connection_base(puerto: int, anotar: Callable[[], None], parar: threading.Event):
+    from src.obd.connection_wifi import OBD2WiFiConnection
+
+    conexion = OBD2WiFiConnection("127.0.0.1", puerto)
+    conectado = conexion.connect()
+    while not parar.is_set():
+        if not conectado:
+            conectado = conexion.reconnect()
+            continue
+        ok, respuesta = conexion.send_command(PID)
+        if ok and "41 0C" in respuesta:
+            anotar()
+        elif not ok or not respuesta:
+            conectado = False
+    conexion.disconnect()
+
+
+def _pila_dashboard(puerto: int, anotar: Callable[[], None], parar: threading.Event):
+    try:
+        from dashboard_optimizado_wifi_final import OptimizedELM327Connection
+    except ImportError as e:
+        raise Omitido(f"dashboard no importable: {e}") from e
+
+    conexion = OptimizedELM327Connection()
+    conexion.ip, conexion.port = "127.0.0.1", puerto
+    conexion.fast_pids = {PID: {"name": "RPM", "unit": "RPM"}}
+    conexion.connect()
+    # Igual que data_acquisition_loop: sin reconexión propia
+    while not parar.is_set():
+        if conexion.query_pid(PID) is not None:
+            anotar()
+    conexion.disconnect()
+
+
+PILAS = {"daemon": _pila_daemon, "connection_base": _pila_connection_base,
+         "dashboard": _pila_dashboard}
+
+
+def _corte(tipo: str, inicio: float, duracion: float) -> Dict:
+    corte = {"tipo": tipo, "inicio": inicio, "duracion": duracion}
+    if tipo == "latencia":
+        corte["segundos"] = LATENCIA_PICO
+    return corte
+
+
+async def _correr(tipo: str, pila: str, inicio: float, duracion: float, total: float) -> Resultado:
+    fallas = InyectorFallas(cortes=[_corte(tipo, inicio, duracion)])
+    vehiculo = VehiculoSimulado(semilla=0)
+    vehiculo.fijar(rpm=1500)
+    tiempos: List[float] = []
+    async with SimuladorELM327(puerto=0, vehiculo=vehiculo, fallas=fallas) as sim:
+        t0 = time.monotonic()
+
+        def anotar():
+            tiempos.append(time.monotonic() - t0)
+
+        funcion = PILAS[pila]
+        if asyncio.iscoroutinefunction(funcion):
+            parar = asyncio.Event()
+            tarea = asyncio.create_task(funcion(sim.puerto, anotar, parar))
+            await asyncio.sleep(total)
+            parar.set()
+            await asyncio.wait_for(tarea, 10)
+        else:
+            parar = threading.Event()
+            hilo = asyncio.get_running_loop().run_in_executor(None, funcion, sim.puerto, anotar, parar)
+            await asyncio.sleep(total)
+            parar.set()
+            await asyncio.wait_for(hilo, 10)
+    return evaluar(tipo, pila, tiempos, inicio, inicio + duracion, total)
+
+
+def medir(tipo: str, pila: str, inicio: float = INICIO_CORTE, duracion: float = DURACION_CORTE,
+          total: Optional[float] = None) -> Resultado:
+    """Corre un escenario (tipo de falla) contra una pila y devuelve sus métricas."""
+    total = total or inicio + duracion + 3.0
+    try:
+        return asyncio.run(_correr(tipo, pila, inicio, duracion, total))
+    except Omitido as e:
+        return Resultado(tipo, pila, 0.0, None, 0, 0, omitido=str(e))
+
+
+def tabla(resultados: List[Resultado]) -> str:
+    lineas = [f"{'escenario':<13} {'pila':<16} {'nominal/s':>10} {'recuperación s':>15} {'perdidas':>9}"]
+    for r in resultados:
+        if r.omitido:
+            lineas.append(f"{r.escenario:<13} {r.pila:<16} omitido: {r.omitido}")
+            continue
+        recuperacion = f"{r.recuperacion_s:.3f}" if r.recuperacion_s is not None else "no recupera"
+        lineas.append(f"{r.escenario:<13} {r.pila:<16} {r.nominal_hz:>10.1f} {recuperacion:>15} "
+                      f"{r.muestras_perdidas:>9}")
+    return "\n".join(lineas)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.recuperacion",
+                                     description="Tiempo de recuperación ante fallas del adaptador")
+    parser.add_argument("-k", dest="filtro", default="", help="solo los escenarios que contienen esto")
+    parser.add_argument("--pila", action="append", choices=sorted(PILAS),
+                        help="pila a medir (repetible; por defecto todas)")
+    parser.add_argument("--inicio", type=float, default=INICIO_CORTE, help="segundos antes del corte")
+    parser.add_argument("--duracion", type=float, default=DURACION_CORTE, help="duración del corte")
+    parser.add_argument("--json", metavar="RUTA", help="guardar los resultados en JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)  # las pilas registran cada error esperado
+
+    resultados = []
+    for tipo in (t for t in TIPOS if args.filtro in t):
+        for pila in args.pila or PILAS:
+            resultado = medir(tipo, pila, args.inicio, args.duracion)
+            resultados.append(resultado)
+            print(f"[RECUPERACION] {tipo} / {pila}: "
+                  f"{resultado.omitido or resultado.recuperacion_s}", file=sys.stderr)
+    print(tabla(resultados))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in resultados], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Registro, ejecución y comparación de benchmarks.
+
+Cada caso es una función ``caso(n) -> (operaciones, segundos)`` registrada con
+``@benchmark``: prepara lo que necesite, mide solo el bucle caliente y
+devuelve cuántas operaciones hizo y en cuánto tiempo. Si le falta una
+dependencia opcional (PyQt6, PySide6...) lanza ``Omitido``.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+VERSION = 1
+TOLERANCIA = 0.15  # caída relativa de ops/s que se considera regresión
+DIR_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+class Omitido(Exception):
+    """El caso no puede correr en este entorno (dependencia opcional ausente)."""
+
+
+@dataclass
+class Caso:
+    nombre: str
+    funcion: Callable[[int], Tuple[int, float]]
+    n: int
+    unidad: str
+    descripcion: str
+
+
+CASOS: Dict[str, Caso] = {}
+
+
+def benchmark(nombre: str, n: int, unidad: str = "ops"):
+    """Registra un caso; ``n`` es el tamaño por defecto de una repetición."""
+    def decorador(funcion):
+        descripcion = (funcion.__doc__ or "").strip().splitlines()
+        CASOS[nombre] = Caso(nombre, funcion, n, unidad, descripcion[0] if descripcion else "")
+        return funcion
+    return decorador
+
+
+def entorno() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def ruta_baseline(host: Optional[str] = None) -> str:
+    """Línea base por máquina: benchmarks/baselines/<host>.json."""
+    return os.path.join(DIR_BASELINES, f"{host or platform.node() or 'local'}.json")
+
+
+def ejecutar_caso(caso: Caso, repeticiones: int = 5, escala: float = 1.0) -> Dict[str, object]:
+    """Corre ``repeticiones`` veces y resume con la mejor y la mediana (ops/s)."""
+    n = max(1, int(caso.n * escala))
+    tasas = []
+    try:
+        for _ in range(repeticiones):
+            ops, segundos = caso.funcion(n)
+            tasas.append(ops / segundos if segundos > 0 else float("inf"))
+    except Omitido as e:
+        return {"omitido": str(e)}
+    mejor = max(tasas)
+    return {
+        "unidad": caso.unidad,
+        "n": n,
+        "repeticiones": repeticiones,
+        "ops_por_s": round(mejor, 2),
+        "mediana_ops_por_s": round(statistics.median(tasas), 2),
+        "us_por_op": round(1e6 / mejor, 3) if mejor else None,
+    }
+
+
+def ejecutar(filtro: Optional[str] = None, repeticiones: int = 5, escala: float = 1.0) -> Dict[str, object]:
+    from . import casos  # noqa: F401  (registra los casos)
+
+    resultados = {}
+    for nombre, caso in CASOS.items():
+        if filtro and filtro not in nombre:
+            continue
+        print(f"[BENCH] {nombre}...", file=sys.stderr, flush=True)
+        resultados[nombre] = ejecutar_caso(caso, repeticiones, escala)
+    return {"version": VERSION, "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "entorno": entorno(), "resultados": resultados}
+
+
+def comparar(actual: Dict[str, object], base: Dict[str, object],
+             tolerancia: float = TOLERANCIA) -> List[Dict[str, object]]:
+    """
+    Compara ops/s caso a caso. ``regresion`` es True si el caso cayó más de
+    ``tolerancia`` (fracción) respecto de la línea base.
+    """
+    filas = []
+    base_res = base.get("resultados", {})
+    for nombre, res in actual.get("resultados", {}).items():
+        ref = base_res.get(nombre)
+        if not ref or "ops_por_s" not in ref or "ops_por_s" not in res:
+            continue
+        cambio = res["ops_por_s"] / ref["ops_por_s"] - 1 if ref["ops_por_s"] else 0.0
+        filas.append({"nombre": nombre, "base": ref["ops_por_s"], "actual": res["ops_por_s"],
+                      "cambio": round(cambio, 4), "regresion": cambio < -tolerancia})
+    return filas
+
+
+def _tabla(informe: Dict[str, object]) -> str:
+    lineas = [f"{'caso':34} {'ops/s':>14} {'us/op':>11}  unidad"]
+    for nombre, res in informe["resultados"].items():
+        if "omitido" in res:
+            lineas.append(f"{nombre:34} {'omitido':>14} {'':>11}  {res['omitido']}")
+        else:
+            lineas.append(f"{nombre:34} {res['ops_por_s']:>14,.1f} {res['us_por_op']:>11.2f}  {res['unidad']}")
+    return "\n".join(lineas)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks OBD-II")
+    parser.add_argument("-k", dest="filtro", help="solo casos cuyo nombre contenga este texto")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5)
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica el tamaño de cada caso")
+    parser.add_argument("--guardar", nargs="?", const="", metavar="JSON",
+                        help="escribe los resultados como línea base (por defecto la de esta máquina)")
+    parser.add_argument("--comparar", nargs="?", const="", metavar="JSON",
+                        help="compara contra una línea base (por defecto la de esta máquina)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--json", action="store_true", help="imprime el informe en JSON")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args.filtro, args.repeticiones, args.escala)
+    print(json.dumps(informe, indent=2, ensure_ascii=False) if args.json else _tabla(informe))
+    if args.guardar is not None:
+        args.guardar = args.guardar or ruta_baseline()
+        os.makedirs(os.path.dirname(os.path.abspath(args.guardar)), exist_ok=True)
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"[BENCH] Línea base guardada en {args.guardar}")
+    if args.comparar is not None:
+        args.comparar = args.comparar or ruta_baseline()
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = 0
+        for fila in comparar(informe, base, args.tolerancia):
+            marca = "REGRESIÓN" if fila["regresion"] else "ok"
+            regresiones += fila["regresion"]
+            print(f"[BENCH] {fila['nombre']:34} {fila['cambio']:+7.1%}  {marca}")
+        if regresiones:
+            print(f"[BENCH] {regresiones} regresiones (tolerancia {args.tolerancia:.0%})")
+            return 1
+    return 0
@@ -5,22 +5,26 @@ import sys
 import os
 import random
 import time
-import csv
 import logging
 import socket
 import json
 from datetime import datetime
-from PyQt6.QtMultimedia import QSoundEffect
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QGroupBox, QGridLayout, QComboBox,
     QCheckBox, QScrollArea, QTabWidget, QDialog, QDialogButtonBox
 )
-from PyQt6.QtCore import QTimer, QUrl
+from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QAction
 
 from data_logger import DataLogger
+from src.obd.catalogo_pids import cargar_catalogo, clave_protocolo
+from src.obd.servicio_dtc import ServicioDTC
+from src.utils.metricas import (
+    REGISTRO, contar, cronometrar_slot, medir, observar_etapa, servir_metricas
+)
+from src.utils.perfilador import PerfiladorMuestreo, instalar_senal
 
 import threading
 import queue
@@ -70,6 +74,111 @@ class PIDCheckboxPanel(QGroupBox):
         return [pid for pid, checkbox in self.checkboxes.items() 
                 if checkbox.isChecked()]
 
+
+# PIDs extendidos SOLO Toyota Hilux (no Jeep, no Chrysler)
+EXTENDED_PIDS_HILUX = {
+    # Modo 01 (estándar y extendidos)
+    '0105': {'name': 'Engine coolant temperature', 'unit': '°C'},
+    '010C': {'name': 'Engine RPM', 'unit': 'rpm'},
+    '010D': {'name': 'Vehicle speed', 'unit': 'km/h'},
+    '012F': {'name': 'Fuel level input', 'unit': '%'},
+    '0133': {'name': 'Barometric pressure', 'unit': 'kPa'},
+    '0146': {'name': 'Ambient air temperature', 'unit': '°C'},
+    '015C': {'name': 'Engine oil temperature', 'unit': '°C'},
+    '0161': {'name': 'Driver demand torque', 'unit': '%'},
+    '0162': {'name': 'Actual engine torque', 'unit': '%'},
+    '0163': {'name': 'Engine reference torque', 'unit': 'Nm'},
+    '017C': {'name': 'DPF temperature', 'unit': '°C'},
+    # Modo 21/22 extendidos Hilux
+    '21B2': {'name': 'Ignition knock retard', 'unit': '°'},
+    '21D9': {'name': 'ATF temperature', 'unit': '°C'},
+    '21A3': {'name': 'DPF differential pressure', 'unit': 'kPa'},
+    '21DA': {'name': 'Current gear', 'unit': 'gear'},
+    '221627': {'name': 'ATF pressure stage 2', 'unit': 'kPa'},
+    # Otros extendidos útiles
+    '2133': {'name': 'Barometric pressure (ext)', 'unit': 'kPa'},
+    '2146': {'name': 'Ambient air temp (ext)', 'unit': '°C'},
+    '220B2': {'name': 'Ignition knock retard (ext)', 'unit': '°'},
+    # Puedes agregar más según tu CSV o necesidades
+}
+
+# PIDs extendidos Jeep Grand Cherokee (solo Jeep)
+EXTENDED_PIDS_JEEP = {
+    '221910': {'name': 'Trans Fluid Temp', 'unit': 'C'},
+    '221136': {'name': 'Engine Oil Temp', 'unit': 'C'},
+    '22111C': {'name': 'Oil Pressure', 'unit': 'kPa'},
+    '221134': {'name': 'Battery Voltage', 'unit': 'V'},
+    '2220CB': {'name': 'Knock Retard', 'unit': '°'},
+    '220298': {'name': 'Injector PW1', 'unit': 'us'},
+    '22029A': {'name': 'Injector PW2', 'unit': 'us'},
+    '22029C': {'name': 'Injector PW3', 'unit': 'us'},
+    '22029E': {'name': 'Injector PW4', 'unit': 'us'},
+    '2202A0': {'name': 'Injector PW5', 'unit': 'us'},
+    '2202A2': {'name': 'Injector PW6', 'unit': 'us'},
+    '2202A4': {'name': 'Injector PW7', 'unit': 'us'},
+    '2202A6': {'name': 'Injector PW8', 'unit': 'us'},
+    '221A00': {'name': 'Trans Output Shaft Speed', 'unit': 'rpm'},
+    '221A02': {'name': 'Trans Input Shaft Speed', 'unit': 'rpm'},
+    '221A08': {'name': 'Trans Torque Converter Slip', 'unit': 'rpm'},
+    '22201D': {'name': 'Engine Torque', 'unit': 'Nm'},
+    '22191A': {'name': 'Trans Fluid Pressure', 'unit': 'bar'},
+    '221138': {'name': 'Oil Life Remaining', 'unit': '%'},
+    '221A18': {'name': 'Gearbox Selected Gear', 'unit': 'N'},
+    '22190E': {'name': 'Transmission Fluid Level', 'unit': 'L'},
+    '221A10': {'name': 'Transfer Case Oil Temp', 'unit': 'C'},
+    '22110A': {'name': 'Differential Oil Temp', 'unit': 'C'},
+    '224901': {'name': 'ABS Wheel Speed FL', 'unit': 'km/h'},
+    '224903': {'name': 'ABS Wheel Speed FR', 'unit': 'km/h'},
+    '224905': {'name': 'ABS Wheel Speed RL', 'unit': 'km/h'},
+    '224907': {'name': 'ABS Wheel Speed RR', 'unit': 'km/h'},
+    '2216BC': {'name': 'Steering Angle', 'unit': 'deg'},
+    '2216A2': {'name': 'G-Force Lateral', 'unit': 'g'},
+    '2216A0': {'name': 'G-Force Longitudinal', 'unit': 'g'},
+    '2216A4': {'name': 'Yaw Rate', 'unit': 'deg/s'},
+    '22120B': {'name': 'Barometric Pressure', 'unit': 'kPa'},
+    '221202': {'name': 'Manifold Absolute Pressure', 'unit': 'bar'}
+}
+
+
+def _jeep_parsers():
+    """Parsers de los PIDs Jeep; se construyen solo si se elige ese vehículo."""
+    return {
+        '221910': lambda raw: int(raw[0:2], 16) - 40 if len(raw) >= 2 else None,
+        '221136': lambda raw: int(raw[0:2], 16) - 40 if len(raw) >= 2 else None,
+        '22111C': lambda raw: int(raw[0:2], 16) * 4 if len(raw) >= 2 else None,
+        '221134': lambda raw: int(raw[0:2], 16) / 10 if len(raw) >= 2 else None,
+        '2220CB': lambda raw: (((int(raw[0:2],16)<<8)+int(raw[2:4],16))*0.05) if len(raw)>=4 else None,
+        '220298': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '22029A': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '22029C': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '22029E': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '2202A0': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '2202A2': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '2202A4': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '2202A6': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '221A00': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '221A02': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '221A08': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
+        '22201D': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/8) if len(raw)>=4 else None,
+        '22191A': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '221138': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
+        '221A18': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
+        '22190E': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '221A10': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
+        '22110A': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
+        '224901': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '224903': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '224905': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '224907': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
+        '2216BC': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/10-720) if len(raw)>=4 else None,
+        '2216A2': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/1000) if len(raw)>=4 else None,
+        '2216A0': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/1000) if len(raw)>=4 else None,
+        '2216A4': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/100) if len(raw)>=4 else None,
+        '22120B': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
+        '221202': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None
+    }
+
+
 class OptimizedELM327Connection:
     """
     Clase para manejar la conexión con el dispositivo ELM327.
@@ -77,133 +186,8 @@ class OptimizedELM327Connection:
     """
     
     def __init__(self):
-        # PIDs extendidos SOLO Toyota Hilux (no Jeep, no Chrysler)
-        self.extended_pids = {
-            # Modo 01 (estándar y extendidos)
-            '0105': {'name': 'Engine coolant temperature', 'unit': '°C'},
-            '010C': {'name': 'Engine RPM', 'unit': 'rpm'},
-            '010D': {'name': 'Vehicle speed', 'unit': 'km/h'},
-            '012F': {'name': 'Fuel level input', 'unit': '%'},
-            '0133': {'name': 'Barometric pressure', 'unit': 'kPa'},
-            '0146': {'name': 'Ambient air temperature', 'unit': '°C'},
-            '015C': {'name': 'Engine oil temperature', 'unit': '°C'},
-            '0161': {'name': 'Driver demand torque', 'unit': '%'},
-            '0162': {'name': 'Actual engine torque', 'unit': '%'},
-            '0163': {'name': 'Engine reference torque', 'unit': 'Nm'},
-            '017C': {'name': 'DPF temperature', 'unit': '°C'},
-            # Modo 21/22 extendidos Hilux
-            '21B2': {'name': 'Ignition knock retard', 'unit': '°'},
-            '21D9': {'name': 'ATF temperature', 'unit': '°C'},
-            '21A3': {'name': 'DPF differential pressure', 'unit': 'kPa'},
-            '21DA': {'name': 'Current gear', 'unit': 'gear'},
-            '221627': {'name': 'ATF pressure stage 2', 'unit': 'kPa'},
-            # Otros extendidos útiles
-            '2133': {'name': 'Barometric pressure (ext)', 'unit': 'kPa'},
-            '2146': {'name': 'Ambient air temp (ext)', 'unit': '°C'},
-            '220B2': {'name': 'Ignition knock retard (ext)', 'unit': '°'},
-            # Puedes agregar más según tu CSV o necesidades
-        }
-        self.extended_parsers = {
-            '0105': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '010C': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16))/4 if len(raw)>=4 else None,
-            '010D': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '012F': lambda raw: int(raw[0:2],16)*100/255 if len(raw)>=2 else None,
-            '0133': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '0146': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '015C': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '0161': lambda raw: int(raw[0:2],16)-125 if len(raw)>=2 else None,
-            '0162': lambda raw: int(raw[0:2],16)-125 if len(raw)>=2 else None,
-            '0163': lambda raw: int(raw[0:2],16)*256+int(raw[2:4],16) if len(raw)>=4 else None,
-            '017C': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16))/10-40 if len(raw)>=4 else None,
-            '21B2': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16))/32-64 if len(raw)>=4 else None,
-            '21D9': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '21A3': lambda raw: int(raw[0:2],16)*256+int(raw[2:4],16) if len(raw)>=4 else None,
-            '21DA': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '221627': lambda raw: int(raw[0:2],16)*256+int(raw[2:4],16) if len(raw)>=4 else None,
-            '2133': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '2146': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '220B2': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16))/32-64 if len(raw)>=4 else None,
-        }
-        # Inicializar extended_parsers como diccionario vacío
-        self.extended_parsers = {}
-        self._mode = OPERATION_MODES["WIFI"]
-        self.ip = "192.168.0.10"
-        self.port = 35000
-        # PIDs rápidos y lentos como diccionarios vacíos
-        self.fast_pids = {}
-        self.slow_pids = {}
-        # PIDs extendidos Jeep Grand Cherokee (solo Jeep)
-        self.extended_pids_jeep = {
-            '221910': {'name': 'Trans Fluid Temp', 'unit': 'C'},
-            '221136': {'name': 'Engine Oil Temp', 'unit': 'C'},
-            '22111C': {'name': 'Oil Pressure', 'unit': 'kPa'},
-            '221134': {'name': 'Battery Voltage', 'unit': 'V'},
-            '2220CB': {'name': 'Knock Retard', 'unit': '°'},
-            '220298': {'name': 'Injector PW1', 'unit': 'us'},
-            '22029A': {'name': 'Injector PW2', 'unit': 'us'},
-            '22029C': {'name': 'Injector PW3', 'unit': 'us'},
-            '22029E': {'name': 'Injector PW4', 'unit': 'us'},
-            '2202A0': {'name': 'Injector PW5', 'unit': 'us'},
-            '2202A2': {'name': 'Injector PW6', 'unit': 'us'},
-            '2202A4': {'name': 'Injector PW7', 'unit': 'us'},
-            '2202A6': {'name': 'Injector PW8', 'unit': 'us'},
-            '221A00': {'name': 'Trans Output Shaft Speed', 'unit': 'rpm'},
-            '221A02': {'name': 'Trans Input Shaft Speed', 'unit': 'rpm'},
-            '221A08': {'name': 'Trans Torque Converter Slip', 'unit': 'rpm'},
-            '22201D': {'name': 'Engine Torque', 'unit': 'Nm'},
-            '22191A': {'name': 'Trans Fluid Pressure', 'unit': 'bar'},
-            '221138': {'name': 'Oil Life Remaining', 'unit': '%'},
-            '221A18': {'name': 'Gearbox Selected Gear', 'unit': 'N'},
-            '22190E': {'name': 'Transmission Fluid Level', 'unit': 'L'},
-            '221A10': {'name': 'Transfer Case Oil Temp', 'unit': 'C'},
-            '22110A': {'name': 'Differential Oil Temp', 'unit': 'C'},
-            '224901': {'name': 'ABS Wheel Speed FL', 'unit': 'km/h'},
-            '224903': {'name': 'ABS Wheel Speed FR', 'unit': 'km/h'},
-            '224905': {'name': 'ABS Wheel Speed RL', 'unit': 'km/h'},
-            '224907': {'name': 'ABS Wheel Speed RR', 'unit': 'km/h'},
-            '2216BC': {'name': 'Steering Angle', 'unit': 'deg'},
-            '2216A2': {'name': 'G-Force Lateral', 'unit': 'g'},
-            '2216A0': {'name': 'G-Force Longitudinal', 'unit': 'g'},
-            '2216A4': {'name': 'Yaw Rate', 'unit': 'deg/s'},
-            '22120B': {'name': 'Barometric Pressure', 'unit': 'kPa'},
-            '221202': {'name': 'Manifold Absolute Pressure', 'unit': 'bar'}
-        }
-        self.extended_parsers_jeep = {
-            '221910': lambda raw: int(raw[0:2], 16) - 40 if len(raw) >= 2 else None,
-            '221136': lambda raw: int(raw[0:2], 16) - 40 if len(raw) >= 2 else None,
-            '22111C': lambda raw: int(raw[0:2], 16) * 4 if len(raw) >= 2 else None,
-            '221134': lambda raw: int(raw[0:2], 16) / 10 if len(raw) >= 2 else None,
-            '2220CB': lambda raw: (((int(raw[0:2],16)<<8)+int(raw[2:4],16))*0.05) if len(raw)>=4 else None,
-            '220298': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '22029A': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '22029C': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '22029E': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '2202A0': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '2202A2': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '2202A4': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '2202A6': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '221A00': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '221A02': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '221A08': lambda raw: (int(raw[0:2],16)*256+int(raw[2:4],16)) if len(raw)>=4 else None,
-            '22201D': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/8) if len(raw)>=4 else None,
-            '22191A': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '221138': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '221A18': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '22190E': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '221A10': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '22110A': lambda raw: int(raw[0:2],16)-40 if len(raw)>=2 else None,
-            '224901': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '224903': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '224905': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '224907': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None,
-            '2216BC': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/10-720) if len(raw)>=4 else None,
-            '2216A2': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/1000) if len(raw)>=4 else None,
-            '2216A0': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/1000) if len(raw)>=4 else None,
-            '2216A4': lambda raw: (((int(raw[0:2],16)*256+int(raw[2:4],16))-20000)/100) if len(raw)>=4 else None,
-            '22120B': lambda raw: int(raw[0:2],16) if len(raw)>=2 else None,
-            '221202': lambda raw: ((int(raw[0:2],16)*256+int(raw[2:4],16))/100) if len(raw)>=4 else None
-        }
-        # Inicializar extended_parsers como diccionario vacío
+        # PIDs extendidos por defecto: Toyota Hilux (tablas a nivel de módulo)
+        self.extended_pids = dict(EXTENDED_PIDS_HILUX)
         self.extended_parsers = {}
         self._mode = OPERATION_MODES["WIFI"]
         self.ip = "192.168.0.10"
@@ -211,6 +195,18 @@ class OptimizedELM327Connection:
         # PIDs rápidos y lentos como diccionarios vacíos
         self.fast_pids = {}
         self.slow_pids = {}
+        # Un pedido y su respuesta por vez: el hilo de adquisición y la UI (DTC)
+        # comparten el socket
+        self._io_lock = threading.RLock()
+
+    @property
+    def extended_pids_jeep(self):
+        return dict(EXTENDED_PIDS_JEEP)
+
+    @property
+    def extended_parsers_jeep(self):
+        return _jeep_parsers()
+
     logger = logging.getLogger(__name__)
 
     def connect(self):
@@ -249,7 +245,11 @@ class OptimizedELM327Connection:
         self.connected = False
 
     def _send_command(self, cmd):
-        """Envía un comando al dispositivo"""
+        """Envía un comando al dispositivo y espera su respuesta (un pedido por vez)"""
+        with self._io_lock:
+            return self._send_command_unlocked(cmd)
+
+    def _send_command_unlocked(self, cmd):
         if not self.connected or self.socket is None:
             self.logger.error("No hay conexión activa con el ELM327.")
             return None
@@ -362,29 +362,46 @@ class OptimizedELM327Connection:
                 command = f"22{pid[2:]}\r\n"
             else:
                 return None
-            try:
-                self.socket.sendall(command.encode())
-                print(f"[DEBUG] Enviado PID: {command.strip()}")
-            except Exception as e:
-                self.logger.error(f"Error enviando comando {pid}: {e}")
-                return None
-            response = ""
-            start_time = time.time()
-            while True:
+            with self._io_lock:
                 try:
-                    chunk = self.socket.recv(256).decode('utf-8', errors='ignore')
-                    response += chunk
-                    if '>' in response or time.time() - start_time > 0.5:
-                        break
-                except socket.timeout:
-                    break
+                    t_envio = time.perf_counter()
+                    self.socket.sendall(command.encode())
+                    observar_etapa("envio", time.perf_counter() - t_envio)
+                    print(f"[DEBUG] Enviado PID: {command.strip()}")
                 except Exception as e:
-                    self.logger.error(f"Error recibiendo respuesta para {pid}: {e}")
-                    break
+                    self.logger.error(f"Error enviando comando {pid}: {e}")
+                    return None
+                response = ""
+                start_time = time.time()
+                t_espera = time.perf_counter()
+                t_primer_byte = None
+                while True:
+                    try:
+                        chunk = self.socket.recv(256).decode('utf-8', errors='ignore')
+                        if t_primer_byte is None:
+                            t_primer_byte = time.perf_counter()
+                        response += chunk
+                        if '>' in response or time.time() - start_time > 0.5:
+                            break
+                    except socket.timeout:
+                        break
+                    except Exception as e:
+                        self.logger.error(f"Error recibiendo respuesta para {pid}: {e}")
+                        break
+                t_fin = time.perf_counter()
+                observar_etapa("espera", (t_primer_byte or t_fin) - t_espera)
+                if t_primer_byte is not None:
+                    observar_etapa("recepcion", t_fin - t_primer_byte)
+            if '>' not in response:
+                contar("obd_timeouts_total", ayuda="Respuestas sin prompt '>' dentro del timeout")
+            if 'NO DATA' in response:
+                contar("obd_no_data_total", ayuda="Respuestas NO DATA del adaptador")
             print(f"[DEBUG] Respuesta cruda PID {pid}: {repr(response)}")
             # --- Parseo ---
             if pid in self.fast_pids or pid in self.slow_pids:
+                t_parseo = time.perf_counter()
                 parsed = self.parse_response(response, pid)
+                observar_etapa("parseo", time.perf_counter() - t_parseo)
                 if parsed:
                     info = (self.fast_pids.get(pid) or self.slow_pids.get(pid, {}))
                     return {'name': info.get('name', 'Unknown'), 'value': parsed['value'], 'unit': info.get('unit', '')}
@@ -475,47 +492,30 @@ class OptimizedELM327Connection:
             print(f"Error parseando respuesta: {str(e)}")
             return None
 
-    def read_dtc(self):
-        """Lee códigos DTC almacenados usando comando OBD-II estándar (robusto para frames múltiples y byte de cantidad atípico, soporta respuestas como '43 01 01 13', muestra siempre la línea cruda y hex, y extrae todos los DTCs posibles)"""
+    def read_dtc(self, pausar=None, reanudar=None):
+        """
+        Lee en una sola ráfaga los DTC almacenados (03), pendientes (07) y
+        permanentes (0A) y el freeze frame (02), sobre la conexión abierta y sin
+        'AT D' (no reinicia la configuración del adaptador). pausar/reanudar
+        detienen el sondeo de PIDs mientras dura la lectura.
+        """
         try:
             if not self.connected:
                 return ["[ERROR] No conectado"]
-            self._send_command('AT D')  # Limpia buffer
-            print("[DEBUG] Enviado DTC: 03")
-            resp = self._send_command('03')
-            print(f"[DEBUG] Respuesta cruda DTC: {repr(resp)}")
-            if not resp:
-                return ["[ERROR] Sin respuesta"]
+            servicio = ServicioDTC(self._send_command, pausar=pausar, reanudar=reanudar)
+            resultado = servicio.leer()
+            print(f"[DEBUG] Ráfaga DTC: {resultado['comandos']} comandos en {resultado['duracion_ms']} ms")
             dtcs = []
-            raw_codes = []
-            lines = resp.replace('\r', '').split('\n')
-            for line in lines:
-                line = line.strip().replace(' ', '')
-                if not line or not line.startswith('43'):
-                    continue
-                print(f"[DEBUG] Línea relevante DTC: {line}")
-                # Log hexadecimal byte a byte
-                hex_bytes = [line[i:i+2] for i in range(0, len(line), 2)]
-                if hex_bytes:
-                    print(f"[DEBUG] Línea relevante HEX: {' '.join(hex_bytes)}")
-                    dtcs.append(f"HEX: {' '.join(hex_bytes)}")
-                else:
-                    print(f"[DEBUG] Línea relevante HEX: (no convertible)")
-                dtcs.append(f"RAW: {line}")
-                # Extraer todos los códigos posibles de 4 en 4 caracteres a partir del tercer byte (saltando '43' + byte de cantidad = 4 chars)
-                data = line[4:]  # Saltar '43' + byte de cantidad (2 bytes = 4 chars)
-                # El byte de cantidad indica la cantidad de DTCs, pero algunos ECUs pueden no respetarlo
-                for i in range(0, len(data), 4):
-                    code = data[i:i+4]
-                    if code and code != '0000' and len(code) == 4:
-                        raw_codes.append(code)
-                        dtc_fmt = self._format_dtc(code)
-                        dtcs.append(dtc_fmt if dtc_fmt else code)
-            print(f"[DEBUG] Códigos DTC crudos extraídos: {raw_codes}")
-            print(f"[DEBUG] Códigos DTC formateados: {dtcs}")
-            if not raw_codes:
+            for clave, titulo in (("almacenados", "Almacenados"), ("pendientes", "Pendientes"),
+                                  ("permanentes", "Permanentes")):
+                if resultado[clave]:
+                    dtcs.append(f"{titulo}: {', '.join(resultado[clave])}")
+            freeze = resultado["freeze_frame"]
+            if freeze:
+                valores = ", ".join(f"{pid}={valor}" for pid, valor in freeze["valores"].items())
+                dtcs.append(f"Freeze frame ({freeze['dtc']}): {valores or 'sin datos'}")
+            if not dtcs:
                 dtcs.append("[INFO] No se encontraron DTCs activos (respuesta válida pero sin códigos)")
-            self._send_command('AT D')
             return dtcs
         except Exception as e:
             self.logger.error(f"Error leyendo DTC: {e}")
@@ -526,13 +526,9 @@ class OptimizedELM327Connection:
         try:
             if not self.connected:
                 return False
-            self._send_command('AT D')
             print("[DEBUG] Enviado CLEAR DTC: 04")
             resp = self._send_command('04')
             print(f"[DEBUG] Respuesta cruda CLEAR DTC: {repr(resp)}")
-            # Flush extra para limpiar el buffer tras borrar DTC
-            self._send_command('AT D')
-            time.sleep(0.2)
             return resp and ('OK' in resp or '44' in resp)
         except Exception as e:
             self.logger.error(f"Error borrando DTC: {e}")
@@ -590,59 +586,28 @@ class OptimizedELM327Connection:
             return None
 
     def load_pid_library(self, protocol=None):
-        """Carga la biblioteca de PIDs desde archivos CSV según el protocolo detectado."""
-        import_path = os.path.join(os.path.dirname(__file__), 'pids')
-        # Cargar universal (si existe)
-        universal_csv = os.path.join(import_path, 'universal_standard.csv')
-        if os.path.exists(universal_csv):
-            try:
-                with open(universal_csv, newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    fast, slow = {}, {}
-                    for row in reader:
-                        pid = row.get('PID', '').strip().upper()
-                        name = row.get('Name', '').strip()
-                        unit = row.get('Unit', '').strip()
-                        tipo = row.get('Type', '').strip().lower()  # 'fast' o 'slow'
-                        if not pid or not name:
-                            continue
-                        entry = {'name': name, 'unit': unit}
-                        if tipo == 'fast':
-                            fast[pid] = entry
-                        elif tipo == 'slow':
-                            slow[pid] = entry
-                    if fast:
-                        self.fast_pids = fast
-                    if slow:
-                        self.slow_pids = slow
-                print(f"[INFO] Biblioteca universal de PIDs cargada: {len(self.fast_pids)} fast, {len(self.slow_pids)} slow")
-            except Exception as e:
-                print(f"[ERROR] Error cargando universal_standard.csv: {e}")
+        """Carga la biblioteca de PIDs (CSV de pids/) desde el catálogo compartido en caché."""
+        try:
+            catalogo = cargar_catalogo()
+        except Exception as e:
+            print(f"[ERROR] Error cargando el catálogo de PIDs: {e}")
+            return
+        if catalogo.universal_fast or catalogo.universal_slow:
+            if catalogo.universal_fast:
+                self.fast_pids = dict(catalogo.universal_fast)
+            if catalogo.universal_slow:
+                self.slow_pids = dict(catalogo.universal_slow)
+            print(f"[INFO] Biblioteca universal de PIDs cargada: {len(self.fast_pids)} fast, {len(self.slow_pids)} slow")
         else:
             print("[INFO] No se encontró universal_standard.csv, usando PIDs por defecto.")
         # Cargar extendidos según protocolo
         if protocol:
-            proto_key = protocol.lower().replace('/', '_').replace(' ', '_')
-            ext_csv = os.path.join(import_path, f'extended_{proto_key}.csv')
-            if os.path.exists(ext_csv):
-                try:
-                    with open(ext_csv, newline='', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        ext = {}
-                        for row in reader:
-                            pid = row.get('PID', '').strip().upper()
-                            name = row.get('Name', '').strip()
-                            unit = row.get('Unit', '').strip()
-                            if not pid or not name:
-                                continue
-                            ext[pid] = {'name': name, 'unit': unit}
-                        if ext:
-                            self.extended_pids = ext
-                    print(f"[INFO] Biblioteca extendida de PIDs cargada: {len(self.extended_pids)} para {protocol}")
-                except Exception as e:
-                    print(f"[ERROR] Error cargando extended_{proto_key}.csv: {e}")
+            ext = catalogo.extendidos_para(protocol)
+            if ext:
+                self.extended_pids = ext
+                print(f"[INFO] Biblioteca extendida de PIDs cargada: {len(self.extended_pids)} para {protocol}")
             else:
-                print(f"[INFO] No se encontró extended_{proto_key}.csv, usando PIDs extendidos por defecto.")
+                print(f"[INFO] No se encontró extended_{clave_protocolo(protocol)}.csv, usando PIDs extendidos por defecto.")
 
     def set_vehicle_mode(self, vehicle_name):
         """Configura los PIDs extendidos y parsers según el vehículo seleccionado"""
@@ -663,11 +628,22 @@ class AlertManager:
         self.thresholds = config.get('pid_thresholds', {})
         self.visual_enabled = config.get('alert', {}).get('visual', True)
         self.sound_enabled = config.get('alert', {}).get('sound', True)
+        # QtMultimedia se carga recién con la primera alerta sonora
         self.sound_effect = None
-        if self.sound_enabled:
+
+    def _get_sound_effect(self):
+        if self.sound_effect is None and self.sound_enabled:
+            try:
+                from PyQt6.QtCore import QUrl
+                from PyQt6.QtMultimedia import QSoundEffect
+            except ImportError as e:
+                print(f"[ALERTA] Sonido deshabilitado, QtMultimedia no disponible: {e}")
+                self.sound_enabled = False
+                return None
             self.sound_effect = QSoundEffect()
             self.sound_effect.setSource(QUrl.fromLocalFile(os.path.join(os.path.dirname(__file__), 'alert.wav')))
             self.sound_effect.setVolume(0.7)
+        return self.sound_effect
 
     def check_and_alert(self, pid, value, label_widget=None):
         """Verifica si el valor está fuera de umbral y lanza alerta visual/sonora."""
@@ -678,7 +654,7 @@ class AlertManager:
         if (min_v is not None and value < min_v) or (max_v is not None and value > max_v):
             if self.visual_enabled and label_widget is not None:
                 label_widget.setStyleSheet('background-color: #ff5252; color: white; font-weight: bold;')
-            if self.sound_enabled and self.sound_effect:
+            if self.sound_enabled and self._get_sound_effect():
                 self.sound_effect.play()
         else:
             if label_widget is not None:
@@ -771,6 +747,14 @@ class HighSpeedOBDDashboard(QMainWindow):
         # Activar logging en SQLite si está configurado
         if self.config.get('logging', {}).get('sqlite', False):
             self.logger.enable_sqlite(True)
+        # Endpoint Prometheus local: se abre después del primer frame
+        self.metrics_server = None
+        QTimer.singleShot(0, self.start_metrics_server)
+        # Perfilador por muestreo: menú Configuración o kill -USR2 <pid>
+        perfil_cfg = self.config.get('perfilador', {})
+        self.perfilador = PerfiladorMuestreo(hz=perfil_cfg.get('hz', 100),
+                                             directorio=perfil_cfg.get('directorio', 'logs'))
+        instalar_senal(self.perfilador)
         self.show_startup_dialog()
         self.setup_ui()
         self.connect_signals()
@@ -891,6 +875,17 @@ class HighSpeedOBDDashboard(QMainWindow):
         self.read_dtc_btn.clicked.connect(self.read_dtcs)
         self.clear_dtc_btn.clicked.connect(self.clear_dtcs)
 
+        # Tab 4: Diagnóstico de rendimiento (métricas por etapa del sondeo)
+        diag_tab = QWidget()
+        diag_layout = QVBoxLayout(diag_tab)
+        self.metricas_label = QLabel("Sin métricas todavía")
+        self.metricas_label.setStyleSheet('font-family: monospace;')
+        diag_layout.addWidget(self.metricas_label)
+        self.tabs.addTab(diag_tab, "Diagnóstico")
+        self.metricas_timer = QTimer()
+        self.metricas_timer.timeout.connect(self.update_metrics_panel)
+        self.metricas_timer.start(1000)
+
         # Botón para escanear PIDs soportados
         self.scan_pids_btn = QPushButton("Escanear PIDs soportados")
         self.scan_pids_btn.setStyleSheet("background-color: #ffb300; color: black; font-weight: bold;")
@@ -910,6 +905,50 @@ class HighSpeedOBDDashboard(QMainWindow):
             self.change_mode_action = QAction("Cambiar modo/vehículo", self)
             config_menu.addAction(self.change_mode_action)
             self.change_mode_action.triggered.connect(self.show_startup_dialog_and_restart)
+            self.profiler_action = QAction("Perfilar rendimiento (muestreo)", self)
+            self.profiler_action.setCheckable(True)
+            config_menu.addAction(self.profiler_action)
+            self.profiler_action.toggled.connect(self.toggle_profiler)
+
+    def toggle_profiler(self, activar):
+        """Prende/apaga el perfilador sin reiniciar; al apagar guarda en logs/."""
+        if activar == self.perfilador.activo:
+            return
+        if activar:
+            self.perfilador.iniciar()
+            self.statusBar().showMessage(f"Perfilando a {self.perfilador.hz} Hz...")
+        else:
+            rutas = self.perfilador.detener()
+            self.statusBar().showMessage(f"Perfil guardado: {rutas.get('speedscope', '')}", 10000)
+
+    def start_metrics_server(self):
+        """Abre el endpoint Prometheus con las métricas del ciclo de sondeo."""
+        metricas_cfg = self.config.get('metricas', {})
+        if self.metrics_server is not None or not metricas_cfg.get('activo', True):
+            return
+        try:
+            self.metrics_server = servir_metricas(metricas_cfg.get('puerto', 9108))
+            print(f"[METRICAS] http://127.0.0.1:{self.metrics_server.server_address[1]}/metrics")
+        except OSError as e:
+            print(f"[METRICAS] No se pudo abrir el puerto de métricas: {e}")
+
+    def update_metrics_panel(self):
+        """Refresca el panel de diagnóstico solo si la pestaña está visible."""
+        if hasattr(self, 'profiler_action') and self.profiler_action.isChecked() != self.perfilador.activo:
+            # El perfilador se alternó por señal: reflejarlo en el menú
+            self.profiler_action.blockSignals(True)
+            self.profiler_action.setChecked(self.perfilador.activo)
+            self.profiler_action.blockSignals(False)
+        if self.tabs.currentWidget() is not self.metricas_label.parentWidget():
+            return
+        lineas = []
+        for nombre, datos in REGISTRO.resumen().items():
+            if "valor" in datos:
+                lineas.append(f"{nombre:60} {datos['valor']}")
+            else:
+                lineas.append(f"{nombre:60} n={datos['n']:<7} media={datos['media_ms']} ms  "
+                              f"p50≤{datos['p50_ms']} ms  p95≤{datos['p95_ms']} ms")
+        self.metricas_label.setText("\n".join(lineas) or "Sin métricas todavía")
 
     def connect_signals(self):
         """Conecta las señales de los widgets"""
@@ -1060,17 +1099,21 @@ class HighSpeedOBDDashboard(QMainWindow):
                 if value is not None and isinstance(value, dict):
                     data[pid] = value
             try:
-                self.data_queue.put(data, timeout=0.5)
+                # Con la marca de tiempo para medir el salto hilo -> UI
+                self.data_queue.put((time.perf_counter(), data), timeout=0.5)
             except queue.Full:
-                pass
+                contar("obd_muestras_descartadas_total", ayuda="Lecturas descartadas por cola llena")
+            medir("obd_cola_profundidad", self.data_queue.qsize(), ayuda="Lecturas en cola hacia la UI")
             time.sleep(1.0 / (self.actual_speed or 2))
 
     def read_fast_data(self):
         if not self.elm327.connected:
             return
+        t_ui = time.perf_counter()
         try:
             while not self.data_queue.empty():
-                data = self.data_queue.get()
+                encolado, data = self.data_queue.get()
+                observar_etapa("cola", time.perf_counter() - encolado)
                 # Actualizar UI y alertas para fast, slow y extendidos
                 for pid, value_dict in data.items():
                     if pid in self.pid_labels:
@@ -1090,6 +1133,8 @@ class HighSpeedOBDDashboard(QMainWindow):
                     self.logger.log_data(data)
         except Exception as e:
             print(f"[ERROR] Al consumir la cola de datos: {e}")
+        finally:
+            observar_etapa("ui", time.perf_counter() - t_ui)
 
     def read_slow_data(self):
         """
@@ -1098,6 +1143,10 @@ class HighSpeedOBDDashboard(QMainWindow):
         """
         if not self.elm327.connected:
             return
+        with cronometrar_slot("read_slow_data"):
+            self._read_slow_data()
+
+    def _read_slow_data(self):
         data = {}
         for pid in self.selected_slow_pids:
             value = self.elm327.query_pid(pid)
@@ -1118,11 +1167,36 @@ class HighSpeedOBDDashboard(QMainWindow):
         if data and hasattr(self.logger, 'active') and self.logger.active:
             self.logger.log_data(data)
 
+    def _pause_polling(self):
+        """Detiene timers e hilo de adquisición; devuelve qué estaba activo."""
+        timers = [t for t in (self.timer, self.slow_timer) if t.isActive()]
+        for t in timers:
+            t.stop()
+        hilo = self.reader_thread is not None and self.reader_thread.is_alive()
+        if hilo:
+            self.reader_thread_stop.set()
+            self.reader_thread.join(timeout=2)
+            self.reader_thread = None
+        return {"timers": timers, "hilo": hilo}
+
+    def _resume_polling(self, timers=(), hilo=False):
+        for t in timers:
+            t.start()
+        if hilo:
+            self.reader_thread_stop.clear()
+            self.reader_thread = threading.Thread(target=self.data_acquisition_loop, daemon=True)
+            self.reader_thread.start()
+
     def read_dtcs(self):
         self.dtc_result.setText("Leyendo DTCs...")
         QApplication.processEvents()
         if hasattr(self.elm327, 'read_dtc'):
-            dtcs = self.elm327.read_dtc()
+            # Sin lecturas de PIDs intercaladas durante la ráfaga de diagnóstico
+            estado = {}
+            dtcs = self.elm327.read_dtc(
+                pausar=lambda: estado.update(self._pause_polling()),
+                reanudar=lambda: self._resume_polling(**estado),
+            )
             self.dtc_result.setText("\n".join(dtcs))
         else:
             self.dtc_result.setText("[ERROR] Función no disponible")
@@ -1131,7 +1205,11 @@ class HighSpeedOBDDashboard(QMainWindow):
         self.dtc_result.setText("Borrando DTCs...")
         QApplication.processEvents()
         if hasattr(self.elm327, 'clear_dtc'):
-            ok = self.elm327.clear_dtc()
+            estado = self._pause_polling()
+            try:
+                ok = self.elm327.clear_dtc()
+            finally:
+                self._resume_polling(**estado)
             if ok:
                 self.dtc_result.setText("DTCs borrados correctamente.")
             else:
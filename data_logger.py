@@ -4,6 +4,8 @@ import logging
 import sqlite3
 from datetime import datetime
 
+from src.utils.metricas import cronometrar
+
 class DataLogger:
     """Clase para el registro de datos OBD (CSV y SQLite)"""
     def __init__(self):
@@ -40,7 +42,7 @@ class DataLogger:
         if not self.active or not self.log_file:
             return False
         try:
-            with open(self.log_file, 'a', newline='', encoding='utf-8') as f:
+            with cronometrar("disco"), open(self.log_file, 'a', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
                 for pid, info in data.items():
@@ -82,19 +84,20 @@ class DataLogger:
         if not self.active or not self.log_file:
             return False
         try:
-            # CSV
-            with open(self.log_file, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                for pid, value in data_row.items():
-                    writer.writerow([timestamp, pid, '', value, ''])
-            # SQLite
-            if self.sqlite_enabled and self.sqlite_conn:
-                c = self.sqlite_conn.cursor()
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                for pid, value in data_row.items():
-                    c.execute("INSERT INTO obd_data (timestamp, pid, value) VALUES (?, ?, ?)", (timestamp, pid, value))
-                self.sqlite_conn.commit()
+            with cronometrar("disco"):
+                # CSV
+                with open(self.log_file, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                    for pid, value in data_row.items():
+                        writer.writerow([timestamp, pid, '', value, ''])
+                # SQLite
+                if self.sqlite_enabled and self.sqlite_conn:
+                    c = self.sqlite_conn.cursor()
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+                    for pid, value in data_row.items():
+                        c.execute("INSERT INTO obd_data (timestamp, pid, value) VALUES (?, ?, ?)", (timestamp, pid, value))
+                    self.sqlite_conn.commit()
             return True
         except Exception as e:
             self.logger.error(f"Error registrando fila de datos: {e}")
@@ -75,15 +75,10 @@ def pids_recomendados_por_dtc(codigo_dtc: str) -> List[str]:
     """Devuelve lista de PIDs sugeridos para un DTC."""
     return resumen_dtc(codigo_dtc).get("pids_relevantes", [])
 
-# Lee DTCs activos (modo 03)
-def leer_dtc(ip: str = '192.168.0.10', puerto: int = 35000) -> List[Dict[str, Any]]:
-    """Devuelve lista de DTCs activos con descripción y sugerencia."""
-    conn = _crear_conexion(ip, puerto)
-    if not conn:
-        return [{"codigo": None, "descripcion": "Sin conexión OBD-II", "sugerencia": ""}]
+def _lista_dtc(conn: obd.OBD, cmd, etiqueta: str) -> List[Dict[str, Any]]:
+    """Consulta un modo de DTC sobre una conexión abierta (sin cerrarla)."""
     try:
-        resp = conn.query(obd.commands['GET_DTC'])
-        codigos = _parse_dtc_response(resp)
+        codigos = _parse_dtc_response(conn.query(cmd))
         resultado = []
         for code in codigos:
             info = resumen_dtc(code)
@@ -93,64 +88,66 @@ def leer_dtc(ip: str = '192.168.0.10', puerto: int = 35000) -> List[Dict[str, An
                 "sugerencia": info["sugerencia"]
             })
         if not resultado:
-            resultado.append({"codigo": None, "descripcion": "No se encontraron DTCs", "sugerencia": ""})
+            resultado.append({"codigo": None, "descripcion": f"No se encontraron {etiqueta}", "sugerencia": ""})
         return resultado
     except Exception:
-        return [{"codigo": None, "descripcion": "Error al leer DTCs", "sugerencia": ""}]
-    finally:
-        conn.close()
+        return [{"codigo": None, "descripcion": f"Error al leer {etiqueta}", "sugerencia": ""}]
 
-# Lee DTCs pendientes (modo 07)
-def leer_dtc_pendientes(ip: str = '192.168.0.10', puerto: int = 35000) -> List[Dict[str, Any]]:
-    """Devuelve lista de DTCs pendientes (modo 07)."""
+def _leer_modo(cmd, etiqueta: str, ip: str, puerto: int, conn: Optional[obd.OBD]) -> List[Dict[str, Any]]:
+    """Usa ``conn`` si se pasa (no la cierra); si no, abre y cierra una conexión propia."""
+    if conn is not None:
+        return _lista_dtc(conn, cmd, etiqueta)
     conn = _crear_conexion(ip, puerto)
     if not conn:
         return [{"codigo": None, "descripcion": "Sin conexión OBD-II", "sugerencia": ""}]
     try:
-        cmd = obd.OBDCommand("PENDING_DTC", "Read pending DTCs", "07", 0, lambda x: x)
-        resp = conn.query(cmd)
-        codigos = _parse_dtc_response(resp)
-        resultado = []
-        for code in codigos:
-            info = resumen_dtc(code)
-            resultado.append({
-                "codigo": code,
-                "descripcion": info["descripcion"],
-                "sugerencia": info["sugerencia"]
-            })
-        if not resultado:
-            resultado.append({"codigo": None, "descripcion": "No se encontraron DTCs pendientes", "sugerencia": ""})
-        return resultado
-    except Exception:
-        return [{"codigo": None, "descripcion": "Error al leer DTCs pendientes", "sugerencia": ""}]
+        return _lista_dtc(conn, cmd, etiqueta)
     finally:
         conn.close()
 
+def _cmd_pendientes():
+    return obd.OBDCommand("PENDING_DTC", "Read pending DTCs", "07", 0, lambda x: x)
+
+def _cmd_permanentes():
+    return obd.OBDCommand("PERMANENT_DTC", "Read permanent DTCs", "0A", 0, lambda x: x)
+
+# Lee DTCs activos (modo 03)
+def leer_dtc(ip: str = '192.168.0.10', puerto: int = 35000,
+             conn: Optional[obd.OBD] = None) -> List[Dict[str, Any]]:
+    """Devuelve lista de DTCs activos con descripción y sugerencia."""
+    return _leer_modo(obd.commands['GET_DTC'], "DTCs", ip, puerto, conn)
+
+# Lee DTCs pendientes (modo 07)
+def leer_dtc_pendientes(ip: str = '192.168.0.10', puerto: int = 35000,
+                        conn: Optional[obd.OBD] = None) -> List[Dict[str, Any]]:
+    """Devuelve lista de DTCs pendientes (modo 07)."""
+    return _leer_modo(_cmd_pendientes(), "DTCs pendientes", ip, puerto, conn)
+
 # Lee DTCs permanentes (modo 0A)
-def leer_dtc_permanentes(ip: str = '192.168.0.10', puerto: int = 35000) -> List[Dict[str, Any]]:
+def leer_dtc_permanentes(ip: str = '192.168.0.10', puerto: int = 35000,
+                         conn: Optional[obd.OBD] = None) -> List[Dict[str, Any]]:
     """Devuelve lista de DTCs permanentes (modo 0A)."""
-    conn = _crear_conexion(ip, puerto)
-    if not conn:
-        return [{"codigo": None, "descripcion": "Sin conexión OBD-II", "sugerencia": ""}]
+    return _leer_modo(_cmd_permanentes(), "DTCs permanentes", ip, puerto, conn)
+
+# Lee los tres modos (03, 07 y 0A) con una sola conexión
+def leer_todos_los_dtc(ip: str = '192.168.0.10', puerto: int = 35000,
+                       conn: Optional[obd.OBD] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Almacenados, pendientes y permanentes abriendo (a lo sumo) una conexión."""
+    propia = conn is None
+    if propia:
+        conn = _crear_conexion(ip, puerto)
+        if not conn:
+            sin_conexion = [{"codigo": None, "descripcion": "Sin conexión OBD-II", "sugerencia": ""}]
+            return {"almacenados": sin_conexion, "pendientes": sin_conexion, "permanentes": sin_conexion}
     try:
-        cmd = obd.OBDCommand("PERMANENT_DTC", "Read permanent DTCs", "0A", 0, lambda x: x)
-        resp = conn.query(cmd)
-        codigos = _parse_dtc_response(resp)
-        resultado = []
-        for code in codigos:
-            info = resumen_dtc(code)
-            resultado.append({
-                "codigo": code,
-                "descripcion": info["descripcion"],
-                "sugerencia": info["sugerencia"]
-            })
-        if not resultado:
-            resultado.append({"codigo": None, "descripcion": "No se encontraron DTCs permanentes", "sugerencia": ""})
-        return resultado
-    except Exception:
-        return [{"codigo": None, "descripcion": "Error al leer DTCs permanentes", "sugerencia": ""}]
+        return {
+            "almacenados": _lista_dtc(conn, obd.commands['GET_DTC'], "DTCs"),
+            "pendientes": _lista_dtc(conn, _cmd_pendientes(), "DTCs pendientes"),
+            "permanentes": _lista_dtc(conn, _cmd_permanentes(), "DTCs permanentes"),
+        }
     finally:
-        conn.close()
+        if propia:
+            conn.close()
 
 # Borra los DTCs (modo 04)
 def borrar_dtc(ip: str = '192.168.0.10', puerto: int = 35000) -> Dict[str, Any]:
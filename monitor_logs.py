@@ -3,86 +3,62 @@ import os
 import time
 from datetime import datetime
 
-def monitor_logs_real_time():
+from src.utils.tail import SeguidorDirectorio
+
+
+def _mostrar_ultimo(linea):
+    parts = linea.strip().split(',')
+    if len(parts) >= 4:
+        rpm = parts[1] if len(parts) > 1 else 'N/A'
+        vel = parts[2] if len(parts) > 2 else 'N/A'
+        temp = parts[3] if len(parts) > 3 else 'N/A'
+        print(f"           ➤ RPM={rpm}, Vel={vel}, Temp={temp}°C")
+
+
+def monitor_logs_real_time(log_dir="logs_obd", intervalo=2.0):
     print("👁️ MONITOR DE LOGS EN TIEMPO REAL")
     print("=" * 40)
-    
-    log_dir = "logs_obd"
-    
+
     if not os.path.exists(log_dir):
-        print("❌ Carpeta logs_obd no existe")
+        print(f"❌ Carpeta {log_dir} no existe")
         return
-    
-    print("🔍 Monitoreando carpeta logs_obd...")
+
+    print(f"🔍 Monitoreando carpeta {log_dir}...")
     print("📋 Presiona Ctrl+C para detener")
     print("-" * 40)
-    
-    last_files = set()
-    last_sizes = {}
-    
+
+    # Solo se leen los bytes agregados desde el último sondeo. Los archivos
+    # que ya existían arrancan al final (leer un log grande por bloques
+    # reportaría sus líneas viejas como nuevas); los que aparecen después se
+    # leen desde el principio.
+    seguidor = SeguidorDirectorio(log_dir, "*.csv", desde_final=True)
+    seguidor.sondear()
+    seguidor.desde_final = False
+
     try:
         while True:
-            current_files = set()
-            for file in os.listdir(log_dir):
-                if file.endswith('.csv'):
-                    current_files.add(file)
-            
-            # Detectar archivos nuevos
-            new_files = current_files - last_files
-            for new_file in new_files:
-                print(f"📝 NUEVO ARCHIVO: {new_file}")
-                last_sizes[new_file] = 0
-            
-            # Verificar cambios de tamaño
-            for file in current_files:
-                filepath = os.path.join(log_dir, file)
-                current_size = os.path.getsize(filepath)
-                
-                if file not in last_sizes:
-                    last_sizes[file] = current_size
-                elif current_size != last_sizes[file]:
-                    size_mb = current_size / 1024 / 1024
-                    added_bytes = current_size - last_sizes[file]
-                    
+            time.sleep(intervalo)
+            for evento in seguidor.sondear():
+                if evento.nuevo:
+                    print(f"📝 NUEVO ARCHIVO: {evento.nombre}")
+                if evento.reiniciado:
+                    print(f"🔄 {evento.nombre}: rotado o truncado, se lee desde el inicio")
+                if evento.lineas:
                     timestamp = datetime.now().strftime("%H:%M:%S")
-                    print(f"[{timestamp}] 📊 {file}: {size_mb:.3f}MB (+{added_bytes} bytes)")
-                    
-                    last_sizes[file] = current_size
-                    
-                    # Mostrar último dato si existe
-                    if current_size > 100:
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                lines = f.readlines()
-                                if len(lines) > 1:
-                                    last_line = lines[-1].strip()
-                                    parts = last_line.split(',')
-                                    if len(parts) >= 4:
-                                        rpm = parts[1] if len(parts) > 1 else 'N/A'
-                                        vel = parts[2] if len(parts) > 2 else 'N/A'
-                                        temp = parts[3] if len(parts) > 3 else 'N/A'
-                                        print(f"           ➤ RPM={rpm}, Vel={vel}, Temp={temp}°C")
-                        except:
-                            pass
-            
-            last_files = current_files
-            time.sleep(2)
-            
+                    size_mb = evento.tamano / 1024 / 1024
+                    print(f"[{timestamp}] 📊 {evento.nombre}: {size_mb:.3f}MB "
+                          f"(+{len(evento.lineas)} líneas, {evento.registros} registros)")
+                    if evento.registros > 0:
+                        _mostrar_ultimo(evento.lineas[-1])
+
     except KeyboardInterrupt:
         print(f"\n✅ Monitoreo detenido")
-        
+
         print(f"\n📊 RESUMEN FINAL:")
-        for file in current_files:
-            filepath = os.path.join(log_dir, file)
-            size_mb = os.path.getsize(filepath) / 1024 / 1024
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    lines = len(f.readlines())
-                records = max(0, lines - 1)
-                print(f"   📄 {file}: {records} registros, {size_mb:.3f}MB")
-            except:
-                print(f"   📄 {file}: Error leyendo archivo")
+        for file, datos in sorted(seguidor.resumen().items()):
+            size_mb = datos["tamano"] / 1024 / 1024
+            print(f"   📄 {file}: {datos['registros']} registros, {size_mb:.3f}MB")
+
 
 if __name__ == "__main__":
-    monitor_logs_real_time()
\ No newline at end of file
+    monitor_logs_real_time()
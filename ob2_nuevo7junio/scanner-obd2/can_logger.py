@@ -1,11 +1,43 @@
 """
 can_logger.py - Registro de tramas CAN simuladas a CSV o JSON
+
+``log_can_to_csv`` / ``log_can_to_json`` guardan valores ya decodificados,
+una fila por llamada. Para tráfico real (miles de tramas por segundo) usar
+``FrameLogger``: guarda las tramas crudas ``(ts_ns, arbitration_id, dlc, data)``
+con escritura en bloques, rotación de archivos y un índice por tiempo; la
+decodificación queda para la lectura (``FrameReader.decoded`` o, en lote
+con NumPy, ``dbc_loader.BatchDecoder.decode_reader``).
+
+Formatos:
+    - ``bin``: registros fijos de 24 bytes (ver ``RECORD``), cabecera ``MAGIC``.
+    - ``candump``: texto compatible con ``candump -L`` / ``canplayer``:
+      ``(1718000000.123456) can0 123#DEADBEEF``.
+
+Cada segmento ``can_<ts_ns de su primera trama>_<n>.bin|.log`` (se abre en
+modo exclusivo: si el nombre existe se prueba el siguiente ``n``, así dos
+registradores en la misma carpeta no se pisan) tiene al lado un ``.idx`` con
+pares ``(ts_ns, offset)`` cada ``index_every`` tramas para buscar por tiempo
+sin recorrer el archivo. Si los segmentos se solapan en el tiempo (dos
+registradores en la misma carpeta) ``FrameReader`` los mezcla por ``ts_ns``.
 """
+import bisect
 import csv
+import heapq
 import json
 import os
+import struct
+import threading
+import time
 from datetime import datetime
 
+MAGIC = b"CANFRM01"
+RECORD = struct.Struct("<qIBB2x8s")  # ts_ns, arbitration_id, dlc, flags, relleno, data
+INDEX = struct.Struct("<qQ")  # ts_ns, offset de la trama dentro del segmento
+EXTENSIONS = {"bin": ".bin", "candump": ".log"}
+MAX_STANDARD_ID = 0x7FF
+FLAG_EXTENDED = 0x01  # bit de ``flags`` en RECORD: id de 29 bits
+
+
 def log_can_to_csv(log_dir, message_name, data_dict):
     """
     Registra una trama CAN simulada en un archivo CSV.
@@ -39,3 +71,338 @@ def log_can_to_json(log_dir, message_name, data_dict):
     row.update({k: v['value'] for k, v in data_dict.items()})
     with open(fname, 'a') as f:
         f.write(json.dumps(row) + '\n')
+
+
+def _frame(ts_ns, arbitration_id, data, is_extended=None):
+    """Trama del buffer; sin ``is_extended`` se deduce del id (> 0x7FF)."""
+    if is_extended is None:
+        is_extended = arbitration_id > MAX_STANDARD_ID
+    return ts_ns, arbitration_id, bytes(data), bool(is_extended)
+
+
+def _candump_line(ts_ns, arbitration_id, data, channel, is_extended):
+    segundos, resto = divmod(ts_ns, 1_000_000_000)
+    # candump distingue el formato por el largo del id: 8 dígitos = extendido
+    ident = f"{arbitration_id:08X}" if is_extended else f"{arbitration_id:03X}"
+    return f"({segundos}.{resto // 1000:06d}) {channel} {ident}#{data.hex().upper()}\n".encode("ascii")
+
+
+def _parse_candump(linea):
+    """'(1718000000.123456) can0 123#DEADBEEF' -> (ts_ns, id, dlc, data)."""
+    marca, _, trama = linea.split()
+    segundos, _, fraccion = marca.strip("()").partition(".")
+    ident, _, datos = trama.partition("#")
+    data = bytes.fromhex(datos)
+    return int(segundos) * 1_000_000_000 + int(fraccion.ljust(9, "0")[:9]), int(ident, 16), len(data), data
+
+
+class FrameLogger:
+    """
+    Registrador de tramas CAN crudas a alta tasa.
+
+    ``log()`` solo agrega la trama a un buffer en memoria (sin E/S); cada
+    ``buffer_frames`` tramas, o cuando la trama más vieja del buffer tiene más
+    de ``flush_seconds`` (se comprueba en cada ``log()``), se escribe el
+    bloque completo de una vez. No hay
+    cola acotada, así que no se descartan tramas: si el disco se atrasa, el
+    productor espera en la escritura del bloque. Es seguro llamarlo desde el
+    hilo del simulador o del lector del bus.
+
+    Args:
+        log_dir (str): Carpeta de los segmentos
+        fmt (str): 'bin' o 'candump'
+        channel (str): Nombre del canal para el formato candump
+        max_bytes (int): Tamaño a partir del cual se rota el segmento
+        max_seconds (float): Duración máxima de un segmento (None = sin límite)
+        buffer_frames (int): Tramas por bloque de escritura
+        index_every (int): Cada cuántas tramas se agrega una entrada al índice
+        flush_seconds (float): Antigüedad máxima de una trama en memoria antes
+            de escribirla y vaciar el buffer a disco (a tasas bajas manda este)
+    """
+
+    def __init__(self, log_dir, fmt="bin", channel="can0", max_bytes=64 * 1024 * 1024,
+                 max_seconds=None, buffer_frames=4096, index_every=1024, flush_seconds=1.0):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Formato desconocido: {fmt} (usar {', '.join(EXTENSIONS)})")
+        self.log_dir = log_dir
+        self.fmt = fmt
+        self.channel = channel
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.buffer_frames = buffer_frames
+        self.index_every = index_every
+        self.flush_seconds = flush_seconds
+        self.frames = 0
+        self.segments = []
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._index = None
+        self._size = 0
+        self._segment_start = 0
+        self._segment_frames = 0
+        self._buffer_since = None  # time.monotonic() de la trama más vieja del buffer
+        os.makedirs(log_dir, exist_ok=True)
+
+    def log(self, arbitration_id, data, ts_ns=None, is_extended=None):
+        """
+        Registra una trama (``data`` de hasta 8 bytes; ``ts_ns`` por defecto
+        time.time_ns(); ``is_extended`` por defecto según el id).
+        """
+        if len(data) > 8:
+            raise ValueError(f"Trama de {len(data)} bytes: solo CAN clásico (máx. 8)")
+        trama = _frame(time.time_ns() if ts_ns is None else ts_ns, arbitration_id, data, is_extended)
+        with self._lock:
+            self._buffer.append(trama)
+            self._after_append()
+
+    def log_many(self, frames):
+        """
+        Registra un lote de tramas ``(ts_ns, arbitration_id, data)`` (o con
+        ``is_extended`` como cuarto elemento) en orden temporal.
+        """
+        with self._lock:
+            self._buffer.extend(_frame(*trama) for trama in frames)
+            self._after_append()
+
+    def _after_append(self):
+        if not self._buffer:
+            return
+        ahora = time.monotonic()
+        if self._buffer_since is None:
+            self._buffer_since = ahora
+        if len(self._buffer) >= self.buffer_frames:
+            self._write_block()
+        elif ahora - self._buffer_since >= self.flush_seconds:
+            self._write_block()
+            self._file.flush()
+            self._index.flush()
+
+    def flush(self):
+        with self._lock:
+            self._write_block()
+            if self._file is not None:
+                self._file.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._write_block()
+            self._close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open_segment(self, ts_ns):
+        n = 0
+        while True:
+            base = os.path.join(self.log_dir, f"can_{ts_ns}_{n:04d}")
+            try:
+                self._file = open(base + EXTENSIONS[self.fmt], "xb")
+            except FileExistsError:
+                n += 1
+                continue
+            break
+        ruta = base + EXTENSIONS[self.fmt]
+        self._index = open(base + ".idx", "wb")
+        if self.fmt == "bin":
+            self._file.write(MAGIC)
+        self._size = self._file.tell()
+        self._segment_start = ts_ns
+        self._segment_frames = 0
+        self.segments.append(ruta)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._index.close()
+            self._file = self._index = None
+
+    def _write_block(self):
+        bloque, self._buffer = self._buffer, []
+        self._buffer_since = None
+        inicio = 0
+        while inicio < len(bloque):
+            ts0 = bloque[inicio][0]
+            if self._file is not None and (
+                self._size >= self.max_bytes
+                or (self.max_seconds is not None and ts0 - self._segment_start >= self.max_seconds * 1e9)
+            ):
+                self._close_segment()
+            if self._file is None:
+                self._open_segment(ts0)
+            inicio = self._write_frames(bloque, inicio)
+
+    def _write_frames(self, bloque, inicio):
+        """Escribe tramas del bloque en el segmento actual hasta llenarlo; devuelve dónde siguió."""
+        partes = []
+        entradas = []
+        tam = self._size
+        i = inicio
+        while i < len(bloque) and tam < self.max_bytes:
+            ts, ident, data, extendida = bloque[i]
+            if self.max_seconds is not None and ts - self._segment_start >= self.max_seconds * 1e9:
+                break
+            if self.fmt == "bin":
+                registro = RECORD.pack(ts, ident, len(data), FLAG_EXTENDED if extendida else 0, data)
+            else:
+                registro = _candump_line(ts, ident, data, self.channel, extendida)
+            if self._segment_frames % self.index_every == 0:
+                entradas.append(INDEX.pack(ts, tam))
+            partes.append(registro)
+            tam += len(registro)
+            self._segment_frames += 1
+            i += 1
+        self._file.write(b"".join(partes))
+        self._index.write(b"".join(entradas))
+        self._size = tam
+        self.frames += i - inicio
+        return i
+
+
+class FrameReader:
+    """
+    Lectura de los segmentos de ``FrameLogger`` con búsqueda por tiempo.
+
+    Args:
+        log_dir (str): Carpeta con los segmentos ``can_*.bin`` / ``can_*.log``
+    """
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self.segments = []  # (ruta, [ts_ns del índice], [offsets])
+        for nombre in sorted(os.listdir(log_dir)):
+            base, ext = os.path.splitext(nombre)
+            if not nombre.startswith("can_") or ext not in EXTENSIONS.values():
+                continue
+            ruta = os.path.join(log_dir, nombre)
+            with open(os.path.join(log_dir, base + ".idx"), "rb") as f:
+                entradas = list(INDEX.iter_unpack(f.read()))
+            if entradas:
+                self.segments.append((ruta, [e[0] for e in entradas], [e[1] for e in entradas]))
+        self.segments.sort(key=lambda s: s[1][0])
+
+    def _segments_for(self, start_ns, end_ns):
+        """
+        Grupos de ``(ruta, offset)`` de los segmentos con tramas en el rango,
+        en orden. Los segmentos de un mismo grupo se solapan en el tiempo y
+        hay que mezclarlos; los grupos entre sí no.
+        """
+        grupo, fin_grupo = [], None
+        for ruta, marcas, offsets in self.segments:
+            if end_ns is not None and marcas[0] > end_ns:
+                break  # ordenados por su primera trama: los que siguen empiezan después
+            ultima = self._last_ts(ruta)
+            if ultima is None or (start_ns is not None and ultima < start_ns):
+                continue
+            if grupo and marcas[0] >= fin_grupo:
+                yield grupo
+                grupo, fin_grupo = [], None
+            pos = 0
+            if start_ns is not None:
+                pos = max(0, bisect.bisect_right(marcas, start_ns) - 1)
+            grupo.append((ruta, offsets[pos]))
+            fin_grupo = ultima if fin_grupo is None else max(fin_grupo, ultima)
+        if grupo:
+            yield grupo
+
+    def frames(self, start_ns=None, end_ns=None, ids=None):
+        """
+        Itera ``(ts_ns, arbitration_id, dlc, data)`` entre ``start_ns`` y
+        ``end_ns`` (inclusive), opcionalmente solo de los ``ids`` indicados.
+        """
+        ids = set(ids) if ids is not None else None
+        for grupo in self._segments_for(start_ns, end_ns):
+            fuentes = [self._read_range(ruta, offset, start_ns, end_ns) for ruta, offset in grupo]
+            tramas = fuentes[0] if len(fuentes) == 1 else heapq.merge(*fuentes, key=lambda t: t[0])
+            for trama in tramas:
+                if ids is None or trama[1] in ids:
+                    yield trama
+
+    def _read_range(self, ruta, offset, start_ns, end_ns):
+        for trama in self._read_segment(ruta, offset):
+            if start_ns is not None and trama[0] < start_ns:
+                continue
+            if end_ns is not None and trama[0] > end_ns:
+                return
+            yield trama
+
+    def arrays(self, start_ns=None, end_ns=None):
+        """
+        Las tramas del rango como arrays de NumPy, para decodificar en lote
+        (``dbc_loader.BatchDecoder``). Los segmentos binarios se leen sin
+        pasar por Python trama a trama.
+        Returns:
+            tuple: (ts_ns int64 (N,), arbitration_id uint32 (N,), dlc uint8 (N,), data uint8 (N, 8))
+        """
+        import numpy as np
+
+        dtype = np.dtype([("ts", "<i8"), ("id", "<u4"), ("dlc", "u1"), ("flags", "u1"), ("pad", "V2"),
+                          ("data", "u1", (8,))])
+        partes = []
+        for grupo in self._segments_for(start_ns, end_ns):
+            parciales = []
+            for ruta, offset in grupo:
+                if ruta.endswith(EXTENSIONS["bin"]):
+                    registros = np.fromfile(ruta, dtype=dtype, offset=offset)
+                else:
+                    tramas = list(self._read_segment(ruta, offset))
+                    registros = np.zeros(len(tramas), dtype=dtype)
+                    for i, (ts, ident, dlc, data) in enumerate(tramas):
+                        registros[i] = (ts, ident, dlc, 0, b"", tuple(data.ljust(8, b"\0")))
+                desde = 0 if start_ns is None else np.searchsorted(registros["ts"], start_ns, "left")
+                hasta = len(registros) if end_ns is None else np.searchsorted(registros["ts"], end_ns, "right")
+                parciales.append(registros[desde:hasta])
+            registros = np.concatenate(parciales)
+            if len(parciales) > 1:  # segmentos solapados: el mismo orden que heapq.merge en frames()
+                registros = registros[np.argsort(registros["ts"], kind="stable")]
+            partes.append(registros)
+        registros = np.concatenate(partes) if partes else np.zeros(0, dtype=dtype)
+        return (registros["ts"].copy(), registros["id"].copy(), registros["dlc"].copy(),
+                np.ascontiguousarray(registros["data"]))
+
+    @staticmethod
+    def _last_ts(ruta):
+        """ts_ns de la última trama completa del segmento (None si no tiene)."""
+        with open(ruta, "rb") as f:
+            fin = f.seek(0, os.SEEK_END)
+            if ruta.endswith(EXTENSIONS["candump"]):
+                f.seek(max(0, fin - 256))
+                lineas = [linea for linea in f.read().split(b"\n")[:-1] if linea.strip()]
+                return _parse_candump(lineas[-1].decode("ascii"))[0] if lineas else None
+            n = (fin - len(MAGIC)) // RECORD.size
+            if n <= 0:
+                return None
+            f.seek(len(MAGIC) + (n - 1) * RECORD.size)
+            return RECORD.unpack(f.read(RECORD.size))[0]
+
+    @staticmethod
+    def _read_segment(ruta, offset, chunk_frames=8192):
+        with open(ruta, "rb") as f:
+            f.seek(offset)
+            if ruta.endswith(EXTENSIONS["candump"]):
+                for linea in f:
+                    if linea.strip():
+                        yield _parse_candump(linea.decode("ascii"))
+                return
+            while True:
+                bloque = f.read(RECORD.size * chunk_frames)
+                if not bloque:
+                    return
+                for ts, ident, dlc, _flags, data in RECORD.iter_unpack(bloque[:len(bloque) - len(bloque) % RECORD.size]):
+                    yield ts, ident, dlc, data[:dlc]
+
+    def decoded(self, database, start_ns=None, end_ns=None):
+        """
+        Decodifica al leer: itera ``(ts_ns, nombre_mensaje, señales)`` con un
+        ``cantools.database.Database``. Las tramas sin mensaje en el DBC se saltan.
+        """
+        for ts, ident, dlc, data in self.frames(start_ns, end_ns):
+            try:
+                mensaje = database.get_message_by_frame_id(ident)
+            except KeyError:
+                continue
+            yield ts, mensaje.name, mensaje.decode(data)
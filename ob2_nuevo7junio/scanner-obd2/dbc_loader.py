@@ -1,18 +1,216 @@
 """
 dbc_loader.py - Utilidades para cargar archivos DBC y preparar el entorno de simulación CAN
+
+``load_dbc`` guarda la base ya parseada en la caché del usuario
+(``$XDG_CACHE_HOME/scanner-obd2/dbc``, por defecto ``~/.cache/...``), con el
+SHA-256 del archivo y la versión de cantools en el nombre: si el DBC no
+cambió, el arranque siguiente lee el pickle en lugar de volver a parsear.
+Leer un pickle ejecuta código, así que solo se usan cachés del propio
+usuario que nadie más puede escribir; cualquier otra se ignora.
+
+``BatchDecoder`` compila, por arbitration ID, las máscaras, desplazamientos,
+escalas y offsets de cada señal y decodifica lotes de tramas con NumPy (p. ej.
+un log completo de ``can_logger.FrameReader.arrays()``), sin pasar por el
+camino genérico de ``decode_message`` trama por trama.
 """
+import hashlib
 import os
+import pickle
+import stat
+
 import cantools
 
-def load_dbc(file_path):
+CACHE_SUBDIR = os.path.join("scanner-obd2", "dbc")
+
+
+def default_cache_dir():
+    """Carpeta de caché por usuario (XDG en Linux/macOS, LOCALAPPDATA en Windows)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_SUBDIR)
+
+
+def _trusted(path):
+    """True si ``path`` es del usuario actual y nadie más puede escribirlo."""
+    if not hasattr(os, "getuid"):  # Windows: la caché vive en el perfil del usuario
+        return True
+    info = os.stat(path)
+    return info.st_uid == os.getuid() and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _dbc_hash(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def load_dbc(file_path, cache_dir=None, use_cache=True):
     """
     Carga un archivo DBC usando cantools y retorna el objeto Database.
     Args:
         file_path (str): Ruta al archivo DBC
+        cache_dir (str): Carpeta de la caché (por defecto ``default_cache_dir()``)
+        use_cache (bool): False fuerza el parseo sin leer ni escribir la caché
     Returns:
         cantools.database.Database: Objeto de base de datos DBC
     """
-    return cantools.database.load_file(file_path)
+    if not use_cache:
+        return cantools.database.load_file(file_path)
+    cache_dir = cache_dir or default_cache_dir()
+    nombre = os.path.splitext(os.path.basename(file_path))[0]
+    cache_path = os.path.join(
+        cache_dir, f"{nombre}.{_dbc_hash(file_path)[:16]}.cantools-{cantools.__version__}.pickle")
+    try:
+        if not (_trusted(cache_dir) and _trusted(cache_path)):
+            raise PermissionError(f"caché de otro usuario o escribible por otros: {cache_path}")
+        with open(cache_path, "rb") as f:
+            database = pickle.load(f)
+        for message in database.messages:
+            message.refresh()  # recompila los codecs que no se guardan
+        return database
+    except FileNotFoundError:
+        pass
+    except PermissionError as e:
+        print(f"[DBC] Se ignora la caché: {e}")
+    except Exception as e:  # pickle de otra versión o incompatible: se vuelve a parsear
+        print(f"[DBC] Caché inválida de {file_path} ({type(e).__name__}: {e}), se regenera")
+    database = cantools.database.load_file(file_path)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        if not _trusted(cache_dir):
+            return database  # no escribir donde otro podría reemplazar el pickle
+        temporal = cache_path + ".tmp"
+        with os.fdopen(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            _dump(database, f)
+        os.replace(temporal, cache_path)
+    except (OSError, pickle.PicklingError, TypeError) as e:
+        print(f"[DBC] No se pudo guardar la caché de {file_path}: {e}")
+    return database
+
+
+def _dump(database, f):
+    """
+    Serializa la base sin los codecs compilados de cada mensaje (con
+    bitstruct.c no son serializables); ``Message.refresh()`` los rehace al leer.
+    """
+    codecs = [m.__dict__.pop("_codecs", None) for m in database.messages]
+    try:
+        pickle.dump(database, f, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for message, codec in zip(database.messages, codecs):
+            message._codecs = codec
+
+
+class _CompiledSignal:
+    """Extracción precalculada de una señal sobre la palabra de 64 bits de la trama."""
+
+    __slots__ = ("name", "big_endian", "shift", "mask", "length", "signed", "float_dtype",
+                 "scale", "offset", "integer", "multiplexer", "multiplexer_ids")
+
+    def __init__(self, signal):
+        self.name = signal.name
+        self.length = signal.length
+        self.big_endian = signal.byte_order == "big_endian"
+        if self.big_endian:
+            # start en numeración "sawtooth" de DBC: apunta al MSB de la señal
+            msb = (signal.start // 8) * 8 + (7 - signal.start % 8)
+            self.shift = 64 - (msb + signal.length)
+        else:
+            self.shift = signal.start
+        self.mask = (1 << signal.length) - 1
+        self.signed = signal.is_signed
+        self.float_dtype = {32: "float32", 64: "float64"}.get(signal.length) if signal.is_float else None
+        self.scale = signal.scale
+        self.offset = signal.offset
+        self.integer = (not signal.is_float and float(signal.scale).is_integer()
+                        and float(signal.offset).is_integer())
+        self.multiplexer = getattr(signal, "multiplexer_signal", None)
+        self.multiplexer_ids = getattr(signal, "multiplexer_ids", None)
+
+    def raw(self, np, palabra_le, palabra_be):
+        palabra = palabra_be if self.big_endian else palabra_le
+        raw = (palabra >> np.uint64(self.shift)) & np.uint64(self.mask)
+        if self.float_dtype is not None:
+            ancho = "uint32" if self.float_dtype == "float32" else "uint64"
+            with np.errstate(invalid="ignore"):  # NaN de señalización en los bits crudos
+                return raw.astype(ancho).view(self.float_dtype).astype("float64")
+        raw = raw.astype("int64")
+        if self.signed and self.length < 64:  # con 64 bits astype ya dio el complemento a dos
+            raw -= (raw >> (self.length - 1)) * (1 << self.length)
+        return raw
+
+    def decode(self, np, palabra_le, palabra_be):
+        raw = self.raw(np, palabra_le, palabra_be)
+        if self.float_dtype is None and self.scale == 1 and self.offset == 0:
+            return raw
+        valores = raw * self.scale + self.offset
+        return valores.astype("int64") if self.integer else valores
+
+
+class BatchDecoder:
+    """
+    Tabla de decodificadores por arbitration ID compilada una sola vez desde
+    un ``cantools.database.Database``.
+
+    Los valores son los físicos (escala y offset aplicados), sin traducir las
+    tablas de valores (VAL_) a texto. Las señales multiplexadas valen NaN en
+    las tramas cuyo multiplexor no las incluye.
+    """
+
+    def __init__(self, database):
+        import numpy as np  # solo necesario para la decodificación en lote
+
+        self._np = np
+        self.messages = {}
+        for message in database.messages:
+            senales = [_CompiledSignal(s) for s in message.signals]
+            self.messages[message.frame_id] = (message.name, senales)
+
+    def decode_batch(self, arbitration_ids, data):
+        """
+        Decodifica un lote de tramas.
+        Args:
+            arbitration_ids: Array (N,) de arbitration IDs
+            data: Array uint8 (N, 8) con los bytes de cada trama (relleno con ceros)
+        Returns:
+            dict: {nombre_mensaje: {"index": posiciones en el lote, señal: valores, ...}}
+                  (las tramas con IDs que no están en el DBC se ignoran)
+        """
+        np = self._np
+        ids = np.asarray(arbitration_ids)
+        datos = np.ascontiguousarray(data, dtype=np.uint8).reshape(len(ids), 8)
+        orden = np.argsort(ids, kind="stable")
+        unicos, inicios = np.unique(ids[orden], return_index=True)
+        fines = np.append(inicios[1:], len(orden))
+        resultado = {}
+        for frame_id, inicio, fin in zip(unicos.tolist(), inicios.tolist(), fines.tolist()):
+            if frame_id not in self.messages:
+                continue
+            nombre, senales = self.messages[frame_id]
+            indices = orden[inicio:fin]
+            bloque = datos[indices]
+            palabra_le = bloque.view("<u8").ravel().astype(np.uint64)
+            palabra_be = bloque.view(">u8").ravel().astype(np.uint64)
+            columnas = {"index": indices}
+            for senal in senales:
+                columnas[senal.name] = senal.decode(np, palabra_le, palabra_be)
+            for senal in senales:
+                if senal.multiplexer and senal.multiplexer_ids:
+                    activa = np.isin(columnas[senal.multiplexer], senal.multiplexer_ids)
+                    columnas[senal.name] = np.where(activa, columnas[senal.name], np.nan)
+            resultado[nombre] = columnas
+        return resultado
+
+    def decode_reader(self, reader, start_ns=None, end_ns=None):
+        """Decodifica un log de ``can_logger.FrameReader``; agrega la columna ``ts_ns``."""
+        ts, ids, _dlc, data = reader.arrays(start_ns, end_ns)
+        resultado = self.decode_batch(ids, data)
+        for columnas in resultado.values():
+            columnas["ts_ns"] = ts[columnas["index"]]
+        return resultado
 
 def ensure_dbc_folder():
     """
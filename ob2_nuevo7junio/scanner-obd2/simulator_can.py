@@ -5,7 +5,8 @@ import random
 import threading
 import time
 
-def simulate_can_messages(database, message_name, callback, interval_ms=500, stop_event=None):
+def simulate_can_messages(database, message_name, callback, interval_ms=500, stop_event=None,
+                          on_frame=None):
     """
     Simula mensajes CAN generando valores aleatorios válidos para cada señal del mensaje.
     Args:
@@ -14,6 +15,8 @@ def simulate_can_messages(database, message_name, callback, interval_ms=500, sto
         callback (callable): Función a la que se le pasa el diccionario de señales
         interval_ms (int): Intervalo entre mensajes en ms
         stop_event (threading.Event): Permite detener la simulación
+        on_frame (callable): Opcional, recibe (arbitration_id, data) con la trama
+            codificada, p. ej. ``FrameLogger.log`` de can_logger.py
     """
     msg = database.get_message_by_name(message_name)
     if not msg:
@@ -27,6 +30,8 @@ def simulate_can_messages(database, message_name, callback, interval_ms=500, sto
                 value = random.uniform(minv, maxv) if sig.is_float else random.randint(int(minv), int(maxv))
                 data[sig.name] = {'value': round(value, 2), 'unit': sig.unit or ''}
             callback(data)
+            if on_frame is not None:
+                on_frame(msg.frame_id, msg.encode({k: v['value'] for k, v in data.items()}))
             time.sleep(interval_ms / 1000.0)
     thread = threading.Thread(target=_simulate, daemon=True)
     thread.start()
@@ -1,10 +1,33 @@
 """
 pid_manager.py - Gestión de PIDs soportados y selección de usuario
 """
+import importlib.util
 import json
+import sys
 from typing import Dict, List, Optional
 import os
 
+# Catálogo unificado de PIDs del repositorio (src/obd/catalogo_pids.py)
+RUTA_CATALOGO = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../src/obd/catalogo_pids.py'))
+
+
+def cargar_catalogo_compartido():
+    """
+    Catálogo de PIDs compartido con el dashboard y el daemon (misma caché en
+    disco). Se carga por ruta porque aquí ``src`` es el paquete del scanner.
+    Devuelve None si el módulo no está disponible.
+    """
+    modulo = sys.modules.get('catalogo_pids')
+    if modulo is None:
+        if not os.path.exists(RUTA_CATALOGO):
+            return None
+        spec = importlib.util.spec_from_file_location('catalogo_pids', RUTA_CATALOGO)
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules['catalogo_pids'] = modulo
+        spec.loader.exec_module(modulo)
+    return modulo.cargar_catalogo()
+
+
 class PIDManager:
     """
     Clase para gestionar la biblioteca de PIDs OBD-II.
@@ -24,6 +47,12 @@ class PIDManager:
         """Carga las definiciones de PIDs desde un archivo JSON."""
         if not os.path.exists(self.pid_def_path):
             raise FileNotFoundError(f"No se encontró el archivo de PIDs: {self.pid_def_path}")
+        # obdii-pids.json (tabla por modo) ya está normalizado en el catálogo cacheado
+        if os.path.basename(self.pid_def_path) == 'obdii-pids.json':
+            catalogo = cargar_catalogo_compartido()
+            if catalogo is not None:
+                self.pids = catalogo.de_fuente('obdii')
+                return
         with open(self.pid_def_path, 'r', encoding='utf-8') as f:
             self.pids = json.load(f)
 
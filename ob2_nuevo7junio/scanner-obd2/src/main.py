@@ -14,11 +14,8 @@ import sys
 import os
 import time
 import socket
-import obd
 import logging
 import datetime
-# INTEGRACIÓN QASYNC
-from qasync import QEventLoop, asyncSlot
 
 # Configuración global de logging con archivo único por sesión
 log_dir = os.path.join(os.path.dirname(__file__), '../logs')
@@ -40,13 +37,10 @@ logger = logging.getLogger("OBD2App")
 # --- En tu configuración inicial (init_connections() o similar) ---
 
 # ✅ Todas las funciones clave de la app (streaming de PIDs, gauges, DTC, multiplexado) permanecen intactas.
-from PySide6.QtWidgets import QApplication, QListWidgetItem, QLabel, QInputDialog, QMessageBox
-from PySide6.QtCore import Qt
-import obd
-from obd import OBDStatus
+# python-obd, vininfo, pyqtgraph, DTC y la UI se importan recién cuando se usan
+# (ver _cargar_ui, leer_vin, connect_obd): el arranque no paga por ellos.
 # Eliminada importación dinámica de GaugeWidget y referencias a gauge.py
 import json
-from vininfo import Vin
 import os
 
 # Asegura que el directorio src esté en sys.path para imports locales
@@ -54,28 +48,13 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # --- CORRECCIÓN DE IMPORTS PARA COMPATIBILIDAD UNIVERSAL ---
 # Usar imports relativos si se ejecuta como módulo, absolutos si es script
-try:
-    from .elm327_async import ELM327Async
-    from .async_json_logger import AsyncJSONLogger
-    from .pid_cache import PIDCache
-    from .obd2_async_utils import read_vin, read_pids_batch
-    from .heartbeat import heartbeat
-    from .ui.data_visualizer import DataVisualizer, AsyncBackendBridge
-    from .ui.pid_acquisition import PIDAcquisitionTab
-    from .obd2_acquisition.core import OBD2Acquisition
-    from .core.elm327_interface import ELM327Interface
-    from .elm_utils import Elm327WiFi
-except ImportError:
-    from elm327_async import ELM327Async
-    from async_json_logger import AsyncJSONLogger
-    from pid_cache import PIDCache
-    from obd2_async_utils import read_vin, read_pids_batch
-    from heartbeat import heartbeat
-    from ui.data_visualizer import DataVisualizer, AsyncBackendBridge
-    from ui.pid_acquisition import PIDAcquisitionTab
-    from obd2_acquisition.core import OBD2Acquisition
-    from core.elm327_interface import ELM327Interface
-    from elm_utils import Elm327WiFi
+def _cargar_ui():
+    """Importa DataVisualizer (PySide6 + widgets) solo al abrir la ventana."""
+    try:
+        from .ui.data_visualizer import DataVisualizer
+    except ImportError:
+        from ui.data_visualizer import DataVisualizer
+    return DataVisualizer
 
 pid_descriptions = {
     "0C": "RPM",
@@ -86,13 +65,15 @@ pid_descriptions = {
 }
 
 # --- Agrupación de PIDs por familia/categoría ---
-pid_families = {
-    "Motor": [obd.commands['RPM'], obd.commands['COOLANT_TEMP'], obd.commands['INTAKE_TEMP']],
-    "Velocidad": [obd.commands['SPEED']],
-    "Combustible": [obd.commands['FUEL_LEVEL'], obd.commands['FUEL_PRESSURE']] if 'FUEL_LEVEL' in obd.commands else [],
-    "Aire": [obd.commands['INTAKE_PRESSURE'], obd.commands['MAF']] if 'INTAKE_PRESSURE' in obd.commands else [],
-    # Agrega más familias y comandos según sea necesario
-}
+def get_pid_families():
+    import obd
+    return {
+        "Motor": [obd.commands['RPM'], obd.commands['COOLANT_TEMP'], obd.commands['INTAKE_TEMP']],
+        "Velocidad": [obd.commands['SPEED']],
+        "Combustible": [obd.commands['FUEL_LEVEL'], obd.commands['FUEL_PRESSURE']] if 'FUEL_LEVEL' in obd.commands else [],
+        "Aire": [obd.commands['INTAKE_PRESSURE'], obd.commands['MAF']] if 'INTAKE_PRESSURE' in obd.commands else [],
+        # Agrega más familias y comandos según sea necesario
+    }
 
 def decode_pid(pid, response):
     import re
@@ -150,7 +131,12 @@ sys.excepthook = log_uncaught_exceptions
 # --- INTEGRACIÓN DE MÓDULO DTC MANAGER ---
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
-from diagnostico import dtc_manager
+
+
+def _dtc_manager():
+    from diagnostico import dtc_manager
+    return dtc_manager
+
 
 class OBDController:
     OBD_URL = "socket://192.168.0.10:35000"
@@ -175,6 +161,8 @@ class OBDController:
             return
 
         self.visualizer.set_status("Conectando…")
+        import obd
+        from obd import OBDStatus
         try:
             self.connection = obd.OBD(self.OBD_URL, fast=self.OBD_FAST, timeout=self.OBD_TIMEOUT)
             logger.info("Intentando conectar a OBD en %s", self.OBD_URL)
@@ -435,7 +423,7 @@ class OBDController:
             return
         try:
             # Usar el dtc_manager funcional
-            dtcs = dtc_manager.leer_dtc()
+            dtcs = _dtc_manager().leer_dtc()
             logger.info(f"DTCs leídos: {dtcs}")
             if dtcs and len(dtcs) > 0 and dtcs[0].get("codigo"):
                 self.visualizer.mostrar_dtcs(dtcs)
@@ -457,7 +445,7 @@ class OBDController:
             self.visualizer.set_status("No conectado")
             return
         try:
-            res = dtc_manager.borrar_dtc()
+            res = _dtc_manager().borrar_dtc()
             logger.info(f"Resultado borrar DTCs: {res}")
             if res.get("exito"):
                 self.visualizer.set_status("DTCs borrados")
@@ -522,6 +510,7 @@ if __name__ == "__main__":
     import sys
     from PySide6.QtWidgets import QApplication
     app = QApplication(sys.argv)
+    DataVisualizer = _cargar_ui()
     visualizer = DataVisualizer(get_data_fn=lambda: {})  # Puedes reemplazar get_data_fn por tu función real
     controller = OBDController(visualizer)
     visualizer.set_controller(controller)
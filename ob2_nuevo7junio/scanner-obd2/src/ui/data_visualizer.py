@@ -6,9 +6,7 @@ import os
 import importlib.util
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QScrollArea, QLineEdit, QGroupBox, QCheckBox, QTabWidget, QHBoxLayout, QComboBox, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QListWidget, QListWidgetItem)
 from PySide6.QtCore import QTimer, Qt, Signal, QObject
-import pyqtgraph as pg  # <--- NUEVO para gráficos en tiempo real
 from .pid_acquisition import PIDAcquisitionTab
-from .tuning_widget import TuningWidget
 from vin_decoder import VinDecoder
 from PySide6.QtWidgets import QTextEdit
 from .widgets.gauge_realista import RealisticGaugeWidget
@@ -25,6 +23,21 @@ if spec and spec.loader:
 else:
     raise ImportError('No se pudo cargar pids_ext.py')
 
+class _ModuloDiferido:
+    """Importa el módulo en el primer acceso a un atributo (pyqtgraph tarda en cargar)."""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nombre)
+        return getattr(self._modulo, atributo)
+
+
+pg = _ModuloDiferido("pyqtgraph")  # <--- gráficos en tiempo real, se carga al abrir la pestaña
+
 GAUGE_COLORS = [
     '#00bcd4', '#ff9800', '#e91e63', '#4caf50', '#ffeb3b', '#9c27b0', '#f44336', '#3f51b5', '#8bc34a', '#607d8b'
 ]
@@ -94,9 +107,22 @@ class DataVisualizer(QWidget):
         self.graph_timer.timeout.connect(self.update_graphs)
         self._main_layout = None
         self.init_ui()
-        # Eliminar inicialización de TuningWidget si no está implementado o importado
-        self.tuning_widget = TuningWidget(vehicle_info=self.vehicle_info)
-        self.tabs.addTab(self.tuning_widget, "Tuning")
+        # Gráficos y Tuning (pyqtgraph) se construyen al abrir su pestaña
+        self.tab_tuning = QWidget()
+        QVBoxLayout(self.tab_tuning)
+        self.tabs.addTab(self.tab_tuning, "Tuning")
+        self.tabs.currentChanged.connect(self._crear_pestana_diferida)
+
+    def _crear_pestana_diferida(self, indice):
+        widget = self.tabs.widget(indice)
+        if widget is self.tab_graphs and self.graph_plot is None:
+            self.graph_plot = pg.PlotWidget(title="Datos OBD2 en Tiempo Real")
+            self.graph_plot.showGrid(x=True, y=True)
+            self.graphs_layout.addWidget(self.graph_plot)  # PyQtGraph PlotWidget ya es un QWidget compatible
+        elif widget is self.tab_tuning and not hasattr(self, 'tuning_widget'):
+            from .tuning_widget import TuningWidget
+            self.tuning_widget = TuningWidget(vehicle_info=self.vehicle_info)
+            self.tab_tuning.layout().addWidget(self.tuning_widget)
 
     def init_ui(self):
         import sys
@@ -1590,10 +1616,8 @@ VIN válido: Sí
         self.graph_pid_selector.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
         self.graphs_layout.addWidget(QLabel("Selecciona PIDs a graficar:"))
         self.graphs_layout.addWidget(self.graph_pid_selector)
-        # Widget de gráfico
-        self.graph_plot = pg.PlotWidget(title="Datos OBD2 en Tiempo Real")
-        self.graph_plot.showGrid(x=True, y=True)
-        self.graphs_layout.addWidget(self.graph_plot)  # PyQtGraph PlotWidget ya es un QWidget compatible
+        # Widget de gráfico: se crea en _crear_pestana_diferida
+        self.graph_plot = None
         self.tabs.addTab(self.tab_graphs, "Gráficos")
         # --- NUEVA PESTAÑA DIAGNÓSTICO ---
         self.tab_diagnostico = QWidget()
@@ -1736,7 +1760,8 @@ VIN válido: Sí
         # Actualiza los gráficos en tiempo real con datos reales
         selected_items = self.graph_pid_selector.selectedItems()
         if not selected_items:
-            self.graph_plot.clear()
+            if self.graph_plot is not None:
+                self.graph_plot.clear()
             self.graph_curves.clear()
             return
         # Asegura que existe el diccionario de últimos valores
@@ -1758,6 +1783,8 @@ VIN válido: Sí
             # Limitar historial a 200 puntos
             if len(self.graph_data[pid_name]) > 200:
                 self.graph_data[pid_name] = self.graph_data[pid_name][-200:]
+        if self.graph_plot is None:  # pestaña aún no abierta: solo se acumula historial
+            return
         self.graph_plot.clear()
         for item in selected_items:
             cmd = item.data(Qt.ItemDataRole.UserRole)
@@ -9,6 +9,7 @@ import os
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton, QHBoxLayout
 from PySide6.QtCore import Signal, Qt, QTimer
 from ui.widgets.simple_gauge import SpeedometerGaugeWidget
+from core.pid_manager import cargar_catalogo_compartido
 import pyqtgraph as pg
 
 class TuningWidget(QWidget):
@@ -26,6 +27,9 @@ class TuningWidget(QWidget):
         self._setup_timer()
 
     def load_pid_definitions(self):
+        catalogo = cargar_catalogo_compartido()
+        if catalogo is not None:
+            return catalogo.tuning
         path = os.path.join(os.path.dirname(__file__), '../../data/pid_definitions.json')
         if os.path.exists(path):
             with open(path, 'r') as f:
@@ -5,14 +5,141 @@ import os
 import json
 import re
 import sqlite3
+import threading
+from functools import lru_cache
+
+DB_VPIC_POR_DEFECTO = os.path.join("data", "vpic_lite.db")
+CACHE_VPIC = 4096  # resultados de VIN (por prefijo de 11) en memoria
+
+# Índices de expresión: la búsqueda por prefijo usa el índice (LIKE 'x%' no lo hace)
+INDICES_VPIC = (
+    "CREATE INDEX IF NOT EXISTS idx_vehicle_vin11 ON Vehicle (substr(upper(VIN), 1, 11))",
+    "CREATE INDEX IF NOT EXISTS idx_vehicle_wmi ON Vehicle (substr(upper(VIN), 1, 3))",
+)
+
+CONSULTA_VPIC = """
+    SELECT
+        mk.MakeName, md.ModelName, v.ModelYear, e.EngineConfiguration,
+        ft.FuelTypeName, bc.BodyClassName, v.PlantCity
+    FROM Vehicle v
+    LEFT JOIN Make mk ON mk.MakeId = v.MakeId
+    LEFT JOIN Model md ON md.ModelId = v.ModelId
+    LEFT JOIN Engine e ON e.EngineId = v.EngineId
+    LEFT JOIN FuelType ft ON ft.FuelTypeId = v.FuelTypeId
+    LEFT JOIN BodyClass bc ON bc.BodyClassId = v.BodyClassId
+    WHERE substr(upper(v.VIN), 1, 11) = ?
+    LIMIT 1
+"""
+
+_VIN_RE = re.compile(r'^[A-HJ-NPR-Z0-9]{17}$')
+_TRANSLIT = {c: i for c, i in zip('ABCDEFGHJKLMNPRSTUVWXYZ',
+    [1,2,3,4,5,6,7,8,1,2,3,4,5,7,8,9,2,3,4,5,6,7,8,9])}
+_TRANSLIT.update({str(i): i for i in range(10)})
+_PESOS = [8,7,6,5,4,3,2,10,0,9,8,7,6,5,4,3,2]
+
+
+@lru_cache(maxsize=None)
+def _tablas_vin():
+    """wmi_codes.json y year_codes.json, leídos una sola vez por proceso."""
+    base = os.path.join(os.path.dirname(__file__), 'vin_data')
+    with open(os.path.join(base, 'wmi_codes.json'), encoding='utf-8') as f:
+        wmi_codes = json.load(f)
+    with open(os.path.join(base, 'year_codes.json'), encoding='utf-8') as f:
+        year_codes = json.load(f)
+    return wmi_codes, year_codes
+
+
+class _SinResultado(LookupError):
+    """Prefijo sin datos en vPIC: se lanza para que el LRU no lo guarde."""
+
+
+class BaseVpicLocal:
+    """
+    Consultas a la base vPIC local (SQLite) con una conexión persistente.
+
+    Una sola consulta con JOIN por VIN, apoyada en índices sobre el prefijo
+    de 11 caracteres y el WMI, y un LRU de resultados por prefijo: los VIN de
+    una misma flota (mismo modelo/planta) se resuelven sin tocar la base.
+    Los prefijos no encontrados no se cachean: aparecen en cuanto se
+    actualiza la base.
+    """
+
+    def __init__(self, db_path=DB_VPIC_POR_DEFECTO, cache=CACHE_VPIC):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._crear_indices()
+        self._buscar_prefijo = lru_cache(maxsize=cache)(self._consultar)
+
+    def _crear_indices(self):
+        try:
+            with self.conn:
+                for sql in INDICES_VPIC:
+                    self.conn.execute(sql)
+        except sqlite3.OperationalError as e:
+            # Base de solo lectura: la consulta funciona igual, sin índice
+            print(f"⚠️ No se pudieron crear los índices vPIC: {e}")
+
+    def _consultar(self, prefijo):
+        with self._lock:
+            row = self.conn.execute(CONSULTA_VPIC, (prefijo,)).fetchone()
+        if row is None:
+            raise _SinResultado(prefijo)  # lru_cache no guarda excepciones
+        return {
+            "marca": row[0],
+            "modelo": row[1],
+            "año": row[2],
+            "tipo_motor": row[3],
+            "tipo_combustible": row[4],
+            "clase_carroceria": row[5],
+            "planta": row[6],
+        }
+
+    def buscar(self, vin):
+        """Datos del vehículo por los 11 primeros caracteres del VIN, o None."""
+        try:
+            return dict(self._buscar_prefijo(vin.strip().upper()[:11]))
+        except _SinResultado:
+            return None
+
+    def buscar_lote(self, vins):
+        """{vin: datos o None} para una lista de VINs (un acceso por prefijo distinto)."""
+        return {vin: self.buscar(vin) for vin in vins}
+
+    def por_wmi(self, wmi, limite=100):
+        """Prefijos de 11 caracteres registrados para un WMI (usa idx_vehicle_wmi)."""
+        with self._lock:
+            filas = self.conn.execute(
+                "SELECT DISTINCT substr(upper(VIN), 1, 11) FROM Vehicle "
+                "WHERE substr(upper(VIN), 1, 3) = ? LIMIT ?", (wmi.upper()[:3], limite)
+            ).fetchall()
+        return [f[0] for f in filas]
+
+    def estadisticas_cache(self):
+        return self._buscar_prefijo.cache_info()
+
+    def cerrar(self):
+        with self._lock:
+            self.conn.close()
+
+
+_bases_vpic = {}
+_bases_lock = threading.Lock()
+
+
+def base_vpic(db_path=DB_VPIC_POR_DEFECTO):
+    """BaseVpicLocal compartida por ruta (una conexión por proceso y base)."""
+    clave = os.path.abspath(db_path)
+    with _bases_lock:
+        base = _bases_vpic.get(clave)
+        if base is None:
+            base = _bases_vpic[clave] = BaseVpicLocal(db_path)
+        return base
+
 
 class VinDecoder:
     def __init__(self):
-        base = os.path.join(os.path.dirname(__file__), 'vin_data')
-        with open(os.path.join(base, 'wmi_codes.json'), encoding='utf-8') as f:
-            self.wmi_codes = json.load(f)
-        with open(os.path.join(base, 'year_codes.json'), encoding='utf-8') as f:
-            self.year_codes = json.load(f)
+        self.wmi_codes, self.year_codes = _tablas_vin()
 
     def validar_vin(self, vin):
         vin = vin.upper()
@@ -20,19 +147,15 @@ class VinDecoder:
             return False, "El VIN debe tener 17 caracteres."
         if any(c in vin for c in 'IOQ'):
             return False, "El VIN no debe contener I, O ni Q."
-        if not re.match(r'^[A-HJ-NPR-Z0-9]{17}$', vin):
+        if not _VIN_RE.match(vin):
             return False, "El VIN contiene caracteres inválidos."
         return True, "VIN válido."
 
     def calcular_digito_control(self, vin):
-        translit = {c: i for c, i in zip('ABCDEFGHJKLMNPRSTUVWXYZ',
-            [1,2,3,4,5,6,7,8,1,2,3,4,5,7,8,9,2,3,4,5,6,7,8,9])}
-        translit.update({str(i): i for i in range(10)})
-        pesos = [8,7,6,5,4,3,2,10,0,9,8,7,6,5,4,3,2]
         suma = 0
         for i, c in enumerate(vin):
-            v = translit.get(c, 0)
-            suma += v * pesos[i]
+            v = _TRANSLIT.get(c, 0)
+            suma += v * _PESOS[i]
         resto = suma % 11
         return 'X' if resto == 10 else str(resto)
 
@@ -65,50 +188,20 @@ class VinDecoder:
             'digito_control_ok': digito == vin[8]
         }
 
-    def buscar_en_base_local(self, vin: str):
-        db_path = os.path.join("data", "vpic_lite.db")
+    def decode_lote(self, vins):
+        """Decodifica una lista de VINs (p. ej. la flota completa)."""
+        return [self.decode(vin) for vin in vins]
+
+    def buscar_en_base_local(self, vin: str, db_path=DB_VPIC_POR_DEFECTO):
         if not os.path.exists(db_path):
             print("❌ Base local vPIC no encontrada.")
             return None
 
         try:
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row  # permite acceso por nombre de columna
-            cursor = conn.cursor()
-
-            # buscar por coincidencia parcial de VIN
-            cursor.execute("""
-                SELECT 
-                    v.MakeId, v.ModelId, v.EngineId, v.FuelTypeId, v.BodyClassId, 
-                    v.PlantCity, v.ModelYear
-                FROM Vehicle v
-                WHERE v.VIN LIKE ? LIMIT 1
-            """, (vin[:11] + "%",))
-            row = cursor.fetchone()
-
-            if not row:
-                print("⚠️ VIN no encontrado en base local.")
-                return None
-
-            # buscar datos extendidos desde otras tablas
-            make = cursor.execute("SELECT MakeName FROM Make WHERE MakeId = ?", (row["MakeId"],)).fetchone()
-            model = cursor.execute("SELECT ModelName FROM Model WHERE ModelId = ?", (row["ModelId"],)).fetchone()
-            engine = cursor.execute("SELECT EngineConfiguration FROM Engine WHERE EngineId = ?", (row["EngineId"],)).fetchone()
-            fuel = cursor.execute("SELECT FuelTypeName FROM FuelType WHERE FuelTypeId = ?", (row["FuelTypeId"],)).fetchone()
-            body = cursor.execute("SELECT BodyClassName FROM BodyClass WHERE BodyClassId = ?", (row["BodyClassId"],)).fetchone()
-
-            conn.close()
-
-            return {
-                "marca": make["MakeName"] if make else None,
-                "modelo": model["ModelName"] if model else None,
-                "año": row["ModelYear"],
-                "tipo_motor": engine["EngineConfiguration"] if engine else None,
-                "tipo_combustible": fuel["FuelTypeName"] if fuel else None,
-                "clase_carroceria": body["BodyClassName"] if body else None,
-                "planta": row["PlantCity"]
-            }
-
+            resultado = base_vpic(db_path).buscar(vin)
         except Exception as e:
             print(f"❌ Error consultando base local: {e}")
             return None
+        if resultado is None:
+            print("⚠️ VIN no encontrado en base local.")
+        return resultado
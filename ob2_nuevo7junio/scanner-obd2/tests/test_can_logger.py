@@ -0,0 +1,142 @@
+import os
+import time
+
+import pytest
+
+import can_logger
+from can_logger import FrameLogger, FrameReader
+
+
+def _tramas(n, t0=1_700_000_000_000_000_000, paso=100_000):
+    """n tramas a 10 kHz con ids estándar y extendidos y DLC variable."""
+    ids = (0x100, 0x7E8, 0x18DAF110)
+    return [(t0 + i * paso, ids[i % 3], bytes(range(i % 9))) for i in range(n)]
+
+
+@pytest.mark.parametrize("fmt", ["bin", "candump"])
+def test_ida_y_vuelta_sin_perder_tramas(tmp_path, fmt):
+    tramas = _tramas(10000)
+    with FrameLogger(str(tmp_path), fmt=fmt, buffer_frames=512) as logger:
+        for ts, ident, data in tramas:
+            logger.log(ident, data, ts_ns=ts)
+    leidas = list(FrameReader(str(tmp_path)).frames())
+    if fmt == "candump":  # candump guarda microsegundos
+        tramas = [(ts // 1000 * 1000, ident, data) for ts, ident, data in tramas]
+    assert leidas == [(ts, ident, len(data), data) for ts, ident, data in tramas]
+
+
+def test_formato_candump(tmp_path):
+    with FrameLogger(str(tmp_path), fmt="candump", channel="vcan0") as logger:
+        logger.log(0x123, b"\xde\xad\xbe\xef", ts_ns=1_718_000_000_123_456_789)
+        logger.log(0x18DAF110, b"", ts_ns=1_718_000_001_000_000_000)
+    with open(logger.segments[0]) as f:
+        assert f.read() == ("(1718000000.123456) vcan0 123#DEADBEEF\n"
+                            "(1718000001.000000) vcan0 18DAF110#\n")
+
+
+def test_rotacion_y_busqueda_por_tiempo(tmp_path):
+    tramas = _tramas(20000)
+    with FrameLogger(str(tmp_path), max_bytes=100_000, buffer_frames=1000, index_every=64) as logger:
+        logger.log_many(tramas)
+    assert len(logger.segments) == 5 and logger.frames == 20000
+    lector = FrameReader(str(tmp_path))
+    desde, hasta = tramas[12345][0], tramas[12400][0]
+    ventana = list(lector.frames(desde, hasta))
+    assert [t[0] for t in ventana] == [t[0] for t in tramas[12345:12401]]
+    assert {t[1] for t in lector.frames(desde, hasta, ids=[0x7E8])} == {0x7E8}
+
+
+def test_rotacion_por_duracion(tmp_path):
+    with FrameLogger(str(tmp_path), max_seconds=0.5) as logger:
+        logger.log_many(_tramas(12000))  # 1.2 s de tráfico
+    assert len(logger.segments) == 3
+
+
+def test_sostiene_10k_tramas_por_segundo(tmp_path):
+    n = 50000
+    data = bytes(8)
+    with FrameLogger(str(tmp_path)) as logger:
+        t0 = time.perf_counter()
+        for i in range(n):
+            logger.log(0x100 + i % 64, data)
+        logger.flush()
+        segundos = time.perf_counter() - t0
+    assert logger.frames == n
+    assert n / segundos > 10000
+
+
+def test_decodificacion_al_leer(tmp_path):
+    cantools = pytest.importorskip("cantools")
+    from dbc_loader import ensure_dbc_folder
+
+    db = cantools.database.load_file(os.path.join(ensure_dbc_folder(), "example.dbc"))
+    with FrameLogger(str(tmp_path)) as logger:
+        logger.log(100, bytes([88, 0, 0, 0, 0, 0, 0, 0]), ts_ns=1)
+        logger.log(0x7FF, b"\x01", ts_ns=2)  # sin mensaje en el DBC
+    assert list(FrameReader(str(tmp_path)).decoded(db)) == [(1, "ExampleMessage", {"ExampleSignal": 88})]
+
+
+@pytest.mark.parametrize("fmt", ["bin", "candump"])
+def test_arrays_para_decodificar_en_lote(tmp_path, fmt):
+    np = pytest.importorskip("numpy")
+    tramas = _tramas(5000)
+    with FrameLogger(str(tmp_path), fmt=fmt, max_bytes=40_000) as logger:
+        logger.log_many(tramas)
+    lector = FrameReader(str(tmp_path))
+    desde, hasta = tramas[1000][0], tramas[3999][0]
+    ts, ids, dlc, data = lector.arrays(desde, hasta)
+    esperadas = list(lector.frames(desde, hasta))
+    assert len(ts) == 3000 and ts.tolist() == [t[0] for t in esperadas]
+    assert ids.tolist() == [t[1] for t in esperadas] and dlc.tolist() == [t[2] for t in esperadas]
+    assert data.shape == (3000, 8) and bytes(data[7]) == esperadas[7][3].ljust(8, b"\0")
+    assert np.all(data[dlc == 0] == 0)
+
+
+def test_dos_registradores_en_la_misma_carpeta_no_se_pisan(tmp_path):
+    for ts in (1, 2):
+        with FrameLogger(str(tmp_path)) as logger:
+            logger.log(0x100, bytes([ts]), ts_ns=1_000)  # mismo nombre de segmento
+    assert [t[3] for t in FrameReader(str(tmp_path)).frames()] == [b"\x01", b"\x02"]
+
+
+def test_vaciado_por_tiempo(tmp_path):
+    logger = FrameLogger(str(tmp_path), flush_seconds=0.05)
+    logger.log(0x100, b"\x01")
+    time.sleep(0.06)
+    logger.log(0x100, b"\x02")  # la primera ya superó flush_seconds: se escribe todo
+    assert [t[3] for t in FrameReader(str(tmp_path)).frames()] == [b"\x01", b"\x02"]
+    logger.close()
+
+
+@pytest.mark.parametrize("fmt", ["bin", "candump"])
+def test_segmentos_solapados_se_mezclan_por_tiempo(tmp_path, fmt):
+    np = pytest.importorskip("numpy")
+    pares = FrameLogger(str(tmp_path), fmt=fmt, buffer_frames=10)
+    impares = FrameLogger(str(tmp_path), fmt=fmt, buffer_frames=10)
+    for ts in range(0, 200_000, 1000):  # dos registradores a la vez, tramas intercaladas
+        (pares if ts % 2000 == 0 else impares).log(0x100, b"\x01", ts_ns=ts)
+    pares.close()
+    impares.close()
+    lector = FrameReader(str(tmp_path))
+    assert [t[0] for t in lector.frames()] == list(range(0, 200_000, 1000))
+    ventana = [t[0] for t in lector.frames(50_000, 60_000)]
+    assert ventana == list(range(50_000, 61_000, 1000))
+    assert lector.arrays(50_000, 60_000)[0].tolist() == ventana
+    assert np.all(np.diff(lector.arrays()[0]) > 0)
+
+
+def test_id_extendido_bajo_se_guarda_con_ocho_digitos(tmp_path):
+    with FrameLogger(str(tmp_path), fmt="candump") as logger:
+        logger.log(0x123, b"\x01", ts_ns=1_000_000_000, is_extended=True)
+        logger.log_many([(2_000_000_000, 0x7E8, b"", True), (3_000_000_000, 0x7E8, b"")])
+    with open(logger.segments[0]) as f:
+        assert [linea.split()[2] for linea in f] == ["00000123#01", "000007E8#", "7E8#"]
+    binario = tmp_path / "bin"
+    with FrameLogger(str(binario)) as logger:
+        logger.log(0x123, b"\x01", ts_ns=1, is_extended=True)
+        logger.log(0x18DAF110, b"", ts_ns=2)
+        logger.log(0x123, b"", ts_ns=3)
+    with open(logger.segments[0], "rb") as f:
+        f.seek(len(can_logger.MAGIC))
+        flags = [r[3] for r in can_logger.RECORD.iter_unpack(f.read())]
+    assert flags == [can_logger.FLAG_EXTENDED, can_logger.FLAG_EXTENDED, 0]
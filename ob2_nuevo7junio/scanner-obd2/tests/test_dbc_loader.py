@@ -0,0 +1,137 @@
+import os
+import time
+
+import pytest
+
+cantools = pytest.importorskip("cantools")
+np = pytest.importorskip("numpy")
+
+from can_logger import FrameLogger, FrameReader
+from dbc_loader import BatchDecoder, default_cache_dir, load_dbc
+
+DBC = """VERSION ""
+BS_:
+BU_: ECU
+BO_ 256 Motor: 8 ECU
+ SG_ Rpm : 0|16@1+ (0.25,0) [0|16383.75] "rpm" ECU
+ SG_ Temp : 16|8@1+ (1,-40) [-40|215] "C" ECU
+ SG_ Par : 24|12@1- (0.5,0) [-1024|1023.5] "Nm" ECU
+ SG_ Presion : 47|16@0+ (0.1,0) [0|6553.5] "kPa" ECU
+ SG_ Delta : 63|5@0- (1,0) [-16|15] "" ECU
+BO_ 512 Diag: 8 ECU
+ SG_ Modo M : 0|2@1+ (1,0) [0|3] "" ECU
+ SG_ Valor m1 : 8|16@1+ (1,0) [0|65535] "" ECU
+ SG_ Otro m2 : 8|8@1- (2,10) [0|0] "" ECU
+"""
+
+
+@pytest.fixture
+def dbc(tmp_path):
+    ruta = tmp_path / "motor.dbc"
+    ruta.write_text(DBC)
+    return str(ruta)
+
+
+def test_cache_por_hash(dbc, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    primera = load_dbc(dbc)
+    cache = default_cache_dir()
+    assert cache == str(tmp_path / "xdg" / "scanner-obd2" / "dbc")
+    assert len(os.listdir(cache)) == 1
+    assert not os.path.exists(os.path.join(os.path.dirname(dbc), ".dbc_cache"))
+
+    def no_parsear(*args, **kwargs):
+        raise AssertionError("el DBC no cambió: debía salir de la caché")
+
+    parsear = cantools.database.load_file
+    monkeypatch.setattr(cantools.database, "load_file", no_parsear)
+    segunda = load_dbc(dbc)
+    assert [m.name for m in segunda.messages] == [m.name for m in primera.messages]
+    monkeypatch.setattr(cantools.database, "load_file", parsear)
+
+    with open(dbc, "a") as f:
+        f.write('CM_ BO_ 256 "editado";\n')
+    load_dbc(dbc)
+    assert len(os.listdir(cache)) == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="permisos POSIX")
+def test_cache_escribible_por_otros_se_ignora(dbc, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    load_dbc(dbc, cache_dir=str(cache))
+    (pickle_path,) = cache.iterdir()
+    os.chmod(pickle_path, 0o666)  # cualquiera podría reemplazar el pickle
+    parseos = []
+    parsear = cantools.database.load_file
+    monkeypatch.setattr(cantools.database, "load_file", lambda *a, **k: parseos.append(a) or parsear(*a, **k))
+    load_dbc(dbc, cache_dir=str(cache))
+    assert len(parseos) == 1
+
+
+def test_cache_incompatible_se_regenera(dbc, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    load_dbc(dbc, cache_dir=str(cache))
+
+    refresh = cantools.database.can.Message.refresh
+    fallos = []
+
+    def refresh_roto(self, *args, **kwargs):
+        if not fallos:  # solo el mensaje leído de la caché; el re-parseo funciona
+            fallos.append(self.name)
+            raise TypeError("pickle de otra versión")
+        return refresh(self, *args, **kwargs)
+
+    monkeypatch.setattr(cantools.database.can.Message, "refresh", refresh_roto)
+    db = load_dbc(dbc, cache_dir=str(cache))
+    monkeypatch.undo()
+    assert fallos and [m.name for m in db.messages] == ["Motor", "Diag"]
+
+
+def _lote(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    ids = rng.choice([256, 512, 999], size=n)
+    data = rng.integers(0, 256, (n, 8), dtype=np.uint8)
+    data[:, 0] = (data[:, 0] & 0xFC) | rng.integers(1, 3, n)  # Modo 1 o 2 (los definidos)
+    return ids, data
+
+
+def test_lote_igual_a_decode_message(dbc):
+    db = load_dbc(dbc, use_cache=False)
+    ids, data = _lote(3000)
+    resultado = BatchDecoder(db).decode_batch(ids, data)
+    assert set(resultado) == {"Motor", "Diag"}
+    for nombre, columnas in resultado.items():
+        for k, i in enumerate(columnas["index"]):
+            esperado = db.decode_message(int(ids[i]), bytes(data[i]), decode_choices=False)
+            for senal, valor in columnas.items():
+                if senal == "index":
+                    continue
+                if senal in esperado:
+                    assert valor[k] == pytest.approx(esperado[senal]), (nombre, senal)
+                else:
+                    assert np.isnan(valor[k])  # señal de otro valor del multiplexor
+
+
+def test_decodifica_log_completo_10x_mas_rapido(dbc, tmp_path):
+    db = load_dbc(dbc, use_cache=False)
+    ids, data = _lote(200_000, semilla=1)
+    with FrameLogger(str(tmp_path / "log")) as logger:
+        logger.log_many((i, int(ident), bytes(d)) for i, (ident, d) in enumerate(zip(ids, data)))
+    lector = FrameReader(str(tmp_path / "log"))
+    decodificador = BatchDecoder(db)
+
+    t0 = time.perf_counter()
+    resultado = decodificador.decode_reader(lector)
+    lote = time.perf_counter() - t0
+
+    tramas = list(lector.frames())
+    t0 = time.perf_counter()
+    for _ts, ident, _dlc, payload in tramas:
+        try:
+            db.decode_message(ident, payload, decode_choices=False)
+        except KeyError:
+            pass
+    bucle = time.perf_counter() - t0
+
+    assert len(resultado["Motor"]["ts_ns"]) == int(np.sum(ids == 256))
+    assert bucle / lote > 10
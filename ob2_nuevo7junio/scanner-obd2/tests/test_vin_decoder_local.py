@@ -0,0 +1,88 @@
+import sqlite3
+import time
+
+from src.vin_decoder import BaseVpicLocal, VinDecoder, _tablas_vin
+
+
+def _crear_vpic(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.executescript("""
+        CREATE TABLE Vehicle (VIN TEXT, MakeId TEXT, ModelId TEXT, EngineId TEXT,
+                              FuelTypeId TEXT, BodyClassId TEXT, PlantCity TEXT, ModelYear TEXT);
+        CREATE TABLE Make (MakeId TEXT, MakeName TEXT);
+        CREATE TABLE Model (ModelId TEXT, ModelName TEXT);
+        CREATE TABLE Engine (EngineId TEXT, EngineConfiguration TEXT);
+        CREATE TABLE FuelType (FuelTypeId TEXT, FuelTypeName TEXT);
+        CREATE TABLE BodyClass (BodyClassId TEXT, BodyClassName TEXT);
+        INSERT INTO Make VALUES ('1', 'HONDA');
+        INSERT INTO Model VALUES ('10', 'Accord');
+        INSERT INTO Engine VALUES ('5', 'In-Line');
+        INSERT INTO FuelType VALUES ('2', 'Gasoline');
+        INSERT INTO BodyClass VALUES ('3', 'Sedan');
+        INSERT INTO Vehicle VALUES ('1HGCM82633A123456', '1', '10', '5', '2', '3', 'Marysville', '2003');
+        INSERT INTO Vehicle VALUES ('1HGCM82633B000001', '1', '10', NULL, '2', '3', 'Marysville', '2003');
+    """)
+    conn.executemany(
+        "INSERT INTO Vehicle (VIN, MakeId, ModelYear) VALUES (?, '1', '2010')",
+        ((f"JH4KA{i:06d}{i:06d}",) for i in range(2000)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_busqueda_con_join_e_indices(tmp_path):
+    ruta = str(tmp_path / "vpic_lite.db")
+    _crear_vpic(ruta)
+    base = BaseVpicLocal(ruta)
+    datos = base.buscar("1hgcm82633a999999")
+    assert datos == {
+        "marca": "HONDA", "modelo": "Accord", "año": "2003", "tipo_motor": "In-Line",
+        "tipo_combustible": "Gasoline", "clase_carroceria": "Sedan", "planta": "Marysville",
+    }
+    assert base.buscar("ZZZZZZZZZZZ000000") is None
+    plan = " ".join(str(f) for f in base.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM Vehicle WHERE substr(upper(VIN), 1, 11) = ?", ("X",)))
+    assert "idx_vehicle_vin11" in plan
+    assert "1HGCM82633A" in base.por_wmi("1hg")
+    base.cerrar()
+
+
+def test_decoder_usa_base_compartida_y_cache(tmp_path):
+    ruta = str(tmp_path / "vpic_lite.db")
+    _crear_vpic(ruta)
+    decoder = VinDecoder()
+    assert decoder.wmi_codes is VinDecoder().wmi_codes  # JSON leído una vez
+    assert _tablas_vin.cache_info().misses == 1
+    assert decoder.buscar_en_base_local("1HGCM82633A123456", db_path=ruta)["marca"] == "HONDA"
+    assert decoder.buscar_en_base_local("1HGCM82633A123456", db_path=str(tmp_path / "no.db")) is None
+
+
+def test_lote_flota_miles_por_segundo(tmp_path):
+    ruta = str(tmp_path / "vpic_lite.db")
+    _crear_vpic(ruta)
+    base = BaseVpicLocal(ruta)
+    decoder = VinDecoder()
+    vins = [f"JH4KA{i % 2000:06d}{i:06d}" for i in range(10000)]
+    t0 = time.perf_counter()
+    decodificados = decoder.decode_lote(vins)
+    encontrados = base.buscar_lote(vins)
+    duracion = time.perf_counter() - t0
+    assert len(decodificados) == len(vins)
+    assert all(encontrados[v]["año"] == "2010" for v in vins)
+    assert base.estadisticas_cache().misses == 2000  # una consulta por prefijo distinto
+    # Cota holgada (el objetivo es >2000/s): solo detecta regresiones groseras
+    # sin volverse inestable en máquinas cargadas
+    assert len(vins) / duracion > 200
+    base.cerrar()
+
+
+def test_prefijos_no_encontrados_no_se_cachean(tmp_path):
+    ruta = str(tmp_path / "vpic_lite.db")
+    _crear_vpic(ruta)
+    base = BaseVpicLocal(ruta)
+    assert base.buscar("2T1BR32E000000001") is None
+    with base.conn:
+        base.conn.execute("INSERT INTO Vehicle (VIN, MakeId, ModelYear) VALUES ('2T1BR32E000000001', '1', '2012')")
+    assert base.buscar("2T1BR32E000000001")["año"] == "2012"
+    assert base.estadisticas_cache().currsize == 1
+    base.cerrar()
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+from utils.vpic_migrator import estado_migracion, migrar_tablas
+
+
+def _origen(ruta, n=5000):
+    conn = sqlite3.connect(ruta)
+    conn.executescript("""
+        CREATE TABLE Vehicle (Id INTEGER, VIN TEXT, MakeId INTEGER, ModelYear INTEGER);
+        CREATE TABLE Make (MakeId INTEGER, MakeName TEXT);
+        INSERT INTO Make VALUES (1, 'HONDA'), (2, 'TOYOTA'), (3, 'FORD');
+    """)
+    # Insertadas en desorden: la migración ordena por la clave
+    conn.executemany(
+        "INSERT INTO Vehicle VALUES (?, ?, ?, ?)",
+        ((i, f"1HGCM{i:06d}A{i:05d}", i % 3 + 1, 2000 + i % 20) for i in reversed(range(n))),
+    )
+    conn.commit()
+    return conn
+
+
+class _OrigenQueFalla:
+    """Conexión DB-API que corta la lectura tras ``lotes`` llamadas a fetchmany."""
+
+    def __init__(self, conn, lotes):
+        self.conn = conn
+        self.lotes = lotes
+
+    def cursor(self):
+        origen = self
+        cursor = self.conn.cursor()
+
+        class _Cursor:
+            def __getattr__(self, nombre):
+                return getattr(cursor, nombre)
+
+            def fetchmany(self, n):
+                if origen.lotes == 0:
+                    raise ConnectionError("conexión perdida")
+                origen.lotes -= 1
+                return cursor.fetchmany(n)
+
+        return _Cursor()
+
+
+def test_migracion_por_lotes_con_indices(tmp_path):
+    origen = _origen(str(tmp_path / "origen.db"))
+    destino = str(tmp_path / "data" / "vpic_lite.db")
+    copiadas = migrar_tablas(origen, destino, ["Vehicle", "Make"], lote=700, filas_por_transaccion=1400)
+    assert copiadas == {"Vehicle": 5000, "Make": 3}
+    conn = sqlite3.connect(destino)
+    assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT Id) FROM Vehicle").fetchone() == (5000, 5000)
+    indices = {f[0] for f in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_vehicle_vin11", "idx_vehicle_wmi", "idx_make_id"} <= indices
+    conn.close()
+    estado = estado_migracion(destino)
+    assert estado["Vehicle"] == {"clave": "Id", "ultima": 4999, "filas": 5000, "completa": True}
+    # Una segunda ejecución no vuelve a copiar nada
+    assert migrar_tablas(origen, destino, ["Vehicle", "Make"]) == {"Vehicle": 0, "Make": 0}
+
+
+def test_migracion_interrumpida_se_reanuda(tmp_path):
+    origen = _origen(str(tmp_path / "origen.db"))
+    destino = str(tmp_path / "vpic_lite.db")
+    with pytest.raises(ConnectionError):
+        migrar_tablas(_OrigenQueFalla(origen, 5), destino, ["Vehicle"], lote=500, filas_por_transaccion=1000)
+    estado = estado_migracion(destino)["Vehicle"]
+    # Se confirmaron dos transacciones completas (4 lotes); el quinto se revirtió
+    assert estado["filas"] == 2000 and not estado["completa"]
+    assert sqlite3.connect(destino).execute("SELECT COUNT(*) FROM Vehicle").fetchone()[0] == 2000
+
+    copiadas = migrar_tablas(origen, destino, ["Vehicle"], lote=500, filas_por_transaccion=1000)
+    assert copiadas == {"Vehicle": 3000}
+    conn = sqlite3.connect(destino)
+    assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT Id), MAX(CAST(Id AS INTEGER)) FROM Vehicle").fetchone() == (5000, 5000, 4999)
+    conn.close()
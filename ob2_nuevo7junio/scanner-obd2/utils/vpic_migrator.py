@@ -1,11 +1,44 @@
 """
 utils/vpic_migrator.py - Utilidades para migrar la base vPIC de SQL Server (.bak) a SQLite
+
+La migración lee por lotes desde cualquier conexión DB-API (pyodbc contra SQL
+Server o, en pruebas, sqlite3), escribe con executemany dentro de
+transacciones grandes y guarda un checkpoint por tabla (última clave copiada)
+en la misma transacción: si se interrumpe, la siguiente ejecución continúa
+donde quedó. Los índices se crean al final, con la tabla ya cargada.
 """
 import os
 import subprocess
 import sqlite3
-from typing import List
-import pyodbc
+import time
+from typing import Dict, List, Optional, Sequence
+
+FILAS_POR_LOTE = 10000
+FILAS_POR_TRANSACCION = 200000
+
+# Índices de la base final (se crean después de cargar los datos)
+INDICES_VPIC = {
+    "Vehicle": [
+        "CREATE INDEX IF NOT EXISTS idx_vehicle_vin11 ON Vehicle (substr(upper(VIN), 1, 11))",
+        "CREATE INDEX IF NOT EXISTS idx_vehicle_wmi ON Vehicle (substr(upper(VIN), 1, 3))",
+    ],
+    "Make": ["CREATE INDEX IF NOT EXISTS idx_make_id ON Make (MakeId)"],
+    "Model": ["CREATE INDEX IF NOT EXISTS idx_model_id ON Model (ModelId)"],
+    "Engine": ["CREATE INDEX IF NOT EXISTS idx_engine_id ON Engine (EngineId)"],
+    "FuelType": ["CREATE INDEX IF NOT EXISTS idx_fueltype_id ON FuelType (FuelTypeId)"],
+    "BodyClass": ["CREATE INDEX IF NOT EXISTS idx_bodyclass_id ON BodyClass (BodyClassId)"],
+}
+
+ESQUEMA_CHECKPOINT = """
+CREATE TABLE IF NOT EXISTS _migracion (
+    tabla TEXT PRIMARY KEY,
+    clave TEXT,
+    ultima,
+    filas INTEGER NOT NULL DEFAULT 0,
+    completa INTEGER NOT NULL DEFAULT 0,
+    actualizado REAL
+)
+"""
 
 # 1. Restaurar la base de datos .bak en SQL Server
 
@@ -24,25 +57,164 @@ def restore_sql_server_database(bak_path: str, db_name: str, sql_instance: str =
     print(f"Ejecutando restauración: {' '.join(cmd)}")
     subprocess.run(cmd, check=True)
 
-# 2. Exportar tablas relevantes a SQLite
+# 2. Migrar tablas por lotes a SQLite (reanudable)
+
+def _columnas_origen(cursor, tabla: str) -> List[str]:
+    cursor.execute(f"SELECT * FROM {tabla} WHERE 1 = 0")
+    columnas = [col[0] for col in cursor.description]
+    cursor.fetchall()
+    return columnas
+
+
+def estado_migracion(sqlite_path: str) -> Dict[str, dict]:
+    """Checkpoints guardados: {tabla: {clave, ultima, filas, completa}}."""
+    if not os.path.exists(sqlite_path):
+        return {}
+    with sqlite3.connect(sqlite_path) as conn:
+        conn.execute(ESQUEMA_CHECKPOINT)
+        filas = conn.execute("SELECT tabla, clave, ultima, filas, completa FROM _migracion").fetchall()
+    return {f[0]: {"clave": f[1], "ultima": f[2], "filas": f[3], "completa": bool(f[4])} for f in filas}
+
+
+def migrar_tabla(conn_origen, conn_destino: sqlite3.Connection, tabla: str, clave: Optional[str] = None,
+                 lote: int = FILAS_POR_LOTE, filas_por_transaccion: int = FILAS_POR_TRANSACCION) -> int:
+    """
+    Copia ``tabla`` por lotes ordenando por ``clave`` (única; por defecto la
+    primera columna) y continúa desde el checkpoint si lo hay. Devuelve las
+    filas copiadas en esta ejecución.
+    """
+    cursor = conn_origen.cursor()
+    columnas = _columnas_origen(cursor, tabla)
+    clave = clave or columnas[0]
+    i_clave = columnas.index(clave)
+    fila = conn_destino.execute(
+        "SELECT ultima, filas, completa FROM _migracion WHERE tabla = ?", (tabla,)
+    ).fetchone()
+    if fila and fila[2]:
+        print(f"⏭️ {tabla} ya migrada ({fila[1]} registros)")
+        return 0
+    if fila is None:
+        schema_sql = ",".join([f'"{col}" TEXT' for col in columnas])
+        with conn_destino:
+            conn_destino.execute(f"DROP TABLE IF EXISTS {tabla}")
+            conn_destino.execute(f"CREATE TABLE {tabla} ({schema_sql})")
+            conn_destino.execute(
+                "INSERT INTO _migracion (tabla, clave, filas, actualizado) VALUES (?, ?, 0, ?)",
+                (tabla, clave, time.time()),
+            )
+        ultima, total = None, 0
+    else:
+        ultima, total = fila[0], fila[1]
+        print(f"↩️ Reanudando {tabla} desde {clave} > {ultima} ({total} registros ya copiados)")
+
+    columnas_sql = ",".join([f'"{c}"' for c in columnas])
+    placeholders = ",".join(["?"] * len(columnas))
+    insertar = f"INSERT INTO {tabla} ({columnas_sql}) VALUES ({placeholders})"
+    if ultima is None:
+        cursor.execute(f"SELECT * FROM {tabla} ORDER BY {clave}")
+    else:
+        cursor.execute(f"SELECT * FROM {tabla} WHERE {clave} > ? ORDER BY {clave}", (ultima,))
+
+    copiadas = 0
+    pendientes = 0
+    conn_destino.execute("BEGIN")
+    try:
+        while True:
+            registros = cursor.fetchmany(lote)
+            if not registros:
+                break
+            conn_destino.executemany(insertar, (tuple(r) for r in registros))
+            ultima = registros[-1][i_clave]
+            copiadas += len(registros)
+            pendientes += len(registros)
+            if pendientes >= filas_por_transaccion:
+                _checkpoint(conn_destino, tabla, ultima, total + copiadas, False)
+                conn_destino.execute("COMMIT")
+                print(f"   {tabla}: {total + copiadas} registros")
+                pendientes = 0
+                conn_destino.execute("BEGIN")
+        _checkpoint(conn_destino, tabla, ultima, total + copiadas, True)
+        conn_destino.execute("COMMIT")
+    except BaseException:
+        conn_destino.execute("ROLLBACK")
+        raise
+    finally:
+        cursor.close()
+    print(f"✅ {tabla} exportada: {total + copiadas} registros")
+    return copiadas
+
+
+def _valor_clave(valor):
+    """La clave se guarda con su tipo (sin afinidad) para compararla igual al reanudar."""
+    if valor is None or isinstance(valor, (int, float, str, bytes)):
+        return valor
+    return str(valor)
+
+
+def _checkpoint(conn_destino, tabla, ultima, filas, completa):
+    conn_destino.execute(
+        "UPDATE _migracion SET ultima = ?, filas = ?, completa = ?, actualizado = ? WHERE tabla = ?",
+        (_valor_clave(ultima), filas, int(completa), time.time(), tabla),
+    )
+
+
+def crear_indices(conn_destino: sqlite3.Connection, tablas: Sequence[str],
+                  indices: Optional[Dict[str, List[str]]] = None):
+    """Crea los índices de las tablas migradas (una vez cargados los datos)."""
+    indices = INDICES_VPIC if indices is None else indices
+    with conn_destino:
+        for tabla in tablas:
+            for sql in indices.get(tabla, []):
+                conn_destino.execute(sql)
+    conn_destino.execute("ANALYZE")
+
+
+def migrar_tablas(conn_origen, sqlite_path: str, tablas: Sequence[str],
+                  claves: Optional[Dict[str, str]] = None, lote: int = FILAS_POR_LOTE,
+                  filas_por_transaccion: int = FILAS_POR_TRANSACCION, reiniciar: bool = False,
+                  indices: Optional[Dict[str, List[str]]] = None) -> Dict[str, int]:
+    """
+    Migra ``tablas`` desde ``conn_origen`` (conexión DB-API con parámetros '?')
+    a ``sqlite_path`` por lotes y con checkpoints. ``reiniciar`` descarta los
+    checkpoints y vuelve a copiar todo. Devuelve {tabla: filas copiadas}.
+    """
+    claves = claves or {}
+    sqlite_path = os.path.abspath(sqlite_path)
+    os.makedirs(os.path.dirname(sqlite_path), exist_ok=True)
+    conn_destino = sqlite3.connect(sqlite_path, isolation_level=None)
+    try:
+        conn_destino.execute("PRAGMA journal_mode=WAL")
+        conn_destino.execute("PRAGMA synchronous=NORMAL")
+        conn_destino.execute(ESQUEMA_CHECKPOINT)
+        if reiniciar:
+            conn_destino.execute("DELETE FROM _migracion")
+        copiadas = {}
+        for tabla in tablas:
+            print(f"🔄 Procesando tabla: {tabla}")
+            copiadas[tabla] = migrar_tabla(conn_origen, conn_destino, tabla, claves.get(tabla),
+                                           lote, filas_por_transaccion)
+        print("🧱 Creando índices...")
+        crear_indices(conn_destino, tablas, indices)
+    finally:
+        conn_destino.close()
+    print(f"Exportación completa a {sqlite_path}")
+    return copiadas
+
 
-def export_tables_to_sqlite(sqlserver_conn_str: str, sqlite_path: str, tablas: List[str]):
+def export_tables_to_sqlite(sqlserver_conn_str: str, sqlite_path: str, tablas: List[str], **opciones):
     """
     Exporta tablas seleccionadas de SQL Server a un archivo SQLite.
     sqlserver_conn_str: cadena de conexión ODBC, ej: 'DRIVER={ODBC Driver 17 for SQL Server};SERVER=localhost;DATABASE=vPIC;Trusted_Connection=yes;'
     sqlite_path: ruta destino del .db
     tablas: lista de nombres de tablas a exportar
+    opciones: ver migrar_tablas (claves, lote, filas_por_transaccion, reiniciar)
     """
-    import pandas as pd
-    sqlite_path = os.path.abspath(sqlite_path)
-    with sqlite3.connect(sqlite_path) as sqlite_conn:
-        sql_conn = pyodbc.connect(sqlserver_conn_str)
-        for tabla in tablas:
-            print(f"Exportando tabla: {tabla}")
-            df = pd.read_sql(f"SELECT * FROM {tabla}", sql_conn)
-            df.to_sql(tabla, sqlite_conn, if_exists='replace', index=False)
+    import pyodbc  # solo hace falta para leer desde SQL Server
+    sql_conn = pyodbc.connect(sqlserver_conn_str)
+    try:
+        return migrar_tablas(sql_conn, sqlite_path, tablas, **opciones)
+    finally:
         sql_conn.close()
-    print(f"Exportación completa a {sqlite_path}")
 
 # 3. Importar tablas relevantes (wrapper)
 def importar_tablas(tablas_relevantes: list):
@@ -74,52 +246,16 @@ TABLAS = [
     "BodyClass"
 ]
 
-def exportar_sqlserver_a_sqlite():
+def exportar_sqlserver_a_sqlite(reiniciar: bool = False):
     print("🔍 Iniciando migración desde SQL Server a SQLite...")
-
-    # Crear carpeta data/ si no existe
-    if not os.path.exists(SQLITE_DIR):
-        os.makedirs(SQLITE_DIR)
-        print(f"📁 Carpeta creada: {SQLITE_DIR}")
-
-    # Conexión SQL Server
     print(f"🖥️ Conectando a SQL Server → Base: {SQL_DB_NAME}...")
-    conn_sql = pyodbc.connect(
+    export_tables_to_sqlite(
         f'DRIVER={{ODBC Driver 17 for SQL Server}};'
         f'SERVER={SQL_SERVER};'
         f'DATABASE={SQL_DB_NAME};'
-        f'UID={SQL_USER};PWD={SQL_PASSWORD}'
+        f'UID={SQL_USER};PWD={SQL_PASSWORD}',
+        SQLITE_PATH, TABLAS, reiniciar=reiniciar,
     )
-    cursor_sql = conn_sql.cursor()
-
-    # Conexión SQLite
-    print(f"🧱 Creando base SQLite en: {SQLITE_PATH}...")
-    conn_sqlite = sqlite3.connect(SQLITE_PATH)
-    cursor_sqlite = conn_sqlite.cursor()
-
-    # Exportar cada tabla
-    for tabla in TABLAS:
-        print(f"🔄 Procesando tabla: {tabla}")
-        cursor_sql.execute(f"SELECT * FROM {tabla}")
-        columnas = [col[0] for col in cursor_sql.description]
-        registros = cursor_sql.fetchall()
-
-        placeholders = ",".join(["?"] * len(columnas))
-        columnas_sql = ",".join([f'"{c}"' for c in columnas])
-        schema_sql = ",".join([f'"{col}" TEXT' for col in columnas])
-
-        cursor_sqlite.execute(f"DROP TABLE IF EXISTS {tabla}")
-        cursor_sqlite.execute(f"CREATE TABLE {tabla} ({schema_sql})")
-        cursor_sqlite.executemany(
-            f"INSERT INTO {tabla} ({columnas_sql}) VALUES ({placeholders})",
-            registros
-        )
-        conn_sqlite.commit()
-        print(f"✅ {tabla} exportada: {len(registros)} registros")
-
-    conn_sql.close()
-    conn_sqlite.close()
-
     print("\n🎉 MIGRACIÓN COMPLETA")
     print(f"📦 Archivo final generado en: {SQLITE_PATH}")
 
@@ -2,33 +2,73 @@ import os
 import glob
 import shutil
 
+from src.storage.indice_logs import IndiceLogs
+
+
 def find_latest_log(pattern="log_*.txt"):
     logs = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
     return logs[0] if logs else None
 
-def summarize_log(input_path, max_bytes=2_621_440):
+
+def _escribir_entradas(entradas, output_path):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for entrada in entradas:
+            f.write(entrada["texto"] + "\n")
+
+
+def summarize_log(input_path, max_bytes=2_621_440, desde=None, hasta=None, indice_db=None):
+    """
+    Resume un log de texto.
+
+    Con ``desde``/``hasta`` (epoch o texto ISO) extrae las entradas de ese rango
+    de tiempo. Si el log supera ``max_bytes`` se conservan las entradas más
+    recientes que entran en el límite, cortando por entrada completa (un
+    traceback no queda partido). Ambos casos usan el índice de logs
+    (src/storage/indice_logs.py), que solo parsea lo nuevo del archivo. Por
+    defecto la base del índice es ``logs_indice.db`` junto al log.
+    """
     output_path = input_path.replace('.txt', '_resumido.txt')
     file_size = os.path.getsize(input_path)
-    if file_size <= max_bytes:
+    if desde is None and hasta is None and file_size <= max_bytes:
         shutil.copy2(input_path, output_path)
         print(f"[RESUMEN] El log ya es menor a 2.5 MB. Copiado a {output_path}")
         return output_path
-    # Si es mayor, recortar desde el final
-    with open(input_path, 'rb') as f:
-        f.seek(-max_bytes, os.SEEK_END)
-        data = f.read()
-        # Buscar el primer salto de línea para no cortar una línea
-        first_nl = data.find(b'\n')
-        if first_nl != -1:
-            data = data[first_nl+1:]
-    with open(output_path, 'wb') as f:
-        f.write(data)
-    print(f"[RESUMEN] Log resumido a {output_path} (<=2.5 MB)")
+
+    if indice_db is None:
+        indice_db = os.path.join(os.path.dirname(os.path.abspath(input_path)), "logs_indice.db")
+    indice = IndiceLogs(indice_db)
+    try:
+        indice.indexar([input_path], procesos=1)
+        if desde is not None or hasta is not None:
+            _escribir_entradas(indice.rango(desde, hasta, archivo=input_path), output_path)
+            print(f"[RESUMEN] Entradas entre {desde or 'inicio'} y {hasta or 'fin'} en {output_path}")
+            return output_path
+        # Entradas más recientes que entran en max_bytes
+        recientes, usados = [], 0
+        for entrada in indice.rango(archivo=input_path, descendente=True):
+            usados += len(entrada["texto"].encode('utf-8')) + 1
+            if usados > max_bytes:
+                break
+            recientes.append(entrada)
+    finally:
+        indice.cerrar()
+    recientes.reverse()
+    _escribir_entradas(recientes, output_path)
+    print(f"[RESUMEN] Log resumido a {output_path} (<=2.5 MB, {len(recientes)} entradas recientes)")
     return output_path
 
+
 if __name__ == "__main__":
-    latest_log = find_latest_log()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resumen del último log de la app")
+    parser.add_argument("log", nargs="?", help="log a resumir (por defecto el más reciente)")
+    parser.add_argument("--desde", help="inicio del rango, p. ej. '2025-06-06 15:00'")
+    parser.add_argument("--hasta", help="fin del rango")
+    args = parser.parse_args()
+
+    latest_log = args.log or find_latest_log()
     if not latest_log:
         print("[RESUMEN][ERROR] No se encontró log para resumir.")
     else:
-        summarize_log(latest_log)
+        summarize_log(latest_log, desde=args.desde, hasta=args.hasta)
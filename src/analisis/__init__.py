@@ -0,0 +1,6 @@
+"""
+Análisis de logs OBD-II en streaming (sin pandas).
+
+- estadisticas: acumuladores online (Welford, cuantiles P², saltos, frecuencia).
+- resumen_logs: resumen por archivo con caché por mtime/tamaño y pool de procesos.
+"""
@@ -0,0 +1,159 @@
+"""
+Acumuladores estadísticos online: una pasada, memoria constante.
+
+- EstadisticaOnline: media y varianza de Welford, min/max y combinación de
+  acumuladores parciales (fórmula de Chan) para juntar resultados de varios
+  archivos o procesos.
+- CuantilP2: estimación de un cuantil con el algoritmo P² (Jain & Chlamtac,
+  1985), con cinco marcadores y sin guardar las muestras.
+- ContadorSaltos: cambios entre muestras consecutivas mayores a un umbral.
+"""
+import math
+from typing import Dict, List, Optional
+
+
+class EstadisticaOnline:
+    __slots__ = ("n", "media", "m2", "minimo", "maximo")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def agregar(self, x: float):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+        if x < self.minimo:
+            self.minimo = x
+        if x > self.maximo:
+            self.maximo = x
+
+    @property
+    def varianza(self) -> float:
+        """Varianza muestral (n-1); 0 con menos de dos muestras."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self) -> float:
+        return math.sqrt(self.varianza)
+
+    def combinar(self, otra: "EstadisticaOnline") -> "EstadisticaOnline":
+        """Combina otro acumulador en este (Chan et al.) y devuelve self."""
+        if otra.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = otra.n, otra.media, otra.m2
+            self.minimo, self.maximo = otra.minimo, otra.maximo
+            return self
+        n = self.n + otra.n
+        delta = otra.media - self.media
+        self.m2 += otra.m2 + delta * delta * self.n * otra.n / n
+        self.media += delta * otra.n / n
+        self.n = n
+        self.minimo = min(self.minimo, otra.minimo)
+        self.maximo = max(self.maximo, otra.maximo)
+        return self
+
+    def a_dict(self) -> Dict[str, float]:
+        return {"n": self.n, "media": self.media, "m2": self.m2,
+                "min": self.minimo if self.n else None, "max": self.maximo if self.n else None}
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, float]) -> "EstadisticaOnline":
+        est = cls()
+        est.n = datos["n"]
+        est.media = datos["media"]
+        est.m2 = datos["m2"]
+        est.minimo = datos["min"] if datos["min"] is not None else math.inf
+        est.maximo = datos["max"] if datos["max"] is not None else -math.inf
+        return est
+
+
+class CuantilP2:
+    """Cuantil ``p`` (0 < p < 1) estimado con el algoritmo P²."""
+
+    __slots__ = ("p", "_q", "_n", "_deseadas", "_incrementos", "_iniciales")
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError("p debe estar entre 0 y 1")
+        self.p = p
+        self._iniciales: List[float] = []
+        self._q: List[float] = []
+        self._n: List[int] = []
+        self._deseadas = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._incrementos = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def agregar(self, x: float):
+        if self._iniciales is not None:
+            self._iniciales.append(x)
+            if len(self._iniciales) == 5:
+                self._q = sorted(self._iniciales)
+                self._n = [1, 2, 3, 4, 5]
+                self._iniciales = None
+            return
+        q, n = self._q, self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._deseadas[i] += self._incrementos[i]
+        for i in (1, 2, 3):
+            d = self._deseadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                nuevo = self._parabolico(i, s)
+                if not q[i - 1] < nuevo < q[i + 1]:
+                    nuevo = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = nuevo
+                n[i] += s
+
+    def _parabolico(self, i: int, s: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + s / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def valor(self) -> Optional[float]:
+        if self._iniciales is not None:
+            if not self._iniciales:
+                return None
+            ordenadas = sorted(self._iniciales)
+            return ordenadas[min(len(ordenadas) - 1, int(self.p * len(ordenadas)))]
+        return self._q[2]
+
+
+class ContadorSaltos:
+    """Cuenta saltos |x[i] - x[i-1]| > umbral y guarda el mayor."""
+
+    __slots__ = ("umbral", "saltos", "mayor", "_anterior")
+
+    def __init__(self, umbral: float):
+        self.umbral = umbral
+        self.saltos = 0
+        self.mayor = 0.0
+        self._anterior: Optional[float] = None
+
+    def agregar(self, x: float):
+        if self._anterior is not None:
+            cambio = abs(x - self._anterior)
+            if cambio > self.umbral:
+                self.saltos += 1
+            if cambio > self.mayor:
+                self.mayor = cambio
+        self._anterior = x
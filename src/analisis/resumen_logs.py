@@ -0,0 +1,252 @@
+"""
+Resumen de logs CSV OBD-II en streaming, en paralelo y con caché.
+
+Cada CSV se recorre una sola vez fila a fila (memoria constante) y se resume
+en un dict JSON-serializable con, por columna numérica:
+media/varianza (Welford), min/max, p50/p95 (P²), % de valores válidos y
+saltos grandes, además de la duración y la frecuencia de muestreo estimada.
+
+Los resúmenes se guardan en un caché JSON indexado por ruta, mtime y tamaño:
+volver a generar el informe de flota solo procesa archivos nuevos o
+modificados, y estos se reparten en un pool de procesos.
+
+Ejemplo:
+    resumenes = resumir_archivos(buscar_logs(["logs_obd", "."]))
+    flota = combinar_resumenes(resumenes)
+"""
+import csv
+import glob
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .estadisticas import ContadorSaltos, CuantilP2, EstadisticaOnline
+
+VERSION_RESUMEN = 1
+CACHE_POR_DEFECTO = os.path.join("logs_obd", ".resumenes_cache.json")
+# Umbral de "cambio grande" entre muestras consecutivas, por columna
+UMBRALES_SALTO = {
+    "rpm": 200,
+    "velocidad": 20,
+    "vel": 20,
+    "temp_motor": 5,
+    "temp": 5,
+    "carga_motor": 30,
+    "acelerador": 30,
+}
+_NO_NUMERICAS = {"timestamp", "escenario"}
+
+
+def buscar_logs(rutas: Iterable[str]) -> List[str]:
+    """
+    CSV de log en directorios o patrones. Solo se aceptan archivos cuya primera
+    columna sea ``timestamp`` (descarta catálogos de PIDs y otros CSV sueltos).
+    """
+    encontrados = []
+    for ruta in rutas:
+        candidatos = glob.glob(os.path.join(ruta, "*.csv")) if os.path.isdir(ruta) else glob.glob(ruta)
+        for archivo in candidatos:
+            try:
+                with open(archivo, "r", encoding="utf-8-sig", errors="replace") as f:
+                    cabecera = f.readline()
+            except OSError:
+                continue
+            if cabecera.strip().strip('"').lower().startswith("timestamp"):
+                encontrados.append(os.path.abspath(archivo))
+    return sorted(set(encontrados))
+
+
+def _parsear_ts(texto: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(texto.strip()).timestamp()
+    except ValueError:
+        return None
+
+
+class _Columna:
+    __slots__ = ("est", "p50", "p95", "saltos", "validos")
+
+    def __init__(self, umbral: Optional[float]):
+        self.est = EstadisticaOnline()
+        self.p50 = CuantilP2(0.5)
+        self.p95 = CuantilP2(0.95)
+        self.saltos = ContadorSaltos(umbral) if umbral is not None else None
+        self.validos = 0
+
+    def agregar(self, x: float):
+        self.validos += 1
+        self.est.agregar(x)
+        self.p50.agregar(x)
+        self.p95.agregar(x)
+        if self.saltos is not None:
+            self.saltos.agregar(x)
+
+    def a_dict(self, filas: int) -> Dict[str, Any]:
+        datos = {
+            "validos": self.validos,
+            "pct_validos": round(100.0 * self.validos / filas, 2) if filas else 0.0,
+            "est": self.est.a_dict(),
+            "p50": self.p50.valor,
+            "p95": self.p95.valor,
+        }
+        if self.saltos is not None:
+            datos["saltos"] = self.saltos.saltos
+            datos["umbral_salto"] = self.saltos.umbral
+            datos["mayor_salto"] = self.saltos.mayor
+        return datos
+
+
+def resumir_archivo(ruta: str, ultimas: int = 5) -> Dict[str, Any]:
+    """Resume un CSV en una sola pasada."""
+    info = os.stat(ruta)
+    resumen: Dict[str, Any] = {
+        "version": VERSION_RESUMEN,
+        "archivo": ruta,
+        "mtime_ns": info.st_mtime_ns,
+        "tamano": info.st_size,
+        "filas": 0,
+        "columnas": [],
+        "error": None,
+    }
+    try:
+        with open(ruta, "r", newline="", encoding="utf-8-sig", errors="replace") as f:
+            lector = csv.reader(f)
+            cabecera = next(lector, None)
+            if not cabecera:
+                return resumen
+            cabecera = [c.strip() for c in cabecera]
+            resumen["columnas"] = cabecera
+            i_ts = cabecera.index("timestamp") if "timestamp" in cabecera else None
+            numericas = [(i, c) for i, c in enumerate(cabecera) if c not in _NO_NUMERICAS]
+            columnas = {c: _Columna(UMBRALES_SALTO.get(c)) for _, c in numericas}
+            intervalos = EstadisticaOnline()
+            cola = deque(maxlen=ultimas)
+            filas = 0
+            ts_texto_ant = None
+            ts_ant = ts_primero = ts_ultimo = None
+            texto_primero = texto_ultimo = None
+            for fila in lector:
+                if not fila:
+                    continue
+                filas += 1
+                cola.append(fila)
+                for i, nombre in numericas:
+                    if i < len(fila):
+                        valor = fila[i]
+                        if valor:
+                            try:
+                                columnas[nombre].agregar(float(valor))
+                            except ValueError:
+                                pass
+                if i_ts is not None and i_ts < len(fila):
+                    texto = fila[i_ts]
+                    if texto != ts_texto_ant:  # muchas filas comparten segundo
+                        ts = _parsear_ts(texto)
+                        ts_texto_ant = texto
+                        if ts is not None:
+                            if ts_ant is not None:
+                                intervalos.agregar(ts - ts_ant)
+                            else:
+                                ts_primero, texto_primero = ts, texto
+                            ts_ant = ts
+                            ts_ultimo, texto_ultimo = ts, texto
+    except OSError as e:
+        resumen["error"] = str(e)
+        return resumen
+    duracion = (ts_ultimo - ts_primero) if ts_primero is not None else 0.0
+    resumen.update(
+        filas=filas,
+        inicio=texto_primero,
+        fin=texto_ultimo,
+        duracion_s=duracion,
+        # Con timestamps de resolución 1 s el intervalo entre distintos
+        # timestamps sobreestima: la frecuencia se estima con filas/duración.
+        frecuencia_hz=round((filas - 1) / duracion, 3) if duracion > 0 else None,
+        intervalo=intervalos.a_dict(),
+        ultimas=[list(f) for f in cola],
+        estadisticas={c: col.a_dict(filas) for c, col in columnas.items()},
+    )
+    return resumen
+
+
+def _cargar_cache(ruta: Optional[str]) -> Dict[str, Any]:
+    if not ruta or not os.path.exists(ruta):
+        return {}
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_cache(ruta: Optional[str], cache: Dict[str, Any]):
+    if not ruta:
+        return
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def _vigente(resumen: Optional[Dict[str, Any]], info: os.stat_result) -> bool:
+    return bool(resumen) and resumen.get("version") == VERSION_RESUMEN and \
+        resumen.get("mtime_ns") == info.st_mtime_ns and resumen.get("tamano") == info.st_size
+
+
+def resumir_archivos(rutas: Iterable[str], cache: Optional[str] = CACHE_POR_DEFECTO,
+                     procesos: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Resúmenes de varios archivos. Reutiliza el caché cuando mtime y tamaño no
+    cambiaron y procesa el resto en paralelo (``procesos=1`` desactiva el pool).
+    """
+    rutas = [os.path.abspath(r) for r in rutas]
+    guardado = _cargar_cache(cache)
+    resultado: Dict[str, Dict[str, Any]] = {}
+    pendientes = []
+    for ruta in rutas:
+        try:
+            info = os.stat(ruta)
+        except OSError:
+            continue
+        if _vigente(guardado.get(ruta), info):
+            resultado[ruta] = guardado[ruta]
+        else:
+            pendientes.append(ruta)
+    if len(pendientes) > 1 and procesos != 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for resumen in pool.map(resumir_archivo, pendientes, chunksize=1):
+                resultado[resumen["archivo"]] = resumen
+    else:
+        for ruta in pendientes:
+            resultado[ruta] = resumir_archivo(ruta)
+    if pendientes:
+        guardado.update({r: resultado[r] for r in pendientes})
+        # Olvidar archivos borrados para que el caché no crezca sin límite
+        for ruta in [r for r in guardado if not os.path.exists(r)]:
+            del guardado[ruta]
+        _guardar_cache(cache, guardado)
+    return [resultado[r] for r in rutas if r in resultado]
+
+
+def combinar_resumenes(resumenes: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totales de flota: filas, bytes, duración y estadísticas combinadas por columna."""
+    total = {"archivos": 0, "filas": 0, "tamano": 0, "duracion_s": 0.0, "estadisticas": {}}
+    combinadas: Dict[str, EstadisticaOnline] = {}
+    saltos: Dict[str, int] = {}
+    for resumen in resumenes:
+        total["archivos"] += 1
+        total["filas"] += resumen.get("filas", 0)
+        total["tamano"] += resumen.get("tamano", 0)
+        total["duracion_s"] += resumen.get("duracion_s") or 0.0
+        for columna, datos in (resumen.get("estadisticas") or {}).items():
+            est = EstadisticaOnline.desde_dict(datos["est"])
+            combinadas.setdefault(columna, EstadisticaOnline()).combinar(est)
+            saltos[columna] = saltos.get(columna, 0) + datos.get("saltos", 0)
+    for columna, est in combinadas.items():
+        total["estadisticas"][columna] = dict(est.a_dict(), desviacion=est.desviacion,
+                                              saltos=saltos.get(columna, 0))
+    return total
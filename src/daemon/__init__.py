@@ -0,0 +1,5 @@
+"""
+Daemon de adquisición OBD-II sin GUI (``python -m src.daemon``).
+
+Ver src/daemon/adquisicion.py y config/daemon.json.
+"""
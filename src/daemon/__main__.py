@@ -0,0 +1,41 @@
+"""
+Punto de entrada: python -m src.daemon --config config/daemon.json
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from .adquisicion import DaemonAdquisicion, cargar_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon de adquisición OBD-II sin GUI")
+    parser.add_argument("--config", default=None, help="Ruta al JSON de configuración")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    daemon = DaemonAdquisicion(cargar_config(args.config))
+
+    async def _run():
+        parar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, parar.set)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+        await daemon.ejecutar(parar)
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    print("[DAEMON] Detenido")
+
+
+if __name__ == "__main__":
+    main()
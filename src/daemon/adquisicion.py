@@ -0,0 +1,317 @@
+"""
+Daemon de adquisición OBD-II sin interfaz gráfica.
+
+Une las piezas asíncronas (cliente ELM327, planificador de PIDs y
+decodificador) y registra cada viaje en un CSV propio dentro de
+``registro.directorio``. No importa Qt ni pandas: está pensado para una caja
+pequeña siempre encendida en el vehículo.
+
+El estado se publica en JSON por un socket TCP local: basta con conectarse
+(``nc 127.0.0.1 35100``) para recibir una línea JSON y el cierre.
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.obd.decodificador import Decodificador
+from src.obd.dtc import es_can
+from src.obd.elm327_asyncio import ClienteELM327Async, ELM327AsyncError
+from src.obd.planificador import PlanificadorPIDs
+from src.obd.servicio_dtc import ServicioDTC
+from src.storage.uplink import Uplink
+
+logger = logging.getLogger(__name__)
+
+CONFIG_POR_DEFECTO: Dict[str, Any] = {
+    "adaptador": {"host": "192.168.0.10", "puerto": 35000, "timeout": 2.0},
+    "pids": {"rpm": 0.2, "vel": 0.5, "temp": 5.0},
+    "registro": {"directorio": "logs_obd", "intervalo": 1.0},
+    "estado": {"host": "127.0.0.1", "puerto": 35100},
+    "reconexion": {"min": 1.0, "max": 30.0},
+    # "uplink": {"url": "http://servidor:8085", "spool": "logs_obd/spool"}
+}
+
+
+def cargar_config(ruta: Optional[str]) -> Dict[str, Any]:
+    """Lee un JSON de configuración y lo combina con CONFIG_POR_DEFECTO."""
+    config = {clave: dict(valor) for clave, valor in CONFIG_POR_DEFECTO.items()}
+    if ruta:
+        with open(ruta, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        for clave, valor in datos.items():
+            if isinstance(valor, dict) and clave in config and clave != "pids":
+                config[clave].update(valor)
+            else:
+                config[clave] = valor
+    return config
+
+
+def _rss_mb() -> Optional[float]:
+    """Memoria residente máxima del proceso en MB (None si no está disponible)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return round(rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+class RegistroCSV:
+    """CSV de un viaje: una fila por intervalo con el último valor de cada PID."""
+
+    def __init__(self, directorio: str, columnas):
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, datetime.now().strftime("sesion_%Y%m%d_%H%M%S"))
+        self.ruta = base + ".csv"
+        n = 1
+        while os.path.exists(self.ruta):  # reconexión dentro del mismo segundo
+            self.ruta = f"{base}_{n}.csv"
+            n += 1
+        self._archivo = open(self.ruta, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._archivo)
+        self.columnas = list(columnas)
+        self._writer.writerow(["timestamp"] + self.columnas)
+        self.filas = 0
+
+    def escribir(self, valores: Dict[str, Any]):
+        ts = datetime.now().isoformat(sep=" ", timespec="milliseconds")
+        self._writer.writerow([ts] + [valores.get(c, "") for c in self.columnas])
+        self.filas += 1
+        if self.filas % 10 == 0:
+            self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+async def _esperar(parar: asyncio.Event, segundos: float) -> bool:
+    """Duerme ``segundos`` o hasta que se pida parar. Devuelve True si hay que parar."""
+    try:
+        await asyncio.wait_for(parar.wait(), segundos)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def servir_estado(obtener, host: str = "127.0.0.1", puerto: int = 35100) -> asyncio.AbstractServer:
+    """Servidor TCP local que responde una línea JSON con ``obtener()`` y cierra."""
+
+    async def _atender(reader, writer):
+        writer.write((json.dumps(obtener(), ensure_ascii=False) + "\n").encode("utf-8"))
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(_atender, host, puerto)
+
+
+def crear_uplink(config: Optional[Dict[str, Any]], vehiculo: str,
+                 subdirectorio: Optional[str] = None) -> Optional[Uplink]:
+    """Uplink store-and-forward según la sección "uplink" de la config (o None)."""
+    if not config:
+        return None
+    spool = config.get("spool", os.path.join("logs_obd", "spool"))
+    if subdirectorio:
+        spool = os.path.join(spool, subdirectorio)
+    return Uplink(
+        spool, config.get("url"), vehiculo,
+        max_muestras=config.get("max_muestras", 5000),
+        max_segundos=config.get("max_segundos", 5.0),
+        max_spool_bytes=int(config.get("max_spool_mb", 200) * 1024 * 1024),
+    )
+
+
+class AdquisidorVehiculo:
+    """
+    Adquisición de un vehículo: su propio cliente ELM327, planificador, caché
+    de protocolo y CSV de sesión. Reconecta con backoff exponencial.
+    """
+
+    def __init__(self, id_vehiculo: str, adaptador: Dict[str, Any], pids: Dict[str, float],
+                 registro: Dict[str, Any], reconexion: Dict[str, float],
+                 decodificador: Optional[Decodificador] = None, uplink: Optional[Uplink] = None):
+        self.id = id_vehiculo
+        self.uplink = uplink
+        self.pids = dict(pids)
+        self.registro_cfg = registro
+        self.reconexion = reconexion
+        self.decodificador = decodificador or Decodificador()
+        self.valores: Dict[str, Any] = {}
+        self.estado_conexion = "desconectado"
+        self.contadores = {"lecturas": 0, "sin_datos": 0, "errores": 0, "reconexiones": 0}
+        self.latencia_ms: Optional[float] = None
+        self.ultimo_ok: Optional[float] = None
+        self.registro: Optional[RegistroCSV] = None
+        self.sesiones = []
+        self._inicio_sesion: Optional[float] = None
+        # Sondeo habilitado (se limpia durante la ráfaga de diagnóstico)
+        self._sondeo = asyncio.Event()
+        self._sondeo.set()
+        self.cliente = ClienteELM327Async(
+            host=adaptador.get("host"),
+            puerto=adaptador.get("puerto", 35000),
+            puerto_serie=adaptador.get("serie"),
+            baudrate=adaptador.get("baudrate", 38400),
+            timeout=adaptador.get("timeout", 2.0),
+            protocolo=adaptador.get("protocolo"),
+        )
+
+    def salud(self) -> Dict[str, Any]:
+        """Métricas de salud del vehículo (para el socket de estado)."""
+        ahora = time.monotonic()
+        duracion = ahora - self._inicio_sesion if self._inicio_sesion else 0
+        return {
+            "estado": self.estado_conexion,
+            "adaptador": self.cliente.destino,
+            "protocolo": self.cliente.protocolo,
+            "contadores": dict(self.contadores),
+            "latencia_ms": round(self.latencia_ms, 1) if self.latencia_ms is not None else None,
+            "lecturas_por_s": round(self.contadores["lecturas"] / duracion, 1) if duracion else 0,
+            "segundos_sin_datos": round(ahora - self.ultimo_ok, 1) if self.ultimo_ok else None,
+            "valores": dict(self.valores),
+            "sesion": self.registro.ruta if self.registro else None,
+            "filas": self.registro.filas if self.registro else 0,
+        }
+
+    async def _leer(self, parar: asyncio.Event):
+        """Un viaje: lee PIDs según el planificador hasta perder la conexión."""
+        planificador = PlanificadorPIDs(self.pids)
+        while not parar.is_set():
+            pid, espera = planificador.proximo()
+            if espera and await _esperar(parar, espera):
+                break
+            await self._sondeo.wait()
+            t0 = time.monotonic()
+            lineas = await self.cliente.comando(self.decodificador.comando(pid))
+            t1 = time.monotonic()
+            muestra = (t1 - t0) * 1000
+            self.latencia_ms = muestra if self.latencia_ms is None else 0.9 * self.latencia_ms + 0.1 * muestra
+            valor = self.decodificador.decodificar(pid, lineas)
+            if valor is None:
+                self.contadores["sin_datos"] += 1
+            else:
+                self.contadores["lecturas"] += 1
+                self.valores[pid] = valor
+                self.ultimo_ok = t1
+                if self.uplink is not None:
+                    self.uplink.agregar(pid, valor)
+            planificador.completado(pid, ok=valor is not None, ahora=t1)
+            # Cede el loop aunque la respuesta ya estuviera en el buffer: con
+            # muchos adaptadores en un proceso ninguno debe acaparar la CPU
+            await asyncio.sleep(0)
+
+    async def leer_dtc(self, freeze_frame: bool = True) -> Dict[str, Any]:
+        """
+        DTC almacenados, pendientes y permanentes (y freeze frame) sobre la
+        conexión en curso, con el sondeo de PIDs en pausa durante la ráfaga.
+        """
+        servicio = ServicioDTC(self.cliente.comando, pausar=self._sondeo.clear,
+                               reanudar=self._sondeo.set, decodificador=self.decodificador,
+                               can=es_can(self.cliente.protocolo))
+        return await servicio.leer_async(freeze_frame)
+
+    async def _registrar(self, parar: asyncio.Event):
+        intervalo = self.registro_cfg.get("intervalo", 1.0)
+        while not await _esperar(parar, intervalo):
+            if self.registro is not None and self.estado_conexion == "conectado" and self.valores:
+                self.registro.escribir(self.valores)
+
+    def _cerrar_sesion(self):
+        if self.registro is not None:
+            self.registro.cerrar()
+            logger.info("[%s] Sesión cerrada: %s (%s filas)", self.id, self.registro.ruta, self.registro.filas)
+            self.sesiones.append(self.registro.ruta)
+            self.registro = None
+        if self.uplink is not None:
+            self.uplink.sellar()
+
+    async def ejecutar(self, parar: asyncio.Event):
+        """Conecta, adquiere y reconecta con backoff hasta ``parar``."""
+        registrador = asyncio.create_task(self._registrar(parar))
+        espera = self.reconexion.get("min", 1.0)
+        try:
+            while not parar.is_set():
+                try:
+                    self.estado_conexion = "conectando"
+                    await self.cliente.conectar()
+                    self.estado_conexion = "conectado"
+                    espera = self.reconexion.get("min", 1.0)
+                    self.valores = {}
+                    self._inicio_sesion = time.monotonic()
+                    self.contadores["lecturas"] = 0
+                    self.registro = RegistroCSV(self.registro_cfg["directorio"], self.pids)
+                    logger.info("[%s] Sesión iniciada: %s", self.id, self.registro.ruta)
+                    if self.uplink is not None:
+                        nombre = os.path.splitext(os.path.basename(self.registro.ruta))[0]
+                        self.uplink.nueva_sesion(f"{self.id}-{nombre}")
+                    await self._leer(parar)
+                except ELM327AsyncError as e:
+                    self.contadores["errores"] += 1
+                    logger.warning("[%s] %s", self.id, e)
+                finally:
+                    self._cerrar_sesion()
+                    await self.cliente.cerrar()
+                if parar.is_set():
+                    break
+                self.estado_conexion = "reconectando"
+                self.contadores["reconexiones"] += 1
+                if await _esperar(parar, espera):
+                    break
+                espera = min(espera * 2, self.reconexion.get("max", 30.0))
+        finally:
+            self.estado_conexion = "detenido"
+            registrador.cancel()
+            try:
+                await registrador
+            except asyncio.CancelledError:
+                pass
+
+
+class DaemonAdquisicion:
+    """Daemon de un solo vehículo: un AdquisidorVehiculo más el socket de estado."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.inicio = time.time()
+        self.puerto_estado = None
+        self.uplink = crear_uplink(config.get("uplink"), config.get("id", "vehiculo"))
+        self.vehiculo = AdquisidorVehiculo(
+            config.get("id", "vehiculo"), config["adaptador"], config["pids"], config["registro"],
+            config["reconexion"], uplink=self.uplink,
+        )
+
+    @property
+    def sesiones(self):
+        return self.vehiculo.sesiones
+
+    def estado(self) -> Dict[str, Any]:
+        datos = self.vehiculo.salud()
+        datos["uptime_s"] = round(time.time() - self.inicio, 1)
+        datos["rss_mb"] = _rss_mb()
+        if self.uplink is not None:
+            datos["uplink"] = dict(self.uplink.stats, pendientes=len(self.uplink.pendientes()))
+        return datos
+
+    async def ejecutar(self, parar: Optional[asyncio.Event] = None):
+        parar = parar or asyncio.Event()
+        cfg_estado = self.config["estado"]
+        servidor = await servir_estado(
+            self.estado, cfg_estado.get("host", "127.0.0.1"), cfg_estado.get("puerto", 35100)
+        )
+        self.puerto_estado = servidor.sockets[0].getsockname()[1]
+        if self.uplink is not None:
+            self.uplink.iniciar()
+        try:
+            await self.vehiculo.ejecutar(parar)
+        finally:
+            if self.uplink is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.uplink.detener)
+            servidor.close()
+            await servidor.wait_closed()
@@ -0,0 +1,165 @@
+"""
+Adquisición concurrente de varios vehículos en un solo proceso asyncio.
+
+Cada vehículo tiene su propio AdquisidorVehiculo (cliente ELM327,
+planificador, CSV de sesión y métricas de salud). Todos comparten el loop,
+el decodificador de fórmulas y un caché de protocolos en disco para no
+repetir la autodetección (ATSP0) en cada reconexión.
+
+Configuración (JSON):
+    {
+      "vehiculos": [
+        {"id": "hilux", "adaptador": {"host": "192.168.0.10", "puerto": 35000}},
+        {"id": "banco2", "adaptador": {"serie": "/dev/ttyUSB0"}, "pids": {"rpm": 0.5}}
+      ],
+      "pids": {"rpm": 0.2, "vel": 0.5},
+      "registro": {"directorio": "logs_obd/flota", "intervalo": 1.0},
+      "estado": {"host": "127.0.0.1", "puerto": 35101},
+      "cache_protocolos": "logs_obd/flota/protocolos.json",
+      "uplink": {"url": "http://servidor:8085", "spool": "logs_obd/spool"}
+    }
+
+Uso:
+    python -m src.daemon.flota --config config/flota.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from typing import Any, Dict, Optional
+
+from src.obd.catalogo_pids import cargar_catalogo
+from src.obd.decodificador import Decodificador
+
+from .adquisicion import (
+    CONFIG_POR_DEFECTO,
+    AdquisidorVehiculo,
+    _esperar,
+    _rss_mb,
+    crear_uplink,
+    servir_estado,
+)
+
+logger = logging.getLogger(__name__)
+
+PUERTO_ESTADO = 35101
+
+
+class GestorFlota:
+    def __init__(self, config: Dict[str, Any]):
+        if not config.get("vehiculos"):
+            raise ValueError("La configuración de flota no define vehículos")
+        self.config = config
+        self.inicio = time.time()
+        self.puerto_estado = None
+        self.ruta_cache = config.get("cache_protocolos")
+        self.protocolos = self._cargar_protocolos()
+        decodificador = Decodificador(catalogo=cargar_catalogo())
+        registro_base = dict(CONFIG_POR_DEFECTO["registro"], **config.get("registro", {}))
+        reconexion = dict(CONFIG_POR_DEFECTO["reconexion"], **config.get("reconexion", {}))
+        self.vehiculos: Dict[str, AdquisidorVehiculo] = {}
+        for cfg in config["vehiculos"]:
+            vid = cfg["id"]
+            if vid in self.vehiculos:
+                raise ValueError(f"Vehículo duplicado en la configuración: {vid}")
+            adaptador = dict(cfg["adaptador"])
+            adaptador.setdefault("protocolo", self.protocolos.get(vid))
+            registro = dict(registro_base, directorio=os.path.join(registro_base["directorio"], vid))
+            self.vehiculos[vid] = AdquisidorVehiculo(
+                vid, adaptador, cfg.get("pids") or config.get("pids") or CONFIG_POR_DEFECTO["pids"],
+                registro, reconexion, decodificador,
+                uplink=crear_uplink(config.get("uplink"), vid, subdirectorio=vid),
+            )
+
+    def _cargar_protocolos(self) -> Dict[str, str]:
+        if not self.ruta_cache or not os.path.exists(self.ruta_cache):
+            return {}
+        try:
+            with open(self.ruta_cache, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Caché de protocolos ilegible (%s), se ignora", e)
+            return {}
+
+    def _guardar_protocolos(self):
+        actuales = {vid: v.cliente.protocolo for vid, v in self.vehiculos.items() if v.cliente.protocolo}
+        if not self.ruta_cache or actuales == self.protocolos:
+            return
+        self.protocolos.update(actuales)
+        os.makedirs(os.path.dirname(self.ruta_cache) or ".", exist_ok=True)
+        temporal = self.ruta_cache + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.protocolos, f, indent=2)
+        os.replace(temporal, self.ruta_cache)
+
+    def estado(self) -> Dict[str, Any]:
+        vehiculos = {vid: v.salud() for vid, v in self.vehiculos.items()}
+        return {
+            "uptime_s": round(time.time() - self.inicio, 1),
+            "rss_mb": _rss_mb(),
+            "conectados": sum(1 for v in vehiculos.values() if v["estado"] == "conectado"),
+            "total": len(vehiculos),
+            "vehiculos": vehiculos,
+        }
+
+    async def _persistir_protocolos(self, parar: asyncio.Event):
+        while not await _esperar(parar, 5.0):
+            self._guardar_protocolos()
+
+    async def ejecutar(self, parar: Optional[asyncio.Event] = None):
+        parar = parar or asyncio.Event()
+        cfg_estado = {"host": "127.0.0.1", "puerto": PUERTO_ESTADO}
+        cfg_estado.update(self.config.get("estado", {}))
+        servidor = await servir_estado(self.estado, cfg_estado["host"], cfg_estado["puerto"])
+        self.puerto_estado = servidor.sockets[0].getsockname()[1]
+        uplinks = [v.uplink for v in self.vehiculos.values() if v.uplink is not None]
+        for uplink in uplinks:
+            uplink.iniciar()
+        tareas = [asyncio.create_task(v.ejecutar(parar), name=f"vehiculo-{vid}")
+                  for vid, v in self.vehiculos.items()]
+        tareas.append(asyncio.create_task(self._persistir_protocolos(parar)))
+        logger.info("Flota iniciada: %s vehículos, estado en %s:%s",
+                    len(self.vehiculos), cfg_estado["host"], self.puerto_estado)
+        try:
+            resultados = await asyncio.gather(*tareas, return_exceptions=True)
+            for resultado in resultados:
+                if isinstance(resultado, Exception):
+                    logger.error("Tarea de flota terminó con error: %r", resultado)
+        finally:
+            self._guardar_protocolos()
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(None, u.detener) for u in uplinks))
+            servidor.close()
+            await servidor.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adquisición OBD-II multi-vehículo")
+    parser.add_argument("--config", required=True, help="JSON con la lista de vehículos")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    with open(args.config, "r", encoding="utf-8") as f:
+        gestor = GestorFlota(json.load(f))
+
+    async def _run():
+        parar = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, parar.set)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+        await gestor.ejecutar(parar)
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    print("[FLOTA] Detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Catálogo unificado de PIDs con caché binaria.
+
+Junta en un solo catálogo normalizado las fuentes que antes cargaba cada
+interfaz por su cuenta:
+
+* ``src/obd/pids_ext.py``: nombres, unidades y fórmulas (``"parse"``).
+* ``pids/universal_standard.csv``: PIDs rápidos/lentos del dashboard WiFi.
+* ``pids/extended_<protocolo>.csv``: PIDs extendidos por protocolo.
+* ``scanner-obd2/obdii-pids.json``: tabla SAE por modo (descripción y bytes).
+* ``scanner-obd2/data/pid_definitions.json``: PIDs de tuning por marca/modelo.
+
+El resultado, con las fórmulas ya compiladas a objetos de código, se guarda
+con ``marshal`` (como un .pyc) y se invalida cuando cambia el mtime o el
+tamaño de alguna fuente, o la versión de Python. Así el dashboard, el
+scanner y el daemon comparten la misma caché y cargar el catálogo es leer
+un archivo.
+
+El módulo solo usa la biblioteca estándar y no tiene imports relativos, de
+modo que scanner-obd2 puede cargarlo por ruta.
+
+Ejemplo:
+    catalogo = cargar_catalogo()
+    catalogo.decodificar("010C", bytes([0x1A, 0xF8]))   # 1726.0
+    catalogo.extendidos_para("ISO 15765-4 CAN")
+"""
+import csv
+import glob
+import importlib.util
+import json
+import logging
+import marshal
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_POR_DEFECTO = os.path.join("pids", ".catalogo_pids.marshal")
+
+# Rutas relativas a la raíz del repositorio
+FUENTES = {
+    "pids_ext": os.path.join("src", "obd", "pids_ext.py"),
+    "universal": os.path.join("pids", "universal_standard.csv"),
+    "extendidos": os.path.join("pids", "extended_*.csv"),
+    "obdii": os.path.join("ob2_nuevo7junio", "scanner-obd2", "obdii-pids.json"),
+    "tuning": os.path.join("ob2_nuevo7junio", "scanner-obd2", "data", "pid_definitions.json"),
+}
+
+# Fórmulas SAE J1979 de PIDs que en pids_ext solo tienen cmd (sin "parse")
+FORMULAS_ESTANDAR = {
+    "0104": "A*100/255",
+    "0105": "A-40",
+    "010B": "A",
+    "010C": "((A*256)+B)/4",
+    "010D": "A",
+    "010F": "A-40",
+    "0110": "((A*256)+B)/100",
+    "0111": "A*100/255",
+    "0123": "((A*256)+B)*10",
+    "012C": "A*100/255",
+    "0133": "A",
+    "0142": "((A*256)+B)/1000",
+    "0146": "A-40",
+    "0159": "((A*256)+B)*10",
+    "015C": "A-40",
+    "015E": "((A*256)+B)/20",
+}
+
+VARIABLES = "ABCDEFGH"
+_GLOBALES = {"__builtins__": {}}
+
+
+def compilar_codigo(expr: str):
+    """Compila una fórmula PID; solo admite las variables A..H."""
+    codigo = compile(expr, f"<pid:{expr}>", "eval")
+    for nombre in codigo.co_names:
+        if nombre not in VARIABLES:
+            raise ValueError(f"Nombre no permitido en fórmula PID: {nombre}")
+    return codigo
+
+
+def evaluador(codigo) -> Callable[[Sequence[int]], float]:
+    """Función ``f(datos) -> valor`` sobre un código compilado por ``compilar_codigo``."""
+    def evaluar(datos: Sequence[int]) -> float:
+        return eval(codigo, _GLOBALES, dict(zip(VARIABLES, datos)))
+    return evaluar
+
+
+def clave_protocolo(protocolo: str) -> str:
+    """'ISO 15765-4 CAN' -> 'iso_15765-4_can' (sufijo de extended_<clave>.csv)."""
+    return protocolo.lower().replace('/', '_').replace(' ', '_')
+
+
+class CatalogoPIDs:
+    """Vista de solo lectura del catálogo cargado desde la caché o las fuentes."""
+
+    def __init__(self, datos: Dict[str, Any]):
+        self.pids: Dict[str, Dict[str, Any]] = datos["pids"]
+        self.universal_fast: Dict[str, Dict[str, str]] = datos["universal"]["fast"]
+        self.universal_slow: Dict[str, Dict[str, str]] = datos["universal"]["slow"]
+        self.extendidos: Dict[str, Dict[str, Dict[str, str]]] = datos["extendidos"]
+        self.tuning: Dict[str, Any] = datos["tuning"]
+        self._codigos = datos["codigos"]
+        self._formulas: Dict[str, Callable] = {}
+
+    def __len__(self):
+        return len(self.pids)
+
+    def info(self, pid: str) -> Optional[Dict[str, Any]]:
+        return self.pids.get(pid.upper())
+
+    def de_fuente(self, fuente: str) -> Dict[str, Dict[str, Any]]:
+        """PIDs que aparecen en una fuente ('obdii', 'pids_ext', 'universal'...)."""
+        return {cmd: info for cmd, info in self.pids.items() if fuente in info["fuentes"]}
+
+    def extendidos_para(self, protocolo: str) -> Dict[str, Dict[str, str]]:
+        return dict(self.extendidos.get(clave_protocolo(protocolo), {}))
+
+    def tuning_para(self, marca: str = "default", modelo: str = "default") -> List[Dict[str, Any]]:
+        return self.tuning.get(marca, {}).get(modelo, []) or self.tuning.get("default", {}).get("default", [])
+
+    def formula(self, cmd: str) -> Optional[Callable[[Sequence[int]], float]]:
+        cmd = cmd.upper()
+        f = self._formulas.get(cmd)
+        if f is None and cmd in self._codigos:
+            f = self._formulas[cmd] = evaluador(self._codigos[cmd])
+        return f
+
+    def decodificar(self, cmd: str, datos: Sequence[int]):
+        """Aplica la fórmula de ``cmd`` a los bytes de datos; None si no hay o falla."""
+        f = self.formula(cmd)
+        if f is None:
+            return None
+        try:
+            return f(datos)
+        except (NameError, TypeError, ZeroDivisionError):
+            return None
+
+
+# ----------------------------------------------------------------------
+# Construcción desde las fuentes
+# ----------------------------------------------------------------------
+def _rutas_fuentes(raiz: str) -> List[str]:
+    rutas = [os.path.abspath(__file__)]
+    for nombre, relativa in FUENTES.items():
+        patron = os.path.join(raiz, relativa)
+        rutas.extend(sorted(glob.glob(patron)) if "*" in relativa else [patron])
+    return rutas
+
+
+def _firma(raiz: str) -> Tuple[Tuple[str, int, int], ...]:
+    firma = []
+    for ruta in _rutas_fuentes(raiz):
+        try:
+            st = os.stat(ruta)
+            firma.append((ruta, st.st_mtime_ns, st.st_size))
+        except OSError:
+            firma.append((ruta, 0, -1))
+    return tuple(firma)
+
+
+def _leer_csv(ruta: str) -> List[Dict[str, str]]:
+    with open(ruta, newline='', encoding='utf-8') as f:
+        return [
+            {k: (v or '').strip() for k, v in fila.items() if k}
+            for fila in csv.DictReader(f)
+        ]
+
+
+def _cargar_pids_ext(ruta: str) -> Dict[str, dict]:
+    spec = importlib.util.spec_from_file_location("_pids_ext_catalogo", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.PIDS
+
+
+def _entrada(pids: Dict[str, Dict[str, Any]], cmd: str, fuente: str, **campos) -> None:
+    """Agrega o completa un PID; los campos ya presentes tienen prioridad."""
+    entrada = pids.setdefault(cmd, {"cmd": cmd, "fuentes": []})
+    if fuente not in entrada["fuentes"]:
+        entrada["fuentes"].append(fuente)
+    for campo, valor in campos.items():
+        if valor not in (None, "") and entrada.get(campo) in (None, ""):
+            entrada[campo] = valor
+
+
+def construir(raiz: str = RAIZ) -> Dict[str, Any]:
+    """Lee todas las fuentes presentes y arma el catálogo (datos marshal-ables)."""
+    pids: Dict[str, Dict[str, Any]] = {}
+    universal = {"fast": {}, "slow": {}}
+    extendidos: Dict[str, Dict[str, Dict[str, str]]] = {}
+    tuning: Dict[str, Any] = {}
+
+    ruta = os.path.join(raiz, FUENTES["pids_ext"])
+    if os.path.exists(ruta):
+        for clave, info in _cargar_pids_ext(ruta).items():
+            cmd = str(info.get("cmd") or clave).upper()
+            _entrada(pids, cmd, "pids_ext", nombre=info.get("nombre"), desc=info.get("desc_en") or info.get("desc"),
+                     unidades=info.get("unidades"), bytes=info.get("bytes"),
+                     parse=info.get("parse") if isinstance(info.get("parse"), str) else None,
+                     min=info.get("min"), max=info.get("max"))
+
+    ruta = os.path.join(raiz, FUENTES["universal"])
+    if os.path.exists(ruta):
+        for fila in _leer_csv(ruta):
+            pid, nombre = fila.get("PID", "").upper(), fila.get("Name", "")
+            if not pid or not nombre:
+                continue
+            entry = {"name": nombre, "unit": fila.get("Unit", "")}
+            tipo = fila.get("Type", "").lower()
+            if tipo in universal:
+                universal[tipo][pid] = entry
+            _entrada(pids, pid, "universal", nombre=nombre, unidades=entry["unit"], tipo=tipo or None)
+
+    prefijo = os.path.join(raiz, "pids", "extended_")
+    for ruta in sorted(glob.glob(os.path.join(raiz, FUENTES["extendidos"]))):
+        proto = ruta[len(prefijo):-len(".csv")]
+        tabla = extendidos.setdefault(proto, {})
+        for fila in _leer_csv(ruta):
+            pid, nombre = fila.get("PID", "").upper(), fila.get("Name", "")
+            if not pid or not nombre:
+                continue
+            tabla[pid] = {"name": nombre, "unit": fila.get("Unit", "")}
+            _entrada(pids, pid, "extendidos", nombre=nombre, unidades=tabla[pid]["unit"])
+
+    ruta = os.path.join(raiz, FUENTES["obdii"])
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            modos = json.load(f)
+        for modo, tabla in enumerate(modos):
+            for fila in tabla or []:
+                if fila and fila.get("PID"):
+                    _entrada(pids, f"{modo:02X}{fila['PID'].upper()}", "obdii",
+                             desc=(fila.get("Desc") or "").strip(), bytes=fila.get("DataLen"))
+
+    ruta = os.path.join(raiz, FUENTES["tuning"])
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            tuning = json.load(f)
+        for modelos in tuning.values():
+            for definiciones in modelos.values():
+                for d in definiciones:
+                    _entrada(pids, d["code"].upper(), "tuning", nombre=d.get("name"),
+                             unidades=d.get("unit"), min=d.get("min"), max=d.get("max"))
+
+    codigos = {}
+    for cmd, info in pids.items():
+        expr = info.get("parse") or FORMULAS_ESTANDAR.get(cmd)
+        if not expr:
+            continue
+        try:
+            codigos[cmd] = compilar_codigo(expr)
+            info["parse"] = expr
+        except (SyntaxError, ValueError) as e:
+            logger.warning("Fórmula inválida para %s (%s): %s", cmd, expr, e)
+
+    return {"pids": pids, "universal": universal, "extendidos": extendidos,
+            "tuning": tuning, "codigos": codigos}
+
+
+# ----------------------------------------------------------------------
+# Caché
+# ----------------------------------------------------------------------
+_MEMO: Dict[Tuple[str, str], Tuple[tuple, CatalogoPIDs]] = {}
+_LOCK = threading.Lock()
+
+
+def _leer_cache(ruta: str, firma: tuple) -> Optional[Dict[str, Any]]:
+    try:
+        with open(ruta, "rb") as f:
+            blob = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(blob, dict) or blob.get("version") != VERSION
+            or blob.get("python") != importlib.util.MAGIC_NUMBER or blob.get("firma") != firma):
+        return None
+    return blob["catalogo"]
+
+
+def _escribir_cache(ruta: str, firma: tuple, datos: Dict[str, Any]) -> None:
+    blob = {"version": VERSION, "python": importlib.util.MAGIC_NUMBER, "firma": firma, "catalogo": datos}
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with open(temporal, "wb") as f:
+            marshal.dump(blob, f)
+        os.replace(temporal, ruta)  # atómico: otro proceso nunca ve un archivo a medias
+    except OSError as e:
+        logger.warning("No se pudo escribir la caché del catálogo de PIDs: %s", e)
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def cargar_catalogo(raiz: str = RAIZ, cache: Optional[str] = None, forzar: bool = False) -> CatalogoPIDs:
+    """
+    Devuelve el catálogo: de memoria si las fuentes no cambiaron, si no de la
+    caché en disco y, como último recurso, reconstruyéndolo desde las fuentes.
+    La ruta de la caché se puede cambiar con ``OBD_CATALOGO_CACHE``.
+    """
+    cache = cache or os.environ.get("OBD_CATALOGO_CACHE") or os.path.join(raiz, CACHE_POR_DEFECTO)
+    firma = _firma(raiz)
+    with _LOCK:
+        memo = _MEMO.get((raiz, cache))
+        if memo and memo[0] == firma and not forzar:
+            return memo[1]
+        datos = None if forzar else _leer_cache(cache, firma)
+        if datos is None:
+            datos = construir(raiz)
+            _escribir_cache(cache, firma, datos)
+            logger.info("Catálogo de PIDs reconstruido: %d PIDs -> %s", len(datos["pids"]), cache)
+        catalogo = CatalogoPIDs(datos)
+        _MEMO[(raiz, cache)] = (firma, catalogo)
+        return catalogo
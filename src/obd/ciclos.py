@@ -0,0 +1,280 @@
+"""
+Ciclos de conducción estándar precalculados para los emuladores.
+
+Cada ciclo es un perfil velocidad-tiempo. A partir de la velocidad se derivan,
+una sola vez y con una semilla fija, las demás señales del vehículo:
+
+- marcha y RPM (relaciones de un auto mediano, ralentí a 800 rpm);
+- carga y mariposa a partir de la potencia de resistencia al avance
+  (masa, rodadura y aerodinámica) y de la aceleración;
+- MAF y MAP (motor atmosférico de 2.0 L), consumo en L/h con corte de
+  inyección en las desaceleraciones;
+- temperatura del refrigerante con calentamiento desde frío;
+- ruido de sensor gaussiano, sorteado con ``numpy.random.default_rng(semilla)``.
+
+La misma (ciclo, semilla, dt) produce siempre la misma traza, así que dos
+corridas de benchmark ven exactamente los mismos datos.
+
+Ciclos incluidos:
+    nedc                NEDC (4 × ECE-15 + EUDC), 1180 s, definición modal exacta
+    wltp                WLTC clase 3b (Low/Medium/High/Extra High), 1800 s
+    ftp75               FTP-75 (fase fría, estabilizada y caliente), 1874 s
+    ralenti_prolongado  arranque en frío y 600 s de ralentí
+
+WLTC y FTP-75 son aproximaciones por tramos que respetan duración y velocidad
+máxima de cada fase y la distancia total con ±10 %. Para las tablas oficiales
+a 1 Hz: ``registrar_csv("wltp", "ciclos/wltc_3b.csv")`` (columnas t, vel).
+
+Ejemplo:
+    reproductor = ReproductorCiclo("wltp", semilla=42)
+    reproductor.valores()   # {'rpm': ..., 'vel': ..., 'temp': ..., ...}
+"""
+import csv
+import math
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Mismo orden que emulador_flota.ESCENARIOS
+FASES = ("ralenti", "aceleracion", "crucero", "frenado")
+
+# Tramos (duración en s, velocidad final en km/h): rampa lineal desde la
+# velocidad del tramo anterior. Todos los ciclos arrancan detenidos.
+_ECE15 = [
+    (11, 0), (4, 15), (8, 15), (5, 0), (21, 0), (5, 15), (2, 15), (5, 32), (24, 32),
+    (11, 0), (21, 0), (5, 15), (2, 15), (9, 35), (2, 35), (8, 50), (12, 50), (8, 35),
+    (13, 35), (12, 0), (7, 0),
+]
+_EUDC = [
+    (20, 0), (5, 15), (2, 15), (9, 35), (2, 35), (8, 50), (2, 50), (13, 70), (50, 70),
+    (8, 50), (69, 50), (13, 70), (50, 70), (35, 100), (30, 100), (20, 120), (10, 120),
+    (34, 0), (20, 0),
+]
+_WLTC_LOW = [
+    (12, 0), (14, 22), (10, 26), (12, 0), (22, 0), (18, 38), (20, 32), (14, 44), (16, 0),
+    (14, 0), (20, 46), (25, 52), (22, 30), (14, 0), (26, 0), (28, 56.5), (38, 48), (22, 22),
+    (16, 0), (18, 0), (20, 38), (26, 34), (16, 0), (16, 0), (22, 30), (18, 18), (12, 0),
+    (78, 0),
+]
+_WLTC_MEDIUM = [
+    (6, 0), (20, 50), (30, 62), (25, 45), (15, 0), (12, 0), (25, 60), (40, 76.6), (35, 70),
+    (25, 50), (20, 0), (10, 0), (20, 50), (30, 58), (20, 40), (15, 0), (15, 0), (20, 48),
+    (30, 58), (20, 0),
+]
+_WLTC_HIGH = [
+    (10, 0), (25, 60), (30, 80), (50, 90), (35, 97.4), (40, 85), (20, 60), (15, 0), (8, 0),
+    (25, 65), (30, 75), (45, 78), (30, 70), (40, 75), (22, 0), (30, 0),
+]
+_WLTC_EXTRA_HIGH = [
+    (10, 0), (30, 70), (40, 110), (60, 120), (45, 131.3), (40, 125), (30, 105), (40, 80),
+    (28, 0),
+]
+_FTP_TRANSITORIA = [
+    (20, 0), (10, 25), (15, 40), (20, 48), (15, 50), (10, 35), (30, 88), (40, 91.2), (30, 80),
+    (20, 60), (35, 0), (15, 0), (20, 45), (20, 52), (15, 0), (15, 0), (20, 40), (15, 45),
+    (15, 0), (15, 0), (20, 45), (25, 50), (15, 0), (15, 0), (15, 40), (20, 0),
+]
+_FTP_ESTABILIZADA = [
+    (15, 0), (15, 30), (20, 45), (15, 0), (25, 0), (20, 45), (30, 55), (25, 0), (20, 0),
+    (15, 35), (20, 45), (15, 0), (30, 0), (20, 40), (35, 52), (20, 0), (25, 0), (15, 35),
+    (20, 45), (15, 0), (30, 0), (20, 45), (30, 55), (25, 0), (25, 0), (15, 35), (25, 45),
+    (15, 0), (30, 0), (20, 40), (40, 55), (20, 0), (25, 0), (15, 35), (20, 45), (15, 0),
+    (9, 0), (20, 40), (30, 50), (20, 0),
+]
+
+
+def _puntos(tramos: Iterable[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    t, v = [0.0], [0.0]
+    for duracion, vel in tramos:
+        t.append(t[-1] + duracion)
+        v.append(float(vel))
+    return np.array(t), np.array(v)
+
+
+# nombre -> (t, vel) de los puntos de quiebre (mismas claves que fisica.CICLOS_ESTANDAR)
+CICLOS: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+    "nedc": _puntos(_ECE15 * 4 + _EUDC),
+    "wltp": _puntos(_WLTC_LOW + _WLTC_MEDIUM + _WLTC_HIGH + _WLTC_EXTRA_HIGH),
+    "ftp75": _puntos(_FTP_TRANSITORIA + _FTP_ESTABILIZADA + _FTP_TRANSITORIA),
+    "ralenti_prolongado": _puntos([(600, 0)]),
+}
+
+# Vehículo de referencia (auto mediano nafta, 2.0 L atmosférico)
+MASA_KG = 1500.0
+RODADURA_N = 150.0
+AERO_N_S2_M2 = 0.45
+RADIO_RUEDA_M = 0.31
+RELACIONES = (13.5, 7.9, 5.3, 4.0, 3.2, 2.6)  # caja × diferencial
+CAMBIOS_KMH = (15.0, 30.0, 50.0, 70.0, 90.0)  # velocidad de paso a la marcha siguiente
+RPM_RALENTI = 800.0
+POTENCIA_MAX_W = 110e3
+RPM_POTENCIA_MAX = 5500.0
+CILINDRADA_L = 2.0
+DENSIDAD_AIRE_G_L = 1.184
+DENSIDAD_NAFTA_G_L = 745.0
+AFR = 14.7
+TEMP_OBJETIVO = 90.0
+
+
+class Traza:
+    """Señales precalculadas de un ciclo, muestreadas cada ``dt`` segundos."""
+
+    def __init__(self, nombre: str, dt: float, semilla: int, columnas: Dict[str, np.ndarray]):
+        self.nombre = nombre
+        self.dt = dt
+        self.semilla = semilla
+        self.columnas = columnas
+        for columna in columnas.values():
+            columna.flags.writeable = False  # compartida por todos los emuladores
+
+    def __len__(self) -> int:
+        return len(self.columnas["t"])
+
+    @property
+    def duracion(self) -> float:
+        return len(self) * self.dt
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        return tuple(k for k in self.columnas if k not in ("t", "fase", "marcha"))
+
+    def en(self, t: float, bucle: bool = True) -> Dict[str, float]:
+        """Valores interpolados en el instante ``t`` (segundos desde el inicio)."""
+        if bucle:
+            t %= self.duracion
+        pos = min(max(t / self.dt, 0.0), len(self) - 1.0)
+        i = int(pos)
+        j = min(i + 1, len(self) - 1)
+        frac = pos - i
+        valores = {}
+        for nombre in self.variables:
+            columna = self.columnas[nombre]
+            a = float(columna[i])
+            valores[nombre] = a + (float(columna[j]) - a) * frac
+        valores["marcha"] = int(self.columnas["marcha"][i])
+        valores["fase"] = FASES[self.columnas["fase"][i]]
+        return valores
+
+    def en_vector(self, t: np.ndarray) -> Dict[str, np.ndarray]:
+        """Como ``en`` pero para un array de instantes (uno por vehículo)."""
+        t = np.mod(t, self.duracion)
+        base = self.columnas["t"]
+        valores = {nombre: np.interp(t, base, self.columnas[nombre]) for nombre in self.variables}
+        indices = np.minimum((t / self.dt).astype(np.int64), len(self) - 1)
+        valores["fase"] = self.columnas["fase"][indices]
+        return valores
+
+
+def registrar_csv(nombre: str, ruta: str):
+    """Registra (o reemplaza) un ciclo desde un CSV con columnas ``t`` y ``vel`` (km/h)."""
+    t, v = [], []
+    with open(ruta, newline="", encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            t.append(float(fila["t"]))
+            v.append(float(fila["vel"]))
+    if not t or t[0] != 0:
+        raise ValueError(f"{ruta}: el ciclo debe empezar en t=0")
+    CICLOS[nombre] = (np.array(t), np.array(v))
+    traza.cache_clear()
+
+
+def velocidad(nombre: str, dt: float = 1.0) -> np.ndarray:
+    """Perfil de velocidad (km/h) del ciclo muestreado cada ``dt`` segundos."""
+    try:
+        t_puntos, v_puntos = CICLOS[nombre]
+    except KeyError:
+        raise ValueError(f"Ciclo desconocido: {nombre} (disponibles: {', '.join(CICLOS)})") from None
+    t = np.arange(0.0, t_puntos[-1], dt)
+    return np.interp(t, t_puntos, v_puntos)
+
+
+@lru_cache(maxsize=32)
+def traza(nombre: str, semilla: int = 0, dt: float = 1.0) -> Traza:
+    """Traza completa del ciclo; se calcula una vez por (nombre, semilla, dt)."""
+    vel = velocidad(nombre, dt)
+    rng = np.random.default_rng(semilla)
+    n = len(vel)
+    v_ms = vel / 3.6
+    acel = np.gradient(v_ms, dt) if n > 1 else np.zeros(n)
+
+    marcha = np.searchsorted(CAMBIOS_KMH, vel, side="right") + 1
+    relacion = np.asarray(RELACIONES)[marcha - 1]
+    rpm = v_ms / (2 * math.pi * RADIO_RUEDA_M) * 60 * relacion
+    detenido = vel < 2
+    rpm = np.where(detenido, RPM_RALENTI, np.maximum(rpm, RPM_RALENTI + 200))
+    marcha = np.where(detenido, 0, marcha)
+
+    fuerza = MASA_KG * acel + RODADURA_N * (v_ms > 0) + AERO_N_S2_M2 * v_ms ** 2
+    potencia = fuerza * v_ms
+    disponible = POTENCIA_MAX_W * np.clip(rpm / RPM_POTENCIA_MAX, 0.15, 1.0)
+    carga = np.clip(potencia / disponible * 100, 0, 100)
+    corte = (potencia < 0) & ~detenido  # freno motor: inyección cortada
+    carga = np.where(detenido, 18.0, np.where(corte, 8.0, np.maximum(carga, 15.0)))
+    throttle = np.where(corte, 0.0, np.where(detenido, 0.0, carga * 0.9))
+
+    maf = rpm / 120 * CILINDRADA_L * DENSIDAD_AIRE_G_L * (0.2 + 0.7 * carga / 100)
+    presion_adm = 25 + 75 * carga / 100
+    consumo = np.where(corte, 0.0, maf / AFR * 3600 / DENSIDAD_NAFTA_G_L)
+
+    temp_aire = 20.0 + rng.uniform(-5, 5)
+    temp = np.empty(n)
+    actual = temp_aire
+    for i in range(n):  # calentamiento de primer orden, más rápido con carga
+        actual += (TEMP_OBJETIVO - actual) / 300 * (0.5 + carga[i] / 100) * dt
+        temp[i] = actual
+
+    fase = np.full(n, FASES.index("crucero"), dtype=np.int8)
+    fase[acel > 0.1] = FASES.index("aceleracion")
+    fase[acel < -0.1] = FASES.index("frenado")
+    fase[detenido] = FASES.index("ralenti")
+
+    columnas = {
+        "t": np.arange(n) * dt,
+        "vel": vel,
+        "rpm": np.maximum(0, rpm + rng.normal(0, 15, n)),
+        "carga_motor": np.clip(carga + rng.normal(0, 1, n), 0, 100),
+        "throttle": np.clip(throttle + rng.normal(0, 0.5, n), 0, 100),
+        "maf": np.maximum(0, maf * (1 + rng.normal(0, 0.02, n))),
+        "presion_adm": presion_adm + rng.normal(0, 0.5, n),
+        "consumo": np.maximum(0, consumo * (1 + rng.normal(0, 0.02, n))),
+        "temp": temp + rng.normal(0, 0.2, n),
+        "temp_aire": np.full(n, temp_aire),
+        "volt_bateria": 14.1 + rng.normal(0, 0.05, n),
+        "marcha": marcha.astype(np.int8),
+        "fase": fase,
+    }
+    return Traza(nombre, dt, semilla, columnas)
+
+
+class ReproductorCiclo:
+    """Reproduce una traza contra un reloj (de pared por defecto), en bucle."""
+
+    def __init__(self, ciclo: str = "wltp", semilla: int = 0, dt: float = 1.0,
+                 escala_tiempo: float = 1.0, reloj: Callable[[], float] = time.monotonic):
+        self.traza = traza(ciclo, semilla, dt)
+        self.escala_tiempo = escala_tiempo
+        self.reloj = reloj
+        self._inicio = reloj()
+
+    def reiniciar(self):
+        self._inicio = self.reloj()
+
+    def tiempo(self) -> float:
+        return (self.reloj() - self._inicio) * self.escala_tiempo
+
+    def valores(self, t: Optional[float] = None) -> Dict[str, float]:
+        return self.traza.en(self.tiempo() if t is None else t)
+
+
+def resumen(nombre: str) -> Dict[str, float]:
+    """Duración, distancia y velocidades del perfil (para verificar ciclos cargados)."""
+    t, v = CICLOS[nombre]
+    distancia_km = float(np.sum((v[1:] + v[:-1]) / 2 * np.diff(t)) / 3600)
+    return {
+        "duracion_s": float(t[-1]),
+        "distancia_km": round(distancia_km, 2),
+        "vel_max": float(v.max()),
+        "vel_media": round(distancia_km * 3600 / float(t[-1]), 1),
+    }
@@ -7,6 +7,12 @@ from typing import Optional, Dict, List, Tuple, Any
 from abc import ABC, abstractmethod
 from .utils.buffer import CircularBuffer
 
+try:
+    from ..utils.metricas import contar, observar_etapa
+except ImportError:
+    # Ejecución con src/ como raíz
+    from utils.metricas import contar, observar_etapa
+
 class OBD2ConnectionError(Exception):
     """Excepción base para errores de conexión OBD-II."""
     pass
@@ -118,8 +124,12 @@ class OBD2Connection(ABC):
             
         encoded = data.encode()
         for attempt in range(self.retry_count):
+            if attempt:
+                contar("obd_reintentos_total", ayuda="Reintentos de escritura al adaptador")
             try:
+                t0 = time.perf_counter()
                 if self._write_internal(encoded):
+                    observar_etapa("envio", time.perf_counter() - t0)
                     self.last_command_time = time.time()
                     return True
             except Exception as e:
@@ -148,14 +158,20 @@ class OBD2Connection(ABC):
             timeout = self._get_adaptive_timeout()
             
         start_time = time.time()
+        t0 = time.perf_counter()
+        primer_byte = None
+        completa = False
         response = []
         
         while (time.time() - start_time) < timeout:
             try:
                 data = self._read_internal(size or 128)
                 if data:
+                    if primer_byte is None:
+                        primer_byte = time.perf_counter()
                     response.extend(data)
                     if b'>' in data:  # Prompt ELM327
+                        completa = True
                         break
             except Exception as e:
                 self.logger.warning(f"Error de lectura: {e}")
@@ -163,6 +179,13 @@ class OBD2Connection(ABC):
                 
         response_time = time.time() - start_time
         self._update_response_metrics(response_time)
+        # Espera del adaptador hasta el primer byte y recepción del resto
+        fin = time.perf_counter()
+        observar_etapa("espera", (primer_byte or fin) - t0)
+        if primer_byte is not None:
+            observar_etapa("recepcion", fin - primer_byte)
+        if not completa:
+            contar("obd_timeouts_total", ayuda="Respuestas sin prompt '>' dentro del timeout")
         
         return bytes(response).decode('utf-8', errors='ignore')
         
@@ -212,6 +235,8 @@ class OBD2Connection(ABC):
             return False, ""
             
         response = self.read(timeout=custom_timeout)
+        if 'NO DATA' in response:
+            contar("obd_no_data_total", ayuda="Respuestas NO DATA del adaptador")
         
         if expected_response and expected_response not in response:
             self.logger.warning(f"Respuesta no esperada. Esperado: {expected_response}, Recibido: {response}")
@@ -124,6 +124,7 @@ class OBD2WiFiConnection(OBD2Connection):
             try:
                 self.disconnect()
                 if self._connect_internal():
+                    self.connected = True
                     self.logger.info("Reconexión exitosa")
                     return True
             except Exception as e:
@@ -0,0 +1,100 @@
+"""
+Decodificación de respuestas OBD-II a partir de las fórmulas de pids_ext.
+
+Las fórmulas ("parse": "((A*256)+B)/4") se compilan una sola vez a código
+Python y se evalúan con los bytes de datos A, B, C, D... Con un
+``CatalogoPIDs`` se usan las fórmulas ya compiladas de su caché. Para los
+PIDs sin fórmula se usa su ``parse_fn`` (si existe) sobre la respuesta compacta.
+
+Ejemplo:
+    dec = Decodificador()
+    dec.decodificar("010C", ["41 0C 1A F8"])  # 1726.0
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .catalogo_pids import FORMULAS_ESTANDAR, CatalogoPIDs, compilar_codigo, evaluador
+from .pids_ext import PIDS
+
+
+def compilar_formula(expr: str) -> Callable[[Sequence[int]], float]:
+    """
+    Compila una fórmula de pids_ext a una función ``f(datos) -> valor``.
+    Solo se permiten las variables A..H; los builtins quedan deshabilitados.
+    """
+    return evaluador(compilar_codigo(expr))
+
+
+def bytes_respuesta(cmd: str, lineas: List[str]) -> Optional[bytes]:
+    """
+    Extrae los bytes de datos de la respuesta a ``cmd`` (sin modo+0x40 ni PID).
+    Tolera espacios, cabeceras CAN y líneas de eco o basura.
+    """
+    esperado = f"{int(cmd[:2], 16) + 0x40:02X}{cmd[2:].upper()}"
+    for linea in lineas:
+        compacta = linea.replace(" ", "").upper()
+        idx = compacta.find(esperado)
+        if idx == -1:
+            continue
+        datos = compacta[idx + len(esperado):]
+        try:
+            return bytes.fromhex(datos[: len(datos) // 2 * 2])
+        except ValueError:
+            continue
+    return None
+
+
+class Decodificador:
+    """Convierte respuestas crudas en valores físicos, con fórmulas precompiladas."""
+
+    def __init__(self, pids: Optional[Dict[str, dict]] = None, catalogo: Optional[CatalogoPIDs] = None):
+        self.pids = PIDS if pids is None else pids
+        self.catalogo = catalogo
+        self._formulas: Dict[str, Optional[Callable]] = {}
+
+    def comando(self, pid: str) -> str:
+        """Acepta nombre legible ('rpm') o código ('010C') y devuelve el código."""
+        info = self.pids.get(pid)
+        if info and info.get("cmd"):
+            return info["cmd"].upper()
+        return pid.upper()
+
+    def _formula(self, cmd: str) -> Optional[Callable]:
+        if cmd not in self._formulas:
+            formula = self.catalogo.formula(cmd) if self.catalogo is not None else None
+            if formula is None:
+                expr = (self.pids.get(cmd) or {}).get("parse") or FORMULAS_ESTANDAR.get(cmd)
+                formula = compilar_formula(expr) if expr else None
+            self._formulas[cmd] = formula
+        return self._formulas[cmd]
+
+    def decodificar_freeze_frame(self, pid: str, lineas: List[str], cuadro: int = 0):
+        """Valor de ``pid`` (modo 01) guardado en el freeze frame: respuesta a '02 PID cuadro'."""
+        cmd = self.comando(pid)
+        datos = bytes_respuesta(f"02{cmd[2:]}{cuadro:02X}", lineas)
+        formula = self._formula(cmd)
+        if not datos or formula is None:
+            return None
+        try:
+            return formula(datos)
+        except (NameError, TypeError, ZeroDivisionError):
+            return None
+
+    def decodificar(self, pid: str, lineas: List[str]):
+        """Valor decodificado de ``pid`` o None si la respuesta no sirve."""
+        cmd = self.comando(pid)
+        datos = bytes_respuesta(cmd, lineas)
+        if not datos:
+            return None
+        formula = self._formula(cmd)
+        if formula is not None:
+            try:
+                return formula(datos)
+            except (NameError, TypeError, ZeroDivisionError):
+                return None
+        parse_fn = (self.pids.get(pid) or self.pids.get(cmd) or {}).get("parse_fn")
+        if parse_fn is not None:
+            try:
+                return parse_fn(f"{int(cmd[:2], 16) + 0x40:02X}{cmd[2:]}{datos.hex().upper()}")
+            except Exception:
+                return None
+        return datos.hex().upper()
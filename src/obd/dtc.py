@@ -37,3 +37,141 @@ def build_dtc_commands():
     Devuelve los comandos OBD-II para leer y borrar DTC.
     """
     return {"read": "03", "clear": "04"}
+
+
+# --- Lectura completa: modos 03/07/0A y freeze frame (modo 02) ---
+MODOS_DTC = {"almacenados": "03", "pendientes": "07", "permanentes": "0A"}
+# PIDs del freeze frame que se leen junto con el DTC que lo generó
+FREEZE_FRAME_PIDS = ("0104", "0105", "010B", "010C", "010D", "010F", "0111")
+
+
+# Protocolos ELM327 (ATSP/ATDPN) que son CAN: 6-9 ISO 15765-4, A-C SAE J1939/usuario
+PROTOCOLOS_CAN = set("6789ABC")
+
+
+def es_can(protocolo):
+    """True/False según el número de protocolo del ELM327; None si no se conoce (o es automático)."""
+    if not protocolo or protocolo.lstrip("A") in ("", "0"):
+        return None
+    return protocolo.lstrip("A")[-1:].upper() in PROTOCOLOS_CAN
+
+
+def _es_hex(texto):
+    return bool(texto) and all(c in "0123456789ABCDEF" for c in texto)
+
+
+def _mensajes(lineas):
+    """
+    Mensajes de la respuesta como (bytes, can): ``can`` es True cuando el
+    formato lo delata (ISO-TP o PCI con cabeceras) y None si no se sabe.
+    Cada mensaje se recorta a la longitud declarada (línea '00A' antes de
+    '0: ..', o byte PCI con cabeceras), descartando el relleno de la trama.
+    """
+    mensajes = []  # [bytearray, longitud o None, can]
+    actual = None  # mensaje ISO-TP sin cabeceras en curso
+    por_cabecera = {}  # mensajes multi-trama con cabeceras, por ECU
+    longitud = None  # de la línea '00A' que precede a '0: ..'
+    for linea in lineas:
+        tokens = linea.upper().split()
+        compacta = "".join(tokens)
+        if not compacta:
+            continue
+        if len(tokens) == 1 and len(compacta) == 3 and _es_hex(compacta):
+            longitud = int(compacta, 16)  # longitud de un mensaje multi-trama
+            continue
+        if len(compacta) > 2 and compacta[1] == ":":
+            datos = compacta[2:]
+            if not _es_hex(datos):
+                continue
+            if compacta[0] == "0" or actual is None:
+                actual = [bytearray(), longitud, True]
+                mensajes.append(actual)
+                longitud = None
+            actual[0].extend(bytes.fromhex(datos[: len(datos) // 2 * 2]))
+            continue
+        cabecera = None
+        if len(tokens) > 1 and len(tokens[0]) in (3, 8):
+            cabecera, datos = tokens[0], "".join(tokens[1:])
+        elif compacta.startswith("7E") and len(compacta) > 5:
+            cabecera, datos = compacta[:3], compacta[3:]  # cabeceras sin espacios (ATS0)
+        elif compacta.startswith("18DA") and len(compacta) > 10:
+            cabecera, datos = compacta[:8], compacta[8:]
+        else:
+            datos = compacta
+        if not _es_hex(datos) or len(datos) < 2:
+            continue
+        crudo = bytes.fromhex(datos[: len(datos) // 2 * 2])
+        if cabecera is None:
+            mensajes.append([bytearray(crudo), None, None])
+            continue
+        pci = crudo[0] >> 4
+        if pci == 0:  # trama única: longitud en el nibble bajo
+            mensajes.append([bytearray(crudo[1:]), crudo[0] & 0x0F, True])
+        elif pci == 1 and len(crudo) > 1:  # primera trama: longitud de 12 bits
+            mensaje = [bytearray(crudo[2:]), (crudo[0] & 0x0F) << 8 | crudo[1], True]
+            por_cabecera[cabecera] = mensaje
+            mensajes.append(mensaje)
+        elif pci == 2 and cabecera in por_cabecera:  # trama consecutiva
+            por_cabecera[cabecera][0].extend(crudo[1:])
+    resultado = []
+    for datos, largo, can in mensajes:
+        if largo is not None:
+            datos = datos[:largo]
+        if datos:
+            resultado.append((bytes(datos), can))
+    return resultado
+
+
+def mensajes_obd(lineas):
+    """
+    Agrupa las líneas de una respuesta en mensajes (bytes), uno por ECU.
+    Soporta tramas múltiples ISO-TP ('0: 43 ..', '1: ..'), la línea de
+    longitud que las precede ('00A') y cabeceras CAN 11/29 bits con byte PCI
+    ('7E8 06 43 ..', '7E8 10 08 43 ..' / '7E8 21 ..'). El relleno queda fuera.
+    """
+    return [datos for datos, _can in _mensajes(lineas)]
+
+
+def parsear_dtcs(lineas, modo="03", can=None):
+    """
+    Códigos DTC de la respuesta a los modos 03, 07 o 0A (sin duplicados).
+    En CAN el primer byte tras el modo es la cantidad de códigos y se toman
+    exactamente esos; en los protocolos anteriores no hay contador y cada
+    trama trae tres códigos rellenos con 0000.
+
+    ``can`` fija el protocolo (ver ``es_can``). Sin él, el formato de la
+    respuesta lo indica (ISO-TP o cabeceras con PCI); una trama sin
+    cabeceras es de los protocolos anteriores solo si tiene su tamaño fijo
+    (modo + 6 bytes), que en CAN no puede darse (2 + 2N bytes).
+    """
+    esperado = int(modo, 16) + 0x40
+    codigos = []
+    for mensaje, formato_can in _mensajes(lineas):
+        if mensaje[0] != esperado:
+            continue
+        mensaje_can = can if can is not None else formato_can
+        if mensaje_can is None:
+            mensaje_can = len(mensaje) != 7
+        if mensaje_can:
+            if len(mensaje) < 2:
+                continue
+            datos = mensaje[2:2 + 2 * mensaje[1]]
+        else:
+            datos = mensaje[1:]
+        for i in range(0, len(datos) - 1, 2):
+            code = datos[i:i + 2].hex().upper()
+            if code == "0000" and not mensaje_can:
+                continue  # relleno
+            dtc = decode_dtc(code)
+            if dtc not in codigos:
+                codigos.append(dtc)
+    return codigos
+
+
+def parsear_dtc_freeze_frame(lineas):
+    """DTC que originó el freeze frame (respuesta a '020200') o None."""
+    for mensaje in mensajes_obd(lineas):
+        if len(mensaje) >= 5 and mensaje[0] == 0x42 and mensaje[1] == 0x02:
+            code = mensaje[3:5].hex().upper()
+            return None if code == "0000" else decode_dtc(code)
+    return None
@@ -1,6 +1,7 @@
 from .connection import OBDConnection
 from .elm327 import ELM327
 from .pids_ext import PIDS
+from .telemetria_shm import AnilloTelemetria
 from src.storage.logger import DataLogger
 import time
 import sys
@@ -10,22 +11,31 @@ import multiprocessing
 class EmuladorIPCAdapter:
     """
     Emula la interfaz ELM327 para integración transparente.
-    Lee valores de RPM y velocidad desde memoria compartida (IPC).
+    Lee valores de RPM y velocidad desde el anillo de telemetría compartido
+    (ver telemetria_shm.py); acepta el objeto o el nombre del segmento.
     """
 
-    def __init__(self, shared_dict):
-        self.shared_dict = shared_dict
+    def __init__(self, telemetria):
+        if isinstance(telemetria, str):
+            telemetria = AnilloTelemetria.adjuntar(telemetria)
+        self.telemetria = telemetria
+
+    def _valor(self, campo, defecto):
+        ultimo = self.telemetria.ultimo()
+        if not ultimo or ultimo.get(campo) != ultimo.get(campo):  # None o NaN
+            return defecto
+        return int(ultimo[campo])
 
     def send_pid(self, cmd):
         # Simula respuesta cruda de ELM327 para los PIDs soportados
         if cmd == PIDS["rpm"]["cmd"]:
-            rpm = int(self.shared_dict.get("rpm", 800))
+            rpm = self._valor("rpm", 800)
             val = rpm * 4
             A = (val >> 8) & 0xFF
             B = val & 0xFF
             return f"410C{A:02X}{B:02X}"
         elif cmd == PIDS["speed"]["cmd"]:
-            speed = int(self.shared_dict.get("vel", 0))
+            speed = self._valor("vel", 0)
             return f"410D{speed:02X}"
         return ""
 
@@ -54,19 +64,17 @@ def main():
     conn = None
     logger = None
     emu_proc = None
+    telemetria = None
+    control = None
     try:
         if USE_EMULADOR_IPC:
-            import multiprocessing
-
-            manager = multiprocessing.Manager()
-            shared_dict = manager.dict(
-                {"modo": "ralenti", "falla": None, "rpm": 800, "vel": 0}
-            )
-            from .emu2_ipc import EmuladorDatos
+            from .emu2_ipc import ControlEmulador, EmuladorDatos
 
-            emu_proc = EmuladorDatos(shared_dict)
+            telemetria = AnilloTelemetria.crear(("ts", "rpm", "vel", "modo"), capacidad=1024)
+            control = ControlEmulador.crear()
+            emu_proc = EmuladorDatos(telemetria.nombre, control.nombre)
             emu_proc.start()
-            elm = EmuladorIPCAdapter(shared_dict)
+            elm = EmuladorIPCAdapter(telemetria)
             logger = DataLogger()
             print("Inicializando Emulador OBD-II (IPC)...")
         else:
@@ -187,6 +195,10 @@ def main():
         if emu_proc:
             emu_proc.terminate()
             emu_proc.join()
+        if telemetria:
+            telemetria.destruir()
+        if control:
+            control.destruir()
 
 
 # Nota: En toda la app, la variable de log y UI es 'vel'.
@@ -0,0 +1,114 @@
+"""
+Cliente ELM327 asíncrono (asyncio) para TCP y, opcionalmente, puerto serie.
+
+Pensado para procesos sin GUI (daemon de adquisición, gestor multi-vehículo):
+no importa Qt ni pandas y no bloquea el loop mientras espera al adaptador.
+
+- ``protocolo``: si se conoce el protocolo del vehículo (p. ej. "6") se fija
+  con ATSP y se evita la autodetección en cada reconexión. Tras inicializar
+  con ATSP0 se consulta ATDPN y queda guardado en ``protocolo``.
+- El puerto serie requiere ``pyserial-asyncio`` (opcional).
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import serial_asyncio
+except ImportError:  # Solo necesario para adaptadores USB/serie
+    serial_asyncio = None
+
+
+class ELM327AsyncError(Exception):
+    """Error de comunicación con el adaptador ELM327."""
+    pass
+
+
+class ClienteELM327Async:
+    def __init__(self, host: Optional[str] = None, puerto: int = 35000,
+                 puerto_serie: Optional[str] = None, baudrate: int = 38400,
+                 timeout: float = 2.0, protocolo: Optional[str] = None):
+        if host is None and puerto_serie is None:
+            raise ValueError("Se requiere host (TCP) o puerto_serie")
+        self.host = host
+        self.puerto = puerto
+        self.puerto_serie = puerto_serie
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.protocolo = protocolo
+        self.version = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def conectado(self) -> bool:
+        return self._writer is not None
+
+    @property
+    def destino(self) -> str:
+        return self.puerto_serie or f"{self.host}:{self.puerto}"
+
+    async def conectar(self):
+        """Abre la conexión y deja el adaptador configurado."""
+        if self.puerto_serie is not None:
+            if serial_asyncio is None:
+                raise ELM327AsyncError("pyserial-asyncio no está instalado (pip install pyserial-asyncio)")
+            abrir = serial_asyncio.open_serial_connection(url=self.puerto_serie, baudrate=self.baudrate)
+        else:
+            abrir = asyncio.open_connection(self.host, self.puerto)
+        try:
+            self._reader, self._writer = await asyncio.wait_for(abrir, self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ELM327AsyncError(f"No se pudo conectar a {self.destino}: {e}") from e
+        await self.inicializar()
+
+    async def inicializar(self):
+        respuesta = await self.comando("ATZ", timeout=max(self.timeout, 3.0))
+        self.version = " ".join(respuesta) or None
+        for cmd in ("ATE0", "ATL0", "ATS0", "ATH0"):
+            await self.comando(cmd)
+        if self.protocolo:
+            await self.comando(f"ATSP{self.protocolo}")
+        else:
+            await self.comando("ATSP0")
+            # Fuerza la autodetección y recuerda el protocolo para la próxima vez
+            await self.comando("0100", timeout=max(self.timeout, 5.0))
+            dpn = await self.comando("ATDPN")
+            if dpn and dpn[0].lstrip("A") not in ("", "0"):
+                self.protocolo = dpn[0].lstrip("A")
+        logger.info("ELM327 %s listo (protocolo %s)", self.destino, self.protocolo)
+
+    async def comando(self, cmd: str, timeout: Optional[float] = None) -> List[str]:
+        """Envía un comando y devuelve las líneas de respuesta (sin eco ni prompt)."""
+        if self._writer is None:
+            raise ELM327AsyncError("Adaptador no conectado")
+        async with self._lock:
+            try:
+                self._writer.write((cmd + "\r").encode("ascii"))
+                await self._writer.drain()
+                crudo = await asyncio.wait_for(self._reader.readuntil(b">"), timeout or self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                await self.cerrar()
+                raise ELM327AsyncError(f"Sin respuesta a {cmd} desde {self.destino}: {e}") from e
+        texto = crudo[:-1].decode("ascii", errors="ignore")
+        lineas = [l.strip() for l in texto.replace("\n", "\r").split("\r")]
+        return [l for l in lineas if l and l != cmd and l != "SEARCHING..."]
+
+    async def cerrar(self):
+        if self._writer is not None:
+            writer, self._writer, self._reader = self._writer, None, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+
+    async def __aenter__(self):
+        await self.conectar()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
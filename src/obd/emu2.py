@@ -1,68 +1,56 @@
-import random
-import math
+import time
 from flask import Flask, render_template_string, request, jsonify
 
+try:
+    from .fisica import PASO_FISICO, ModeloConduccion
+except ImportError:
+    from fisica import PASO_FISICO, ModeloConduccion
+
 
 class EmuladorOBD2:
     """
     Emulador avanzado de OBD-II con modos de conducción y fallas.
+    Además de MODOS acepta los ciclos estándar de ciclos.py (wltp, ftp75,
+    nedc, ralenti_prolongado); con ``semilla`` cada corrida es idéntica.
+
+    La dinámica corre a paso fijo (``paso`` segundos, ver fisica.py): las
+    respuestas dependen del tiempo transcurrido y no de la frecuencia de
+    consulta, y entre pasos se interpolan.
     """
 
-    MODOS = ["ralenti", "ciudad", "carretera", "falla"]
+    MODOS = list(ModeloConduccion.MODOS)
+
+    def __init__(self, semilla=None, paso=PASO_FISICO, reloj=time.monotonic):
+        self.modelo = ModeloConduccion(semilla, paso, reloj)
+
+    @property
+    def modo(self):
+        return self.modelo.modo
 
-    def __init__(self):
-        self.modo = "ralenti"
-        self.rpm = 800
-        self.velocidad = 0
-        self.t = 0
-        self.falla = None  # Puede ser 'sensor_rpm', 'sensor_vel', 'dtc', etc.
+    @property
+    def falla(self):  # Puede ser 'sensor_rpm', 'sensor_vel', 'dtc', etc.
+        return self.modelo.falla
+
+    @property
+    def t(self):
+        return self.modelo.t
+
+    @property
+    def rpm(self):
+        return int(self.modelo.valores()["rpm"])
+
+    @property
+    def velocidad(self):
+        return self.modelo.valores()["vel"]
 
     def set_modo(self, modo):
-        if modo in self.MODOS:
-            self.modo = modo
-            self.t = 0
-            self.falla = None
+        self.modelo.set_modo(modo)
 
     def set_falla(self, falla):
-        self.falla = falla
+        self.modelo.falla = falla
 
     def update(self):
-        self.t += 1
-        if self.modo == "ralenti":
-            self.rpm = 800 + random.randint(-20, 20)
-            self.velocidad = 0
-        elif self.modo == "ciudad":
-            self.rpm = (
-                900 + int(1200 * abs(math.sin(self.t / 15))) + random.randint(-50, 50)
-            )
-            if self.t % 40 < 10:
-                self.velocidad = 0
-            elif self.t % 40 < 30:
-                self.velocidad = min(60, self.velocidad + random.randint(0, 4))
-            else:
-                self.velocidad = max(0, self.velocidad - random.randint(0, 6))
-        elif self.modo == "carretera":
-            self.rpm = (
-                2200 + int(600 * abs(math.sin(self.t / 30))) + random.randint(-40, 40)
-            )
-            self.velocidad = (
-                90 + int(30 * abs(math.sin(self.t / 20))) + random.randint(-5, 5)
-            )
-        elif self.modo == "falla":
-            # Simula fallas: valores erráticos o imposibles
-            if self.falla == "sensor_rpm":
-                self.rpm = random.choice([0, 200, 8000, 3000])
-            elif self.falla == "sensor_vel":
-                self.velocidad = random.choice([0, 255, 10, 180])
-            elif self.falla == "dtc":
-                self.rpm = 1200
-                self.velocidad = 30
-            else:
-                self.rpm = random.randint(0, 8000)
-                self.velocidad = random.randint(0, 200)
-        else:
-            self.rpm = 800
-            self.velocidad = 0
+        self.modelo.actualizar()
 
     def send_pid(self, pid_cmd):
         self.update()
@@ -110,6 +98,9 @@ PANEL_HTML = """
         <button class="boton" onclick="setModo('ciudad')">Ciudad</button>
         <button class="boton" onclick="setModo('carretera')">Carretera</button>
         <button class="boton" onclick="setModo('falla')">Falla</button>
+        <button class="boton" onclick="setModo('wltp')">WLTP</button>
+        <button class="boton" onclick="setModo('ftp75')">FTP-75</button>
+        <button class="boton" onclick="setModo('nedc')">NEDC</button>
     </div>
     <div style="margin-top:1em;">
         <b>Falla:</b>
@@ -1,6 +1,4 @@
 import sys
-import math
-import random
 from PyQt6.QtWidgets import (
     QApplication,
     QWidget,
@@ -15,21 +13,33 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
+try:
+    from .fisica import ModeloConduccion
+except ImportError:
+    from fisica import ModeloConduccion
+
 
 class EmuladorOBD2GUI(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Emulador OBD-II Avanzado")
         self.setGeometry(200, 200, 420, 320)
-        self.modo = "ralenti"
-        self.falla = None
+        # Física a paso fijo: el período del timer solo cambia la frecuencia de refresco
+        self.modelo = ModeloConduccion()
         self.rpm = 800
         self.velocidad = 0
-        self.t = 0
         self.init_ui()
         self.timer = QTimer()
         self.timer.timeout.connect(self.simular)
-        self.timer.start(1000)
+        self.timer.start(100)
+
+    @property
+    def modo(self):
+        return self.modelo.modo
+
+    @property
+    def falla(self):
+        return self.modelo.falla
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -76,47 +86,29 @@ class EmuladorOBD2GUI(QWidget):
         self.actualizar_status()
 
     def cambiar_modo(self, modo):
-        self.modo = modo
-        self.t = 0
+        falla = self.modelo.falla
+        self.modelo.set_modo(modo)
+        self.modelo.falla = falla
         self.actualizar_status()
 
     def cambiar_falla(self, falla):
-        self.falla = None if falla == "Sin Falla" else falla
+        self.modelo.falla = None if falla == "Sin Falla" else falla
         self.actualizar_status()
 
     def simular(self):
-        self.t += 1
-        if self.modo == "ralenti":
-            self.rpm = 800 + random.randint(-20, 20)
-            self.velocidad = 0
-        elif self.modo == "ciudad":
-            self.rpm = (
-                900 + int(1200 * abs(math.sin(self.t / 15))) + random.randint(-50, 50)
-            )
-            if self.t % 40 < 10:
-                self.velocidad = 0
-            elif self.t % 40 < 30:
-                self.velocidad = min(60, self.velocidad + random.randint(0, 4))
-            else:
-                self.velocidad = max(0, self.velocidad - random.randint(0, 6))
-        elif self.modo == "carretera":
-            self.rpm = (
-                2200 + int(600 * abs(math.sin(self.t / 30))) + random.randint(-40, 40)
-            )
-            self.velocidad = (
-                90 + int(30 * abs(math.sin(self.t / 20))) + random.randint(-5, 5)
-            )
-        elif self.modo == "falla":
-            if self.falla == "sensor_rpm":
-                self.rpm = self.slider_rpm.value()
-            elif self.falla == "sensor_vel":
-                self.velocidad = self.slider_vel.value()
-            elif self.falla == "dtc":
-                self.rpm = 1200
-                self.velocidad = 30
-            else:
-                self.rpm = self.slider_rpm.value()
-                self.velocidad = self.slider_vel.value()
+        # Solo el canal en falla sale del slider; el otro lo sigue el modelo
+        if self.falla == "dtc":
+            self.modelo.manual = None
+        elif self.falla == "sensor_rpm":
+            self.modelo.fijar_manual(rpm=self.slider_rpm.value())
+        elif self.falla == "sensor_vel":
+            self.modelo.fijar_manual(vel=self.slider_vel.value())
+        else:
+            self.modelo.fijar_manual(self.slider_rpm.value(), self.slider_vel.value())
+        self.modelo.actualizar()
+        valores = self.modelo.valores()
+        self.rpm = int(valores["rpm"])
+        self.velocidad = int(valores["vel"])
         self.actualizar_status()
 
     def actualizar_status(self):
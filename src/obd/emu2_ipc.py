@@ -1,6 +1,4 @@
 import sys
-import math
-import random
 import multiprocessing
 import time
 from PyQt6.QtWidgets import (
@@ -15,58 +13,132 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
+try:
+    from .fisica import CICLOS_ESTANDAR, PASO_FISICO, ModeloConduccion
+    from .telemetria_shm import AnilloTelemetria
+except ImportError:
+    from fisica import CICLOS_ESTANDAR, PASO_FISICO, ModeloConduccion
+    from telemetria_shm import AnilloTelemetria
+
+# Los ciclos estándar (wltp, ftp75, ...) se reproducen desde su traza
+# precalculada; NumPy solo hace falta al elegir uno
+MODOS = ["ralenti", "ciudad", "carretera", "falla"] + list(CICLOS_ESTANDAR)
+FALLAS = [None, "sensor_rpm", "sensor_vel"]
+
+
+class ControlEmulador:
+    """
+    Bloque de control GUI -> emulador (modo, falla, rpm/vel manuales) en
+    memoria compartida. Reemplaza al Manager().dict(): leer y escribir ya no
+    son llamadas RPC a otro proceso.
+    """
+
+    CAMPOS = ("modo", "falla", "rpm", "vel")
+
+    def __init__(self, anillo):
+        self.anillo = anillo
+
+    @classmethod
+    def crear(cls, modo="ralenti", falla=None, rpm=800, vel=0):
+        control = cls(AnilloTelemetria.crear(cls.CAMPOS, capacidad=1))
+        control.actualizar(modo=modo, falla=falla, rpm=rpm, vel=vel)
+        return control
+
+    @classmethod
+    def adjuntar(cls, nombre):
+        return cls(AnilloTelemetria.adjuntar(nombre))
+
+    @property
+    def nombre(self):
+        return self.anillo.nombre
+
+    def leer(self):
+        valores = self.anillo.ultimo() or {"modo": 0, "falla": 0, "rpm": 800, "vel": 0}
+        return {
+            "modo": MODOS[int(valores["modo"])],
+            "falla": FALLAS[int(valores["falla"])],
+            "rpm": int(valores["rpm"]),
+            "vel": int(valores["vel"]),
+        }
+
+    def actualizar(self, **cambios):
+        estado = self.leer()
+        estado.update(cambios)
+        self.anillo.publicar(
+            {
+                "modo": MODOS.index(estado["modo"]),
+                "falla": FALLAS.index(estado["falla"]),
+                "rpm": estado["rpm"],
+                "vel": estado["vel"],
+            }
+        )
+
+    def cerrar(self):
+        self.anillo.cerrar()
+
+    def destruir(self):
+        self.anillo.destruir()
+
 
 class EmuladorDatos(multiprocessing.Process):
-    def __init__(self, shared_dict):
+    """
+    Proceso productor: lee el bloque de control y publica rpm/vel (y el modo
+    efectivo, si el anillo tiene el campo ``modo``) en el anillo de telemetría
+    compartido (ver src/obd/telemetria_shm.py).
+
+    La física corre a paso fijo (``paso``) y se publica cada ``periodo``
+    segundos con valores interpolados entre pasos (ver src/obd/fisica.py).
+    """
+
+    def __init__(self, nombre_telemetria, nombre_control, semilla=None,
+                 paso=PASO_FISICO, periodo=0.02):
         super().__init__()
-        self.shared_dict = shared_dict
+        self.nombre_telemetria = nombre_telemetria
+        self.nombre_control = nombre_control
+        self.semilla = semilla
+        self.paso = paso
+        self.periodo = periodo
         self.running = True
 
     def run(self):
-        t = 0
-        while self.running:
-            modo = self.shared_dict.get("modo", "ralenti")
-            falla = self.shared_dict.get("falla", None)
-            if modo == "ralenti":
-                rpm = 800 + random.randint(-20, 20)
-                vel = 0
-            elif modo == "ciudad":
-                rpm = 900 + int(1200 * abs(math.sin(t / 15))) + random.randint(-50, 50)
-                if t % 40 < 10:
-                    vel = 0
-                elif t % 40 < 30:
-                    vel = min(60, self.shared_dict.get("vel", 0) + random.randint(0, 4))
-                else:
-                    vel = max(0, self.shared_dict.get("vel", 0) - random.randint(0, 6))
-            elif modo == "carretera":
-                rpm = 2200 + int(600 * abs(math.sin(t / 30))) + random.randint(-40, 40)
-                vel = 90 + int(30 * abs(math.sin(t / 20))) + random.randint(-5, 5)
-            elif modo == "falla":
-                if falla == "sensor_rpm":
-                    rpm = self.shared_dict.get("rpm", 0)
-                    vel = self.shared_dict.get("vel", 0)
-                elif falla == "sensor_vel":
-                    rpm = self.shared_dict.get("rpm", 0)
-                    vel = self.shared_dict.get("vel", 0)
+        telemetria = AnilloTelemetria.adjuntar(self.nombre_telemetria)
+        control = ControlEmulador.adjuntar(self.nombre_control)
+        modelo = ModeloConduccion(self.semilla, self.paso)
+        rechazado = None  # modo pedido que set_modo no pudo cargar
+        try:
+            while self.running:
+                estado = control.leer()
+                # El control solo lo escribe la GUI: un ciclo no disponible se
+                # ignora aquí y el modo efectivo viaja en la telemetría
+                if estado["modo"] not in (modelo.modo, rechazado):
+                    rechazado = None if modelo.set_modo(estado["modo"]) else estado["modo"]
+                modelo.falla = estado["falla"]
+                # Con falla activa los valores los fija la GUI (sliders); con
+                # un sensor en falla, solo ese canal
+                if estado["falla"] == "sensor_rpm":
+                    modelo.fijar_manual(rpm=estado["rpm"])
+                elif estado["falla"] == "sensor_vel":
+                    modelo.fijar_manual(vel=estado["vel"])
                 else:
-                    rpm = self.shared_dict.get("rpm", 0)
-                    vel = self.shared_dict.get("vel", 0)
-            else:
-                rpm = 800
-                vel = 0
-            self.shared_dict["rpm"] = rpm
-            self.shared_dict["vel"] = vel
-            t += 1
-            time.sleep(1)
+                    modelo.fijar_manual(estado["rpm"], estado["vel"])
+                modelo.actualizar()
+                valores = modelo.valores()
+                telemetria.publicar({"ts": time.time(), "rpm": valores["rpm"], "vel": valores["vel"],
+                                     "modo": MODOS.index(modelo.modo)})
+                time.sleep(self.periodo)
+        finally:
+            telemetria.cerrar()
+            control.cerrar()
 
     def stop(self):
         self.running = False
 
 
 class EmuladorGUI(QWidget):
-    def __init__(self, shared_dict):
+    def __init__(self, telemetria, control):
         super().__init__()
-        self.shared_dict = shared_dict
+        self.telemetria = telemetria
+        self.control = control
         self.setWindowTitle("Emulador OBD-II (IPC)")
         self.setGeometry(200, 200, 420, 320)
         self.init_ui()
@@ -79,9 +151,8 @@ class EmuladorGUI(QWidget):
         self.status = QLabel()
         self.status.setFont(QFont("Arial", 14))
         layout.addWidget(self.status)
-        modos = ["ralenti", "ciudad", "carretera", "falla"]
         self.combo_modo = QComboBox()
-        self.combo_modo.addItems(modos)
+        self.combo_modo.addItems(MODOS)
         self.combo_modo.currentTextChanged.connect(self.cambiar_modo)
         layout.addWidget(QLabel("Modo de conducción:"))
         layout.addWidget(self.combo_modo)
@@ -111,39 +182,43 @@ class EmuladorGUI(QWidget):
         self.actualizar_status()
 
     def cambiar_modo(self, modo):
-        self.shared_dict["modo"] = modo
+        self.control.actualizar(modo=modo)
         self.actualizar_status()
 
     def cambiar_falla(self, falla):
-        self.shared_dict["falla"] = None if falla == "Sin Falla" else falla
+        self.control.actualizar(falla=None if falla == "Sin Falla" else falla)
         self.actualizar_status()
 
     def cambiar_rpm(self, val):
-        self.shared_dict["rpm"] = val
+        self.control.actualizar(rpm=val)
         self.actualizar_status()
 
     def cambiar_vel(self, val):
-        self.shared_dict["vel"] = val
+        self.control.actualizar(vel=val)
         self.actualizar_status()
 
     def actualizar_status(self):
-        modo = self.shared_dict.get("modo", "ralenti")
-        rpm = self.shared_dict.get("rpm", 800)
-        vel = self.shared_dict.get("vel", 0)
-        falla = self.shared_dict.get("falla", None)
+        estado = self.control.leer()
+        falla = estado["falla"]
+        ultimo = self.telemetria.ultimo()
+        modo = MODOS[int(ultimo["modo"])] if ultimo and "modo" in ultimo else estado["modo"]
+        rpm = int(ultimo["rpm"]) if ultimo else estado["rpm"]
+        vel = int(ultimo["vel"]) if ultimo else estado["vel"]
         self.status.setText(
             f"<b>Modo:</b> {modo} | <b>RPM:</b> {rpm} | <b>Velocidad:</b> {vel} km/h | <b>Falla:</b> {falla or 'Ninguna'}"
         )
 
 
 if __name__ == "__main__":
-    manager = multiprocessing.Manager()
-    shared_dict = manager.dict({"modo": "ralenti", "falla": None, "rpm": 800, "vel": 0})
-    emu_proc = EmuladorDatos(shared_dict)
+    telemetria = AnilloTelemetria.crear(("ts", "rpm", "vel", "modo"), capacidad=1024)
+    control = ControlEmulador.crear()
+    emu_proc = EmuladorDatos(telemetria.nombre, control.nombre)
     emu_proc.start()
     app = QApplication(sys.argv)
-    win = EmuladorGUI(shared_dict)
+    win = EmuladorGUI(telemetria, control)
     win.show()
     app.exec()
     emu_proc.terminate()
     emu_proc.join()
+    telemetria.destruir()
+    control.destruir()
@@ -20,6 +20,7 @@ import sys
 
 try:
     from ..utils.logging_app import log_evento_app
+    from .fisica import RelojFisico, interpolar
 except ImportError:
     # Fallback para ejecución directa o desde src como raíz
     import os
@@ -29,6 +30,7 @@ except ImportError:
     if src_dir not in sys.path:
         sys.path.insert(0, src_dir)
     from utils.logging_app import log_evento_app
+    from obd.fisica import RelojFisico, interpolar
 
 
 # =========================
@@ -624,7 +626,7 @@ else:
 class EmuladorOBD:
     """Emulador OBD-II profesional con soporte para curriculum All Motors"""
     
-    def __init__(self):
+    def __init__(self, semilla: Optional[int] = None):
         # Importar configuración
         try:
             from src.config import EMULATOR_SETTINGS
@@ -649,11 +651,33 @@ class EmuladorOBD:
             'carga_motor': 0
         }
         
-        # Configuración de comportamiento
-        self._last_update = datetime.now()
+        # Configuración de comportamiento: el escenario avanza a paso fijo
+        # (update_interval) sin importar cada cuánto se pidan datos
+        self._reloj = RelojFisico(self.settings['update_interval'])
+        self._anterior = dict(self.estado)
         self._escenario = "ralenti"
+        self._escenario_previo = self._escenario  # se restaura al quitar el ciclo
         self._fase = 0
         self._ruido = self.settings['noise_factor']
+        self._rnd = random.Random(semilla)
+        self._ciclo = None
+        
+    def usar_ciclo(self, nombre: Optional[str], semilla: int = 0):
+        """Reproduce un ciclo estándar (wltp, ftp75, nedc, ...) en lugar del escenario; None lo quita."""
+        if nombre is None:
+            if self._ciclo is not None:
+                self._ciclo = None
+                self._escenario = self._escenario_previo
+            return
+        try:
+            from .ciclos import ReproductorCiclo
+        except ImportError:
+            from obd.ciclos import ReproductorCiclo
+        ciclo = ReproductorCiclo(nombre, semilla=semilla)
+        if self._ciclo is None:
+            self._escenario_previo = self._escenario
+        self._ciclo = ciclo
+        self._escenario = nombre
         
     def get_simulated_data(self, pids: List[str]) -> Dict[str, Any]:
         """Genera datos simulados según el escenario actual"""
@@ -662,21 +686,33 @@ class EmuladorOBD:
         # Convertir PIDs a formato legible
         pids_legibles = [self._convertir_pid(pid) for pid in pids]
         
+        # Entre pasos se interpola; con ciclo la traza ya viene interpolada
+        estado = self.estado
+        if self._ciclo is None:
+            estado = interpolar(self._anterior, self.estado, self._reloj.alfa)
+        
         # Generar respuesta con ruido aleatorio
         respuesta = {}
         for pid in pids_legibles:
-            if pid in self.estado:
-                valor_base = self.estado[pid]
-                ruido = random.uniform(-self._ruido, self._ruido) * valor_base
+            if pid in estado:
+                valor_base = estado[pid]
+                ruido = self._rnd.uniform(-self._ruido, self._ruido) * valor_base
                 respuesta[pid] = max(0, valor_base + ruido)
                 
         return respuesta
         
     def _actualizar_estado(self):
         """Actualiza estado según tiempo transcurrido y escenario"""
-        now = datetime.now()
-        delta = (now - self._last_update).total_seconds()
-        
+        if self._ciclo is not None:
+            valores = self._ciclo.valores()
+            for clave in self.estado:
+                self.estado[clave] = valores[clave]
+        else:
+            self._reloj.avanzar(self._paso_escenario)
+            
+    def _paso_escenario(self, delta):
+        """Un paso fijo de física del escenario actual"""
+        self._anterior = dict(self.estado)
         if self._escenario == "ralenti":
             self._actualizar_ralenti(delta)
         elif self._escenario == "aceleracion":
@@ -685,8 +721,6 @@ class EmuladorOBD:
             self._actualizar_crucero(delta)
         elif self._escenario == "frenado":
             self._actualizar_frenado(delta)
-            
-        self._last_update = now
         
     def _actualizar_ralenti(self, delta):
         """Actualiza estado en ralentí"""
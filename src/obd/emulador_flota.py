@@ -0,0 +1,313 @@
+"""
+Emulador vectorizado de flota: N vehículos virtuales avanzando a la vez.
+
+Reproduce el modelo de ``EmuladorOBD`` (src/obd/emulador.py) pero con el
+estado de toda la flota en arrays NumPy, uno por variable. Cada paso hace las
+mismas cuentas para todos los vehículos con unas pocas operaciones de array:
+
+- máquina de estados de escenarios por vehículo (ralenti → aceleracion →
+  crucero → frenado → ralenti), con duraciones sorteadas en cada fase;
+- ``_suavizar`` hacia los objetivos del escenario y ``_actualizar_dependencias``
+  (MAF, consumo, presión de admisión y temperatura);
+- los generadores diésel y ``update_diesel_interdependencies`` (boost, turbo,
+  EGR, DPF y caudal de combustible);
+- ruido proporcional (``noise_factor``) con un generador con semilla.
+
+Con ``ciclo="wltp"`` (o ftp75, nedc, ...) cada vehículo reproduce la traza
+precalculada de src/obd/ciclos.py con un desfase propio, en lugar de la
+máquina de escenarios.
+
+Se consume de dos formas:
+
+* flujo directo: ``flota.flujo(pasos, dt)`` entrega ``(t, {variable: array})``
+  para alimentar SessionStore, el servidor de ingesta o el anillo de telemetría;
+* N adaptadores ELM327 virtuales: ``servir_flota(flota)`` levanta un
+  ``SimuladorELM327`` por vehículo, cada uno leyendo su fila del estado.
+
+Ejemplo (200 adaptadores y la configuración para ``python -m src.daemon.flota``):
+    python -m src.obd.emulador_flota --vehiculos 200 --config-flota flota.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ciclos import traza
+from .fisica import RelojFisico
+from .simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+ESCENARIOS = ("ralenti", "aceleracion", "crucero", "frenado")
+RALENTI, ACELERACION, CRUCERO, FRENADO = range(4)
+
+# Objetivos por escenario (mismo orden que ESCENARIOS), los de EmuladorOBD
+_RPM_OBJETIVO = np.array([800.0, 3500.0, 2200.0, 1200.0])
+_VEL_OBJETIVO = np.array([0.0, 60.0, 90.0, 0.0])
+_THROTTLE = np.array([0.0, 70.0, 20.0, 0.0])
+_CARGA = np.array([5.0, 80.0, 40.0, 10.0])
+# Duración de cada fase en segundos (mínimo, máximo)
+DURACIONES = np.array([[5.0, 15.0], [10.0, 25.0], [20.0, 60.0], [5.0, 12.0]])
+
+# Rangos de los generadores diésel de emulador.py (gen_boost_pressure, ...)
+_BOOST = np.array([[0.0, 5.0], [80.0, 180.0], [40.0, 90.0], [0.0, 20.0]])
+_DPF = np.array([[200.0, 300.0], [400.0, 600.0], [350.0, 450.0], [250.0, 350.0]])
+_FUEL_BASE = np.array([1.2, 8.5, 4.2, 0.8])
+
+VARIABLES = ("rpm", "vel", "temp", "maf", "throttle", "consumo", "presion_adm",
+             "volt_bateria", "carga_motor")
+VARIABLES_DIESEL = ("boost_pressure", "turbo_rpm", "egr_temp", "dpf_temperature", "fuel_rate")
+
+# Igual que EmuladorOBD._convertir_pid
+PID_A_VARIABLE = {
+    "010C": "rpm",
+    "010D": "vel",
+    "0105": "temp",
+    "0110": "maf",
+    "0111": "throttle",
+    "015E": "consumo",
+    "010B": "presion_adm",
+    "0142": "volt_bateria",
+    "0104": "carga_motor",
+}
+
+
+class EmuladorFlota:
+    """Estado de ``n`` vehículos como arrays; ``avanzar(dt)`` mueve a todos."""
+
+    def __init__(self, n: int, semilla: Optional[int] = None, ruido: float = 0.05,
+                 diesel: bool = True, paso: float = 0.1, ciclo: Optional[str] = None):
+        if n <= 0:
+            raise ValueError("La flota necesita al menos un vehículo")
+        self.n = n
+        self.ruido = ruido
+        self.diesel = diesel
+        self.paso = paso  # paso fijo de sincronizar()
+        self.rng = np.random.default_rng(semilla)
+        self.t = 0.0
+        self.pasos = 0
+        self.vins = [f"MR0FLOTA{i:09d}" for i in range(n)]
+
+        self.escenario = np.zeros(n, dtype=np.int8)
+        # Fases desfasadas para que la flota no cambie de escenario al unísono
+        self.restante = self.rng.uniform(0, DURACIONES[RALENTI, 1], n)
+        self.estado: Dict[str, np.ndarray] = {
+            "rpm": np.full(n, 800.0),
+            "vel": np.zeros(n),
+            "temp": np.full(n, 85.0),
+            "maf": np.full(n, 2.5),
+            "throttle": np.zeros(n),
+            "consumo": np.zeros(n),
+            "presion_adm": np.full(n, 101.0),
+            "volt_bateria": np.full(n, 14.2),
+            "carga_motor": np.zeros(n),
+        }
+        if diesel:
+            for nombre in VARIABLES_DIESEL:
+                self.estado[nombre] = np.zeros(n)
+        self.traza = traza(ciclo, semilla or 0) if ciclo else None
+        if self.traza is not None:
+            self.desfase = self.rng.uniform(0, self.traza.duracion, n)
+        self._instantanea: Optional[Dict[str, np.ndarray]] = None
+        self.reloj = RelojFisico(paso)
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        return tuple(self.estado)
+
+    # ------------------------------------------------------------------
+    # Simulación
+    # ------------------------------------------------------------------
+    def avanzar(self, dt: float):
+        """Avanza ``dt`` segundos a todos los vehículos."""
+        if self.traza is not None:
+            self._seguir_ciclo(dt)
+        else:
+            self._simular_escenarios(dt)
+        if self.diesel:
+            self._actualizar_diesel()
+        self.t += dt
+        self.pasos += 1
+        self._instantanea = None
+
+    def _simular_escenarios(self, dt: float):
+        self._transiciones(dt)
+        esc = self.escenario
+        e = self.estado
+        factor = min(1.0, dt * 2)  # EmuladorOBD._suavizar
+        e["rpm"] += (_RPM_OBJETIVO[esc] - e["rpm"]) * factor
+        vel = e["vel"] + (_VEL_OBJETIVO[esc] - e["vel"]) * factor
+        vel = np.where(esc == FRENADO, np.maximum(0.0, e["vel"] - 30 * dt), vel)
+        e["vel"] = np.where(esc == RALENTI, 0.0, vel)
+        e["throttle"] = _THROTTLE[esc]
+        e["carga_motor"] = _CARGA[esc]
+        self._actualizar_dependencias()
+
+    def _seguir_ciclo(self, dt: float):
+        valores = self.traza.en_vector(self.t + dt + self.desfase)
+        for nombre in VARIABLES:
+            self.estado[nombre] = valores[nombre]
+        self.escenario[:] = valores["fase"]
+
+    def _transiciones(self, dt: float):
+        self.restante -= dt
+        cambian = np.flatnonzero(self.restante <= 0)
+        if cambian.size:
+            siguiente = (self.escenario[cambian] + 1) % len(ESCENARIOS)
+            self.escenario[cambian] = siguiente
+            minimo, maximo = DURACIONES[siguiente, 0], DURACIONES[siguiente, 1]
+            self.restante[cambian] = self.rng.uniform(minimo, maximo)
+
+    def _actualizar_dependencias(self):
+        e = self.estado
+        rpm, throttle = e["rpm"], e["throttle"]
+        e["maf"] = rpm * throttle * 0.001 + 1.5
+        e["consumo"] = np.where(e["vel"] > 0, rpm * throttle * 0.0001 + 0.5, 0.2)
+        e["presion_adm"] = 101 + throttle * 0.5
+        e["temp"] = np.clip(85 + (e["carga_motor"] - 20) * 0.1, 82, 95)
+
+    def _actualizar_diesel(self):
+        e, esc, rng, n = self.estado, self.escenario, self.rng, self.n
+        e["boost_pressure"] = rng.uniform(_BOOST[esc, 0], _BOOST[esc, 1]) + rng.uniform(-5, 5, n)
+        dpf = rng.uniform(_DPF[esc, 0], _DPF[esc, 1])
+        regeneracion = rng.random(n) < 0.05  # 5 % de las lecturas en regeneración
+        dpf[regeneracion] = rng.uniform(600, 700, int(regeneracion.sum()))
+        e["dpf_temperature"] = dpf + rng.uniform(-20, 20, n)
+        e["egr_temp"] = e["temp"] + rng.uniform(20, 60, n)
+        fuel = _FUEL_BASE[esc] * (e["rpm"] / 1000) * (e["carga_motor"] / 50)
+        e["fuel_rate"] = np.clip(fuel, 0.5, 15.0) + rng.uniform(-0.2, 0.2, n)
+        # update_diesel_interdependencies
+        e["fuel_rate"] = np.where(e["boost_pressure"] > 100, e["fuel_rate"] * 1.2, e["fuel_rate"])
+        e["egr_temp"] = np.where(e["dpf_temperature"] > 600, e["egr_temp"] + 50, e["egr_temp"])
+        e["turbo_rpm"] = e["rpm"] * rng.uniform(8, 15, n)
+
+    def sincronizar(self) -> bool:
+        """Corre los pasos fijos de ``paso`` segundos pendientes según el reloj de pared."""
+        return self.reloj.avanzar(self.avanzar) > 0
+
+    # ------------------------------------------------------------------
+    # Lecturas
+    # ------------------------------------------------------------------
+    def instantanea(self) -> Dict[str, np.ndarray]:
+        """Valores con ruido del paso actual (se calcula una vez por paso)."""
+        if self._instantanea is None:
+            self._instantanea = {nombre: self._con_ruido(v) for nombre, v in self.estado.items()}
+        return self._instantanea
+
+    def _con_ruido(self, valores: np.ndarray) -> np.ndarray:
+        if not self.ruido:
+            return valores.copy()
+        ruido = self.rng.uniform(-self.ruido, self.ruido, self.n) * valores
+        return np.maximum(0.0, valores + ruido)
+
+    def muestra(self, pids: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Como ``EmuladorOBD.get_simulated_data`` pero con un array por variable."""
+        valores = self.instantanea()
+        if pids is None:
+            return dict(valores)
+        nombres = (PID_A_VARIABLE.get(pid, pid) for pid in pids)
+        return {nombre: valores[nombre] for nombre in nombres if nombre in valores}
+
+    def flujo(self, pasos: int, dt: float = 0.1,
+              pids: Optional[Sequence[str]] = None) -> Iterator[Tuple[float, Dict[str, np.ndarray]]]:
+        """Genera ``pasos`` muestras de toda la flota en tiempo simulado."""
+        for _ in range(pasos):
+            self.avanzar(dt)
+            yield self.t, self.muestra(pids)
+
+    def filas(self, indice: int, t0: float = 0.0) -> List[Tuple[float, str, float]]:
+        """Muestra actual de un vehículo como filas (ts, pid, valor) de SessionStore."""
+        ts = t0 + self.t
+        return [(ts, nombre, float(v[indice])) for nombre, v in self.instantanea().items()]
+
+    def vehiculo(self, indice: int) -> "VehiculoFlota":
+        return VehiculoFlota(self, indice)
+
+
+class VehiculoFlota(VehiculoSimulado):
+    """Vista de un vehículo de la flota con la interfaz de ``VehiculoSimulado``."""
+
+    def __init__(self, flota: EmuladorFlota, indice: int, **kwargs):
+        super().__init__(vin=flota.vins[indice], **kwargs)
+        self.flota = flota
+        self.indice = indice
+
+    def valores(self) -> Dict[str, float]:
+        self.flota.sincronizar()
+        v = self.flota.instantanea()
+        i = self.indice
+        base = {
+            "rpm": float(v["rpm"][i]),
+            "vel": float(v["vel"][i]),
+            "temp": float(v["temp"][i]),
+            "temp_aire": 25.0,
+            "maf": float(v["maf"][i]),
+            "carga": float(v["carga_motor"][i]),
+            "tps": float(v["throttle"][i]),
+            "map": float(v["presion_adm"][i]),
+            "voltaje": float(v["volt_bateria"][i]),
+        }
+        base.update(self.fijos)
+        return base
+
+
+@contextlib.asynccontextmanager
+async def servir_flota(flota: EmuladorFlota, host: str = "127.0.0.1", puerto_base: int = 0,
+                       **opciones):
+    """
+    Levanta un ``SimuladorELM327`` por vehículo. Con ``puerto_base=0`` cada uno
+    toma un puerto libre; si no, usa puertos consecutivos desde ``puerto_base``.
+    ``opciones`` se pasan al simulador (latencia, max_clientes).
+    """
+    async with contextlib.AsyncExitStack() as pila:
+        simuladores = []
+        for i in range(flota.n):
+            puerto = puerto_base + i if puerto_base else 0
+            sim = SimuladorELM327(host, puerto, vehiculo=flota.vehiculo(i), **opciones)
+            simuladores.append(await pila.enter_async_context(sim))
+        yield simuladores
+
+
+def config_flota(simuladores: Sequence[SimuladorELM327], **extra) -> Dict[str, object]:
+    """Configuración de ``GestorFlota`` apuntando a los simuladores."""
+    config: Dict[str, object] = {
+        "vehiculos": [
+            {"id": f"v{i:05d}", "adaptador": {"host": sim.host, "puerto": sim.puerto}}
+            for i, sim in enumerate(simuladores)
+        ],
+    }
+    config.update(extra)
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flota de adaptadores ELM327 virtuales")
+    parser.add_argument("--vehiculos", type=int, default=100)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto-base", type=int, default=36000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por petición OBD")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--ciclo", help="Ciclo de conducción (wltp, ftp75, nedc, ralenti_prolongado)")
+    parser.add_argument("--config-flota", help="Escribe la configuración para src.daemon.flota")
+    args = parser.parse_args()
+
+    async def _run():
+        flota = EmuladorFlota(args.vehiculos, semilla=args.semilla, ciclo=args.ciclo)
+        async with servir_flota(flota, args.host, args.puerto_base, latencia=args.latencia,
+                                max_clientes=1) as simuladores:
+            if args.config_flota:
+                with open(args.config_flota, "w", encoding="utf-8") as f:
+                    json.dump(config_flota(simuladores), f, indent=2)
+            print(f"[FLOTA] {flota.n} adaptadores en {args.host}:{simuladores[0].puerto}-"
+                  f"{simuladores[-1].puerto} (Ctrl+C para salir)")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        print("[FLOTA] Detenida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Inyección de fallas para el simulador ELM327 (src/obd/simulador_elm327.py).
+
+Los modos "falla" de los emuladores solo corrompen valores. En el auto las
+demoras reales vienen del adaptador y del enlace: NO DATA, BUFFER FULL,
+CAN ERROR, STOPPED, SEARCHING... seguido de UNABLE TO CONNECT, conexiones
+TCP que se caen y picos de latencia. ``InyectorFallas`` decide, por cada
+petición OBD, si el simulador responde normal o con una de esas fallas.
+
+Dos formas de configurarlo (se pueden combinar):
+
+- ``reglas``: fallas aleatorias por petición. ``probabilidad`` de disparar y
+  ``rafaga`` peticiones seguidas afectadas una vez que dispara.
+- ``cortes``: fallas programadas por tiempo desde el arranque del simulador
+  (``inicio`` y ``duracion`` en segundos, ``periodo`` opcional para repetir).
+  Un corte de ``desconexion`` cierra la conexión en curso y también las que
+  se abran mientras dure, como un adaptador WiFi que se reinicia.
+
+``latencia`` no cambia la respuesta: la demora ``segundos`` extra.
+
+Ejemplo (JSON para ``--fallas``):
+    {"semilla": 1,
+     "reglas": [{"tipo": "NO DATA", "probabilidad": 0.02, "rafaga": 5},
+                {"tipo": "latencia", "probabilidad": 0.01, "segundos": 0.8}],
+     "cortes": [{"tipo": "desconexion", "inicio": 30, "duracion": 3, "periodo": 120}]}
+"""
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Respuesta del adaptador para cada falla de protocolo
+RESPUESTAS = {
+    "NO DATA": ["NO DATA"],
+    "BUFFER FULL": ["BUFFER FULL"],
+    "CAN ERROR": ["CAN ERROR"],
+    "STOPPED": ["STOPPED"],
+    "SEARCHING": ["SEARCHING...", "UNABLE TO CONNECT"],
+}
+TIPOS = tuple(RESPUESTAS) + ("desconexion", "latencia")
+LATENCIA_POR_DEFECTO = 1.0  # segundos
+
+
+def _validar(regla: Dict[str, Any]) -> Dict[str, Any]:
+    if regla.get("tipo") not in TIPOS:
+        raise ValueError(f"Tipo de falla desconocido: {regla.get('tipo')!r} (válidos: {', '.join(TIPOS)})")
+    regla = dict(regla)
+    regla.setdefault("segundos", LATENCIA_POR_DEFECTO)
+    return regla
+
+
+class InyectorFallas:
+    """Decide qué falla (si alguna) afecta a cada petición OBD."""
+
+    def __init__(self, reglas: Optional[List[Dict[str, Any]]] = None,
+                 cortes: Optional[List[Dict[str, Any]]] = None, semilla: Optional[int] = None,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.reglas = [_validar(r) for r in reglas or []]
+        self.cortes = [_validar(c) for c in cortes or []]
+        self.reloj = reloj
+        self.contadores: Counter = Counter()  # fallas inyectadas por tipo
+        self._rnd = random.Random(semilla)
+        self._rafaga: Optional[Dict[str, Any]] = None
+        self._restantes = 0
+        self._inicio = reloj()
+
+    @classmethod
+    def desde_config(cls, config: Dict[str, Any], **extra) -> "InyectorFallas":
+        return cls(config.get("reglas"), config.get("cortes"), config.get("semilla"), **extra)
+
+    @classmethod
+    def desde_json(cls, ruta: str) -> "InyectorFallas":
+        with open(ruta, "r", encoding="utf-8") as f:
+            return cls.desde_config(json.load(f))
+
+    def reiniciar(self):
+        """Vuelve a contar los cortes desde ahora (al arrancar el simulador)."""
+        self._inicio = self.reloj()
+        self._rafaga, self._restantes = None, 0
+
+    @property
+    def t(self) -> float:
+        return self.reloj() - self._inicio
+
+    def corte_activo(self, tipo: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """El corte programado vigente (de ``tipo`` si se indica), o None."""
+        t = self.t
+        for corte in self.cortes:
+            if tipo is not None and corte["tipo"] != tipo:
+                continue
+            desde = t - corte["inicio"]
+            if desde < 0:
+                continue
+            if corte.get("periodo"):
+                desde %= corte["periodo"]
+            if desde < corte["duracion"]:
+                return corte
+        return None
+
+    def decidir(self) -> Optional[Dict[str, Any]]:
+        """Falla para la próxima petición OBD (None = responder normal)."""
+        falla = self.corte_activo()
+        if falla is None and self._restantes:
+            falla = self._rafaga
+            self._restantes -= 1
+        if falla is None:
+            for regla in self.reglas:
+                if self._rnd.random() < regla.get("probabilidad", 0.0):
+                    falla = regla
+                    self._rafaga, self._restantes = regla, max(0, regla.get("rafaga", 1) - 1)
+                    break
+        if falla is not None:
+            self.contadores[falla["tipo"]] += 1
+        return falla
@@ -0,0 +1,176 @@
+"""
+Reloj de física a paso fijo para los emuladores.
+
+La dinámica simulada avanza en pasos de ``paso`` segundos según el tiempo
+transcurrido, no según cuántas veces se consulta el emulador: a 1 Hz o a
+50 Hz se ven las mismas curvas. Si entre dos consultas pasaron varios pasos
+se ejecutan todos (sub-pasos); si no pasó ninguno, las lecturas se
+interpolan entre los dos últimos estados con ``alfa`` (fracción del paso en
+curso), así que a alta frecuencia tampoco se repiten valores escalonados.
+
+``ModeloConduccion`` es la dinámica de los modos de emu2.py y emu2_ipc.py
+(ralenti, ciudad, carretera, falla y los ciclos de ciclos.py) sobre este reloj.
+
+Ejemplo:
+    modelo = ModeloConduccion(semilla=1)
+    modelo.set_modo("ciudad")
+    modelo.actualizar()          # corre los pasos pendientes
+    modelo.valores()             # {'rpm': ..., 'vel': ...} interpolados
+"""
+import math
+import random
+import time
+from typing import Callable, Dict, Optional
+
+PASO_FISICO = 0.1  # segundos
+MAX_SUBPASOS = 100  # tope por actualización (evita la espiral de pasos atrasados)
+# Claves de ciclos.CICLOS. Se repiten aquí para listar los ciclos sin importar
+# NumPy; la traza solo se carga al elegir uno (ModeloConduccion.set_modo).
+CICLOS_ESTANDAR = ("nedc", "wltp", "ftp75", "ralenti_prolongado")
+
+
+class RelojFisico:
+    """Acumula tiempo de pared y lo consume en pasos fijos."""
+
+    def __init__(self, paso: float = PASO_FISICO, reloj: Callable[[], float] = time.monotonic,
+                 max_subpasos: int = MAX_SUBPASOS):
+        if paso <= 0:
+            raise ValueError("El paso de física debe ser positivo")
+        self.paso = paso
+        self.reloj = reloj
+        self.max_subpasos = max_subpasos
+        self.t = 0.0  # tiempo simulado al final del último paso
+        self.pasos = 0
+        self.descartado = 0.0  # segundos perdidos por superar max_subpasos
+        self._acumulado = 0.0
+        self._anterior = reloj()
+
+    @property
+    def alfa(self) -> float:
+        """Fracción (0-1) del paso en curso, para interpolar lecturas."""
+        return min(self._acumulado / self.paso, 1.0)
+
+    def avanzar(self, funcion_paso: Callable[[float], None]) -> int:
+        """Llama ``funcion_paso(paso)`` por cada paso pendiente; devuelve cuántos."""
+        ahora = self.reloj()
+        self._acumulado += max(0.0, ahora - self._anterior)
+        self._anterior = ahora
+        n = 0
+        while self._acumulado >= self.paso:
+            if n == self.max_subpasos:
+                self.descartado += self._acumulado - self._acumulado % self.paso
+                self._acumulado %= self.paso
+                break
+            funcion_paso(self.paso)
+            self._acumulado -= self.paso
+            self.t += self.paso
+            self.pasos += 1
+            n += 1
+        return n
+
+    def reiniciar(self):
+        self.t = 0.0
+        self._acumulado = 0.0
+        self._anterior = self.reloj()
+
+
+def interpolar(anterior: Dict[str, float], actual: Dict[str, float], alfa: float) -> Dict[str, float]:
+    return {k: anterior[k] + (v - anterior[k]) * alfa for k, v in actual.items()}
+
+
+def _ciclos():
+    try:
+        from . import ciclos
+    except ImportError:
+        import ciclos
+    return ciclos
+
+
+class ModeloConduccion:
+    """Modos de conducción de los emuladores emu2 sobre un ``RelojFisico``."""
+
+    MODOS = ("ralenti", "ciudad", "carretera", "falla")
+
+    def __init__(self, semilla: Optional[int] = None, paso: float = PASO_FISICO,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.modo = "ralenti"
+        self.falla = None
+        self.semilla = semilla
+        self.ciclo = None  # traza de ciclos.py si el modo es un ciclo
+        self.manual: Optional[Dict[str, float]] = None  # rpm/vel fijados en modo falla
+        self.rpm = 800.0
+        self.velocidad = 0.0
+        self.t = 0.0
+        self.reloj = RelojFisico(paso, reloj)
+        self._rnd = random.Random(semilla)
+        self._anterior = self._estado()
+
+    def _estado(self) -> Dict[str, float]:
+        return {"rpm": self.rpm, "vel": self.velocidad}
+
+    def set_modo(self, modo: str) -> bool:
+        try:
+            ciclos = None if modo in self.MODOS else _ciclos()
+        except ImportError as e:  # los ciclos necesitan NumPy
+            print(f"[FISICA] Ciclo {modo} no disponible: {e}")
+            return False
+        if ciclos is not None and modo not in ciclos.CICLOS:
+            return False
+        self.modo = modo
+        self.t = 0.0
+        self.falla = None
+        self.ciclo = ciclos.traza(modo, self.semilla or 0) if ciclos else None
+        return True
+
+    def fijar_manual(self, rpm: Optional[float] = None, vel: Optional[float] = None):
+        """Fija desde la GUI los canales indicados; los omitidos siguen al modelo."""
+        manual = {k: v for k, v in (("rpm", rpm), ("vel", vel)) if v is not None}
+        self.manual = manual or None
+
+    def actualizar(self) -> int:
+        """Corre los pasos de física pendientes según el reloj."""
+        return self.reloj.avanzar(self.paso)
+
+    def valores(self) -> Dict[str, float]:
+        """RPM y velocidad interpoladas entre los dos últimos pasos."""
+        if self.modo == "falla":  # valores erráticos: sin suavizar
+            return self._estado()
+        return interpolar(self._anterior, self._estado(), self.reloj.alfa)
+
+    def paso(self, dt: float):
+        self._anterior = self._estado()
+        self.t += dt
+        rnd, t = self._rnd, self.t
+        if self.ciclo is not None:
+            valores = self.ciclo.en(t)
+            self.rpm, self.velocidad = valores["rpm"], valores["vel"]
+        elif self.modo == "ralenti":
+            self.rpm = 800 + rnd.uniform(-20, 20)
+            self.velocidad = 0.0
+        elif self.modo == "ciudad":
+            self.rpm = 900 + 1200 * abs(math.sin(t / 15)) + rnd.uniform(-50, 50)
+            if t % 40 < 10:
+                self.velocidad = 0.0
+            elif t % 40 < 30:
+                self.velocidad = min(60.0, self.velocidad + rnd.uniform(0, 4) * dt)
+            else:
+                self.velocidad = max(0.0, self.velocidad - rnd.uniform(0, 6) * dt)
+        elif self.modo == "carretera":
+            self.rpm = 2200 + 600 * abs(math.sin(t / 30)) + rnd.uniform(-40, 40)
+            self.velocidad = 90 + 30 * abs(math.sin(t / 20)) + rnd.uniform(-5, 5)
+        elif self.modo == "falla":
+            # Simula fallas: valores erráticos o imposibles (o los de la GUI)
+            if self.manual is not None:
+                self.rpm = self.manual.get("rpm", self.rpm)
+                self.velocidad = self.manual.get("vel", self.velocidad)
+            elif self.falla == "sensor_rpm":
+                self.rpm = rnd.choice([0, 200, 8000, 3000])
+            elif self.falla == "sensor_vel":
+                self.velocidad = rnd.choice([0, 255, 10, 180])
+            elif self.falla == "dtc":
+                self.rpm, self.velocidad = 1200, 30
+            else:
+                self.rpm = rnd.randint(0, 8000)
+                self.velocidad = rnd.randint(0, 200)
+        else:
+            self.rpm, self.velocidad = 800.0, 0.0
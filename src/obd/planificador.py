@@ -0,0 +1,58 @@
+"""
+Planificador de lectura de PIDs por periodo.
+
+Cada PID tiene un periodo objetivo (p. ej. rpm cada 0.2 s, temp cada 5 s).
+El planificador entrega siempre el PID más atrasado, de modo que los rápidos
+no bloquean a los lentos y ninguno se lee más seguido de lo necesario.
+
+Los PIDs que devuelven NO DATA repetidamente se espacian (backoff x2 hasta
+``max_backoff``) para no gastar el bus en PIDs que el vehículo no soporta.
+"""
+import heapq
+import itertools
+import time
+from typing import Dict, Optional, Tuple
+
+
+class PlanificadorPIDs:
+    def __init__(self, periodos: Dict[str, float], max_backoff: int = 16):
+        if not periodos:
+            raise ValueError("El planificador necesita al menos un PID")
+        self.periodos = dict(periodos)
+        self.max_backoff = max_backoff
+        self._backoff: Dict[str, int] = {pid: 1 for pid in periodos}
+        self._vence: Dict[str, float] = {}
+        self._contador = itertools.count()
+        ahora = time.monotonic()
+        self._cola = [(ahora, next(self._contador), pid) for pid in periodos]
+        heapq.heapify(self._cola)
+
+    def proximo(self, ahora: Optional[float] = None) -> Tuple[str, float]:
+        """
+        Saca el siguiente PID a leer.
+
+        Returns:
+            (pid, espera): segundos a esperar antes de leerlo (0 si está atrasado).
+            Después de leerlo hay que llamar a ``completado()``.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        vence, _, pid = heapq.heappop(self._cola)
+        self._vence[pid] = vence
+        return pid, max(0.0, vence - ahora)
+
+    def completado(self, pid: str, ok: bool = True, ahora: Optional[float] = None):
+        """Reprograma ``pid`` tras una lectura (ok=False si no hubo datos)."""
+        ahora = time.monotonic() if ahora is None else ahora
+        if ok:
+            self._backoff[pid] = 1
+        else:
+            self._backoff[pid] = min(self._backoff[pid] * 2, self.max_backoff)
+        periodo = self.periodos[pid] * self._backoff[pid]
+        vence = self._vence.pop(pid, ahora) + periodo
+        if vence < ahora:
+            # Atrasado más de un periodo: no acumular lecturas pendientes
+            vence = ahora + periodo
+        heapq.heappush(self._cola, (vence, next(self._contador), pid))
+
+    def pendientes(self) -> int:
+        return len(self._cola)
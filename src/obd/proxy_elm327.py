@@ -0,0 +1,371 @@
+"""
+Proxy multiplexor para adaptadores ELM327 WiFi.
+
+Los adaptadores WiFi aceptan un único cliente TCP, así que el dashboard, el
+lector de DTC, el web dashboard y los scripts de captura se pelean por
+192.168.0.10:35000. Este proxy es el único dueño de la conexión al adaptador
+y expone el mismo protocolo de texto ELM327 a varios clientes locales:
+
+- Las peticiones de todos los clientes se encolan y un único planificador las
+  envía al adaptador en round-robin entre clientes (nadie monopoliza el bus).
+- Peticiones idénticas de modo 01/02/09 (y consultas AT de solo lectura como
+  ATRV) se agrupan: si hay una en vuelo se espera esa misma respuesta, y si
+  hay una respuesta más nueva que ``ventana_frescura`` se reutiliza.
+- El estado AT de presentación (eco, saltos de línea, espacios) se emula por
+  cliente sin tocar el adaptador. El estado que cambia lo que responde el
+  adaptador (ATH, ATSH, ATSP, ...) se guarda por cliente y se aplica al
+  adaptador solo antes de las peticiones de ese cliente, si hace falta.
+- ATZ/ATWS/ATD de un cliente reinician solo su estado virtual: el adaptador
+  real no se resetea bajo los pies de los demás.
+
+Los clientes se conectan al proxy como si fuera el adaptador, por ejemplo
+``dtc_manager.leer_dtc(ip="127.0.0.1", puerto=35001)`` o python-obd con
+``socket://127.0.0.1:35001``.
+
+Ejemplo:
+    python -m src.obd.proxy_elm327 --adaptador 192.168.0.10:35000 --escuchar 127.0.0.1:35001
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+IDENTIFICACION = "ELM327 v1.5"
+PUERTO_PROXY = 35001
+
+# Estado canónico del adaptador real: el proxy siempre lee con eco y saltos
+# apagados y con espacios, y re-formatea para cada cliente.
+_INICIALIZACION = ("ATZ", "ATE0", "ATL0", "ATS1", "ATH0")
+# Comandos AT que cambian el contenido de las respuestas del adaptador.
+# Se guardan por cliente (clave = prefijo) y se aplican de forma perezosa.
+_AT_ADAPTADOR = ("SH", "SP", "TP", "CAF", "CRA", "CF", "CM", "ST", "AT", "H", "AL", "FC", "PB")
+# Consultas AT sin efecto que se reenvían (y se pueden agrupar)
+_AT_CONSULTA = ("RV", "DP", "DPN", "I", "@1")
+# Modos OBD de solo lectura que se pueden agrupar entre clientes
+_MODOS_AGRUPABLES = ("01", "02", "09")
+
+
+class _Cliente:
+    """Estado virtual de una conexión de cliente al proxy."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.id = next(self._ids)
+        self.writer = writer
+        self.reset()
+
+    def reset(self):
+        self.eco = True
+        self.saltos = False
+        self.espacios = True
+        self.adaptador: Dict[str, str] = {}
+
+    def estado_adaptador(self) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted(self.adaptador.items()))
+
+
+class _Peticion:
+    __slots__ = ("cliente", "cmd", "estado", "futuro")
+
+    def __init__(self, cliente: _Cliente, cmd: str, estado, futuro: asyncio.Future):
+        self.cliente = cliente
+        self.cmd = cmd
+        self.estado = estado
+        self.futuro = futuro
+
+
+def _clasificar_at(at: str) -> Optional[str]:
+    """Prefijo de estado de adaptador al que pertenece un AT, o None."""
+    for prefijo in _AT_ADAPTADOR:
+        if at.startswith(prefijo):
+            return prefijo
+    return None
+
+
+class ProxyELM327:
+    """
+    Servidor asyncio que multiplexa varios clientes ELM327 sobre un adaptador.
+
+    Args:
+        host_adaptador / puerto_adaptador: dirección del adaptador real.
+        escuchar: (host, puerto) local donde aceptar clientes.
+        ventana_frescura: segundos durante los que una respuesta se reutiliza
+            para peticiones idénticas (0 = solo agrupar las que están en vuelo).
+        timeout: segundos máximos esperando el prompt ``>`` del adaptador.
+    """
+
+    def __init__(self, host_adaptador: str = "192.168.0.10", puerto_adaptador: int = 35000,
+                 escuchar: Tuple[str, int] = ("127.0.0.1", PUERTO_PROXY),
+                 ventana_frescura: float = 0.1, timeout: float = 5.0):
+        self.host_adaptador = host_adaptador
+        self.puerto_adaptador = puerto_adaptador
+        self.host, self.puerto = escuchar
+        self.ventana_frescura = ventana_frescura
+        self.timeout = timeout
+        self.stats = {"peticiones": 0, "enviadas": 0, "agrupadas": 0, "cache": 0,
+                      "reconexiones": 0, "errores": 0}
+        self._clientes: Dict[int, _Cliente] = {}
+        self._colas: Dict[int, deque] = {}
+        self._turno: deque = deque()
+        self._hay_trabajo = asyncio.Event()
+        self._en_vuelo: Dict[tuple, asyncio.Future] = {}
+        self._cache: Dict[tuple, Tuple[float, List[str]]] = {}
+        self._estado_real: Dict[str, str] = {}
+        self._up_reader: Optional[asyncio.StreamReader] = None
+        self._up_writer: Optional[asyncio.StreamWriter] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._planificador: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    async def iniciar(self):
+        self._server = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._server.sockets[0].getsockname()[1]
+        self._planificador = asyncio.create_task(self._planificar())
+        logger.info("Proxy ELM327 %s:%s -> %s:%s", self.host, self.puerto,
+                    self.host_adaptador, self.puerto_adaptador)
+        return self
+
+    async def detener(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._planificador is not None:
+            self._planificador.cancel()
+            try:
+                await self._planificador
+            except asyncio.CancelledError:
+                pass
+            self._planificador = None
+        await self._cerrar_adaptador()
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc):
+        await self.detener()
+
+    # ------------------------------------------------------------------
+    # Adaptador real
+    # ------------------------------------------------------------------
+    async def _conectar_adaptador(self):
+        self._up_reader, self._up_writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host_adaptador, self.puerto_adaptador), self.timeout
+        )
+        self._estado_real = {}
+        for cmd in _INICIALIZACION:
+            await self._enviar_crudo(cmd)
+        logger.info("Conectado al adaptador %s:%s", self.host_adaptador, self.puerto_adaptador)
+
+    async def _cerrar_adaptador(self):
+        if self._up_writer is not None:
+            self._up_writer.close()
+            try:
+                await self._up_writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._up_reader = self._up_writer = None
+        self._estado_real = {}
+
+    async def _enviar_crudo(self, cmd: str) -> List[str]:
+        """Envía un comando al adaptador y devuelve las líneas hasta el prompt."""
+        self._up_writer.write((cmd + "\r").encode("ascii"))
+        await self._up_writer.drain()
+        crudo = await asyncio.wait_for(self._up_reader.readuntil(b">"), self.timeout)
+        texto = crudo[:-1].decode("ascii", errors="ignore")
+        lineas = [l.strip() for l in texto.replace("\n", "\r").split("\r")]
+        # El eco puede seguir activo durante la inicialización (antes de ATE0)
+        return [l for l in lineas if l and l != cmd]
+
+    async def _sincronizar_estado(self, deseado: Dict[str, str]):
+        """Lleva el adaptador al estado AT que espera el cliente de la petición."""
+        if any(clave not in deseado for clave in self._estado_real):
+            # Volver a valores por defecto sin ATZ (más rápido) y re-aplicar
+            await self._enviar_crudo("ATD")
+            for cmd in _INICIALIZACION[1:]:
+                await self._enviar_crudo(cmd)
+            self._estado_real = {}
+        for clave, cmd in deseado.items():
+            if self._estado_real.get(clave) != cmd:
+                await self._enviar_crudo(cmd)
+                self._estado_real[clave] = cmd
+
+    async def _ejecutar(self, peticion: _Peticion) -> List[str]:
+        for intento in range(2):
+            try:
+                if self._up_writer is None:
+                    await self._conectar_adaptador()
+                await self._sincronizar_estado(dict(peticion.estado))
+                self.stats["enviadas"] += 1
+                return await self._enviar_crudo(peticion.cmd)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self.stats["errores"] += 1
+                logger.warning("Fallo con el adaptador (%s), reconectando", e)
+                await self._cerrar_adaptador()
+                self.stats["reconexiones"] += 1
+        return ["UNABLE TO CONNECT"]
+
+    # ------------------------------------------------------------------
+    # Planificador
+    # ------------------------------------------------------------------
+    def _encolar(self, peticion: _Peticion):
+        cola = self._colas.setdefault(peticion.cliente.id, deque())
+        if not cola:
+            self._turno.append(peticion.cliente.id)
+        cola.append(peticion)
+        self._hay_trabajo.set()
+
+    async def _planificar(self):
+        """Único dueño del adaptador: atiende un cliente por turno (round-robin)."""
+        while True:
+            await self._hay_trabajo.wait()
+            while self._turno:
+                cid = self._turno.popleft()
+                cola = self._colas.get(cid)
+                if not cola:
+                    continue
+                peticion = cola.popleft()
+                if cola:
+                    self._turno.append(cid)
+                clave = (peticion.cmd, peticion.estado)
+                try:
+                    lineas = await self._ejecutar(peticion)
+                except Exception:
+                    logger.exception("Error inesperado atendiendo %s", peticion.cmd)
+                    lineas = ["?"]
+                finally:
+                    self._en_vuelo.pop(clave, None)
+                if clave[0][:2] in _MODOS_AGRUPABLES or clave[0][2:] in _AT_CONSULTA:
+                    self._cache[clave] = (time.monotonic(), lineas)
+                if not peticion.futuro.done():
+                    peticion.futuro.set_result(lineas)
+            self._hay_trabajo.clear()
+
+    def _agrupable(self, cmd: str) -> bool:
+        if cmd.startswith("AT"):
+            return cmd[2:] in _AT_CONSULTA
+        return cmd[:2] in _MODOS_AGRUPABLES
+
+    async def solicitar(self, cliente: _Cliente, cmd: str) -> List[str]:
+        """Resuelve una petición OBD (o AT de consulta) a través del planificador."""
+        self.stats["peticiones"] += 1
+        estado = cliente.estado_adaptador()
+        clave = (cmd, estado)
+        if self._agrupable(cmd):
+            guardado = self._cache.get(clave)
+            if guardado and time.monotonic() - guardado[0] <= self.ventana_frescura:
+                self.stats["cache"] += 1
+                return guardado[1]
+            futuro = self._en_vuelo.get(clave)
+            if futuro is not None:
+                self.stats["agrupadas"] += 1
+                return await asyncio.shield(futuro)
+        futuro = asyncio.get_running_loop().create_future()
+        if self._agrupable(cmd):
+            self._en_vuelo[clave] = futuro
+        self._encolar(_Peticion(cliente, cmd, estado, futuro))
+        return await asyncio.shield(futuro)
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cliente = _Cliente(writer)
+        self._clientes[cliente.id] = cliente
+        logger.info("Cliente %s conectado", cliente.id)
+        try:
+            while True:
+                linea = await reader.readuntil(b"\r")
+                cmd = linea.decode("ascii", errors="ignore").strip().upper()
+                if not cmd:
+                    writer.write(b">")
+                    await writer.drain()
+                    continue
+                lineas = await self._procesar(cliente, cmd)
+                writer.write(self._formatear(cliente, cmd, lineas).encode("ascii"))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clientes.pop(cliente.id, None)
+            self._colas.pop(cliente.id, None)
+            writer.close()
+            logger.info("Cliente %s desconectado", cliente.id)
+
+    async def _procesar(self, cliente: _Cliente, cmd: str) -> List[str]:
+        compacto = cmd.replace(" ", "")
+        if not compacto.startswith("AT"):
+            return await self.solicitar(cliente, compacto)
+        at = compacto[2:]
+        if at in ("Z", "WS"):
+            cliente.reset()
+            return [IDENTIFICACION]
+        if at == "D":
+            cliente.reset()
+            return ["OK"]
+        if at[:1] in "ELS" and at[1:] in ("0", "1") and not at.startswith("SH"):
+            atributo = {"E": "eco", "L": "saltos", "S": "espacios"}[at[0]]
+            setattr(cliente, atributo, at[1:] == "1")
+            return ["OK"]
+        prefijo = _clasificar_at(at)
+        if prefijo is not None:
+            cliente.adaptador[prefijo] = compacto
+            return ["OK"]
+        # Consultas y AT desconocidos: se reenvían tal cual
+        return await self.solicitar(cliente, compacto)
+
+    @staticmethod
+    def _formatear(cliente: _Cliente, cmd: str, lineas: List[str]) -> str:
+        fin = "\r\n" if cliente.saltos else "\r"
+        eco = cmd + fin if cliente.eco else ""
+        if not cliente.espacios:
+            lineas = [l.replace(" ", "") if all(c in "0123456789ABCDEF " for c in l) else l
+                      for l in lineas]
+        return eco + "".join(l + fin for l in lineas) + fin + ">"
+
+    def estadisticas(self) -> Dict[str, int]:
+        datos = dict(self.stats)
+        datos["clientes"] = len(self._clientes)
+        return datos
+
+
+def _direccion(texto: str, puerto_defecto: int) -> Tuple[str, int]:
+    host, _, puerto = texto.partition(":")
+    return host, int(puerto) if puerto else puerto_defecto
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proxy multiplexor para adaptador ELM327 WiFi")
+    parser.add_argument("--adaptador", default="192.168.0.10:35000", help="host:puerto del ELM327")
+    parser.add_argument("--escuchar", default=f"127.0.0.1:{PUERTO_PROXY}", help="host:puerto local")
+    parser.add_argument("--frescura", type=float, default=0.1,
+                        help="Segundos que una respuesta se reutiliza para peticiones idénticas")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    host, puerto = _direccion(args.adaptador, 35000)
+
+    async def _run():
+        proxy = ProxyELM327(host, puerto, _direccion(args.escuchar, PUERTO_PROXY),
+                            ventana_frescura=args.frescura)
+        async with proxy:
+            print(f"[PROXY] Escuchando en {proxy.host}:{proxy.puerto} -> {host}:{puerto}")
+            while True:
+                await asyncio.sleep(30)
+                logger.info("Estadísticas: %s", proxy.estadisticas())
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        print("[PROXY] Detenido")
+
+
+if __name__ == "__main__":
+    main()
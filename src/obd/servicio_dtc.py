@@ -0,0 +1,116 @@
+"""
+Lectura de diagnóstico sobre la conexión ya abierta.
+
+``ServicioDTC`` lee en una sola ráfaga los DTC almacenados (modo 03),
+pendientes (07) y permanentes (0A), y el freeze frame (modo 02: DTC que lo
+originó y los PIDs de FREEZE_FRAME_PIDS), usando la conexión en vivo del
+dashboard o del daemon en lugar de abrir una nueva. No envía ``AT D``: la
+configuración del adaptador (eco, cabeceras, protocolo) queda intacta.
+
+Durante la ráfaga se pausa el sondeo periódico (``pausar``/``reanudar``) para
+que las lecturas de PIDs no se intercalen con los comandos de diagnóstico.
+
+Ejemplo (síncrono, socket del dashboard):
+    servicio = ServicioDTC(conexion._send_command, pausar=timer.stop, reanudar=timer.start)
+    resultado = servicio.leer()
+    resultado["almacenados"], resultado["freeze_frame"]
+
+Ejemplo (asyncio, ClienteELM327Async):
+    resultado = await ServicioDTC(cliente.comando).leer_async()
+"""
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence
+
+from .decodificador import Decodificador
+from .dtc import FREEZE_FRAME_PIDS, MODOS_DTC, parsear_dtc_freeze_frame, parsear_dtcs
+
+
+def normalizar_respuesta(respuesta) -> List[str]:
+    """Acepta texto crudo ('43 01 01 33\\r\\r>') o una lista de líneas."""
+    if respuesta is None:
+        return []
+    if isinstance(respuesta, str):
+        respuesta = respuesta.replace(">", "").replace("\n", "\r").split("\r")
+    return [l.strip() for l in respuesta if l and l.strip() and l.strip() != "SEARCHING..."]
+
+
+class ServicioDTC:
+    def __init__(self, enviar: Callable, pausar: Optional[Callable[[], Any]] = None,
+                 reanudar: Optional[Callable[[], Any]] = None,
+                 freeze_pids: Sequence[str] = FREEZE_FRAME_PIDS,
+                 decodificador: Optional[Decodificador] = None, can: Optional[bool] = None):
+        """
+        Args:
+            enviar: ``enviar(cmd)`` devuelve la respuesta (texto o líneas); en
+                ``leer_async`` debe ser una corrutina (p. ej. ClienteELM327Async.comando).
+            pausar, reanudar: detienen y reanudan el sondeo de PIDs.
+            can: si el protocolo es CAN (``dtc.es_can``); None = deducirlo de la respuesta.
+        """
+        self.enviar = enviar
+        self.pausar = pausar
+        self.reanudar = reanudar
+        self.freeze_pids = tuple(freeze_pids)
+        self.decodificador = decodificador or Decodificador()
+        self.can = can
+
+    def _rafaga(self, freeze_frame: bool) -> Generator[str, List[str], Dict[str, Any]]:
+        """Secuencia de comandos: recibe las líneas de cada respuesta y arma el resultado."""
+        resultado: Dict[str, Any] = {"freeze_frame": None, "comandos": 0}
+        for clave, modo in MODOS_DTC.items():
+            resultado[clave] = parsear_dtcs((yield modo), modo, self.can)
+        if freeze_frame:
+            dtc = parsear_dtc_freeze_frame((yield "020200"))
+            if dtc is not None:
+                valores = {}
+                for pid in self.freeze_pids:
+                    lineas = yield f"02{pid[2:]}00"
+                    valor = self.decodificador.decodificar_freeze_frame(pid, lineas)
+                    if valor is not None:
+                        valores[pid] = valor
+                resultado["freeze_frame"] = {"dtc": dtc, "valores": valores}
+        return resultado
+
+    def _inicio(self):
+        if self.pausar is not None:
+            self.pausar()
+        return time.perf_counter()
+
+    def _fin(self, resultado: Dict[str, Any], inicio: float) -> Dict[str, Any]:
+        resultado["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        return resultado
+
+    def leer(self, freeze_frame: bool = True) -> Dict[str, Any]:
+        """Ráfaga completa de diagnóstico con un ``enviar`` síncrono."""
+        inicio = self._inicio()
+        try:
+            rafaga = self._rafaga(freeze_frame)
+            cmd = next(rafaga)
+            n = 0
+            while True:
+                n += 1
+                try:
+                    cmd = rafaga.send(normalizar_respuesta(self.enviar(cmd)))
+                except StopIteration as fin:
+                    fin.value["comandos"] = n
+                    return self._fin(fin.value, inicio)
+        finally:
+            if self.reanudar is not None:
+                self.reanudar()
+
+    async def leer_async(self, freeze_frame: bool = True) -> Dict[str, Any]:
+        """Igual que ``leer`` con un ``enviar`` asíncrono."""
+        inicio = self._inicio()
+        try:
+            rafaga = self._rafaga(freeze_frame)
+            cmd = next(rafaga)
+            n = 0
+            while True:
+                n += 1
+                try:
+                    cmd = rafaga.send(normalizar_respuesta(await self.enviar(cmd)))
+                except StopIteration as fin:
+                    fin.value["comandos"] = n
+                    return self._fin(fin.value, inicio)
+        finally:
+            if self.reanudar is not None:
+                self.reanudar()
@@ -0,0 +1,360 @@
+"""
+Simulador TCP de un adaptador ELM327 WiFi (asyncio, sin dependencias).
+
+Responde como un ELM327 v1.5 sobre TCP: comandos AT básicos (eco, saltos de
+línea, espacios, cabeceras, protocolo, cabecera de envío) y peticiones OBD-II
+de los modos 01, 02, 03, 04, 07, 09 y 0A. Sirve para probar el dashboard, el
+proxy multiplexor y los scripts de captura sin hardware.
+
+- ``max_clientes=1`` reproduce la limitación de los adaptadores WiFi reales
+  (una sola conexión TCP a la vez).
+- ``latencia`` simula el tiempo de ida y vuelta al bus por petición OBD.
+- ``VehiculoSimulado.fijar()`` permite fijar el estado del vehículo (rpm, vel, temp, ...).
+- ``VehiculoSimulado(ciclo="wltp", semilla=1)`` reproduce un ciclo de
+  conducción estándar precalculado (ver src/obd/ciclos.py), igual en cada corrida.
+- ``fallas=InyectorFallas(...)`` inyecta NO DATA, BUFFER FULL, CAN ERROR,
+  STOPPED, SEARCHING, desconexiones y picos de latencia (ver src/obd/fallas_elm327.py).
+
+Ejemplo:
+    python -m src.obd.simulador_elm327 --puerto 35000
+    python -m src.obd.simulador_elm327 --ciclo ftp75 --semilla 1
+    python -m src.obd.simulador_elm327 --fallas fallas.json
+"""
+import argparse
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from .fallas_elm327 import RESPUESTAS as RESPUESTAS_FALLA, InyectorFallas
+
+logger = logging.getLogger(__name__)
+
+IDENTIFICACION = "ELM327 v1.5"
+PROTOCOLOS = {
+    "0": "AUTO",
+    "6": "ISO 15765-4 (CAN 11/500)",
+    "7": "ISO 15765-4 (CAN 29/500)",
+    "8": "ISO 15765-4 (CAN 11/250)",
+    "9": "ISO 15765-4 (CAN 29/250)",
+}
+VIN_POR_DEFECTO = "MR0HA3CD200000001"
+
+# AT que solo responden OK (no cambian nada observable en el simulador)
+_AT_ACEPTADOS = ("AT", "ST", "CAF", "CFC", "MA", "AL", "NL", "CRA", "FC", "M", "PC", "SS")
+
+
+def _codificar_dtc(codigo: str) -> str:
+    """'P0300' -> '0300' (dos bytes hex según SAE J2012)."""
+    primero = "PCBU".index(codigo[0].upper()) << 2 | int(codigo[1])
+    return f"{primero:X}{codigo[2:].upper()}"
+
+
+class VehiculoSimulado:
+    """
+    Estado del vehículo simulado. Los valores evolucionan con el tiempo de
+    pared salvo los que se fijan explícitamente con ``fijar()``. Con ``ciclo``
+    siguen la traza de ese ciclo de conducción en lugar de las senoides.
+    """
+
+    def __init__(self, vin: str = VIN_POR_DEFECTO, dtcs=None, dtcs_pendientes=None,
+                 dtcs_permanentes=None, semilla: Optional[int] = None,
+                 ciclo: Optional[str] = None):
+        self.vin = vin
+        self.dtcs: List[str] = list(dtcs or [])
+        self.dtcs_pendientes: List[str] = list(dtcs_pendientes or [])
+        self.dtcs_permanentes: List[str] = list(dtcs_permanentes or [])
+        self.fijos: Dict[str, float] = {}
+        self._inicio = time.monotonic()
+        self._rnd = random.Random(semilla)
+        self._ciclo = None
+        if ciclo:
+            from .ciclos import ReproductorCiclo  # NumPy solo si se usa un ciclo
+
+            self._ciclo = ReproductorCiclo(ciclo, semilla=semilla or 0)
+
+    def fijar(self, **valores):
+        """Fija valores (rpm, vel, temp, temp_aire, maf, carga, tps, map, voltaje)."""
+        self.fijos.update(valores)
+
+    def valores(self) -> Dict[str, float]:
+        if self._ciclo is not None:
+            base = self._valores_ciclo()
+            base.update(self.fijos)
+            return base
+        t = time.monotonic() - self._inicio
+        base = {
+            "rpm": 800 + 1400 * abs(math.sin(t / 15)) + self._rnd.uniform(-30, 30),
+            "vel": 50 * abs(math.sin(t / 20)),
+            "temp": min(90.0, 40 + t),
+            "temp_aire": 25.0,
+            "maf": 5 + 25 * abs(math.sin(t / 15)),
+            "carga": 20 + 40 * abs(math.sin(t / 15)),
+            "tps": 12 + 30 * abs(math.sin(t / 15)),
+            "map": 35 + 60 * abs(math.sin(t / 15)),
+            "voltaje": 14.1,
+        }
+        base.update(self.fijos)
+        return base
+
+    def _valores_ciclo(self) -> Dict[str, float]:
+        v = self._ciclo.valores()
+        return {
+            "rpm": v["rpm"],
+            "vel": v["vel"],
+            "temp": v["temp"],
+            "temp_aire": v["temp_aire"],
+            "maf": v["maf"],
+            "carga": v["carga_motor"],
+            "tps": v["throttle"],
+            "map": v["presion_adm"],
+            "voltaje": v["volt_bateria"],
+        }
+
+    def datos_pid(self, pid: int) -> Optional[bytes]:
+        """Bytes de datos (A, B, ...) del modo 01 para un PID, o None si no existe."""
+        v = self.valores()
+        if pid == 0x00:
+            # PIDs soportados 01-20: 04 05 0B 0C 0D 0F 10 11
+            return bytes([0x18, 0x3B, 0x80, 0x00])
+        if pid == 0x04:
+            return bytes([int(v["carga"] * 255 / 100) & 0xFF])
+        if pid == 0x05:
+            return bytes([int(v["temp"] + 40) & 0xFF])
+        if pid == 0x0B:
+            return bytes([int(v["map"]) & 0xFF])
+        if pid == 0x0C:
+            raw = int(v["rpm"] * 4) & 0xFFFF
+            return raw.to_bytes(2, "big")
+        if pid == 0x0D:
+            return bytes([int(v["vel"]) & 0xFF])
+        if pid == 0x0F:
+            return bytes([int(v["temp_aire"] + 40) & 0xFF])
+        if pid == 0x10:
+            raw = int(v["maf"] * 100) & 0xFFFF
+            return raw.to_bytes(2, "big")
+        if pid == 0x11:
+            return bytes([int(v["tps"] * 255 / 100) & 0xFF])
+        return None
+
+
+class _EstadoCliente:
+    """Configuración AT de una conexión (cada conexión arranca en valores por defecto)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.eco = True
+        self.saltos = False
+        self.espacios = True
+        self.cabeceras = False
+        self.protocolo = "0"
+        self.cabecera_envio = "7DF"
+
+
+class SimuladorELM327:
+    """Servidor asyncio que habla el protocolo de texto del ELM327."""
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 35000,
+                 vehiculo: Optional[VehiculoSimulado] = None, latencia: float = 0.0,
+                 max_clientes: Optional[int] = None, fallas=None):
+        self.host = host
+        self.puerto = puerto
+        self.vehiculo = vehiculo or VehiculoSimulado()
+        self.latencia = latencia
+        self.max_clientes = max_clientes
+        self.fallas = fallas  # InyectorFallas opcional
+        self.clientes = 0
+        self.peticiones_obd = 0
+        self.comandos = deque(maxlen=1000)  # últimos comandos recibidos (diagnóstico)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self):
+        self._server = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._server.sockets[0].getsockname()[1]
+        if self.fallas is not None:
+            self.fallas.reiniciar()
+        logger.info("Simulador ELM327 escuchando en %s:%s", self.host, self.puerto)
+        return self
+
+    async def detener(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc):
+        await self.detener()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.max_clientes is not None and self.clientes >= self.max_clientes:
+            # Igual que un adaptador WiFi ocupado: acepta y corta
+            writer.close()
+            return
+        if self.fallas is not None and self.fallas.corte_activo("desconexion"):
+            writer.close()  # adaptador reiniciándose: acepta y corta
+            return
+        self.clientes += 1
+        estado = _EstadoCliente()
+        try:
+            while True:
+                linea = await reader.readuntil(b"\r")
+                cmd = linea.decode("ascii", errors="ignore").strip().upper()
+                if not cmd:
+                    writer.write(b">")
+                    await writer.drain()
+                    continue
+                self.comandos.append(cmd)
+                respuesta = await self.procesar(cmd, estado)
+                writer.write(self._formatear(cmd, respuesta, estado).encode("ascii"))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clientes -= 1
+            writer.close()
+
+    def _formatear(self, cmd: str, lineas: List[str], estado: _EstadoCliente) -> str:
+        fin = "\r\n" if estado.saltos else "\r"
+        eco = cmd + fin if estado.eco else ""
+        if not estado.espacios:
+            lineas = [l.replace(" ", "") if _es_hex(l) else l for l in lineas]
+        return eco + "".join(l + fin for l in lineas) + fin + ">"
+
+    async def procesar(self, cmd: str, estado: _EstadoCliente) -> List[str]:
+        """Procesa un comando ya normalizado y devuelve las líneas de respuesta."""
+        cmd = cmd.replace(" ", "")
+        if cmd.startswith("AT"):
+            return self._procesar_at(cmd[2:], estado)
+        if not _es_hex(cmd) or len(cmd) < 2 or len(cmd) % 2:
+            return ["?"]
+        self.peticiones_obd += 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        falla = self.fallas.decidir() if self.fallas is not None else None
+        if falla is not None:
+            if falla["tipo"] == "desconexion":
+                raise ConnectionResetError("desconexión inyectada")
+            if falla["tipo"] == "latencia":
+                await asyncio.sleep(falla["segundos"])
+            else:
+                return list(RESPUESTAS_FALLA[falla["tipo"]])
+        return self._procesar_obd(cmd, estado)
+
+    def _procesar_at(self, at: str, estado: _EstadoCliente) -> List[str]:
+        if at in ("Z", "WS"):
+            estado.reset()
+            return [IDENTIFICACION]
+        if at == "D":
+            estado.reset()
+            return ["OK"]
+        if at == "I":
+            return [IDENTIFICACION]
+        if at == "@1":
+            return ["OBDII to RS232 Interpreter"]
+        if at == "RV":
+            return [f"{self.vehiculo.valores()['voltaje']:.1f}V"]
+        if at == "DP":
+            if estado.protocolo == "0":
+                return ["AUTO, " + PROTOCOLOS["6"]]
+            return [PROTOCOLOS[estado.protocolo]]
+        if at == "DPN":
+            # En automático el simulador "detecta" CAN 11/500
+            return ["A6" if estado.protocolo == "0" else estado.protocolo]
+        if at[:1] in "ELSH" and at[1:] in ("0", "1"):
+            valor = at[1:] == "1"
+            atributo = {"E": "eco", "L": "saltos", "S": "espacios", "H": "cabeceras"}[at[0]]
+            setattr(estado, atributo, valor)
+            return ["OK"]
+        if at.startswith("SP") or at.startswith("TP"):
+            protocolo = at[2:].lstrip("A") or "0"
+            if protocolo not in PROTOCOLOS:
+                return ["?"]
+            estado.protocolo = protocolo
+            return ["OK"]
+        if at.startswith("SH") and _es_hex(at[2:]) and len(at) in (5, 8):
+            estado.cabecera_envio = at[2:]
+            return ["OK"]
+        if any(at.startswith(p) for p in _AT_ACEPTADOS):
+            return ["OK"]
+        return ["?"]
+
+    def _procesar_obd(self, cmd: str, estado: _EstadoCliente) -> List[str]:
+        modo = int(cmd[:2], 16)
+        datos = bytes.fromhex(cmd[2:])
+        if modo == 0x02 and len(datos) != 2 or modo == 0x02 and datos[1] != 0x00:
+            return ["NO DATA"]  # modo 02 exige PID y número de frame (solo existe el 00)
+        if modo == 0x02 and datos[0] == 0x02:
+            # DTC que originó el freeze frame: el primero almacenado
+            codigo = _codificar_dtc(self.vehiculo.dtcs[0]) if self.vehiculo.dtcs else "0000"
+            return [self._trama(b"\x42\x02\x00" + bytes.fromhex(codigo), estado)]
+        if modo in (0x01, 0x02) and datos:
+            payload = self.vehiculo.datos_pid(datos[0])
+            if payload is None:
+                return ["NO DATA"]
+            extra = b"\x00" if modo == 0x02 else b""  # frame de freeze frame
+            return [self._trama(bytes([modo + 0x40, datos[0]]) + extra + payload, estado)]
+        if modo in (0x03, 0x07, 0x0A):
+            lista = {0x03: self.vehiculo.dtcs, 0x07: self.vehiculo.dtcs_pendientes,
+                     0x0A: self.vehiculo.dtcs_permanentes}[modo]
+            payload = bytes([modo + 0x40, len(lista)])
+            for codigo in lista:
+                payload += bytes.fromhex(_codificar_dtc(codigo))
+            return [self._trama(payload, estado)]
+        if modo == 0x04:
+            self.vehiculo.dtcs.clear()
+            self.vehiculo.dtcs_pendientes.clear()
+            return [self._trama(b"\x44", estado)]
+        if modo == 0x09 and datos and datos[0] == 0x02:
+            payload = b"\x49\x02\x01" + self.vehiculo.vin.encode("ascii")
+            return [self._trama(payload, estado)]
+        return ["NO DATA"]
+
+    @staticmethod
+    def _trama(payload: bytes, estado: _EstadoCliente) -> str:
+        texto = " ".join(f"{b:02X}" for b in payload)
+        if estado.cabeceras:
+            return f"7E8 {len(payload):02X} {texto}"
+        return texto
+
+
+def _es_hex(texto: str) -> bool:
+    return bool(texto) and all(c in "0123456789ABCDEFabcdef " for c in texto)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador TCP de adaptador ELM327")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=35000)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por petición OBD")
+    parser.add_argument("--un-cliente", action="store_true", help="Aceptar una sola conexión (como WiFi real)")
+    parser.add_argument("--ciclo", help="Ciclo de conducción: wltp, ftp75, nedc, ralenti_prolongado")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--fallas", help="JSON con reglas y cortes de fallas a inyectar")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def _run():
+        vehiculo = VehiculoSimulado(semilla=args.semilla, ciclo=args.ciclo)
+        sim = SimuladorELM327(args.host, args.puerto, vehiculo=vehiculo, latencia=args.latencia,
+                              max_clientes=1 if args.un_cliente else None,
+                              fallas=InyectorFallas.desde_json(args.fallas) if args.fallas else None)
+        async with sim:
+            print(f"[SIMULADOR] ELM327 en {args.host}:{sim.puerto} (Ctrl+C para salir)")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        print("[SIMULADOR] Detenido")
+
+
+if __name__ == "__main__":
+    main()
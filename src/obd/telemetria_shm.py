@@ -0,0 +1,294 @@
+"""
+Anillo de telemetría en memoria compartida para consumidores multi-proceso.
+
+Reemplaza el uso de ``multiprocessing.Manager().dict()`` (cada acceso es una
+llamada RPC al proceso manager) por un bloque ``multiprocessing.shared_memory``
+con layout struct-of-arrays:
+
+    [cabecera][nombres de campos][seq por slot][columna 0][columna 1]...
+
+- Un único productor (proceso de adquisición o emulador) publica muestras.
+- Varios lectores (GUI, web dashboard, grabador) se adjuntan por nombre y leen
+  sin bloquear al productor.
+- Cada slot tiene un contador seqlock: impar mientras se escribe, par cuando
+  la muestra está completa. El lector reintenta si detecta escritura en curso.
+- Con NumPy disponible, ``columna()`` entrega vistas sin copia sobre el buffer.
+
+Ejemplo de uso:
+    anillo = AnilloTelemetria.crear(("ts", "rpm", "vel"), capacidad=4096)
+    anillo.publicar({"ts": time.time(), "rpm": 850, "vel": 0})
+
+    lector = AnilloTelemetria.adjuntar(anillo.nombre)
+    print(lector.ultimo())  # {'ts': ..., 'rpm': 850.0, 'vel': 0.0}
+"""
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: se usa memoryview como respaldo
+    np = None
+
+MAGIC = b"OBDR"
+VERSION = 1
+# magic, version, capacidad, n_campos, escritos (total de muestras publicadas)
+_CABECERA = struct.Struct("<4sIQQQ")
+_TAM_CABECERA = 64
+_TAM_NOMBRE = 32
+_OFFSET_ESCRITOS = 24
+_MAX_REINTENTOS = 1000
+
+CAMPOS_POR_DEFECTO = ("ts", "rpm", "vel")
+
+
+class AnilloTelemetriaError(Exception):
+    """Error de formato o uso del anillo de telemetría."""
+    pass
+
+
+def _adjuntar_sin_rastreo(nombre: str) -> shared_memory.SharedMemory:
+    """
+    Abre un segmento existente sin que el resource_tracker del lector lo
+    elimine al terminar (solo el creador debe hacer unlink).
+    """
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    from multiprocessing import resource_tracker
+
+    # Si el tracker ya existe fue heredado del proceso creador: no tocarlo.
+    heredado = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+    shm = shared_memory.SharedMemory(name=nombre)
+    if os.name == "posix" and not heredado:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class AnilloTelemetria:
+    """
+    Buffer circular de muestras numéricas (float64) en memoria compartida,
+    con un seqlock por slot. Un productor, N lectores.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, propietario: bool):
+        self._shm = shm
+        self.propietario = propietario
+        magic, version, capacidad, n_campos, _ = _CABECERA.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise AnilloTelemetriaError(f"Segmento '{shm.name}' no es un anillo de telemetría válido")
+        self.capacidad = int(capacidad)
+        self.campos: Tuple[str, ...] = tuple(
+            bytes(shm.buf[_TAM_CABECERA + i * _TAM_NOMBRE:_TAM_CABECERA + (i + 1) * _TAM_NOMBRE])
+            .rstrip(b"\0").decode("utf-8")
+            for i in range(n_campos)
+        )
+        self._indice = {campo: i for i, campo in enumerate(self.campos)}
+        off_seq = _TAM_CABECERA + n_campos * _TAM_NOMBRE
+        off_datos = off_seq + self.capacidad * 8
+        self._cab = shm.buf[_OFFSET_ESCRITOS:_OFFSET_ESCRITOS + 8].cast("Q")
+        if np is not None:
+            self._seq = np.ndarray((self.capacidad,), dtype=np.uint64, buffer=shm.buf, offset=off_seq)
+            self._datos = np.ndarray((n_campos, self.capacidad), dtype=np.float64,
+                                     buffer=shm.buf, offset=off_datos)
+            self._cols = [self._datos[i] for i in range(n_campos)]
+        else:
+            self._seq = shm.buf[off_seq:off_datos].cast("Q")
+            tam_col = self.capacidad * 8
+            self._datos = None
+            self._cols = [
+                shm.buf[off_datos + i * tam_col:off_datos + (i + 1) * tam_col].cast("d")
+                for i in range(n_campos)
+            ]
+
+    # ------------------------------------------------------------------
+    # Creación / adjunto
+    # ------------------------------------------------------------------
+    @staticmethod
+    def tamano_requerido(n_campos: int, capacidad: int) -> int:
+        """Bytes necesarios para un anillo con n_campos columnas y capacidad slots."""
+        return _TAM_CABECERA + n_campos * _TAM_NOMBRE + capacidad * 8 * (1 + n_campos)
+
+    @classmethod
+    def crear(cls, campos: Sequence[str] = CAMPOS_POR_DEFECTO, capacidad: int = 1024,
+              nombre: Optional[str] = None) -> "AnilloTelemetria":
+        """
+        Crea un anillo nuevo (el proceso que lo crea es el propietario y debe
+        llamar a ``destruir()`` al terminar).
+        """
+        if capacidad < 1:
+            raise AnilloTelemetriaError("La capacidad debe ser >= 1")
+        if not campos or len(set(campos)) != len(campos):
+            raise AnilloTelemetriaError("Los campos deben ser no vacíos y únicos")
+        for campo in campos:
+            if len(campo.encode("utf-8")) >= _TAM_NOMBRE:
+                raise AnilloTelemetriaError(f"Nombre de campo demasiado largo: {campo}")
+        tam = cls.tamano_requerido(len(campos), capacidad)
+        shm = shared_memory.SharedMemory(name=nombre, create=True, size=tam)
+        shm.buf[:tam] = bytes(tam)
+        _CABECERA.pack_into(shm.buf, 0, MAGIC, VERSION, capacidad, len(campos), 0)
+        for i, campo in enumerate(campos):
+            inicio = _TAM_CABECERA + i * _TAM_NOMBRE
+            nombre_b = campo.encode("utf-8")
+            shm.buf[inicio:inicio + len(nombre_b)] = nombre_b
+        return cls(shm, propietario=True)
+
+    @classmethod
+    def adjuntar(cls, nombre: str) -> "AnilloTelemetria":
+        """Se adjunta (como lector o productor secundario) a un anillo existente."""
+        return cls(_adjuntar_sin_rastreo(nombre), propietario=False)
+
+    @property
+    def nombre(self) -> str:
+        """Nombre del segmento, para pasarlo a otros procesos."""
+        return self._shm.name
+
+    @property
+    def escritos(self) -> int:
+        """Total de muestras publicadas desde la creación (cursor global)."""
+        return int(self._cab[0])
+
+    # ------------------------------------------------------------------
+    # Productor
+    # ------------------------------------------------------------------
+    def publicar(self, valores: Union[Dict[str, float], Sequence[float]]) -> int:
+        """
+        Publica una muestra. Acepta un dict {campo: valor} (campos faltantes
+        quedan en NaN) o una secuencia en el orden de ``campos``.
+
+        Returns:
+            int: número de secuencia global de la muestra publicada.
+        """
+        if isinstance(valores, dict):
+            valores = [valores.get(campo) for campo in self.campos]
+        elif len(valores) != len(self.campos):
+            raise AnilloTelemetriaError(
+                f"Se esperaban {len(self.campos)} valores, llegaron {len(valores)}"
+            )
+        n = int(self._cab[0])
+        slot = n % self.capacidad
+        seq = int(self._seq[slot])
+        self._seq[slot] = seq + 1  # impar: escritura en curso
+        for col, valor in zip(self._cols, valores):
+            col[slot] = float("nan") if valor is None else float(valor)
+        self._seq[slot] = seq + 2  # par: muestra completa
+        self._cab[0] = n + 1
+        return n
+
+    # ------------------------------------------------------------------
+    # Lectores
+    # ------------------------------------------------------------------
+    def _leer_slot(self, slot: int) -> Optional[Tuple[float, ...]]:
+        """Copia consistente de un slot usando el seqlock (None si no se logra)."""
+        for _ in range(_MAX_REINTENTOS):
+            antes = int(self._seq[slot])
+            if antes & 1:
+                continue
+            fila = tuple(float(col[slot]) for col in self._cols)
+            if int(self._seq[slot]) == antes:
+                return fila
+        return None
+
+    def ultimo(self) -> Optional[Dict[str, float]]:
+        """Última muestra completa como dict, o None si aún no hay datos."""
+        for _ in range(_MAX_REINTENTOS):
+            n = int(self._cab[0])
+            if n == 0:
+                return None
+            fila = self._leer_slot((n - 1) % self.capacidad)
+            # Si el productor dio una vuelta completa mientras leíamos, reintentar
+            if fila is not None and int(self._cab[0]) - n < self.capacidad:
+                return dict(zip(self.campos, fila))
+        return None
+
+    def leer_nuevos(self, cursor: int, maximo: Optional[int] = None) -> Tuple[List[Tuple[float, ...]], int, int]:
+        """
+        Lee las muestras publicadas desde ``cursor``.
+
+        Args:
+            cursor: valor devuelto por la llamada anterior (0 al comenzar).
+            maximo: tope de filas a devolver (None = todas las disponibles).
+
+        Returns:
+            (filas, nuevo_cursor, perdidas): filas como tuplas en el orden de
+            ``campos``; ``perdidas`` cuenta las muestras sobrescritas antes de
+            poder leerlas (lector demasiado lento).
+        """
+        fin = int(self._cab[0])
+        perdidas = 0
+        if fin - cursor > self.capacidad:
+            perdidas = fin - self.capacidad - cursor
+            cursor = fin - self.capacidad
+        if maximo is not None:
+            fin = min(fin, cursor + maximo)
+        filas = []
+        for n in range(cursor, fin):
+            fila = self._leer_slot(n % self.capacidad)
+            if fila is None or int(self._cab[0]) - n > self.capacidad:
+                perdidas += 1
+                continue
+            filas.append(fila)
+        return filas, fin, perdidas
+
+    def ventana(self, n: int) -> Dict[str, List[float]]:
+        """Copia consistente de las últimas ``n`` muestras, en orden cronológico."""
+        total = self.escritos
+        n = min(n, total, self.capacidad)
+        filas, _, _ = self.leer_nuevos(total - n)
+        return {campo: [fila[i] for fila in filas] for i, campo in enumerate(self.campos)}
+
+    def columna(self, campo: str):
+        """
+        Vista sin copia de una columna completa (orden físico del anillo).
+        Con NumPy devuelve un ``ndarray`` sobre la memoria compartida; sin NumPy
+        un ``memoryview`` de floats. Útil para gráficas: no usa el seqlock, así
+        que el slot en escritura puede estar a medio actualizar.
+        """
+        try:
+            return self._cols[self._indice[campo]]
+        except KeyError:
+            raise AnilloTelemetriaError(f"Campo desconocido: {campo}")
+
+    def slot_actual(self) -> int:
+        """Slot físico de la última muestra publicada (-1 si no hay datos)."""
+        n = self.escritos
+        return (n - 1) % self.capacidad if n else -1
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def cerrar(self):
+        """Libera las vistas locales y cierra el segmento en este proceso."""
+        self._cols = []
+        self._seq = None
+        self._datos = None
+        if self._cab is not None:
+            self._cab.release()
+            self._cab = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Alguna vista NumPy externa sigue viva; el SO libera al salir
+            pass
+
+    def destruir(self):
+        """Cierra y elimina el segmento (solo el propietario)."""
+        self.cerrar()
+        if self.propietario:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.propietario:
+            self.destruir()
+        else:
+            self.cerrar()
+        return False
+
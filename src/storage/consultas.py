@@ -0,0 +1,102 @@
+"""
+Consultas por rango de tiempo sobre el archivo de sesiones.
+
+``consultar_serie(store, sesion, pids, t0, t1, resolucion)`` devuelve, por PID,
+buckets con min/max/media/último:
+
+- Con ``resolucion=None`` se elige automáticamente la más fina que no supere
+  ``max_puntos`` buckets en el rango pedido.
+- Se leen los rollups materializados (1 s, 10 s, 60 s). Resoluciones mayores
+  múltiplos de ellas (p. ej. 300 s) se re-agregan en SQL desde el rollup base.
+- Solo con zoom por debajo de 1 s se leen las muestras crudas.
+
+Ejemplo:
+    store = SessionStore("sesiones.db")
+    datos = consultar_serie(store, "hilux-sesion_20250610_080000", ["rpm", "vel"])
+    datos["resolucion"], datos["series"]["rpm"][0]
+    # 60, {"t": 1749542400, "min": 780.0, "max": 2450.0, "media": 1320.5, "ultimo": 900.0, "n": 300}
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from .sesiones import RESOLUCIONES, SessionStore
+
+MAX_PUNTOS = 1500
+
+
+def elegir_resolucion(t0: float, t1: float, max_puntos: int = MAX_PUNTOS) -> int:
+    """Resolución (segundos por bucket) para que el rango quepa en ``max_puntos``."""
+    necesaria = max(t1 - t0, 0) / max(max_puntos, 1)
+    if necesaria < RESOLUCIONES[0]:
+        return 0  # crudo
+    for res in RESOLUCIONES:
+        if res >= necesaria:
+            return res
+    base = RESOLUCIONES[-1]
+    return int(base * -(-necesaria // base))  # múltiplo de 60 s hacia arriba
+
+
+def _crudo(store: SessionStore, sesion: str, pid: str, t0: float, t1: float) -> List[Dict[str, Any]]:
+    return [
+        {"t": ts, "min": v, "max": v, "media": v, "ultimo": v, "n": 1}
+        for ts, v in store.muestras(sesion, pid, t0, t1)
+    ]
+
+
+def _rollup(store: SessionStore, sesion: str, pid: str, t0: float, t1: float,
+            resolucion: int) -> List[Dict[str, Any]]:
+    base = max(r for r in RESOLUCIONES if resolucion % r == 0)
+    factor = resolucion // base
+    rango = (sesion, pid, base, int(t0 // base), int(t1 // base))
+    filtro = "sesion = ? AND pid = ? AND resolucion = ? AND bucket >= ? AND bucket <= ?"
+    if factor == 1:
+        sql = (f"SELECT bucket * {base}, minimo, maximo, suma / n, ultimo, n "
+               f"FROM rollups WHERE {filtro} ORDER BY bucket")
+        params = rango
+    else:
+        # Re-agregado: el "último" de cada grupo es el del rollup con ts_ultimo mayor
+        sql = (
+            "SELECT g * ?, MIN(minimo), MAX(maximo), SUM(suma) / SUM(n), MAX(u), SUM(n) FROM ("
+            "  SELECT bucket / ? AS g, minimo, maximo, suma, n, "
+            "  FIRST_VALUE(ultimo) OVER (PARTITION BY bucket / ? ORDER BY ts_ultimo DESC) AS u "
+            f"  FROM rollups WHERE {filtro}"
+            ") GROUP BY g ORDER BY g"
+        )
+        params = (resolucion, factor, factor) + rango
+    with store._lock:
+        filas = store.conn.execute(sql, params).fetchall()
+    return [
+        {"t": t, "min": mn, "max": mx, "media": media, "ultimo": ultimo, "n": n}
+        for t, mn, mx, media, ultimo, n in filas
+    ]
+
+
+def consultar_serie(store: SessionStore, sesion: str, pids: Optional[Sequence[str]] = None,
+                    t0: Optional[float] = None, t1: Optional[float] = None,
+                    resolucion: Optional[float] = None, max_puntos: int = MAX_PUNTOS) -> Dict[str, Any]:
+    """
+    Serie agregada de una sesión.
+
+    Args:
+        pids: PIDs a consultar (None = todos los de la sesión).
+        t0, t1: rango en epoch segundos (None = toda la sesión).
+        resolucion: segundos por bucket; 0 = muestras crudas; None = automática.
+    """
+    info = store.sesion(sesion)
+    if info is None:
+        raise KeyError(f"Sesión desconocida: {sesion}")
+    t0 = info["inicio"] if t0 is None else t0
+    t1 = info["fin"] if t1 is None else t1
+    if t0 is None or t1 is None:
+        return {"sesion": sesion, "t0": t0, "t1": t1, "resolucion": resolucion, "series": {}}
+    pids = list(pids) if pids else store.pids(sesion)
+    if resolucion is None:
+        resolucion = elegir_resolucion(t0, t1, max_puntos)
+    if resolucion and (resolucion < RESOLUCIONES[0] or resolucion % RESOLUCIONES[0]):
+        raise ValueError(f"Resolución no soportada: {resolucion} (0 o múltiplo de 1 s)")
+    series = {}
+    for pid in pids:
+        if resolucion:
+            series[pid] = _rollup(store, sesion, pid, t0, t1, int(resolucion))
+        else:
+            series[pid] = _crudo(store, sesion, pid, t0, t1)
+    return {"sesion": sesion, "t0": t0, "t1": t1, "resolucion": resolucion, "series": series}
@@ -5,58 +5,109 @@
 # --- Validación automática de logs OBD-II ---
 # Se ejecuta tras cada exportación y notifica al usuario si el archivo cumple los estándares.
 # Ver src/storage/validador.py para detalles y criterios de validación.
+# --- Exportación en streaming ---
+# Las filas se escriben por lotes a medida que se leen (lista, iterador o
+# sesión del SessionStore), sin copiar el log completo en memoria. Formatos:
+# CSV, CSV comprimido (.csv.gz) y Parquet (columnar, requiere pyarrow).
 
 import csv
+import gzip
+import heapq
 from datetime import datetime, timedelta
+from itertools import groupby, islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
 from .validador import validar_log_csv
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional
+    pa = None
+    pq = None
+
+FORMATOS = ("csv", "csv.gz", "parquet")
+FILAS_POR_LOTE = 5000
+_VACIOS = (None, "", "None")
+
+
+def formato_de_archivo(filename: str) -> str:
+    """Formato según la extensión: .csv.gz/.gz, .parquet o CSV por defecto."""
+    nombre = filename.lower()
+    if nombre.endswith(".gz"):
+        return "csv.gz"
+    if nombre.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def _a_texto(valor: Any) -> str:
+    return "" if valor is None else str(valor)
+
+
+def _a_numero(valor: Any) -> Optional[float]:
+    if valor in _VACIOS:
+        return None
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
 
-def export_dynamic_log(filename, log_data, pids):
+def _escribir_csv(archivo, filas: Iterable[Mapping[str, Any]], columnas: Sequence[str], lote: int) -> int:
+    writer = csv.writer(archivo)
+    writer.writerow(columnas)
+    total = 0
+    filas = iter(filas)
+    while True:
+        bloque = [[_a_texto(fila.get(c)) for c in columnas] for fila in islice(filas, lote)]
+        if not bloque:
+            return total
+        writer.writerows(bloque)
+        total += len(bloque)
+
+
+def _escribir_parquet(filename: str, filas: Iterable[Mapping[str, Any]], columnas: Sequence[str],
+                      lote: int) -> int:
+    if pq is None:
+        raise RuntimeError("Exportar a Parquet requiere pyarrow (pip install pyarrow)")
+    texto = {"timestamp", "escenario"}
+    esquema = pa.schema([(c, pa.string() if c in texto else pa.float64()) for c in columnas])
+    total = 0
+    filas = iter(filas)
+    with pq.ParquetWriter(filename, esquema, compression="zstd") as writer:
+        while True:
+            bloque = list(islice(filas, lote))
+            if not bloque:
+                return total
+            datos = {
+                c: [(_a_texto(f.get(c)) if c in texto else _a_numero(f.get(c))) for f in bloque]
+                for c in columnas
+            }
+            writer.write_table(pa.table(datos, schema=esquema))  # un row group por lote
+            total += len(bloque)
+
+
+def exportar_stream(filename: str, filas: Iterable[Mapping[str, Any]], columnas: Sequence[str],
+                    formato: Optional[str] = None, lote: int = FILAS_POR_LOTE) -> int:
     """
-    Exporta el log OBD-II de forma dinámica y robusta.
-    - Siempre incluye la columna 'escenario' (modo/fase actual) en el encabezado y en cada fila,
-      aunque no esté en la lista de PIDs seleccionados.
-    - Solo columnas con nombres legibles (ej: 'rpm', 'vel', 'temp', ...).
-    - Solo incluye PIDs seleccionados y con datos en al menos un registro.
-    - Consistencia total: lo que se muestra en la UI es lo que se exporta.
-    - Sin columnas vacías ni duplicadas.
-    Uso recomendado: import y llamada desde dashboard/logger.
+    Escribe ``filas`` (dicts) con las ``columnas`` dadas, por lotes de ``lote``
+    filas y sin materializar el iterador. Devuelve la cantidad de filas escritas.
     """
-    if not log_data:
-        print(
-            "[EXPORT] No hay datos en memoria para exportar. Se generarán datos de prueba."
-        )
-        now = datetime.now()
-        log_data = []
-        for i in range(5):
-            entry = {pid: "" for pid in pids}
-            entry["timestamp"] = (now + timedelta(seconds=i)).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-            if "rpm" in pids:
-                entry["rpm"] = str(800 + i * 20)
-            if "vel" in pids:
-                entry["vel"] = str(i)
-            if "temp" in pids:
-                entry["temp"] = str(65 + i)
-            if "maf" in pids:
-                entry["maf"] = str(round(2.0 + 0.1 * i, 2)) if i % 2 == 0 else ""
-            entry["escenario"] = "prueba"
-            log_data.append(entry)
-    # Determina PIDs realmente activos y con datos
-    active_pids = set(["timestamp", "escenario"])
-    for row in log_data:
-        for pid in pids:
-            if pid != "timestamp" and row.get(pid) not in (None, "", "None"):
-                active_pids.add(pid)
-        # Forzar 'escenario' como activo si existe en el registro
-        if "escenario" in row:
-            active_pids.add("escenario")
-    # Ordena según pids originales, pero siempre antepone 'escenario' tras timestamp
+    formato = formato or formato_de_archivo(filename)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS)})")
+    if formato == "parquet":
+        return _escribir_parquet(filename, filas, columnas, lote)
+    abrir = gzip.open if formato == "csv.gz" else open
+    with abrir(filename, "wt", newline="", encoding="utf-8") as f:
+        return _escribir_csv(f, filas, columnas, lote)
+
+
+def _columnas_exportables(pids: Sequence[str], activos) -> List[str]:
+    """timestamp y escenario primero, luego los PIDs activos sin duplicados."""
     export_pids = ["timestamp", "escenario"] + [
-        pid
-        for pid in pids
-        if pid in active_pids and pid not in ["timestamp", "escenario"]
+        pid for pid in pids if pid in activos and pid not in ["timestamp", "escenario"]
     ]
     # --- DEDUPLICACIÓN DE PIDs EN EXPORTACIÓN ---
     pid_map = {}
@@ -71,33 +122,149 @@ def export_dynamic_log(filename, log_data, pids):
                 f"[EXPORT] Duplicado detectado y eliminado: {pid} "
                 f"(normalizado como {norm})"
             )
-    export_pids = dedup_pids
-    # Limpia los registros para solo exportar columnas activas y sin duplicados
-    export_log = []
+    return dedup_pids
+
+
+def _pids_con_datos(log_data: Sequence[Mapping[str, Any]], pids: Sequence[str]) -> set:
+    """PIDs con al menos un dato; deja de revisar cada PID en cuanto lo encuentra."""
+    pendientes = [p for p in pids if p != "timestamp"]
+    activos = set()
     for row in log_data:
-        export_row = {
-            pid: str(row.get(pid, "")) if row.get(pid, "") is not None else ""
-            for pid in export_pids
-        }
-        export_log.append(export_row)
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=export_pids)
-        writer.writeheader()
-        writer.writerows(export_log)
+        if not pendientes:
+            break
+        encontrados = [p for p in pendientes if row.get(p) not in _VACIOS]
+        if encontrados:
+            activos.update(encontrados)
+            pendientes = [p for p in pendientes if p not in activos]
+    return activos
+
+
+def _datos_de_prueba(pids):
+    now = datetime.now()
+    log_data = []
+    for i in range(5):
+        entry = {pid: "" for pid in pids}
+        entry["timestamp"] = (now + timedelta(seconds=i)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        if "rpm" in pids:
+            entry["rpm"] = str(800 + i * 20)
+        if "vel" in pids:
+            entry["vel"] = str(i)
+        if "temp" in pids:
+            entry["temp"] = str(65 + i)
+        if "maf" in pids:
+            entry["maf"] = str(round(2.0 + 0.1 * i, 2)) if i % 2 == 0 else ""
+        entry["escenario"] = "prueba"
+        log_data.append(entry)
+    return log_data
+
+
+def _encadenar(primera, resto):
+    yield primera
+    yield from resto
+
+
+def _validar(filename, formato, pids, **opciones):
+    if formato == "parquet":
+        # El validador lee CSV (plano o gzip); Parquet se valida al re-importar
+        return True, []
+    return validar_log_csv(filename, [pid for pid in pids if pid != "timestamp"], **opciones)
+
+
+def export_dynamic_log(filename, log_data, pids, formato=None, pids_con_datos=None):
+    """
+    Exporta el log OBD-II de forma dinámica y robusta.
+    - Siempre incluye la columna 'escenario' (modo/fase actual) en el encabezado y en cada fila,
+      aunque no esté en la lista de PIDs seleccionados.
+    - Solo columnas con nombres legibles (ej: 'rpm', 'vel', 'temp', ...).
+    - Solo incluye PIDs seleccionados y con datos en al menos un registro.
+    - Consistencia total: lo que se muestra en la UI es lo que se exporta.
+    - Sin columnas vacías ni duplicadas.
+    - log_data puede ser una lista o un iterador; las filas se escriben por
+      lotes sin copiarlas. Con un iterador (o si se conoce de antemano) pasar
+      ``pids_con_datos`` (p. ej. conteos por columna) para no recorrerlo dos veces;
+      sin él, un iterador exporta todos los PIDs seleccionados.
+    - formato: 'csv', 'csv.gz' o 'parquet' (por defecto según la extensión).
+    Uso recomendado: import y llamada desde dashboard/logger.
+    """
+    if not isinstance(log_data, Sequence):
+        log_data = iter(log_data)
+        primera = next(log_data, None)
+        if primera is not None:
+            log_data = _encadenar(primera, log_data)
+        else:
+            log_data = []
+    if not log_data:
+        print(
+            "[EXPORT] No hay datos en memoria para exportar. Se generarán datos de prueba."
+        )
+        log_data = _datos_de_prueba(pids)
+    if isinstance(pids_con_datos, Mapping):
+        activos = {p for p, n in pids_con_datos.items() if n}
+    elif pids_con_datos is not None:
+        activos = set(pids_con_datos)
+    elif isinstance(log_data, Sequence):
+        activos = _pids_con_datos(log_data, pids)
+    else:
+        activos = set(pids)
+    export_pids = _columnas_exportables(pids, activos)
+    formato = formato or formato_de_archivo(filename)
+    total = exportar_stream(filename, log_data, export_pids, formato)
     print(
         f"[EXPORT] Log exportado correctamente en '{filename}' "
-        f"con {len(export_log)} registros y columnas: {export_pids}"
+        f"con {total} registros y columnas: {export_pids}"
     )
     # Validación automática tras exportar
-    valido, errores = validar_log_csv(
-        filename, [pid for pid in pids if pid != "timestamp"]
-    )
-    return valido, errores
+    return _validar(filename, formato, pids)
+
+
+def filas_de_sesion(store, sesion: str, pids: Sequence[str], t0: Optional[float] = None,
+                    t1: Optional[float] = None, escenario: str = "") -> Iterable[Dict[str, Any]]:
+    """
+    Filas anchas (timestamp, escenario, pid...) de una sesión del SessionStore.
+    Mezcla por timestamp un cursor paginado por PID: memoria constante.
+    """
+    def flujo(pid):
+        for ts, valor in store.iterar_muestras(sesion, pid, t0, t1):
+            yield ts, pid, valor
+
+    flujos = [flujo(pid) for pid in pids]
+    for ts, grupo in groupby(heapq.merge(*flujos, key=lambda m: m[0]), key=lambda m: m[0]):
+        fila = {"timestamp": datetime.fromtimestamp(ts).isoformat(sep=" ", timespec="milliseconds"),
+                "escenario": escenario}
+        for _, pid, valor in grupo:
+            fila[pid] = valor
+        yield fila
+
+
+def exportar_sesion(filename: str, store, sesion: str, pids: Optional[Sequence[str]] = None,
+                    t0: Optional[float] = None, t1: Optional[float] = None,
+                    formato: Optional[str] = None, escenario: Optional[str] = None):
+    """
+    Exporta una sesión del SessionStore en streaming. Las columnas activas se
+    obtienen de los conteos por PID de los rollups, sin recorrer las muestras.
+    Las sesiones archivadas no guardan el escenario: la columna queda vacía
+    salvo que se indique ``escenario``, y no se exige al validar.
+    """
+    info = store.sesion(sesion)
+    if info is None:
+        raise KeyError(f"Sesión desconocida: {sesion}")
+    con_datos = store.columnas_con_datos(sesion)
+    pids = list(pids) if pids else sorted(con_datos)
+    export_pids = _columnas_exportables(pids, con_datos)
+    filas = filas_de_sesion(store, sesion, export_pids[2:], t0, t1, escenario or "")
+    formato = formato or formato_de_archivo(filename)
+    total = exportar_stream(filename, filas, export_pids, formato)
+    print(f"[EXPORT] Sesión '{sesion}' exportada en '{filename}' con {total} registros")
+    # La columna 'escenario' solo se exige si se pasó uno; sin él queda vacía
+    return _validar(filename, formato, pids, requerir_escenario=bool(escenario))
 
 
 # --- Ejemplo de uso/documentación para desarrolladores ---
 # from src.storage.export import export_dynamic_log
 # export_dynamic_log('log.csv', log_data, pids)
-# log_data: lista de dicts con los datos de cada registro
+# log_data: lista de dicts con los datos de cada registro (o un iterador)
 # pids: lista de nombres de columna (PIDs seleccionados + 'timestamp')
 # Si log_data está vacío, se generan datos de prueba automáticamente.
+# Sesiones guardadas: exportar_sesion('viaje.csv.gz', SessionStore('sesiones.db'), sesion_id)
@@ -0,0 +1,380 @@
+# Índice de texto completo (SQLite FTS5) para los logs de texto de la app
+# (log_2025*.txt, obd_connection.log, obd_data.log, app_errors.log).
+# Cada línea con timestamp es una entrada (ts, nivel, contexto, mensaje); las
+# líneas sin timestamp (tracebacks, resúmenes de tests) se agregan a la
+# entrada anterior. La indexación es incremental: por archivo se guarda el
+# offset en bytes y solo se parsea lo agregado; los archivos se parsean en un
+# pool de procesos y se escriben desde un único proceso.
+#
+# Ejemplo:
+#   indice = IndiceLogs("logs_indice.db")
+#   indice.indexar(archivos_por_defecto())
+#   indice.buscar("BUFFER FULL", desde="2025-06-01", hasta="2025-06-08")
+
+import glob
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+PATRONES_POR_DEFECTO = ("log_2025*.txt", "obd_connection.log", "obd_data.log", "app_errors.log")
+COLUMNAS = ("id", "archivo", "linea", "ts", "nivel", "contexto", "mensaje", "texto")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    ruta TEXT PRIMARY KEY,
+    inode INTEGER,
+    offset INTEGER NOT NULL DEFAULT 0,
+    lineas INTEGER NOT NULL DEFAULT 0,
+    ultimo_ts REAL
+);
+CREATE TABLE IF NOT EXISTS entradas (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    linea INTEGER NOT NULL,
+    ts REAL,
+    nivel TEXT,
+    contexto TEXT,
+    mensaje TEXT,
+    texto TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entradas_ts ON entradas (ts);
+CREATE INDEX IF NOT EXISTS idx_entradas_archivo ON entradas (archivo, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entradas_fts USING fts5(
+    mensaje, contexto, content='entradas', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entradas_ai AFTER INSERT ON entradas BEGIN
+    INSERT INTO entradas_fts (rowid, mensaje, contexto) VALUES (new.id, new.mensaje, new.contexto);
+END;
+CREATE TRIGGER IF NOT EXISTS entradas_ad AFTER DELETE ON entradas BEGIN
+    INSERT INTO entradas_fts (entradas_fts, rowid, mensaje, contexto)
+    VALUES ('delete', old.id, old.mensaje, old.contexto);
+END;
+"""
+
+_TS = r"(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)(?:[,.](\d{1,6}))?"
+# 2025-06-02 17:22:17,802 [INFO] mensaje  (logging / obd_data.log)
+_RE_CORCHETES = re.compile(_TS + r"\s+\[(\w+)\]\s?(.*)$")
+# 2025-06-06 15:56:16,487 - OBD - INFO - mensaje  (obd_connection.log)
+_RE_GUIONES = re.compile(_TS + r" - (.+?) - (\w+) - (.*)$")
+# [2025-06-06 15:56:16] ERROR: mensaje | Contexto: ctx  (log_evento_app)
+_RE_EVENTO = re.compile(r"^\[" + _TS + r"\]\s+(\w+):\s+(.*)$")
+# 2025-06-01 19:35:47 | mensaje
+_RE_BARRA = re.compile(_TS + r" \| (.*)$")
+_RE_ETIQUETAS = re.compile(r"^((?:\[[^\]\s]{1,40}\])+)\s*")
+_SUFIJO_CONTEXTO = " | Contexto: "
+LOTE_RANGO = 2000
+
+
+def a_epoch(valor: Union[None, float, int, str, datetime]) -> Optional[float]:
+    """Acepta epoch, datetime o texto ISO ('2025-06-06', '2025-06-06 15:56:16')."""
+    if valor is None or isinstance(valor, (int, float)):
+        return valor
+    if isinstance(valor, datetime):
+        return valor.timestamp()
+    return datetime.fromisoformat(valor.strip()).timestamp()
+
+
+def _ts(fecha: str, fraccion: Optional[str]) -> Optional[float]:
+    try:
+        ts = datetime.fromisoformat(fecha).timestamp()
+    except ValueError:
+        return None
+    if fraccion:
+        ts += int(fraccion) / 10 ** len(fraccion)
+    return ts
+
+
+def _contexto_de_etiquetas(mensaje: str) -> Tuple[Optional[str], str]:
+    """'[PARSE][rpm] Respuesta vacía' -> ('PARSE/rpm', 'Respuesta vacía')."""
+    m = _RE_ETIQUETAS.match(mensaje)
+    if not m:
+        return None, mensaje
+    etiquetas = m.group(1)[1:-1].split("][")
+    return "/".join(etiquetas), mensaje[m.end():]
+
+
+def parsear_linea(linea: str) -> Optional[Tuple[Optional[float], Optional[str], Optional[str], str]]:
+    """(ts, nivel, contexto, mensaje) o None si la línea no empieza una entrada."""
+    contexto = None
+    m = _RE_CORCHETES.match(linea)
+    if m:
+        fecha, fraccion, nivel, mensaje = m.groups()
+    else:
+        m = _RE_GUIONES.match(linea)
+        if m:
+            fecha, fraccion, contexto, nivel, mensaje = m.groups()
+        else:
+            m = _RE_EVENTO.match(linea)
+            if m:
+                fecha, fraccion, nivel, mensaje = m.groups()
+            else:
+                m = _RE_BARRA.match(linea)
+                if not m:
+                    return None
+                fecha, fraccion, mensaje = m.groups()
+                nivel = None
+    if _SUFIJO_CONTEXTO in mensaje:
+        mensaje, contexto = mensaje.split(_SUFIJO_CONTEXTO, 1)
+    elif contexto is None:
+        contexto, mensaje = _contexto_de_etiquetas(mensaje)
+    nivel = nivel.upper() if nivel else None
+    if nivel == "ADVERTENCIA":
+        nivel = "WARNING"
+    return _ts(fecha, fraccion), nivel, contexto, mensaje
+
+
+def parsear_desde(ruta: str, offset: int = 0, linea_inicial: int = 0,
+                  ultimo_ts: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Parsea las líneas completas de ``ruta`` a partir de ``offset`` (se ejecuta
+    en los procesos del pool). Devuelve las entradas y el nuevo offset.
+    """
+    with open(ruta, "rb") as f:
+        f.seek(offset)
+        datos = f.read()
+    corte = datos.rfind(b"\n") + 1  # solo líneas completas
+    texto = datos[:corte].decode("utf-8", errors="replace")
+    entradas: List[list] = []
+    n = linea_inicial
+    for linea in texto.splitlines():
+        n += 1
+        linea = linea.rstrip()
+        if not linea:
+            continue
+        partes = parsear_linea(linea)
+        if partes is not None:
+            ts, nivel, contexto, mensaje = partes
+            if ts is not None:
+                ultimo_ts = ts
+            entradas.append([n, ts if ts is not None else ultimo_ts, nivel, contexto, mensaje, linea])
+        elif entradas:
+            # Continuación (traceback, bloque de resumen): se agrega a la entrada anterior
+            entradas[-1][4] += "\n" + linea
+            entradas[-1][5] += "\n" + linea
+        else:
+            entradas.append([n, ultimo_ts, None, None, linea, linea])
+    return {"ruta": ruta, "offset": offset + corte, "lineas": n, "ultimo_ts": ultimo_ts,
+            "entradas": entradas}
+
+
+def archivos_por_defecto(directorio: str = ".") -> List[str]:
+    rutas = set()
+    for patron in PATRONES_POR_DEFECTO:
+        rutas.update(glob.glob(os.path.join(directorio, patron)))
+    return sorted(rutas)
+
+
+class IndiceLogs:
+    """Base SQLite con las entradas de log y su índice FTS5."""
+
+    def __init__(self, ruta: str = "logs_indice.db"):
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ESQUEMA)
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Indexación
+    # ------------------------------------------------------------------
+    def _pendientes(self, rutas: Iterable[str]) -> List[Tuple[str, int, int, Optional[float]]]:
+        """(ruta, offset, lineas, ultimo_ts) de los archivos con datos nuevos."""
+        pendientes = []
+        for ruta in rutas:
+            ruta = os.path.abspath(ruta)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            fila = self.conn.execute(
+                "SELECT inode, offset, lineas, ultimo_ts FROM archivos WHERE ruta = ?", (ruta,)
+            ).fetchone()
+            if fila and fila[0] == info.st_ino and fila[1] <= info.st_size:
+                if fila[1] < info.st_size:
+                    pendientes.append((ruta, fila[1], fila[2], fila[3]))
+                continue
+            # Nuevo, rotado o truncado: se indexa desde cero
+            with self.conn:
+                self.conn.execute("DELETE FROM entradas WHERE archivo = ?", (ruta,))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO archivos (ruta, inode, offset, lineas) VALUES (?, ?, 0, 0)",
+                    (ruta, info.st_ino),
+                )
+            pendientes.append((ruta, 0, 0, None))
+        return pendientes
+
+    def _guardar(self, resultado: Dict[str, Any]):
+        ruta = resultado["ruta"]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO entradas (archivo, linea, ts, nivel, contexto, mensaje, texto) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((ruta, *e) for e in resultado["entradas"]),
+            )
+            self.conn.execute(
+                "UPDATE archivos SET offset = ?, lineas = ?, ultimo_ts = ? WHERE ruta = ?",
+                (resultado["offset"], resultado["lineas"], resultado["ultimo_ts"], ruta),
+            )
+
+    def indexar(self, rutas: Optional[Iterable[str]] = None, procesos: Optional[int] = None) -> Dict[str, int]:
+        """
+        Indexa lo nuevo de cada archivo. ``procesos=1`` parsea en este proceso.
+
+        Returns:
+            dict: archivos procesados y entradas agregadas.
+        """
+        rutas = archivos_por_defecto() if rutas is None else rutas
+        with self._lock:
+            pendientes = self._pendientes(rutas)
+            nuevas = 0
+            if len(pendientes) > 1 and procesos != 1:
+                with ProcessPoolExecutor(max_workers=procesos) as pool:
+                    for resultado in pool.map(parsear_desde, *zip(*pendientes)):
+                        self._guardar(resultado)
+                        nuevas += len(resultado["entradas"])
+            else:
+                for pendiente in pendientes:
+                    resultado = parsear_desde(*pendiente)
+                    self._guardar(resultado)
+                    nuevas += len(resultado["entradas"])
+        return {"archivos": len(pendientes), "entradas": nuevas}
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _filtros(desde, hasta, nivel, contexto, archivo) -> Tuple[List[str], List[Any]]:
+        condiciones, params = [], []
+        if desde is not None:
+            condiciones.append("e.ts >= ?")
+            params.append(a_epoch(desde))
+        if hasta is not None:
+            condiciones.append("e.ts <= ?")
+            params.append(a_epoch(hasta))
+        if nivel:
+            condiciones.append("e.nivel = ?")
+            params.append(nivel.upper())
+        if contexto:
+            condiciones.append("e.contexto LIKE ?")
+            params.append(contexto + "%")
+        if archivo:
+            condiciones.append("e.archivo = ?")
+            params.append(os.path.abspath(archivo))
+        return condiciones, params
+
+    def _consulta(self, texto, consulta_fts, filtros) -> Tuple[str, List[Any]]:
+        """FROM/WHERE común a buscar() y contar()."""
+        condiciones, params = self._filtros(*filtros)
+        sql = " FROM entradas e"
+        if texto:
+            consulta = texto if consulta_fts else '"' + texto.replace('"', '""') + '"'
+            sql = " FROM entradas_fts f JOIN entradas e ON e.id = f.rowid"
+            condiciones.insert(0, "entradas_fts MATCH ?")
+            params.insert(0, consulta)
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        return sql, params
+
+    def buscar(self, texto: Optional[str] = None, desde=None, hasta=None, nivel: Optional[str] = None,
+               contexto: Optional[str] = None, archivo: Optional[str] = None, limite: int = 200,
+               consulta_fts: bool = False) -> List[Dict[str, Any]]:
+        """
+        Entradas que contienen ``texto`` (como frase) en el rango de tiempo.
+
+        Args:
+            consulta_fts: tratar ``texto`` como consulta FTS5 (AND/OR/NEAR, prefijo*).
+        """
+        sql, params = self._consulta(texto, consulta_fts, (desde, hasta, nivel, contexto, archivo))
+        sql = f"SELECT e.{', e.'.join(COLUMNAS)}" + sql + " ORDER BY e.ts, e.id LIMIT ?"
+        with self._lock:
+            filas = self.conn.execute(sql, params + [limite]).fetchall()
+        return [dict(zip(COLUMNAS, f)) for f in filas]
+
+    def contar(self, texto: Optional[str] = None, desde=None, hasta=None, nivel: Optional[str] = None,
+               contexto: Optional[str] = None, archivo: Optional[str] = None,
+               consulta_fts: bool = False) -> int:
+        sql, params = self._consulta(texto, consulta_fts, (desde, hasta, nivel, contexto, archivo))
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*)" + sql, params).fetchone()[0]
+
+    def rango(self, desde=None, hasta=None, archivo: Optional[str] = None,
+              descendente: bool = False, lote: int = LOTE_RANGO) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre las entradas de un rango de tiempo en orden, por lotes.
+
+        Cada lote se lee con el lock tomado y se entrega ya sin él (paginado
+        por (ts, id)), así un consumidor lento no frena la indexación.
+        """
+        condiciones, params = self._filtros(desde, hasta, None, None, archivo)
+        orden = "DESC" if descendente else "ASC"
+        mayor = "<" if descendente else ">"
+        columnas = f"SELECT e.{', e.'.join(COLUMNAS)} FROM entradas e WHERE "
+        # Como ORDER BY de SQLite: las entradas sin ts van primero en orden ascendente
+        tramos = [True, False] if descendente else [False, True]
+        for con_ts in tramos:
+            base = condiciones + ["e.ts IS NOT NULL" if con_ts else "e.ts IS NULL"]
+            ultimo = None
+            while True:
+                where, extra = list(base), []
+                if ultimo is not None and con_ts:
+                    where.append(f"(e.ts {mayor} ? OR (e.ts = ? AND e.id {mayor} ?))")
+                    extra = [ultimo[0], ultimo[0], ultimo[1]]
+                elif ultimo is not None:
+                    where.append(f"e.id {mayor} ?")
+                    extra = [ultimo[1]]
+                sql = columnas + " AND ".join(where) + f" ORDER BY e.ts {orden}, e.id {orden} LIMIT ?"
+                with self._lock:
+                    filas = self.conn.execute(sql, params + extra + [lote]).fetchall()
+                for fila in filas:
+                    yield dict(zip(COLUMNAS, fila))
+                if len(filas) < lote:
+                    break
+                ultimo = (filas[-1][3], filas[-1][0])  # (ts, id)
+
+    def niveles(self, desde=None, hasta=None, archivo: Optional[str] = None) -> Dict[str, int]:
+        condiciones, params = self._filtros(desde, hasta, None, None, archivo)
+        sql = "SELECT COALESCE(e.nivel, ''), COUNT(*) FROM entradas e"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        with self._lock:
+            return dict(self.conn.execute(sql + " GROUP BY 1", params).fetchall())
+
+    def cerrar(self):
+        with self._lock:
+            self.conn.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Índice FTS5 de logs de texto")
+    parser.add_argument("--db", default="logs_indice.db")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("texto", nargs="?", help="frase a buscar (sin texto solo indexa)")
+    parser.add_argument("--desde")
+    parser.add_argument("--hasta")
+    parser.add_argument("--nivel")
+    parser.add_argument("--limite", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    indice = IndiceLogs(args.db)
+    try:
+        stats = indice.indexar(procesos=args.procesos)
+        print(f"[INDICE] {stats['archivos']} archivos actualizados, {stats['entradas']} entradas nuevas")
+        if args.texto or args.desde or args.hasta or args.nivel:
+            for e in indice.buscar(args.texto, args.desde, args.hasta, args.nivel, limite=args.limite):
+                fecha = datetime.fromtimestamp(e["ts"]).strftime("%Y-%m-%d %H:%M:%S") if e["ts"] else "-"
+                print(f"{fecha} [{e['nivel'] or '-'}] {os.path.basename(e['archivo'])}:{e['linea']} "
+                      f"{e['mensaje'].splitlines()[0]}")
+    finally:
+        indice.cerrar()
+
+
+if __name__ == "__main__":
+    main()
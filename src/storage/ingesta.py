@@ -0,0 +1,181 @@
+"""
+Servidor de ingesta de flota (HTTP, solo biblioteca estándar).
+
+Recibe los chunks gzip del uplink (src/storage/uplink.py) y los guarda en el
+archivo de sesiones (src/storage/sesiones.py). Cada chunk se guarda en una
+transacción y su ID queda registrado, de modo que un reenvío responde
+``{"duplicado": true}`` sin volver a insertar.
+
+Rutas:
+    POST /ingest   cuerpo JSON (Content-Encoding: gzip opcional)
+    GET  /salud    estado y contadores
+    GET  /sesiones lista de sesiones archivadas
+
+Uso local (pruebas o un servidor de taller):
+    python -m src.storage.ingesta --db sesiones.db --puerto 8085
+"""
+import argparse
+import gzip
+import json
+import logging
+import math
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .sesiones import SessionStore
+
+logger = logging.getLogger(__name__)
+
+MAX_CUERPO = 64 * 1024 * 1024
+
+
+def _es_numero(valor) -> bool:
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+
+
+def validar_chunk(chunk) -> None:
+    """
+    Verifica el sobre y cada fila ``[ts, pid, valor]`` antes de tocar la base.
+
+    Raises:
+        ValueError: con la primera inconsistencia encontrada (el servidor
+            responde 400 y el uplink aparta el chunk en vez de reintentarlo).
+    """
+    if not isinstance(chunk, dict):
+        raise ValueError("el cuerpo no es un objeto JSON")
+    for campo in ("chunk", "sesion", "filas"):
+        if campo not in chunk:
+            raise ValueError(f"falta '{campo}'")
+    for campo in ("chunk", "sesion"):
+        if not isinstance(chunk[campo], str) or not chunk[campo]:
+            raise ValueError(f"'{campo}' debe ser un texto no vacío")
+    if not isinstance(chunk["filas"], list):
+        raise ValueError("'filas' debe ser una lista")
+    for i, fila in enumerate(chunk["filas"]):
+        if not isinstance(fila, list) or len(fila) != 3:
+            raise ValueError(f"fila {i}: se esperaba [ts, pid, valor]")
+        ts, pid, valor = fila
+        if not _es_numero(ts) or not isinstance(pid, str) or not (valor is None or _es_numero(valor)):
+            raise ValueError(f"fila {i}: tipos inválidos {fila!r}")
+
+
+class _ManejadorIngesta(BaseHTTPRequestHandler):
+    server_version = "OBDIngesta/1.0"
+
+    def log_message(self, formato, *args):
+        logger.debug("%s - %s", self.address_string(), formato % args)
+
+    def _responder(self, codigo: int, cuerpo: dict):
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        if self.path == "/salud":
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            self._responder(200, {"ok": True, **stats})
+        elif self.path == "/sesiones":
+            self._responder(200, {"sesiones": self.server.store.sesiones()})
+        else:
+            self._responder(404, {"error": "ruta desconocida"})
+
+    def do_POST(self):
+        if self.path != "/ingest":
+            self._responder(404, {"error": "ruta desconocida"})
+            return
+        largo = int(self.headers.get("Content-Length") or 0)
+        if largo <= 0 or largo > MAX_CUERPO:
+            self._responder(413 if largo > MAX_CUERPO else 400, {"error": "cuerpo inválido"})
+            return
+        datos = self.rfile.read(largo)
+        try:
+            if self.headers.get("Content-Encoding", "").lower() == "gzip":
+                datos = gzip.decompress(datos)
+            chunk = json.loads(datos)
+            validar_chunk(chunk)
+            cabecera = self.headers.get("X-Chunk-Id")
+            if cabecera and cabecera != chunk["chunk"]:
+                raise ValueError("X-Chunk-Id no coincide con el contenido")
+        except (OSError, EOFError, ValueError) as e:
+            self._rechazar(f"chunk inválido: {e}")
+            return
+        try:
+            nuevo = self.server.store.guardar_chunk(chunk)
+        except (TypeError, ValueError, KeyError, sqlite3.IntegrityError) as e:
+            # Contenido que pasó la validación pero la base no acepta: reintentar no sirve
+            self._rechazar(f"chunk no almacenable: {e}")
+            return
+        except sqlite3.Error as e:
+            # Falla del servidor (disco, bloqueo): 503 para que el uplink reintente
+            logger.error("No se pudo guardar %s: %s", chunk["chunk"], e)
+            self._responder(503, {"error": "almacenamiento no disponible"})
+            return
+        with self.server.lock:
+            if nuevo:
+                self.server.stats["chunks"] += 1
+                self.server.stats["muestras"] += len(chunk["filas"])
+            else:
+                self.server.stats["duplicados"] += 1
+        self._responder(200, {"chunk": chunk["chunk"], "duplicado": not nuevo})
+
+    def _rechazar(self, motivo: str):
+        with self.server.lock:
+            self.server.stats["rechazados"] += 1
+        self._responder(400, {"error": motivo})
+
+
+class ServidorIngesta(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, store: SessionStore, host: str = "127.0.0.1", puerto: int = 8085):
+        super().__init__((host, puerto), _ManejadorIngesta)
+        self.store = store
+        self.lock = threading.Lock()
+        self.stats = {"chunks": 0, "muestras": 0, "duplicados": 0, "rechazados": 0}
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def iniciar_en_hilo(self) -> "ServidorIngesta":
+        """Sirve en un hilo de fondo (útil para pruebas y para el dashboard)."""
+        self._hilo = threading.Thread(target=self.serve_forever, name="ingesta", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.shutdown()
+        self.server_close()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de ingesta de sesiones OBD-II")
+    parser.add_argument("--db", default="sesiones.db")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--puerto", type=int, default=8085)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    servidor = ServidorIngesta(SessionStore(args.db), args.host, args.puerto)
+    print(f"[INGESTA] Escuchando en {servidor.url} -> {args.db}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("[INGESTA] Detenido")
+    finally:
+        servidor.server_close()
+        servidor.store.cerrar()
+
+
+if __name__ == "__main__":
+    main()
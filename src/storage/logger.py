@@ -4,6 +4,8 @@ import sqlite3
 from datetime import datetime
 import json
 
+from ..utils.metricas import cronometrar
+
 
 class DataLogger:
     def __init__(self, db_path="obd_log.db"):
@@ -30,14 +32,15 @@ class DataLogger:
         Ejemplo: {'rpm': 1234, 'vel': 45, '0105': 80}
         """
         try:
-            cursor = self.conn.cursor()
-            timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
-            datos_json = json.dumps(datos, ensure_ascii=False)
-            cursor.execute(
-                "INSERT INTO lecturas (timestamp, datos) VALUES (?, ?)",
-                (timestamp, datos_json),
-            )
-            self.conn.commit()
+            with cronometrar("disco"):
+                cursor = self.conn.cursor()
+                timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+                datos_json = json.dumps(datos, ensure_ascii=False)
+                cursor.execute(
+                    "INSERT INTO lecturas (timestamp, datos) VALUES (?, ?)",
+                    (timestamp, datos_json),
+                )
+                self.conn.commit()
         except Exception as e:
             print(f"[Logger] Error al guardar datos: {e}")
 
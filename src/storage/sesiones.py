@@ -0,0 +1,270 @@
+# Archivo de sesiones OBD-II en SQLite
+# Formato largo (sesion, ts, pid, valor): admite cualquier combinación de PIDs
+# por vehículo sin cambiar el esquema. Los chunks recibidos del uplink se
+# registran por ID para que reintentos y reenvíos sean idempotentes.
+# Al escribir se materializan rollups de 1 s, 10 s y 60 s (n, suma, min, max,
+# último) para que las consultas por rango de tiempo no recorran las muestras
+# crudas (ver src/storage/consultas.py).
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+RESOLUCIONES = (1, 10, 60)  # segundos por bucket de rollup
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sesiones (
+    id TEXT PRIMARY KEY,
+    vehiculo TEXT,
+    inicio REAL,
+    fin REAL,
+    n_muestras INTEGER NOT NULL DEFAULT 0,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS muestras (
+    sesion TEXT NOT NULL,
+    pid TEXT NOT NULL,
+    ts REAL NOT NULL,
+    valor REAL
+);
+CREATE INDEX IF NOT EXISTS idx_muestras_sesion_pid_ts ON muestras (sesion, pid, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    sesion TEXT NOT NULL,
+    pid TEXT NOT NULL,
+    resolucion INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    suma REAL NOT NULL,
+    minimo REAL,
+    maximo REAL,
+    ultimo REAL,
+    ts_ultimo REAL,
+    PRIMARY KEY (sesion, pid, resolucion, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chunks (
+    id TEXT PRIMARY KEY,
+    sesion TEXT NOT NULL,
+    n_muestras INTEGER NOT NULL,
+    recibido REAL NOT NULL
+);
+"""
+
+
+class SessionStore:
+    """
+    Almacén de sesiones. Seguro para usar desde varios hilos (una conexión
+    protegida por lock), pensado para el servidor de ingesta y las consultas.
+    """
+
+    def __init__(self, ruta: str = "sesiones.db"):
+        self.ruta = ruta
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ESQUEMA)
+        self.conn.commit()
+        if self._faltan_rollups():
+            # Base creada antes de los rollups: se completan una vez al abrir
+            print(f"[SESIONES] Calculando rollups de {ruta} (base anterior a los rollups)")
+            self.reconstruir_rollups()
+
+    def _faltan_rollups(self) -> bool:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM rollups) AND "
+                "EXISTS (SELECT 1 FROM muestras WHERE valor IS NOT NULL)"
+            ).fetchone()[0] == 1
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def crear_sesion(self, sesion: str, vehiculo: Optional[str] = None,
+                     inicio: Optional[float] = None, meta: Optional[Dict[str, Any]] = None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sesiones (id, vehiculo, inicio, meta) VALUES (?, ?, ?, ?)",
+                (sesion, vehiculo, inicio if inicio is not None else time.time(),
+                 json.dumps(meta, ensure_ascii=False) if meta else None),
+            )
+
+    def _insertar(self, sesion: str, filas: Sequence[Tuple[float, str, float]]):
+        """Inserta filas (ts, pid, valor) dentro de la transacción en curso."""
+        self.conn.executemany(
+            "INSERT INTO muestras (sesion, ts, pid, valor) VALUES (?, ?, ?, ?)",
+            ((sesion, ts, pid, valor) for ts, pid, valor in filas),
+        )
+        self._acumular_rollups(sesion, filas)
+        ts_min = min(f[0] for f in filas)
+        ts_max = max(f[0] for f in filas)
+        self.conn.execute(
+            "UPDATE sesiones SET n_muestras = n_muestras + ?, "
+            "inicio = MIN(COALESCE(inicio, ?), ?), fin = MAX(COALESCE(fin, ?), ?) WHERE id = ?",
+            (len(filas), ts_min, ts_min, ts_max, ts_max, sesion),
+        )
+
+    def _acumular_rollups(self, sesion: str, filas: Sequence[Tuple[float, str, float]]):
+        """Agrega el lote por bucket en memoria y lo suma a los rollups con un UPSERT."""
+        agregados: Dict[Tuple[str, int, int], list] = {}
+        for ts, pid, valor in filas:
+            if valor is None:
+                continue
+            for res in RESOLUCIONES:
+                clave = (pid, res, int(ts // res))
+                acc = agregados.get(clave)
+                if acc is None:
+                    agregados[clave] = [1, valor, valor, valor, valor, ts]
+                    continue
+                acc[0] += 1
+                acc[1] += valor
+                if valor < acc[2]:
+                    acc[2] = valor
+                if valor > acc[3]:
+                    acc[3] = valor
+                if ts >= acc[5]:
+                    acc[4] = valor
+                    acc[5] = ts
+        self.conn.executemany(
+            "INSERT INTO rollups (sesion, pid, resolucion, bucket, n, suma, minimo, maximo, ultimo, ts_ultimo) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (sesion, pid, resolucion, bucket) DO UPDATE SET "
+            "n = n + excluded.n, suma = suma + excluded.suma, "
+            "minimo = MIN(minimo, excluded.minimo), maximo = MAX(maximo, excluded.maximo), "
+            "ultimo = CASE WHEN excluded.ts_ultimo >= ts_ultimo THEN excluded.ultimo ELSE ultimo END, "
+            "ts_ultimo = MAX(ts_ultimo, excluded.ts_ultimo)",
+            ((sesion, pid, res, bucket, *acc) for (pid, res, bucket), acc in agregados.items()),
+        )
+
+    def reconstruir_rollups(self, sesion: Optional[str] = None):
+        """Recalcula los rollups desde las muestras (bases creadas antes de los rollups)."""
+        with self._lock, self.conn:
+            ids = [sesion] if sesion else [f[0] for f in self.conn.execute("SELECT id FROM sesiones")]
+            for sid in ids:
+                self.conn.execute("DELETE FROM rollups WHERE sesion = ?", (sid,))
+                cursor = self.conn.execute(
+                    "SELECT ts, pid, valor FROM muestras WHERE sesion = ? ORDER BY ts", (sid,)
+                )
+                while True:
+                    lote = cursor.fetchmany(50000)
+                    if not lote:
+                        break
+                    self._acumular_rollups(sid, lote)
+
+    def agregar_muestras(self, sesion: str, filas: Iterable[Tuple[float, str, float]]):
+        """Agrega muestras (ts, pid, valor) a una sesión existente o nueva."""
+        filas = list(filas)
+        if not filas:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO sesiones (id) VALUES (?)", (sesion,))
+            self._insertar(sesion, filas)
+
+    def guardar_chunk(self, chunk: Dict[str, Any]) -> bool:
+        """
+        Guarda un chunk del uplink en una sola transacción.
+
+        Returns:
+            bool: False si el chunk ya se había recibido (reenvío idempotente).
+        """
+        filas = [tuple(f) for f in chunk.get("filas", [])]
+        with self._lock, self.conn:
+            try:
+                self.conn.execute(
+                    "INSERT INTO chunks (id, sesion, n_muestras, recibido) VALUES (?, ?, ?, ?)",
+                    (chunk["chunk"], chunk["sesion"], len(filas), time.time()),
+                )
+            except sqlite3.IntegrityError:
+                return False
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sesiones (id, vehiculo) VALUES (?, ?)",
+                (chunk["sesion"], chunk.get("vehiculo")),
+            )
+            if filas:
+                self._insertar(chunk["sesion"], filas)
+        return True
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def sesiones(self, vehiculo: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT id, vehiculo, inicio, fin, n_muestras FROM sesiones"
+        params: tuple = ()
+        if vehiculo is not None:
+            sql += " WHERE vehiculo = ?"
+            params = (vehiculo,)
+        with self._lock:
+            filas = self.conn.execute(sql + " ORDER BY inicio", params).fetchall()
+        return [dict(zip(("id", "vehiculo", "inicio", "fin", "n_muestras"), f)) for f in filas]
+
+    def sesion(self, sesion: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fila = self.conn.execute(
+                "SELECT id, vehiculo, inicio, fin, n_muestras FROM sesiones WHERE id = ?", (sesion,)
+            ).fetchone()
+        return dict(zip(("id", "vehiculo", "inicio", "fin", "n_muestras"), fila)) if fila else None
+
+    def pids(self, sesion: str) -> List[str]:
+        with self._lock:
+            # El rollup de 60 s es mucho más chico que las muestras crudas
+            filas = self.conn.execute(
+                "SELECT DISTINCT pid FROM rollups WHERE sesion = ? AND resolucion = ? ORDER BY pid",
+                (sesion, RESOLUCIONES[-1]),
+            ).fetchall()
+            if not filas:  # sin rollups (p. ej. solo valores nulos): desde las crudas
+                filas = self.conn.execute(
+                    "SELECT DISTINCT pid FROM muestras WHERE sesion = ? ORDER BY pid", (sesion,)
+                ).fetchall()
+        return [f[0] for f in filas]
+
+    def muestras(self, sesion: str, pid: str, t0: Optional[float] = None,
+                 t1: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Muestras crudas (ts, valor) de un PID en [t0, t1]."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT ts, valor FROM muestras WHERE sesion = ? AND pid = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (sesion, pid, t0 if t0 is not None else float("-inf"),
+                 t1 if t1 is not None else float("inf")),
+            ).fetchall()
+
+    def iterar_muestras(self, sesion: str, pid: str, t0: Optional[float] = None,
+                        t1: Optional[float] = None, lote: int = 5000) -> Iterator[Tuple[float, float]]:
+        """Como ``muestras`` pero por lotes, para exportar sesiones largas sin cargarlas."""
+        rango = (sesion, pid, t0 if t0 is not None else float("-inf"),
+                 t1 if t1 is not None else float("inf"))
+        ultimo = None
+        while True:
+            # Paginado por ts (keyset): no mantiene un cursor abierto entre lotes
+            with self._lock:
+                if ultimo is None:
+                    filas = self.conn.execute(
+                        "SELECT ts, valor, rowid FROM muestras WHERE sesion = ? AND pid = ? "
+                        "AND ts >= ? AND ts <= ? ORDER BY ts, rowid LIMIT ?", rango + (lote,)
+                    ).fetchall()
+                else:
+                    filas = self.conn.execute(
+                        "SELECT ts, valor, rowid FROM muestras WHERE sesion = ? AND pid = ? "
+                        "AND ts >= ? AND ts <= ? AND (ts > ? OR (ts = ? AND rowid > ?)) "
+                        "ORDER BY ts, rowid LIMIT ?", rango + (ultimo[0], ultimo[0], ultimo[1], lote)
+                    ).fetchall()
+            if not filas:
+                return
+            for ts, valor, _ in filas:
+                yield ts, valor
+            ultimo = (filas[-1][0], filas[-1][2])
+            if len(filas) < lote:
+                return
+
+    def columnas_con_datos(self, sesion: str) -> Dict[str, int]:
+        """Muestras válidas por PID, desde los rollups de 60 s (sin recorrer las crudas)."""
+        with self._lock:
+            filas = self.conn.execute(
+                "SELECT pid, SUM(n) FROM rollups WHERE sesion = ? AND resolucion = ? GROUP BY pid",
+                (sesion, RESOLUCIONES[-1]),
+            ).fetchall()
+        return {pid: n for pid, n in filas if n}
+
+    def cerrar(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,260 @@
+"""
+Uplink store-and-forward hacia el servidor de ingesta de flota.
+
+Las muestras decodificadas se agrupan en chunks comprimidos (JSON + gzip) que
+se escriben primero en un directorio de spool local y luego se envían por
+HTTP al servidor de ingesta (src/storage/ingesta.py). Así:
+
+- Sin red, los datos quedan en disco. La memoria se limita a un chunk
+  abierto y el disco a ``max_spool_bytes``; si se supera, se descartan los
+  chunks más viejos.
+- Cada chunk tiene un ID determinista (vehículo, sesión, secuencia). El
+  servidor ignora los repetidos, así que reintentar es seguro.
+- Los envíos se reintentan con backoff exponencial en un hilo aparte, sin
+  bloquear la adquisición.
+- Un chunk que el servidor rechaza (4xx) se aparta a ``<spool>/rechazados``
+  para inspección y no frena el envío de los siguientes.
+
+Ejemplo:
+    uplink = Uplink("spool", "http://servidor:8085", vehiculo="hilux")
+    uplink.nueva_sesion()
+    uplink.iniciar()
+    uplink.agregar("rpm", 850, ts=time.time())
+    ...
+    uplink.detener()
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUFIJO = ".json.gz"
+RECHAZADOS = "rechazados"
+VERSION_CHUNK = 1
+
+
+class Uplink:
+    def __init__(self, spool: str, url: Optional[str], vehiculo: str,
+                 max_muestras: int = 5000, max_segundos: float = 5.0,
+                 max_spool_bytes: int = 200 * 1024 * 1024, timeout: float = 10.0):
+        self.spool = spool
+        self.url = url.rstrip("/") if url else None
+        self.vehiculo = vehiculo
+        self.max_muestras = max_muestras
+        self.max_segundos = max_segundos
+        self.max_spool_bytes = max_spool_bytes
+        self.timeout = timeout
+        self.sesion: Optional[str] = None
+        self.stats = {"muestras": 0, "chunks": 0, "enviados": 0, "duplicados": 0,
+                      "fallos_envio": 0, "descartados": 0, "rechazados": 0}
+        self._filas: List[Tuple[float, str, float]] = []
+        self._abierto_desde: Optional[float] = None
+        self._secuencia = 0
+        self._lock = threading.Lock()
+        self._lock_spool = threading.RLock()  # productor (descarte) vs hilo de envío
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        os.makedirs(spool, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Productor (hilo/loop de adquisición)
+    # ------------------------------------------------------------------
+    def nueva_sesion(self, sesion: Optional[str] = None) -> str:
+        """Cierra el chunk abierto y empieza una sesión (un viaje)."""
+        self.sellar()
+        with self._lock:
+            self.sesion = sesion or f"{self.vehiculo}-{datetime.now():%Y%m%d_%H%M%S}"
+            self._secuencia = 0
+        return self.sesion
+
+    def agregar(self, pid: str, valor, ts: Optional[float] = None):
+        """Encola una muestra numérica; los valores no numéricos se ignoran."""
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            return
+        if self.sesion is None:
+            self.nueva_sesion()
+        lleno = False
+        with self._lock:
+            if not self._filas:
+                self._abierto_desde = time.monotonic()
+            self._filas.append((ts if ts is not None else time.time(), pid, valor))
+            self.stats["muestras"] += 1
+            lleno = len(self._filas) >= self.max_muestras
+        if lleno:
+            self.sellar()
+
+    def sellar(self) -> Optional[str]:
+        """Escribe el chunk abierto en el spool (escritura atómica). Devuelve su ruta."""
+        with self._lock:
+            if not self._filas:
+                return None
+            filas, self._filas = self._filas, []
+            self._abierto_desde = None
+            chunk_id = f"{self.sesion}-{self._secuencia:06d}"
+            self._secuencia += 1
+            documento = {
+                "v": VERSION_CHUNK,
+                "vehiculo": self.vehiculo,
+                "sesion": self.sesion,
+                "chunk": chunk_id,
+                "filas": filas,
+            }
+        datos = gzip.compress(json.dumps(documento, separators=(",", ":")).encode("utf-8"), 6)
+        ruta = os.path.join(self.spool, chunk_id + SUFIJO)
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        with self._lock_spool:
+            os.replace(temporal, ruta)
+            self.stats["chunks"] += 1
+        self._limitar_spool()
+        return ruta
+
+    def _limitar_spool(self):
+        with self._lock_spool:
+            pendientes = self.pendientes()
+            total = sum(os.path.getsize(r) for r in pendientes)
+            for ruta in pendientes:
+                if total <= self.max_spool_bytes:
+                    break
+                total -= os.path.getsize(ruta)
+                os.remove(ruta)
+                self.stats["descartados"] += 1
+                logger.warning("Spool lleno: se descarta %s", os.path.basename(ruta))
+
+    def _apartar(self, ruta: str):
+        """Mueve un chunk rechazado a la cuarentena del spool."""
+        destino = os.path.join(self.spool, RECHAZADOS)
+        with self._lock_spool:
+            os.makedirs(destino, exist_ok=True)
+            try:
+                os.replace(ruta, os.path.join(destino, os.path.basename(ruta)))
+            except FileNotFoundError:
+                pass
+
+    def rechazados(self) -> List[str]:
+        """Chunks en cuarentena (rechazados por el servidor)."""
+        destino = os.path.join(self.spool, RECHAZADOS)
+        if not os.path.isdir(destino):
+            return []
+        return sorted(os.path.join(destino, n) for n in os.listdir(destino) if n.endswith(SUFIJO))
+
+    def _quitar(self, ruta: str):
+        with self._lock_spool:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Envío
+    # ------------------------------------------------------------------
+    def pendientes(self) -> List[str]:
+        """Chunks en spool, del más viejo al más nuevo."""
+        with self._lock_spool:  # sin carreras con _quitar/_limitar_spool
+            fechas = []
+            for nombre in os.listdir(self.spool):
+                if not nombre.endswith(SUFIJO):
+                    continue
+                ruta = os.path.join(self.spool, nombre)
+                try:
+                    fechas.append((os.path.getmtime(ruta), ruta))
+                except FileNotFoundError:
+                    continue  # borrado desde fuera del uplink
+        return [ruta for _, ruta in sorted(fechas)]
+
+    def _enviar(self, ruta: str) -> bool:
+        with self._lock_spool:
+            try:
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+            except FileNotFoundError:
+                return True  # descartado por límite de spool mientras tanto
+        chunk_id = os.path.basename(ruta)[: -len(SUFIJO)]
+        peticion = urllib.request.Request(
+            self.url + "/ingest",
+            data=datos,
+            method="POST",
+            headers={
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+                "X-Chunk-Id": chunk_id,
+            },
+        )
+        try:
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as resp:
+                respuesta = json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            if 400 <= e.code < 500 and e.code != 429:
+                # El servidor rechaza el chunk (corrupto): reintentar no sirve
+                logger.error("Chunk %s rechazado (%s), se aparta a %s/", chunk_id, e.code, RECHAZADOS)
+                self._apartar(ruta)
+                self.stats["rechazados"] += 1
+                return True
+            self.stats["fallos_envio"] += 1
+            return False
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            logger.debug("Envío de %s falló: %s", chunk_id, e)
+            self.stats["fallos_envio"] += 1
+            return False
+        if respuesta.get("duplicado"):
+            self.stats["duplicados"] += 1
+        self.stats["enviados"] += 1
+        self._quitar(ruta)
+        return True
+
+    def enviar_pendientes(self) -> int:
+        """
+        Envía los chunks del spool en orden. Se detiene en el primer fallo
+        reintentable (red, 5xx, 429); los rechazados se apartan y se sigue.
+        """
+        if not self.url:
+            return 0
+        enviados = 0
+        for ruta in self.pendientes():
+            if not self._enviar(ruta):
+                break
+            enviados += 1
+        return enviados
+
+    def _bucle(self, intervalo: float, backoff_max: float):
+        espera = intervalo
+        while not self._parar.wait(espera):
+            with self._lock:
+                vencido = self._abierto_desde is not None and \
+                    time.monotonic() - self._abierto_desde >= self.max_segundos
+            if vencido:
+                self.sellar()
+            pendientes = len(self.pendientes())
+            enviados = self.enviar_pendientes()
+            if pendientes and not enviados:
+                espera = min(espera * 2, backoff_max)  # sin conexión: backoff
+            else:
+                espera = intervalo
+
+    def iniciar(self, intervalo: float = 1.0, backoff_max: float = 60.0):
+        """Lanza el hilo que sella por tiempo y envía el spool."""
+        if self._hilo is not None:
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, args=(intervalo, backoff_max),
+                                      name="uplink", daemon=True)
+        self._hilo.start()
+
+    def detener(self, enviar: bool = True):
+        """Sella lo pendiente y, si hay red, intenta un último envío."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        self.sellar()
+        if enviar:
+            self.enviar_pendientes()
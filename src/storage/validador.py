@@ -1,74 +1,224 @@
 import csv
-from typing import List, Tuple
+import gzip
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # la validación por bloques es opcional
+    np = None
+
+# Rangos de coherencia por columna (mínimo, máximo)
+RANGOS = {"rpm": (0, 10000), "vel": (0, 300)}
+MAX_ERRORES_POR_TIPO = 20
+FILAS_POR_BLOQUE = 16384
+
+
+@dataclass
+class ResultadoValidacion:
+    valido: bool
+    errores: List[str]
+    filas: int = 0
+    # Por columna: filas con dato, no numéricos y fuera de rango
+    columnas: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # Total de ocurrencias por tipo de error (sin el tope de reporte)
+    conteo_errores: Dict[str, int] = field(default_factory=dict)
+
+
+class _Errores:
+    """Guarda hasta ``maximo`` mensajes por tipo y cuenta el resto."""
+
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self.mensajes: Dict[str, List[str]] = {}
+        self.conteo: Dict[str, int] = {}
+        self.descripciones: Dict[str, str] = {}
+
+    def agregar(self, tipo: str, mensaje: str, descripcion: Optional[str] = None):
+        n = self.conteo.get(tipo, 0) + 1
+        self.conteo[tipo] = n
+        if n <= self.maximo:
+            self.mensajes.setdefault(tipo, []).append(mensaje)
+        if descripcion:
+            self.descripciones[tipo] = descripcion
+
+    def disponibles(self, tipo: str) -> int:
+        """Mensajes que todavía se guardarían para ``tipo``."""
+        return max(self.maximo - self.conteo.get(tipo, 0), 0)
+
+    def contar(self, tipo: str, n: int, descripcion: str):
+        """Suma ``n`` ocurrencias sin guardar mensajes (ya se superó el tope)."""
+        self.conteo[tipo] = self.conteo.get(tipo, 0) + n
+        self.descripciones[tipo] = descripcion
+
+    def lista(self) -> List[str]:
+        salida = []
+        for tipo, n in self.conteo.items():  # también los tipos sin mensajes (tope 0)
+            if not n:
+                continue
+            mensajes = self.mensajes.get(tipo, [])
+            salida.extend(mensajes)
+            if n > len(mensajes):
+                salida.append(
+                    f"{self.descripciones.get(tipo, tipo)}: {n} filas en total "
+                    f"(se muestran {len(mensajes)})."
+                )
+        return salida
+
+
+def _rango_por_filas(valores, inicio, columna, rango, errores, stats):
+    """Chequeo fila a fila (sin NumPy o bloque con valores no numéricos)."""
+    minimo, maximo = rango
+    for i, valor in enumerate(valores):
+        if not valor:
+            continue
+        try:
+            x = float(valor)
+        except ValueError:
+            stats["no_numericos"] += 1
+            errores.agregar(f"no_numerico:{columna}", f"Fila {inicio + i}: valor no numérico en '{columna}'.",
+                            f"Valores no numéricos en '{columna}'")
+            continue
+        if x < minimo or x > maximo:
+            stats["fuera_de_rango"] += 1
+            errores.agregar(f"rango:{columna}",
+                            f"Fila {inicio + i}: valor de '{columna}' fuera de rango ({minimo}-{maximo}).",
+                            f"Valores de '{columna}' fuera de rango ({minimo}-{maximo})")
+
+
+def _rango_numpy(valores, inicio, columna, rango, errores, stats):
+    """Chequeo vectorizado de un bloque de valores de texto."""
+    minimo, maximo = rango
+    texto = np.asarray(valores, dtype=str)
+    con_dato = np.flatnonzero(texto != "")
+    try:
+        x = texto[con_dato].astype(np.float64)
+    except ValueError:
+        _rango_por_filas(valores, inicio, columna, rango, errores, stats)
+        return
+    fuera = con_dato[(x < minimo) | (x > maximo)]
+    stats["fuera_de_rango"] += len(fuera)
+    tipo = f"rango:{columna}"
+    descripcion = f"Valores de '{columna}' fuera de rango ({minimo}-{maximo})"
+    mostrados = fuera[: errores.disponibles(tipo)]
+    for i in mostrados:
+        errores.agregar(tipo, f"Fila {inicio + int(i)}: valor de '{columna}' fuera de rango ({minimo}-{maximo}).",
+                        descripcion)
+    if len(fuera) > len(mostrados):
+        errores.contar(tipo, len(fuera) - len(mostrados), descripcion)
+
+
+def validar_csv_streaming(
+    ruta_csv: str,
+    pids_seleccionados: List[str],
+    rangos: Optional[Dict[str, Tuple[float, float]]] = None,
+    max_errores_por_tipo: int = MAX_ERRORES_POR_TIPO,
+    usar_numpy: Optional[bool] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    requerir_escenario: bool = True,
+) -> ResultadoValidacion:
+    """
+    Valida un CSV de log (o ``.csv.gz``) en una sola pasada y con memoria constante.
+
+    Las filas se leen por bloques de ``filas_por_bloque``; los chequeos de
+    rango de cada bloque se hacen con NumPy si está disponible (``usar_numpy``
+    None = automático). Se reportan hasta ``max_errores_por_tipo`` mensajes por
+    tipo de error y el resto se resume con su total. Con
+    ``requerir_escenario=False`` (sesiones archivadas, que no registran el
+    escenario) la columna 'escenario' puede faltar o venir vacía.
+    """
+    rangos = RANGOS if rangos is None else rangos
+    usar_numpy = (np is not None) if usar_numpy is None else (usar_numpy and np is not None)
+    chequeo_rango = _rango_numpy if usar_numpy else _rango_por_filas
+    errores_filas = _Errores(max_errores_por_tipo)
+    errores = _Errores(max_errores_por_tipo)  # valores por columna
+    cabecera: List[str] = []
+    filas = 0
+    columnas: Dict[str, Dict[str, int]] = {}
+    try:
+        abrir = gzip.open if ruta_csv.lower().endswith(".gz") else open
+        with abrir(ruta_csv, "rt", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            encabezado = next(reader, None)
+            if encabezado is None:
+                return ResultadoValidacion(False, ["El archivo no tiene encabezado."])
+            # 1. Verificar columnas obligatorias
+            obligatorias = ["timestamp", "escenario"] if requerir_escenario else ["timestamp"]
+            faltantes = [c for c in obligatorias + pids_seleccionados if c not in encabezado]
+            if faltantes:
+                cabecera.append(f"Faltan columnas obligatorias: {faltantes}")
+            indice = {c: i for i, c in enumerate(encabezado)}
+            i_escenario = indice.get("escenario") if requerir_escenario else None
+            columnas = {c: {"con_datos": 0, "no_numericos": 0, "fuera_de_rango": 0} for c in encabezado}
+            con_rango = [(c, indice[c], rangos[c]) for c in rangos if c in indice]
+            ancho = len(encabezado)
+            con_datos = [0] * ancho
+            while True:
+                bloque = []
+                for fila in reader:
+                    if not fila:
+                        continue  # línea en blanco: csv.DictReader también la omite
+                    bloque.append(fila)
+                    if len(bloque) >= filas_por_bloque:
+                        break
+                if not bloque:
+                    break
+                inicio = filas + 2  # número de fila en el archivo (1 = encabezado)
+                filas += len(bloque)
+                # 2. Filas vacías, 'escenario' y filas con dato por columna
+                for i, fila in enumerate(bloque):
+                    if len(fila) < ancho:
+                        fila.extend([""] * (ancho - len(fila)))
+                    vacia = True
+                    for j in range(ancho):
+                        if fila[j].strip():
+                            con_datos[j] += 1
+                            vacia = False
+                    if vacia:
+                        errores_filas.agregar("vacia", f"Fila {inicio + i} completamente vacía.",
+                                              "Filas completamente vacías")
+                    if i_escenario is not None and not fila[i_escenario].strip():
+                        errores_filas.agregar("escenario", f"Fila {inicio + i} sin valor válido en 'escenario'.",
+                                              "Filas sin valor válido en 'escenario'")
+                # 4. Coherencia de rangos, vectorizada por bloque si hay NumPy
+                for c, i, rango in con_rango:
+                    chequeo_rango([fila[i].strip() for fila in bloque], inicio, c, rango, errores, columnas[c])
+            for c, j in indice.items():
+                columnas[c]["con_datos"] = con_datos[j]
+    except Exception as e:
+        return ResultadoValidacion(False, cabecera + [f"Error al leer el archivo: {e}"], filas, columnas)
+
+    lista = list(cabecera)
+    if filas == 0:
+        lista.append("El archivo no contiene registros.")
+    lista.extend(errores_filas.lista())
+    for pid in pids_seleccionados:
+        if pid in columnas:
+            if columnas[pid]["con_datos"] == 0:
+                lista.append(f"El PID '{pid}' está en el encabezado pero no tiene datos en ningún registro.")
+        else:
+            lista.append(f"El PID '{pid}' no está en el encabezado.")
+    lista.extend(errores.lista())
+    conteo = {**errores_filas.conteo, **errores.conteo}
+    valido = not lista and not any(conteo.values())
+    return ResultadoValidacion(valido, lista, filas, columnas, conteo)
 
 
 def validar_log_csv(
-    ruta_csv: str, pids_seleccionados: List[str]
+    ruta_csv: str, pids_seleccionados: List[str], **opciones
 ) -> Tuple[bool, List[str]]:
     """
     Valida un archivo CSV de log OBD-II según los estándares definidos.
     Args:
         ruta_csv: Ruta al archivo CSV a validar.
         pids_seleccionados: Lista de PIDs que deben estar presentes como columnas.
+        opciones: ver validar_csv_streaming (rangos, max_errores_por_tipo, usar_numpy,
+            requerir_escenario).
     Returns:
         (valido, lista_errores):
             valido: True si el log es válido, False si hay errores.
-            lista_errores: Lista de strings describiendo los problemas encontrados.
+            lista_errores: Lista de strings describiendo los problemas encontrados
+                (a lo sumo max_errores_por_tipo por tipo, más un total por tipo).
     """
-    errores = []
-    columnas_obligatorias = ["timestamp", "escenario"] + pids_seleccionados
-    try:
-        with open(ruta_csv, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            encabezado = reader.fieldnames
-            if encabezado is None:
-                errores.append("El archivo no tiene encabezado.")
-                return False, errores
-            # 1. Verificar columnas obligatorias
-            faltantes = [col for col in columnas_obligatorias if col not in encabezado]
-            if faltantes:
-                errores.append(f"Faltan columnas obligatorias: {faltantes}")
-            # 2. Revisar filas vacías y valores de 'escenario'
-            filas = list(reader)
-            if not filas:
-                errores.append("El archivo no contiene registros.")
-            for i, fila in enumerate(filas):
-                if all((v is None or str(v).strip() == "") for v in fila.values()):
-                    errores.append(f"Fila {i+2} completamente vacía.")
-                if "escenario" in fila and (
-                    fila["escenario"] is None or str(fila["escenario"]).strip() == ""
-                ):
-                    errores.append(f"Fila {i+2} sin valor válido en 'escenario'.")
-            # 3. Validar que cada PID seleccionado esté presente y tenga al menos un dato
-            for pid in pids_seleccionados:
-                if pid in encabezado:
-                    if not any(str(f[pid]).strip() != "" for f in filas):
-                        errores.append(
-                            f"El PID '{pid}' está en el encabezado pero no tiene datos en ningún registro."
-                        )
-                else:
-                    errores.append(f"El PID '{pid}' no está en el encabezado.")
-            # 4. Validaciones básicas de coherencia (ejemplo: rpm > 0, vel >= 0)
-            for i, fila in enumerate(filas):
-                if "rpm" in fila and fila["rpm"]:
-                    try:
-                        rpm = float(fila["rpm"])
-                        if rpm < 0 or rpm > 10000:
-                            errores.append(
-                                f"Fila {i+2}: valor de 'rpm' fuera de rango (0-10000)."
-                            )
-                    except ValueError:
-                        errores.append(f"Fila {i+2}: valor no numérico en 'rpm'.")
-                if "vel" in fila and fila["vel"]:
-                    try:
-                        vel = float(fila["vel"])
-                        if vel < 0 or vel > 300:
-                            errores.append(
-                                f"Fila {i+2}: valor de 'vel' fuera de rango (0-300)."
-                            )
-                    except ValueError:
-                        errores.append(f"Fila {i+2}: valor no numérico en 'vel'.")
-    except Exception as e:
-        errores.append(f"Error al leer el archivo: {e}")
-        return False, errores
-    return (len(errores) == 0), errores
+    resultado = validar_csv_streaming(ruta_csv, pids_seleccionados, **opciones)
+    return resultado.valido, resultado.errores
@@ -68,6 +68,7 @@ from obd.connection import OBDConnection
 from obd.elm327 import ELM327
 from obd.pids_ext import PIDS, normalizar_pid, buscar_pid
 from utils.logging_app import log_evento_app
+from storage.export import exportar_stream
 
 # --- Corrección: Conversión robusta de datos OBD-II a int/float en modo real ---
 # Todos los valores numéricos de PIDs se convierten a int/float antes de operar, loguear o exportar.
@@ -1283,7 +1284,9 @@ class DashboardOBD(QWidget):
         Permite al usuario seleccionar la ubicación y nombre del archivo.
         """
         try:
-            fname, _ = QFileDialog.getSaveFileName(self, "Guardar log como", "obd_log.csv", "CSV (*.csv)")
+            fname, _ = QFileDialog.getSaveFileName(
+                self, "Guardar log como", "obd_log.csv", "CSV (*.csv);;CSV comprimido (*.csv.gz)"
+            )
             if not fname:
                 return
             log = self.data_source.get_log()
@@ -1291,15 +1294,17 @@ class DashboardOBD(QWidget):
                 QMessageBox.warning(self, "Sin datos", "No hay datos para exportar.")
                 return
             campos = ["timestamp"] + self.selected_pids + ["escenario"]
-            with open(fname, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=campos)
-                writer.writeheader()
+
+            def filas():
+                # Copia por fila (el log en memoria no se modifica) y 0 explícito en rpm/vel
                 for row in log:
-                    # Asegurar que 0 se exporta correctamente
+                    fila = {k: row.get(k, "") for k in campos}
                     for pid in ("rpm", "vel"):
-                        if pid in campos and (row.get(pid) is None or row.get(pid) == ""):
-                            row[pid] = 0
-                    writer.writerow({k: row.get(k, "") for k in campos})
+                        if pid in campos and fila[pid] in (None, ""):
+                            fila[pid] = 0
+                    yield fila
+
+            exportar_stream(fname, filas(), campos)
             QMessageBox.information(self, "Exportación exitosa", f"Log exportado a {fname}")
         except Exception as e:
             QMessageBox.critical(self, "Error al exportar log", str(e))
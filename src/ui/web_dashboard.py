@@ -1,4 +1,5 @@
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, render_template_string, jsonify, request
+import os
 import sqlite3
 import threading
 import time
@@ -114,6 +115,74 @@ def ver_log():
     return html
 
 
+# --- Consultas por rango sobre el archivo de sesiones (rollups 1s/10s/60s) ---
+SESIONES_DB = os.environ.get("OBD_SESIONES_DB", "sesiones.db")
+_store_sesiones = None
+_lock_sesiones = threading.Lock()
+
+
+def _sesiones():
+    global _store_sesiones
+    with _lock_sesiones:  # Flask atiende en varios hilos: una sola conexión
+        if _store_sesiones is None:
+            from src.storage.sesiones import SessionStore
+
+            _store_sesiones = SessionStore(SESIONES_DB)
+        return _store_sesiones
+
+
+@app.route("/api/sesiones")
+def api_sesiones():
+    return jsonify(_sesiones().sesiones(request.args.get("vehiculo")))
+
+
+@app.route("/api/serie/<sesion>")
+def api_serie(sesion):
+    """
+    Serie agregada: /api/serie/<sesion>?pids=rpm,vel&t0=...&t1=...&res=10
+    Sin 'res' la resolución se elige según el rango (máx. 'puntos' buckets).
+    """
+    from src.storage.consultas import MAX_PUNTOS, consultar_serie
+
+    def _num(nombre, tipo=float):
+        valor = request.args.get(nombre)
+        return tipo(valor) if valor not in (None, "") else None
+
+    pids = [p for p in request.args.get("pids", "").split(",") if p]
+    try:
+        datos = consultar_serie(
+            _sesiones(), sesion, pids or None, _num("t0"), _num("t1"),
+            resolucion=_num("res"), max_puntos=_num("puntos", int) or MAX_PUNTOS,
+        )
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(datos)
+
+
+# --- Logs CSV en curso: seguimiento incremental (solo bytes nuevos) ---
+_seguidor_logs = None
+_lock_logs = threading.Lock()
+
+
+@app.route("/api/logs_csv")
+def api_logs_csv():
+    """Registros por archivo de logs_obd/ y la última línea de los que crecieron."""
+    global _seguidor_logs
+    from src.utils.tail import SeguidorDirectorio
+
+    with _lock_logs:
+        if _seguidor_logs is None:
+            _seguidor_logs = SeguidorDirectorio(os.environ.get("OBD_LOGS_DIR", "logs_obd"), "*.csv")
+        eventos = _seguidor_logs.sondear()
+        resumen = _seguidor_logs.resumen()
+    for evento in eventos:
+        if evento.lineas and evento.registros > 0:
+            resumen[evento.nombre]["ultima"] = evento.lineas[-1]
+    return jsonify(resumen)
+
+
 HTML = HTML.replace(
     "</div>\n    <script>", '<a class="btn" href="/log">Ver log</a></div>\n    <script>'
 )
@@ -0,0 +1,252 @@
+"""
+Métricas livianas del camino caliente (envío, espera del adaptador,
+recepción, parseo, salto de cola, pintado de UI y escritura a disco).
+
+Histogramas de buckets fijos sobre el reloj monotónico, contadores y
+medidores, sin dependencias externas. Se exponen en formato de texto de
+Prometheus en un puerto local y como resumen (p50/p95) para el panel de
+diagnóstico del dashboard.
+
+Uso:
+    from src.utils.metricas import REGISTRO, cronometrar, servir_metricas
+
+    with cronometrar("parse"):
+        valor = parsear(respuesta)
+    REGISTRO.contador("obd_no_data_total").inc()
+    servir_metricas(9108)        # http://127.0.0.1:9108/metrics
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # http.server se importa recién al servir (cuesta ~40 ms)
+    from http.server import ThreadingHTTPServer
+
+# Límites superiores de los buckets, en segundos (0,1 ms .. 2,5 s)
+LIMITES_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+             0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PUERTO_POR_DEFECTO = 9108
+
+# Etapas del ciclo de sondeo (etiqueta 'etapa' de obd_etapa_segundos)
+ETAPAS = ("envio", "espera", "recepcion", "parseo", "cola", "ui", "disco")
+
+
+def _etiquetas(etiquetas: Tuple[Tuple[str, str], ...]) -> str:
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in etiquetas) + "}"
+
+
+class Contador:
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1):
+        with self._lock:
+            self.valor += n
+
+
+class Medidor:
+    """Valor instantáneo (p. ej. profundidad de cola)."""
+
+    def __init__(self):
+        self.valor = 0.0
+
+    def set(self, valor: float):
+        self.valor = valor
+
+
+class Histograma:
+    def __init__(self, limites: Sequence[float] = LIMITES_S):
+        self.limites = tuple(limites)
+        self.cuentas = [0] * (len(self.limites) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float):
+        i = bisect_left(self.limites, valor)
+        with self._lock:
+            self.cuentas[i] += 1
+            self.suma += valor
+            self.n += 1
+
+    def cuantil(self, q: float) -> Optional[float]:
+        """Aproximación por el límite superior del bucket que contiene ``q``."""
+        if not self.n:
+            return None
+        objetivo = q * self.n
+        acumulado = 0
+        for i, c in enumerate(self.cuentas):
+            acumulado += c
+            if acumulado >= objetivo:
+                return self.limites[i] if i < len(self.limites) else float("inf")
+        return None
+
+
+class Registro:
+    """Conjunto de métricas con nombre y etiquetas; seguro entre hilos."""
+
+    def __init__(self):
+        self._metricas: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], object] = {}
+        self._tipos: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.activo = True
+
+    def _obtener(self, tipo: str, clase, nombre: str, ayuda: str, etiquetas: Dict[str, str]):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        metrica = self._metricas.get(clave)
+        if metrica is None:
+            with self._lock:
+                metrica = self._metricas.get(clave)
+                if metrica is None:
+                    metrica = self._metricas[clave] = clase()
+                    self._tipos.setdefault(nombre, (tipo, ayuda))
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str = "", **etiquetas) -> Contador:
+        return self._obtener("counter", Contador, nombre, ayuda, etiquetas)
+
+    def medidor(self, nombre: str, ayuda: str = "", **etiquetas) -> Medidor:
+        return self._obtener("gauge", Medidor, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre: str, ayuda: str = "", **etiquetas) -> Histograma:
+        return self._obtener("histogram", Histograma, nombre, ayuda, etiquetas)
+
+    def etapa(self, etapa: str) -> Histograma:
+        """Histograma de duración de una etapa del ciclo de sondeo."""
+        return self.histograma("obd_etapa_segundos", "Duración por etapa del ciclo de sondeo", etapa=etapa)
+
+    def exportar_prometheus(self) -> str:
+        """Formato de texto de Prometheus (version 0.0.4)."""
+        with self._lock:
+            metricas = sorted(self._metricas.items(), key=lambda kv: kv[0])
+            tipos = dict(self._tipos)
+        lineas = []
+        vistos = set()
+        for (nombre, etiquetas), metrica in metricas:
+            if nombre not in vistos:
+                vistos.add(nombre)
+                tipo, ayuda = tipos[nombre]
+                if ayuda:
+                    lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+            if isinstance(metrica, Histograma):
+                acumulado = 0
+                for limite, c in zip(metrica.limites + (float("inf"),), metrica.cuentas):
+                    acumulado += c
+                    le = "+Inf" if limite == float("inf") else repr(limite)
+                    lineas.append(f"{nombre}_bucket{_etiquetas(etiquetas + (('le', le),))} {acumulado}")
+                lineas.append(f"{nombre}_sum{_etiquetas(etiquetas)} {metrica.suma!r}")
+                lineas.append(f"{nombre}_count{_etiquetas(etiquetas)} {metrica.n}")
+            else:
+                lineas.append(f"{nombre}{_etiquetas(etiquetas)} {metrica.valor}")
+        return "\n".join(lineas) + "\n"
+
+    def resumen(self) -> Dict[str, Dict[str, object]]:
+        """{nombre{etiquetas}: valores} legible, para el panel de diagnóstico."""
+        with self._lock:
+            metricas = list(self._metricas.items())
+        salida = {}
+        for (nombre, etiquetas), metrica in sorted(metricas, key=lambda kv: kv[0]):
+            clave = nombre + _etiquetas(etiquetas)
+            if isinstance(metrica, Histograma):
+                p50, p95 = metrica.cuantil(0.5), metrica.cuantil(0.95)
+                salida[clave] = {
+                    "n": metrica.n,
+                    "media_ms": round(metrica.suma / metrica.n * 1000, 3) if metrica.n else None,
+                    "p50_ms": None if p50 is None else p50 * 1000,
+                    "p95_ms": None if p95 is None else p95 * 1000,
+                }
+            else:
+                salida[clave] = {"valor": metrica.valor}
+        return salida
+
+    def limpiar(self):
+        with self._lock:
+            self._metricas.clear()
+            self._tipos.clear()
+
+
+REGISTRO = Registro()
+
+
+@contextmanager
+def cronometrar(etapa: str, registro: Optional[Registro] = None):
+    """Mide el bloque con time.perf_counter y lo suma al histograma de ``etapa``."""
+    registro = registro or REGISTRO
+    if not registro.activo:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.etapa(etapa).observar(time.perf_counter() - t0)
+
+
+@contextmanager
+def cronometrar_slot(slot: str, registro: Optional[Registro] = None):
+    """Duración de un slot de actualización de la UI (obd_slot_segundos{slot=...})."""
+    registro = registro or REGISTRO
+    if not registro.activo:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.histograma("obd_slot_segundos", "Duración de los slots Qt de actualización",
+                            slot=slot).observar(time.perf_counter() - t0)
+
+
+def observar_etapa(etapa: str, segundos: float, registro: Optional[Registro] = None):
+    registro = registro or REGISTRO
+    if registro.activo:
+        registro.etapa(etapa).observar(segundos)
+
+
+def contar(nombre: str, n: int = 1, ayuda: str = "", registro: Optional[Registro] = None, **etiquetas):
+    registro = registro or REGISTRO
+    if registro.activo:
+        registro.contador(nombre, ayuda, **etiquetas).inc(n)
+
+
+def medir(nombre: str, valor: float, ayuda: str = "", registro: Optional[Registro] = None, **etiquetas):
+    registro = registro or REGISTRO
+    if registro.activo:
+        registro.medidor(nombre, ayuda, **etiquetas).set(valor)
+
+
+def servir_metricas(puerto: int = PUERTO_POR_DEFECTO, host: str = "127.0.0.1",
+                    registro: Optional[Registro] = None) -> "ThreadingHTTPServer":
+    """
+    Sirve ``/metrics`` en un hilo daemon. Con ``puerto=0`` se elige uno libre
+    (ver ``servidor.server_address``). Llamar ``servidor.shutdown()`` para parar.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registro = registro or REGISTRO
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            cuerpo = registro.exportar_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, puerto), _Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    return servidor
@@ -0,0 +1,201 @@
+"""
+Perfilador por muestreo que se puede prender y apagar en caliente.
+
+Un hilo daemon toma, a ``hz`` muestras por segundo, la pila de todos los
+hilos de Python (``sys._current_frames``): el de adquisición, el principal
+de Qt, los de logging, etc. No instala hooks de trazado, así que el costo
+solo depende de la frecuencia de muestreo. ``fraccion_muestreo()`` informa
+el tiempo que pasa el propio muestreador tomando pilas; no es el impacto
+sobre el programa (mientras muestrea tiene el GIL y los demás hilos
+esperan), que hay que medir comparando corridas con y sin perfilador.
+Al detenerse escribe en ``logs/``:
+
+* ``perfil_<fecha>.folded``: pilas colapsadas (``hilo;f1;f2 N``), para
+  flamegraph.pl / inferno.
+* ``perfil_<fecha>.speedscope.json``: un perfil por hilo, se abre en
+  https://www.speedscope.app.
+
+Uso:
+    perfilador = PerfiladorMuestreo(hz=100)
+    instalar_senal(perfilador)       # kill -USR2 <pid> alterna
+    perfilador.alternar()            # o desde una acción de menú
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+HZ_POR_DEFECTO = 100
+DIRECTORIO_POR_DEFECTO = "logs"
+
+
+def _nombre_frame(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class PerfiladorMuestreo:
+    """Muestrea las pilas de todos los hilos desde un hilo propio."""
+
+    def __init__(self, hz: int = HZ_POR_DEFECTO, directorio: str = DIRECTORIO_POR_DEFECTO,
+                 profundidad_max: int = 128):
+        self.hz = hz
+        self.directorio = directorio
+        self.profundidad_max = profundidad_max
+        self.muestras: Counter = Counter()  # (hilo, pila) -> cantidad
+        self.n_muestras = 0
+        self.segundos_muestreo = 0.0  # tiempo gastado dentro del muestreo
+        self._inicio = 0.0
+        self._fin = 0.0
+        self._hilo: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self) -> bool:
+        with self._lock:
+            if self.activo:
+                return False
+            self.muestras = Counter()
+            self.n_muestras = 0
+            self.segundos_muestreo = 0.0
+            self._parar.clear()
+            self._inicio = time.perf_counter()
+            self._hilo = threading.Thread(target=self._bucle, name="perfilador", daemon=True)
+            self._hilo.start()
+        print(f"[PERFIL] Muestreo iniciado a {self.hz} Hz")
+        return True
+
+    def detener(self, escribir: bool = True) -> Dict[str, str]:
+        """Detiene el muestreo y, si ``escribir``, devuelve las rutas generadas."""
+        with self._lock:
+            if self._hilo is None:
+                return {}
+            self._parar.set()
+            self._hilo.join()
+            self._hilo = None
+            self._fin = time.perf_counter()
+        print(f"[PERFIL] {self.n_muestras} muestras, muestreo {self.fraccion_muestreo():.2%} del tiempo de pared")
+        return self.escribir() if escribir else {}
+
+    def alternar(self) -> Dict[str, str]:
+        if self.activo:
+            return self.detener()
+        self.iniciar()
+        return {}
+
+    def fraccion_muestreo(self) -> float:
+        """
+        Fracción del tiempo de pared que el hilo muestreador pasó tomando
+        pilas. Es una cota del trabajo propio, no la sobrecarga sobre el
+        programa perfilado.
+        """
+        fin = self._fin if not self.activo else time.perf_counter()
+        duracion = fin - self._inicio
+        return self.segundos_muestreo / duracion if duracion > 0 else 0.0
+
+    def _bucle(self):
+        intervalo = 1.0 / self.hz
+        propio = threading.get_ident()
+        while not self._parar.wait(intervalo):
+            t0 = time.perf_counter()
+            self.muestrear(excluir=propio)
+            self.segundos_muestreo += time.perf_counter() - t0
+
+    def muestrear(self, excluir: Optional[int] = None):
+        """Toma una muestra de cada hilo (salvo ``excluir``)."""
+        nombres = {h.ident: h.name for h in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == excluir:
+                continue
+            pila = []
+            while frame is not None and len(pila) < self.profundidad_max:
+                pila.append(_nombre_frame(frame.f_code))
+                frame = frame.f_back
+            pila.reverse()
+            self.muestras[(nombres.get(ident, f"hilo-{ident}"), tuple(pila))] += 1
+        self.n_muestras += 1
+
+    # ------------------------------------------------------------------
+    # Salida
+    # ------------------------------------------------------------------
+    def colapsado(self) -> List[str]:
+        return [";".join((hilo,) + pila) + f" {n}" for (hilo, pila), n in sorted(self.muestras.items())]
+
+    def speedscope(self) -> Dict[str, object]:
+        frames: List[Dict[str, str]] = []
+        indices: Dict[str, int] = {}
+        por_hilo: Dict[str, List[Tuple[List[int], int]]] = {}
+        for (hilo, pila), n in sorted(self.muestras.items()):
+            ids = []
+            for nombre in pila:
+                if nombre not in indices:
+                    indices[nombre] = len(frames)
+                    frames.append({"name": nombre})
+                ids.append(indices[nombre])
+            por_hilo.setdefault(hilo, []).append((ids, n))
+        intervalo = 1.0 / self.hz
+        perfiles = []
+        for hilo, filas in por_hilo.items():
+            total = sum(n for _, n in filas) * intervalo
+            perfiles.append({
+                "type": "sampled", "name": hilo, "unit": "seconds",
+                "startValue": 0, "endValue": total,
+                "samples": [ids for ids, _ in filas],
+                "weights": [n * intervalo for _, n in filas],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": perfiles,
+            "name": "OBD-II dashboard",
+            "exporter": "perfilador.py",
+        }
+
+    def escribir(self, prefijo: Optional[str] = None) -> Dict[str, str]:
+        os.makedirs(self.directorio, exist_ok=True)
+        base = os.path.join(self.directorio, prefijo or time.strftime("perfil_%Y%m%d_%H%M%S"))
+        rutas = {"folded": base + ".folded", "speedscope": base + ".speedscope.json"}
+        with open(rutas["folded"], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.colapsado()) + "\n")
+        with open(rutas["speedscope"], "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(), f)
+        print(f"[PERFIL] Guardado en {rutas['folded']} y {rutas['speedscope']}")
+        return rutas
+
+
+def instalar_senal(perfilador: PerfiladorMuestreo, signum: Optional[int] = None) -> bool:
+    """
+    Alterna el perfilador con una señal (SIGUSR2 por defecto). Solo funciona
+    desde el hilo principal y en plataformas con la señal (no en Windows).
+
+    El manejador solo escribe un byte en un pipe: ``alternar()`` toma un lock,
+    espera al hilo muestreador y escribe archivos, y hacerlo dentro del
+    manejador puede trabar el hilo interrumpido si ya tenía ese lock. Un hilo
+    daemon lee el pipe y alterna fuera del contexto de la señal.
+    """
+    signum = signum if signum is not None else getattr(signal, "SIGUSR2", None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+    lectura, escritura = os.pipe()
+    os.set_blocking(escritura, False)
+
+    def _manejador(*_):
+        try:
+            os.write(escritura, b"\0")
+        except BlockingIOError:  # ya hay pedidos sin atender
+            pass
+
+    def _atender():
+        while os.read(lectura, 1):
+            perfilador.alternar()
+
+    threading.Thread(target=_atender, name="perfilador-senal", daemon=True).start()
+    signal.signal(signum, _manejador)
+    return True
@@ -0,0 +1,174 @@
+"""
+Seguimiento incremental de archivos de log ("tail -F").
+
+``SeguidorArchivo`` recuerda el offset en bytes de cada archivo y en cada
+``leer()`` solo lee lo agregado desde la última vez, así el costo de monitorear
+no crece con el tamaño del log. Detecta rotación (cambia el inode) y
+truncado (el archivo es más chico que el offset) y en ambos casos vuelve a
+empezar desde el principio. Lleva la cuenta de líneas completas leídas.
+Cada ``leer()`` lee a lo sumo ``max_bytes``: un log grande se recorre en
+varias llamadas en lugar de cargarlo entero de una vez.
+
+``SeguidorDirectorio`` aplica lo mismo a todos los archivos de un directorio
+que coinciden con un patrón (p. ej. ``logs_obd/*.csv``).
+
+Ejemplo:
+    seguidor = SeguidorDirectorio("logs_obd", "*.csv")
+    while True:
+        for evento in seguidor.sondear():
+            print(evento.nombre, evento.registros, evento.lineas[-1:])
+        time.sleep(1)
+"""
+import fnmatch
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+MAX_BYTES_POR_LECTURA = 4 * 1024 * 1024
+
+
+class SeguidorArchivo:
+    """Lee incrementalmente las líneas nuevas de un archivo."""
+
+    def __init__(self, ruta: str, desde_final: bool = False, cabecera: bool = True,
+                 encoding: str = "utf-8", max_bytes: int = MAX_BYTES_POR_LECTURA):
+        """
+        Args:
+            desde_final: si es True, la primera lectura arranca al final del
+                archivo (sin contar las líneas existentes); la cabecera se
+                lee igual del principio del archivo.
+            cabecera: la primera línea del archivo es una cabecera CSV y no
+                cuenta como registro.
+            max_bytes: bytes leídos como máximo por llamada a ``leer()``.
+        """
+        self.ruta = ruta
+        self.encoding = encoding
+        self.tiene_cabecera = cabecera
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.tamano = 0  # tamaño del archivo en la última lectura
+        self.lineas = 0
+        self.cabecera: Optional[str] = None
+        self.ultima: Optional[str] = None
+        self.reinicios = 0
+        self._inode: Optional[int] = None
+        self._resto = b""
+        self._cabecera_contada = False  # la cabecera está entre las ``lineas`` leídas
+        self._desde_final = desde_final
+
+    @property
+    def registros(self) -> int:
+        """Líneas de datos completas (sin la cabecera)."""
+        return self.lineas - 1 if self._cabecera_contada else self.lineas
+
+    @property
+    def pendiente(self) -> int:
+        """Bytes ya presentes en el archivo que faltan leer (por ``max_bytes``)."""
+        return max(self.tamano - self.offset, 0)
+
+    def _reiniciar(self, inode: Optional[int]):
+        self.offset = 0
+        self.lineas = 0
+        self.cabecera = None
+        self.ultima = None
+        self._resto = b""
+        self._cabecera_contada = False
+        self._inode = inode
+
+    def _saltar_al_final(self, tamano: int):
+        """Arranca al final, pero con la cabecera leída del principio del archivo."""
+        if not self.tiene_cabecera:
+            self.offset = tamano
+            return
+        with open(self.ruta, "rb") as f:
+            primera = f.readline(self.max_bytes)
+        if not primera.endswith(b"\n"):
+            return  # ni la cabecera está completa todavía: se lee desde el principio
+        self.cabecera = primera.decode(self.encoding, errors="replace").rstrip("\r\n")
+        self.offset = tamano
+
+    def leer(self) -> List[str]:
+        """Líneas completas agregadas desde la última lectura (sin salto de línea)."""
+        try:
+            info = os.stat(self.ruta)
+        except FileNotFoundError:
+            return []
+        if self._inode is None:
+            self._inode = info.st_ino
+            if self._desde_final:
+                self._saltar_al_final(info.st_size)
+                self._desde_final = False
+        elif info.st_ino != self._inode or info.st_size < self.offset:
+            # Rotado o truncado: el contenido actual es un archivo nuevo
+            self.reinicios += 1
+            self._reiniciar(info.st_ino)
+        self.tamano = info.st_size
+        if info.st_size == self.offset:
+            return []
+        with open(self.ruta, "rb") as f:
+            f.seek(self.offset)
+            datos = f.read(min(info.st_size - self.offset, self.max_bytes))
+        self.offset += len(datos)
+        datos = self._resto + datos
+        corte = datos.rfind(b"\n")
+        if corte < 0:
+            self._resto = datos  # línea todavía incompleta
+            return []
+        self._resto = datos[corte + 1:]
+        nuevas = datos[:corte].decode(self.encoding, errors="replace").split("\n")
+        nuevas = [l.rstrip("\r") for l in nuevas]
+        if self.tiene_cabecera and self.cabecera is None and nuevas:
+            self.cabecera = nuevas[0]
+            self._cabecera_contada = True
+        self.lineas += len(nuevas)
+        self.ultima = nuevas[-1]
+        return nuevas
+
+
+@dataclass
+class EventoTail:
+    nombre: str
+    lineas: List[str] = field(default_factory=list)
+    nuevo: bool = False
+    reiniciado: bool = False
+    registros: int = 0
+    tamano: int = 0
+
+
+class SeguidorDirectorio:
+    """Sigue todos los archivos de ``directorio`` que coinciden con ``patron``."""
+
+    def __init__(self, directorio: str, patron: str = "*.csv", desde_final: bool = False,
+                 cabecera: bool = True):
+        self.directorio = directorio
+        self.patron = patron
+        self.desde_final = desde_final
+        self.cabecera = cabecera
+        self.archivos: Dict[str, SeguidorArchivo] = {}
+
+    def sondear(self) -> List[EventoTail]:
+        """Un ciclo de sondeo: eventos de archivos nuevos o con datos agregados."""
+        eventos = []
+        try:
+            nombres = [n for n in os.listdir(self.directorio) if fnmatch.fnmatch(n, self.patron)]
+        except FileNotFoundError:
+            return eventos
+        for nombre in sorted(nombres):
+            seguidor = self.archivos.get(nombre)
+            nuevo = seguidor is None
+            if nuevo:
+                seguidor = SeguidorArchivo(os.path.join(self.directorio, nombre),
+                                           desde_final=self.desde_final, cabecera=self.cabecera)
+                self.archivos[nombre] = seguidor
+            reinicios = seguidor.reinicios
+            lineas = seguidor.leer()
+            if nuevo or lineas or seguidor.reinicios != reinicios:
+                eventos.append(EventoTail(nombre, lineas, nuevo, seguidor.reinicios != reinicios,
+                                          seguidor.registros, seguidor.offset))
+        for nombre in set(self.archivos) - set(nombres):
+            del self.archivos[nombre]  # borrado
+        return eventos
+
+    def resumen(self) -> Dict[str, Dict[str, int]]:
+        """Registros y bytes leídos por archivo, sin volver a leer nada."""
+        return {n: {"registros": s.registros, "tamano": s.offset} for n, s in self.archivos.items()}
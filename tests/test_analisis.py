@@ -0,0 +1,83 @@
+import random
+import statistics
+
+from src.analisis.estadisticas import ContadorSaltos, CuantilP2, EstadisticaOnline
+from src.analisis.resumen_logs import buscar_logs, combinar_resumenes, resumir_archivos
+
+
+def test_welford_y_combinacion():
+    datos = [random.gauss(900, 150) for _ in range(5000)]
+    a, b, total = EstadisticaOnline(), EstadisticaOnline(), EstadisticaOnline()
+    for i, x in enumerate(datos):
+        (a if i < 1234 else b).agregar(x)
+        total.agregar(x)
+    combinada = EstadisticaOnline().combinar(a).combinar(EstadisticaOnline.desde_dict(b.a_dict()))
+    assert combinada.n == 5000
+    assert abs(combinada.media - statistics.fmean(datos)) < 1e-6
+    assert abs(combinada.varianza - statistics.variance(datos)) < 1e-3
+    assert abs(total.desviacion - statistics.stdev(datos)) < 1e-6
+    assert (combinada.minimo, combinada.maximo) == (min(datos), max(datos))
+
+
+def test_cuantil_p2_aproxima_al_exacto():
+    rnd = random.Random(7)
+    datos = [rnd.expovariate(1 / 40) for _ in range(20000)]
+    ordenados = sorted(datos)
+    for p in (0.5, 0.95):
+        est = CuantilP2(p)
+        for x in datos:
+            est.agregar(x)
+        exacto = ordenados[int(p * len(ordenados))]
+        assert abs(est.valor - exacto) / exacto < 0.03
+    pocos = CuantilP2(0.5)
+    assert pocos.valor is None
+    for x in (3, 1, 2):
+        pocos.agregar(x)
+    assert pocos.valor == 2
+
+
+def test_contador_saltos():
+    saltos = ContadorSaltos(200)
+    for x in (800, 900, 1500, 1450, 700):
+        saltos.agregar(x)
+    assert saltos.saltos == 2
+    assert saltos.mayor == 750
+
+
+def _escribir_log(ruta, filas):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("timestamp,rpm,velocidad,temp_motor\n")
+        for i in range(filas):
+            f.write(f"2025-06-06 15:{i // 120:02d}:{(i // 2) % 60:02d},{800 + (i % 3) * 300},{i % 50},OK>\n")
+
+
+def test_resumen_con_cache(tmp_path):
+    _escribir_log(tmp_path / "a.csv", 240)
+    _escribir_log(tmp_path / "b.csv", 120)
+    (tmp_path / "pids_soportados.csv").write_text('﻿"PID","Descripcion"\n"010C","RPM"\n', encoding="utf-8")
+    cache = str(tmp_path / "cache.json")
+
+    rutas = buscar_logs([str(tmp_path)])
+    assert [r.rsplit("/", 1)[-1] for r in rutas] == ["a.csv", "b.csv"]
+    resumenes = resumir_archivos(rutas, cache=cache, procesos=2)
+    a = resumenes[0]
+    assert a["filas"] == 240
+    assert a["duracion_s"] == 119
+    assert abs(a["frecuencia_hz"] - 2.0) < 0.02
+    assert a["estadisticas"]["rpm"]["saltos"] == 239
+    assert a["estadisticas"]["temp_motor"]["validos"] == 0
+    assert a["ultimas"][-1][0] == "2025-06-06 15:01:59"
+
+    # Segunda pasada: nada cambió, todo sale del caché
+    otra = resumir_archivos(rutas, cache=cache, procesos=2)
+    assert otra == resumenes
+
+    # Solo el archivo modificado se vuelve a procesar
+    _escribir_log(tmp_path / "b.csv", 10)
+    nuevos = resumir_archivos(rutas, cache=cache, procesos=1)
+    assert nuevos[0] == resumenes[0]
+    assert nuevos[1]["filas"] == 10
+
+    flota = combinar_resumenes(nuevos)
+    assert flota["archivos"] == 2 and flota["filas"] == 250
+    assert flota["estadisticas"]["rpm"]["n"] == 250
@@ -0,0 +1,41 @@
+import json
+
+from benchmarks.suite import CASOS, comparar, ejecutar, main
+
+
+def test_suite_registra_y_mide_casos():
+    informe = ejecutar("decode.decodificador", repeticiones=1, escala=0.01)
+    assert {"decode.pid_decoder", "log.sesiones_sqlite", "e2e.simulador_elm327",
+            "ui.dashboard_frame", "ui.data_visualizer_frame"} <= set(CASOS)
+    res = informe["resultados"]["decode.decodificador"]
+    assert list(informe["resultados"]) == ["decode.decodificador"]
+    assert res["ops_por_s"] > 0 and res["n"] == 1000
+
+
+def test_casos_sin_dependencias_se_omiten():
+    informe = ejecutar("ui.", repeticiones=1, escala=0.01)
+    for res in informe["resultados"].values():
+        assert "omitido" in res or res["ops_por_s"] > 0
+
+
+def test_comparar_marca_regresiones(tmp_path):
+    base = {"resultados": {"a": {"ops_por_s": 1000.0}, "b": {"ops_por_s": 1000.0}, "c": {"omitido": "x"}}}
+    actual = {"resultados": {"a": {"ops_por_s": 700.0}, "b": {"ops_por_s": 950.0}, "c": {"omitido": "x"}}}
+    filas = {f["nombre"]: f for f in comparar(actual, base, tolerancia=0.15)}
+    assert filas["a"]["regresion"] and not filas["b"]["regresion"]
+    assert "c" not in filas
+
+    ruta = tmp_path / "base.json"
+    ruta.write_text(json.dumps({"resultados": {"decode.decodificador": {"ops_por_s": 1e12}}}))
+    assert main(["-k", "decode.decodificador", "-r", "1", "--escala", "0.01", "--comparar", str(ruta)]) == 1
+
+
+def test_importtime_mide_en_proceso_nuevo():
+    from benchmarks.importtime import informe, main as main_import, medir, total_s
+
+    filas = medir("src.utils.metricas")
+    assert total_s(filas, "src.utils.metricas") > 0
+    assert "http.server" not in {f.modulo for f in filas}  # se importa recién al servir
+    assert "src.utils.metricas" in informe(filas)
+    assert main_import(["src.utils.metricas", "--presupuesto", "0"]) == 1
+    assert main_import(["modulo_que_no_existe"]) == 2
@@ -0,0 +1,57 @@
+import os
+
+from src.obd import catalogo_pids
+from src.obd.catalogo_pids import cargar_catalogo
+from src.obd.decodificador import Decodificador
+
+
+def _fuentes(raiz):
+    (raiz / "pids").mkdir()
+    (raiz / "pids" / "universal_standard.csv").write_text(
+        "PID,Name,Unit,Type\n010C,RPM,RPM,fast\n0105,Temp_Motor,°C,slow\n", encoding="utf-8")
+    (raiz / "pids" / "extended_iso_15765_4_can.csv").write_text(
+        "PID,Name,Unit\n221910,Trans Fluid Temp,C\n", encoding="utf-8")
+    obd = raiz / "ob2_nuevo7junio" / "scanner-obd2"
+    (obd / "data").mkdir(parents=True)
+    (obd / "obdii-pids.json").write_text(
+        '[null, [{"PID": "0C", "DataLen": 2, "Desc": "Engine RPM"}, null]]', encoding="utf-8")
+    (obd / "data" / "pid_definitions.json").write_text(
+        '{"default": {"default": [{"name": "Boost", "code": "015F", "unit": "psi"}]}}', encoding="utf-8")
+    pids_ext = raiz / "src" / "obd" / "pids_ext.py"
+    pids_ext.parent.mkdir(parents=True)
+    pids_ext.write_text('PIDS = {"010C": {"cmd": "010C", "nombre": "rpm", "parse": "((A*256)+B)/4"}}\n')
+
+
+def test_catalogo_unifica_fuentes_y_usa_cache(tmp_path, monkeypatch):
+    _fuentes(tmp_path)
+    cache = str(tmp_path / "cache.marshal")
+    catalogo = cargar_catalogo(str(tmp_path), cache)
+    assert os.path.exists(cache)
+    rpm = catalogo.info("010c")
+    assert rpm["nombre"] == "rpm" and rpm["desc"] == "Engine RPM" and rpm["tipo"] == "fast"
+    assert set(rpm["fuentes"]) == {"pids_ext", "universal", "obdii"}
+    assert catalogo.universal_slow == {"0105": {"name": "Temp_Motor", "unit": "°C"}}
+    assert catalogo.extendidos_para("ISO_15765_4 CAN") == {"221910": {"name": "Trans Fluid Temp", "unit": "C"}}
+    assert catalogo.tuning_para("Ford", "Focus")[0]["code"] == "015F"
+    assert catalogo.decodificar("010C", bytes([0x1A, 0xF8])) == 1726.0
+    assert catalogo.decodificar("0105", bytes([0x7B])) == 83  # FORMULAS_ESTANDAR
+    assert cargar_catalogo(str(tmp_path), cache) is catalogo
+
+    # Otro proceso (memo vacío) lee la caché sin volver a parsear las fuentes
+    catalogo_pids._MEMO.clear()
+    monkeypatch.setattr(catalogo_pids, "construir", lambda raiz: (_ for _ in ()).throw(AssertionError))
+    assert cargar_catalogo(str(tmp_path), cache).info("010C")["parse"] == "((A*256)+B)/4"
+    monkeypatch.undo()
+
+    # Cambiar una fuente invalida la caché
+    csv = tmp_path / "pids" / "universal_standard.csv"
+    csv.write_text("PID,Name,Unit,Type\n010D,Velocidad,km/h,fast\n", encoding="utf-8")
+    os.utime(csv, ns=(1, 1))
+    assert list(cargar_catalogo(str(tmp_path), cache).universal_fast) == ["010D"]
+
+
+def test_decodificador_usa_formulas_del_catalogo(tmp_path):
+    _fuentes(tmp_path)
+    catalogo = cargar_catalogo(str(tmp_path), str(tmp_path / "cache.marshal"))
+    dec = Decodificador(pids={}, catalogo=catalogo)
+    assert dec.decodificar("010C", ["41 0C 1A F8"]) == 1726.0
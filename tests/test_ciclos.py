@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.obd import ciclos
+from src.obd.ciclos import CICLOS, ReproductorCiclo, registrar_csv, resumen, traza
+from src.obd.emulador import EmuladorOBD
+from src.obd.emulador_flota import EmuladorFlota
+from src.obd.simulador_elm327 import VehiculoSimulado
+
+
+@pytest.mark.parametrize("nombre,duracion,vel_max,distancia_km", [
+    ("nedc", 1180, 120.0, 11.0),
+    ("wltp", 1800, 131.3, 23.3),
+    ("ftp75", 1874, 91.2, 17.8),
+])
+def test_perfiles_estandar(nombre, duracion, vel_max, distancia_km):
+    datos = resumen(nombre)
+    assert datos["duracion_s"] == duracion
+    assert datos["vel_max"] == vel_max
+    assert datos["distancia_km"] == pytest.approx(distancia_km, rel=0.1)
+
+
+def test_traza_reproducible_y_coherente():
+    a = traza("wltp", semilla=5)
+    assert traza("wltp", semilla=5) is a  # precalculada una sola vez
+    traza.cache_clear()
+    b = traza("wltp", semilla=5)
+    assert all(np.array_equal(a.columnas[k], b.columnas[k]) for k in a.columnas)
+    assert not np.array_equal(a.columnas["rpm"], traza("wltp", semilla=6).columnas["rpm"])
+
+    c = a.columnas
+    detenido = c["vel"] < 2
+    assert np.all(np.abs(c["rpm"][detenido] - 800) < 100)
+    assert np.all(c["rpm"][c["vel"] > 100] > 2000)
+    assert c["temp"][0] < 30 and c["temp"][-1] > 85  # arranque en frío
+    frenado = c["fase"] == ciclos.FASES.index("frenado")
+    assert np.median(c["consumo"][frenado & ~detenido]) == 0  # corte de inyección
+    assert len(a) == 1800 and a.duracion == 1800
+
+
+def test_interpolacion_y_bucle():
+    tr = traza("nedc")
+    v0, v1 = tr.en(15.0), tr.en(16.0)
+    medio = tr.en(15.5)
+    assert medio["rpm"] == pytest.approx((v0["rpm"] + v1["rpm"]) / 2)
+    assert tr.en(15.0 + tr.duracion)["rpm"] == v0["rpm"]
+    vector = tr.en_vector(np.array([15.0, 15.5, 16.0]))
+    assert vector["rpm"].tolist() == pytest.approx([v0["rpm"], medio["rpm"], v1["rpm"]])
+
+
+def test_reproductor_con_reloj_propio():
+    ahora = [100.0]
+    rep = ReproductorCiclo("ftp75", semilla=1, reloj=lambda: ahora[0])
+    ahora[0] += 200
+    assert rep.valores() == traza("ftp75", 1).en(200)
+
+
+def test_registrar_csv(tmp_path):
+    ruta = tmp_path / "ciclo.csv"
+    ruta.write_text("t,vel\n0,0\n10,36\n20,0\n")
+    registrar_csv("propio", str(ruta))
+    try:
+        assert resumen("propio") == {"duracion_s": 20.0, "distancia_km": 0.1,
+                                     "vel_max": 36.0, "vel_media": 18.0}
+        assert traza("propio").en(10)["vel"] == 36
+    finally:
+        del CICLOS["propio"]
+
+
+def test_emuladores_usan_el_ciclo():
+    vehiculo = VehiculoSimulado(semilla=2, ciclo="wltp")
+    assert set(vehiculo.valores()) >= {"rpm", "vel", "temp", "maf", "carga", "tps", "map"}
+    assert vehiculo.datos_pid(0x0C) is not None
+
+    emu = EmuladorOBD(semilla=2)
+    emu.usar_ciclo("nedc", semilla=2)
+    assert set(emu.get_simulated_data(["010C", "010D", "0105"])) == {"rpm", "vel", "temp"}
+    emu.usar_ciclo(None)
+    assert emu._ciclo is None and emu._escenario == "ralenti"
+
+    flota = EmuladorFlota(100, semilla=2, ciclo="ftp75")
+    flota.avanzar(1.0)
+    esperado = traza("ftp75", 2).en_vector(flota.desfase + 1.0)
+    assert np.array_equal(flota.estado["vel"], esperado["vel"])
+
+
+def test_nombres_de_ciclos_sin_numpy():
+    from src.obd.fisica import CICLOS_ESTANDAR
+
+    assert tuple(CICLOS)[:len(CICLOS_ESTANDAR)] == CICLOS_ESTANDAR
+    codigo = (
+        "import sys; sys.modules['numpy'] = None\n"
+        "from src.obd.fisica import CICLOS_ESTANDAR, ModeloConduccion\n"
+        "modelo = ModeloConduccion(semilla=1)\n"
+        "assert 'wltp' in CICLOS_ESTANDAR and not modelo.set_modo('wltp')\n"
+        "assert modelo.set_modo('ciudad') and modelo.modo == 'ciudad'\n"
+    )
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True, cwd=raiz)
@@ -0,0 +1,95 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.storage.consultas import consultar_serie, elegir_resolucion
+from src.storage.sesiones import SessionStore
+
+
+def _store_con_dia(tmp_path):
+    store = SessionStore(str(tmp_path / "sesiones.db"))
+    t0 = 1_749_513_600.0  # medianoche UTC, múltiplo de 60
+    # 24 h a 2 Hz de rpm, en lotes como los chunks del uplink
+    lote = []
+    for i in range(24 * 3600 * 2):
+        lote.append((t0 + i * 0.5, "rpm", float(800 + i % 600)))
+        if len(lote) == 5000:
+            store.agregar_muestras("dia", lote)
+            lote = []
+    store.agregar_muestras("dia", lote)
+    return store, t0
+
+
+def test_rollups_y_resoluciones(tmp_path):
+    store, t0 = _store_con_dia(tmp_path)
+    try:
+        # Zoom fino: muestras crudas
+        crudo = consultar_serie(store, "dia", ["rpm"], t0, t0 + 10, resolucion=0)
+        assert len(crudo["series"]["rpm"]) == 21
+
+        diez = consultar_serie(store, "dia", ["rpm"], t0, t0 + 59.9, resolucion=10)["series"]["rpm"]
+        assert len(diez) == 6
+        assert diez[0] == {"t": t0, "min": 800.0, "max": 819.0, "media": 809.5, "ultimo": 819.0, "n": 20}
+
+        # Re-agregado a 5 min desde el rollup de 60 s (600 muestras = 300 s por ciclo)
+        cinco = consultar_serie(store, "dia", ["rpm"], t0, t0 + 599, resolucion=300)["series"]["rpm"]
+        assert [b["n"] for b in cinco] == [600, 600]
+        assert cinco[0]["min"] == 800.0 and cinco[0]["max"] == 1399.0
+        assert cinco[0]["ultimo"] == 1399.0
+
+        # Día completo, resolución automática: pocos puntos y rápido
+        inicio = time.perf_counter()
+        dia = consultar_serie(store, "dia")
+        transcurrido = time.perf_counter() - inicio
+        assert dia["resolucion"] == 60
+        assert len(dia["series"]["rpm"]) == 1440
+        assert sum(b["n"] for b in dia["series"]["rpm"]) == 24 * 3600 * 2
+        assert transcurrido < 0.2
+    finally:
+        store.cerrar()
+
+
+def test_reconstruir_rollups_y_errores(tmp_path):
+    store = SessionStore(str(tmp_path / "s.db"))
+    try:
+        store.agregar_muestras("s", [(100.0, "vel", 10.0), (100.5, "vel", 30.0)])
+        antes = consultar_serie(store, "s", resolucion=1)["series"]
+        store.reconstruir_rollups("s")
+        assert consultar_serie(store, "s", resolucion=1)["series"] == antes
+        assert antes["vel"][0]["media"] == 20.0
+        with pytest.raises(KeyError):
+            consultar_serie(store, "no-existe")
+        with pytest.raises(ValueError):
+            consultar_serie(store, "s", resolucion=0.5)
+    finally:
+        store.cerrar()
+
+
+def test_base_anterior_a_los_rollups(tmp_path):
+    ruta = str(tmp_path / "vieja.db")
+    conn = sqlite3.connect(ruta)
+    conn.executescript(
+        "CREATE TABLE sesiones (id TEXT PRIMARY KEY, vehiculo TEXT, inicio REAL, fin REAL, "
+        "n_muestras INTEGER NOT NULL DEFAULT 0, meta TEXT);"
+        "CREATE TABLE muestras (sesion TEXT NOT NULL, pid TEXT NOT NULL, ts REAL NOT NULL, valor REAL);"
+        "INSERT INTO sesiones VALUES ('s', 'hilux', 100.0, 101.0, 3, NULL);"
+        "INSERT INTO muestras VALUES ('s', 'rpm', 100.0, 800), ('s', 'rpm', 100.5, 900), "
+        "('s', 'vel', 101.0, 20);"
+    )
+    conn.commit()
+    conn.close()
+    store = SessionStore(ruta)
+    try:
+        assert store.pids("s") == ["rpm", "vel"]
+        serie = consultar_serie(store, "s", resolucion=1)["series"]
+        assert serie["rpm"][0]["media"] == 850.0 and serie["vel"][0]["n"] == 1
+    finally:
+        store.cerrar()
+
+
+def test_elegir_resolucion():
+    assert elegir_resolucion(0, 600) == 0
+    assert elegir_resolucion(0, 3600) == 10
+    assert elegir_resolucion(0, 86400) == 60
+    assert elegir_resolucion(0, 7 * 86400) == 420
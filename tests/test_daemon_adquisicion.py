@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import json
+import subprocess
+import sys
+
+from src.daemon.adquisicion import DaemonAdquisicion, cargar_config
+from src.obd.decodificador import Decodificador
+from src.obd.planificador import PlanificadorPIDs
+from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+
+def test_decodificador_formulas():
+    dec = Decodificador()
+    assert dec.decodificar("rpm", ["41 0C 1A F8"]) == 1726.0
+    assert dec.decodificar("010D", ["SEARCHING...", "410D28"]) == 40
+    assert dec.decodificar("0105", ["7E8 03 41 05 7B"]) == 83
+    assert dec.decodificar("010C", ["NO DATA"]) is None
+
+
+def test_planificador_prioriza_atrasados():
+    plan = PlanificadorPIDs({"rpm": 0.1, "temp": 1.0})
+    leidos = []
+    ahora = 0.0
+    plan._cola = [(0.0, 0, "rpm"), (0.0, 1, "temp")]
+    while True:
+        pid, espera = plan.proximo(ahora)
+        if ahora + espera >= 0.95:
+            break
+        ahora += espera
+        leidos.append(pid)
+        plan.completado(pid, ahora=ahora)
+    assert leidos.count("rpm") >= 9
+    assert leidos.count("temp") == 1
+
+
+def test_daemon_contra_simulador(tmp_path):
+    async def _run():
+        vehiculo = VehiculoSimulado()
+        vehiculo.fijar(rpm=1500, vel=60)
+        async with SimuladorELM327(puerto=0, vehiculo=vehiculo) as sim:
+            config = cargar_config(None)
+            config["adaptador"] = {"host": "127.0.0.1", "puerto": sim.puerto}
+            config["pids"] = {"rpm": 0.02, "vel": 0.05}
+            config["registro"] = {"directorio": str(tmp_path), "intervalo": 0.05}
+            config["estado"] = {"host": "127.0.0.1", "puerto": 0}
+            daemon = DaemonAdquisicion(config)
+            parar = asyncio.Event()
+            tarea = asyncio.create_task(daemon.ejecutar(parar))
+            await asyncio.sleep(0.5)
+            reader, _ = await asyncio.open_connection("127.0.0.1", daemon.puerto_estado)
+            estado = json.loads(await reader.readline())
+            parar.set()
+            await asyncio.wait_for(tarea, 5)
+            return daemon, estado
+
+    daemon, estado = asyncio.run(_run())
+    assert estado["estado"] == "conectado"
+    assert estado["protocolo"] == "6"
+    assert estado["valores"] == {"rpm": 1500.0, "vel": 60}
+    with open(daemon.sesiones[0], newline="", encoding="utf-8") as f:
+        filas = list(csv.DictReader(f))
+    assert filas and filas[-1]["rpm"] == "1500.0"
+
+
+def test_daemon_no_importa_qt_ni_pandas():
+    codigo = (
+        "import sys, src.daemon.__main__; "
+        "print(any(m.split('.')[0] in ('PyQt6', 'PySide6', 'pandas') for m in sys.modules))"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == "False"
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.obd.decodificador import Decodificador
+from src.obd.elm327_asyncio import ClienteELM327Async
+from src.obd.emulador import EmuladorOBD
+from src.obd.emulador_flota import (
+    ACELERACION, CRUCERO, ESCENARIOS, FRENADO, RALENTI, EmuladorFlota, config_flota, servir_flota,
+)
+
+
+def test_misma_semilla_misma_flota():
+    a = EmuladorFlota(500, semilla=7)
+    b = EmuladorFlota(500, semilla=7)
+    for (ta, ma), (tb, mb) in zip(a.flujo(50, 0.2), b.flujo(50, 0.2)):
+        assert ta == tb
+        assert all(np.array_equal(ma[k], mb[k]) for k in ma)
+
+
+def test_coincide_con_emulador_escalar():
+    """Sin ruido, cada fila sigue las mismas cuentas que EmuladorOBD."""
+    flota = EmuladorFlota(4, ruido=0, diesel=False)
+    flota.escenario[:] = [RALENTI, ACELERACION, CRUCERO, FRENADO]
+    flota.restante[:] = 1e9
+    flota.estado["vel"][:] = 50
+    escalares = []
+    for nombre in ESCENARIOS:
+        emu = EmuladorOBD()
+        emu._escenario = nombre
+        emu.estado["vel"] = 50
+        escalares.append(emu)
+    for _ in range(20):
+        flota.avanzar(0.1)
+        for emu in escalares:
+            getattr(emu, f"_actualizar_{emu._escenario}")(0.1)
+    muestra = flota.muestra()
+    for i, emu in enumerate(escalares):
+        for nombre, valor in emu.estado.items():
+            assert muestra[nombre][i] == pytest.approx(valor), (emu._escenario, nombre)
+
+
+def test_escenarios_e_interdependencias_diesel():
+    flota = EmuladorFlota(2000, semilla=1)
+    vistos = set()
+    for _ in range(1200):  # 2 minutos simulados
+        flota.avanzar(0.1)
+        vistos.update(np.unique(flota.escenario).tolist())
+    assert vistos == {RALENTI, ACELERACION, CRUCERO, FRENADO}
+    e = flota.estado
+    assert np.all((e["temp"] >= 82) & (e["temp"] <= 95))
+    assert np.all(e["turbo_rpm"] >= e["rpm"] * 8 - 1e-9)
+    assert np.all(e["vel"][flota.escenario == RALENTI] == 0)
+    muestra = flota.muestra(["010C", "010D", "fuel_rate"])
+    assert set(muestra) == {"rpm", "vel", "fuel_rate"}
+    assert all(v.shape == (2000,) and np.all(v >= 0) for v in muestra.values())
+
+
+def test_adaptadores_virtuales():
+    flota = EmuladorFlota(5, semilla=3, ruido=0, paso=1e9)  # sin pasos durante la prueba
+    for _ in range(100):
+        flota.avanzar(0.1)
+
+    async def _run():
+        async with servir_flota(flota, max_clientes=1) as simuladores:
+            assert len({s.puerto for s in simuladores}) == 5
+            config = config_flota(simuladores)
+            dec = Decodificador()
+            leidos = []
+            for i, sim in enumerate(simuladores):
+                assert config["vehiculos"][i]["adaptador"]["puerto"] == sim.puerto
+                cliente = ClienteELM327Async(host="127.0.0.1", puerto=sim.puerto)
+                await cliente.conectar()
+                leidos.append(dec.decodificar("010C", await cliente.comando("010C")))
+                await cliente.cerrar()
+            return leidos
+
+    leidos = asyncio.run(_run())
+    rpm = flota.instantanea()["rpm"]
+    for i, lectura in enumerate(leidos):
+        assert lectura == pytest.approx(rpm[i], abs=0.25)
@@ -0,0 +1,101 @@
+import csv
+import gzip
+import tracemalloc
+
+import pytest
+
+from src.storage.export import export_dynamic_log, exportar_sesion, exportar_stream
+from src.storage.sesiones import SessionStore
+
+
+def test_export_dynamic_log_columnas_activas(tmp_path):
+    log = [
+        {"timestamp": "2025-06-06 10:00:00", "rpm": 800, "vel": None, "maf": "", "escenario": "ciudad"},
+        {"timestamp": "2025-06-06 10:00:01", "rpm": 820, "vel": 3, "maf": None, "escenario": "ciudad"},
+    ]
+    ruta = tmp_path / "log.csv"
+    valido, errores = export_dynamic_log(str(ruta), log, ["timestamp", "rpm", "vel", "maf", "RPM"])
+    with open(ruta, newline="", encoding="utf-8") as f:
+        filas = list(csv.reader(f))
+    assert filas[0] == ["timestamp", "escenario", "rpm", "vel"]
+    assert filas[1] == ["2025-06-06 10:00:00", "ciudad", "800", ""]
+    assert log[0]["vel"] is None  # el log original no se modifica
+    assert "El PID 'maf' no está en el encabezado." in errores and not valido
+
+
+def test_export_iterador_gzip(tmp_path):
+    def filas():
+        for i in range(12_000):
+            yield {"timestamp": f"t{i}", "escenario": "ruta", "rpm": 800 + i % 100}
+
+    ruta = tmp_path / "log.csv.gz"
+    valido, _ = export_dynamic_log(str(ruta), filas(), ["timestamp", "rpm"], pids_con_datos={"rpm": 12_000})
+    assert valido
+    with gzip.open(ruta, "rt", encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert lineas[0] == "timestamp,escenario,rpm" and len(lineas) == 12_001
+    with pytest.raises(ValueError):
+        exportar_stream(str(tmp_path / "x.xls"), [], ["timestamp"], formato="xls")
+
+
+def test_export_gzip_se_valida(tmp_path):
+    log = [{"timestamp": "t0", "escenario": "ruta", "rpm": 800},
+           {"timestamp": "t1", "escenario": "", "rpm": 99_999}]
+    valido, errores = export_dynamic_log(str(tmp_path / "log.csv.gz"), log, ["timestamp", "rpm"])
+    assert not valido
+    assert "Fila 3 sin valor válido en 'escenario'." in errores
+    assert any("fuera de rango" in e for e in errores)
+
+
+def test_export_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    log = [{"timestamp": f"t{i}", "escenario": "ruta", "rpm": 800 + i, "vel": "" if i % 2 else i}
+           for i in range(12)]
+    ruta = tmp_path / "log.parquet"
+    assert exportar_stream(str(ruta), iter(log), ["timestamp", "escenario", "rpm", "vel"], lote=5) == 12
+    archivo = pq.ParquetFile(str(ruta))
+    assert archivo.metadata.num_row_groups == 3
+    tabla = archivo.read()
+    assert tabla.column_names == ["timestamp", "escenario", "rpm", "vel"]
+    assert tabla.column("rpm").to_pylist() == [800.0 + i for i in range(12)]
+    assert tabla.column("vel").to_pylist()[:3] == [0.0, None, 2.0]
+    assert tabla.column("escenario").to_pylist()[0] == "ruta"
+
+
+def test_exportar_sesion_en_streaming(tmp_path):
+    store = SessionStore(str(tmp_path / "s.db"))
+    try:
+        t0 = 1_749_513_600.0
+        for bloque in range(8):
+            lote = []
+            for i in range(bloque * 5000, (bloque + 1) * 5000):
+                ts = t0 + i * 0.5
+                lote.append((ts, "rpm", 800.0 + i % 500))
+                if i % 2 == 0:
+                    lote.append((ts, "vel", float(i % 90)))
+                lote.append((ts, "maf", None))
+            store.agregar_muestras("viaje", lote)
+        store.conn.execute("UPDATE sesiones SET vehiculo = 'hilux'")
+        assert store.columnas_con_datos("viaje") == {"rpm": 40_000, "vel": 20_000}
+
+        ruta = tmp_path / "viaje.csv"
+        tracemalloc.start()
+        valido, errores = exportar_sesion(str(ruta), store, "viaje")
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert valido, errores
+        assert pico < 10 * 1024 * 1024
+        with open(ruta, newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            assert next(lector) == ["timestamp", "escenario", "rpm", "vel"]
+            primera, segunda = next(lector), next(lector)
+            assert primera[1:] == ["", "800.0", "0.0"]  # las sesiones no guardan el escenario
+            assert segunda[2:] == ["801.0", ""]
+            assert sum(1 for _ in lector) == 40_000 - 2
+
+        # Con escenario indicado se exige como en los logs en vivo; también en gzip
+        valido, errores = exportar_sesion(str(tmp_path / "viaje.csv.gz"), store, "viaje",
+                                          t0=t0, t1=t0 + 10, escenario="ruta")
+        assert valido, errores
+    finally:
+        store.cerrar()
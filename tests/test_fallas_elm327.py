@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from benchmarks.recuperacion import evaluar, medir
+from src.obd.elm327_asyncio import ClienteELM327Async, ELM327AsyncError
+from src.obd.fallas_elm327 import InyectorFallas
+from src.obd.simulador_elm327 import SimuladorELM327
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_cortes_programados_y_periodicos():
+    reloj = _Reloj()
+    fallas = InyectorFallas(cortes=[
+        {"tipo": "CAN ERROR", "inicio": 1.0, "duracion": 0.5},
+        {"tipo": "desconexion", "inicio": 2.0, "duracion": 1.0, "periodo": 10.0},
+    ], reloj=reloj)
+    esperado = {0.5: None, 1.2: "CAN ERROR", 1.6: None, 2.5: "desconexion", 3.5: None,
+                12.9: "desconexion", 13.1: None}
+    for t, tipo in esperado.items():
+        reloj.t = t
+        falla = fallas.decidir()
+        assert (falla and falla["tipo"]) == tipo, t
+    assert fallas.corte_activo("CAN ERROR") is None
+    assert fallas.contadores == {"CAN ERROR": 1, "desconexion": 2}
+
+
+def test_rafagas_reproducibles():
+    def secuencia():
+        fallas = InyectorFallas([{"tipo": "NO DATA", "probabilidad": 0.05, "rafaga": 4}], semilla=7)
+        return [fallas.decidir() is not None for _ in range(2000)]
+
+    a = secuencia()
+    assert a == secuencia()
+    # Cada disparo afecta a cuatro peticiones seguidas
+    rachas = "".join("x" if f else "." for f in a).split(".")
+    assert {len(r) % 4 for r in rachas if r} == {0}
+    with pytest.raises(ValueError):
+        InyectorFallas([{"tipo": "CAN EROR"}])
+
+
+def test_simulador_inyecta_fallas():
+    async def _run():
+        fallas = InyectorFallas(cortes=[{"tipo": "SEARCHING", "inicio": 0, "duracion": 0.3},
+                                        {"tipo": "desconexion", "inicio": 0.3, "duracion": 0.3}])
+        async with SimuladorELM327(puerto=0, fallas=fallas) as sim:
+            cliente = ClienteELM327Async(host="127.0.0.1", puerto=sim.puerto)
+            await cliente.conectar()
+            buscando = await cliente.comando("010C")
+            await asyncio.sleep(0.3)
+            with pytest.raises(ELM327AsyncError):
+                await cliente.comando("010C")
+            with pytest.raises((ELM327AsyncError, OSError)):
+                await cliente.conectar()  # el adaptador acepta y corta
+            await asyncio.sleep(0.3)
+            await cliente.conectar()
+            normal = await cliente.comando("010C")
+            await cliente.cerrar()
+            return buscando, normal
+
+    buscando, normal = asyncio.run(_run())
+    assert buscando == ["UNABLE TO CONNECT"]
+    assert normal[0].startswith("410C")
+
+
+def test_metricas_de_recuperacion():
+    tiempos = [0.5 + i * 0.1 for i in range(15)] + [2.4, 2.5]  # 10 Hz, corte de 2.0 a 2.3
+    r = evaluar("NO DATA", "pila", tiempos, inicio=2.0, fin=2.3, total=3.0)
+    assert r.nominal_hz == 10.0 and r.recuperacion_s == 0.1 and r.muestras_perdidas == 4
+    assert evaluar("x", "pila", tiempos[:15], 2.0, 2.3, 3.0).muestras_perdidas == 10
+
+
+def test_benchmark_daemon_se_recupera_de_no_data():
+    r = medir("NO DATA", "daemon", inicio=0.8, duracion=0.3, total=1.5)
+    assert r.omitido is None and r.nominal_hz > 0
+    assert r.recuperacion_s is not None and r.recuperacion_s < 0.5
@@ -0,0 +1,82 @@
+import pytest
+
+from src.obd.emulador import EmuladorOBD
+from src.obd.fisica import ModeloConduccion, RelojFisico
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_subpasos_alfa_y_tope():
+    reloj = _Reloj()
+    fisica = RelojFisico(0.25, reloj, max_subpasos=10)
+    pasos = []
+    reloj.t = 0.875
+    assert fisica.avanzar(pasos.append) == 3
+    assert pasos == [0.25] * 3 and fisica.t == 0.75
+    assert fisica.alfa == 0.5
+    reloj.t = 0.9375
+    assert fisica.avanzar(pasos.append) == 0 and fisica.alfa == 0.75
+    reloj.t = 10.0  # una pausa larga no dispara cuarenta pasos de golpe
+    assert fisica.avanzar(pasos.append) == 10
+    assert fisica.descartado == 6.75 and fisica.alfa == 0.0
+
+
+def _muestrear(hz, segundos, modo):
+    reloj = _Reloj()
+    modelo = ModeloConduccion(semilla=3, reloj=reloj)
+    modelo.set_modo(modo)
+    lecturas = {}
+    for i in range(int(segundos * hz) + 1):
+        reloj.t = i / hz
+        modelo.actualizar()
+        lecturas[round(reloj.t, 6)] = modelo.valores()
+    return lecturas
+
+
+@pytest.mark.parametrize("modo", ["ciudad", "carretera"])
+def test_dinamica_no_depende_de_la_frecuencia(modo):
+    rapido = _muestrear(50, 60, modo)
+    lento = _muestrear(1, 60, modo)
+    for t, valores in lento.items():
+        assert rapido[t] == pytest.approx(valores)
+    # A 50 Hz la velocidad en ciudad cambia de forma continua, no a saltos de 1 s
+    serie = [v["vel"] for t, v in sorted(rapido.items()) if 12 <= t < 13]
+    assert len(set(serie)) > 10
+
+
+def test_emulador_obd_paso_fijo():
+    def crear():
+        reloj = _Reloj()
+        emu = EmuladorOBD(semilla=1)
+        emu._ruido = 0
+        emu._reloj = RelojFisico(0.1, reloj)
+        emu._escenario = "aceleracion"
+        return emu, reloj
+
+    rapido, reloj_rapido = crear()
+    lento, reloj_lento = crear()
+    for i in range(1, 101):  # 2 s a 50 Hz
+        reloj_rapido.t = i / 50
+        datos_rapido = rapido.get_simulated_data(["010C", "010D"])
+    reloj_lento.t = 2.0
+    datos_lento = lento.get_simulated_data(["010C", "010D"])
+    assert datos_rapido == pytest.approx(datos_lento)
+    assert 800 < datos_lento["rpm"] < 3500
+
+
+def test_manual_solo_en_el_canal_en_falla():
+    reloj = _Reloj()
+    modelo = ModeloConduccion(semilla=2, paso=0.1, reloj=reloj)
+    modelo.set_modo("falla")
+    modelo.falla = "sensor_rpm"
+    modelo.velocidad = 42.0
+    modelo.fijar_manual(rpm=3000)
+    reloj.t = 0.5
+    modelo.actualizar()
+    assert modelo.rpm == 3000 and modelo.velocidad == 42.0
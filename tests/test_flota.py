@@ -0,0 +1,58 @@
+import asyncio
+import json
+from contextlib import AsyncExitStack
+
+import pytest
+
+from src.daemon.flota import GestorFlota
+from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+N_VEHICULOS = 20
+
+
+def test_flota_veinte_adaptadores_contra_simulador(tmp_path):
+    cache = tmp_path / "protocolos.json"
+
+    async def _run():
+        async with AsyncExitStack() as pila:
+            simuladores = []
+            for i in range(N_VEHICULOS):
+                vehiculo = VehiculoSimulado()
+                vehiculo.fijar(rpm=1000 + i, vel=i)
+                sim = SimuladorELM327(puerto=0, vehiculo=vehiculo, latencia=0.01, max_clientes=1)
+                simuladores.append(await pila.enter_async_context(sim))
+            config = {
+                "vehiculos": [
+                    {"id": f"v{i:02d}", "adaptador": {"host": "127.0.0.1", "puerto": sim.puerto}}
+                    for i, sim in enumerate(simuladores)
+                ],
+                "pids": {"rpm": 0.05, "vel": 0.1},
+                "registro": {"directorio": str(tmp_path), "intervalo": 0.1},
+                "estado": {"host": "127.0.0.1", "puerto": 0},
+                "cache_protocolos": str(cache),
+            }
+            gestor = GestorFlota(config)
+            parar = asyncio.Event()
+            tarea = asyncio.create_task(gestor.ejecutar(parar))
+            await asyncio.sleep(1.0)
+            reader, _ = await asyncio.open_connection("127.0.0.1", gestor.puerto_estado)
+            estado = json.loads(await reader.readline())
+            parar.set()
+            await asyncio.wait_for(tarea, 10)
+            return estado
+
+    estado = asyncio.run(_run())
+    assert estado["conectados"] == N_VEHICULOS
+    for i in range(N_VEHICULOS):
+        salud = estado["vehiculos"][f"v{i:02d}"]
+        assert salud["valores"] == {"rpm": 1000.0 + i, "vel": i}
+        assert salud["contadores"]["lecturas"] >= 5
+        assert salud["latencia_ms"] is not None
+    # Caché de protocolos persistido para la próxima conexión
+    assert set(json.loads(cache.read_text()).values()) == {"6"}
+
+
+def test_flota_rechaza_vehiculos_duplicados():
+    config = {"vehiculos": [{"id": "a", "adaptador": {"host": "x"}}, {"id": "a", "adaptador": {"host": "y"}}]}
+    with pytest.raises(ValueError, match="duplicado"):
+        GestorFlota(config)
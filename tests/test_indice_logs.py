@@ -0,0 +1,117 @@
+import os
+
+from src.storage.indice_logs import IndiceLogs, parsear_linea
+
+
+def test_parsear_formatos():
+    ts, nivel, ctx, msg = parsear_linea("2025-06-02 21:43:25,175 [WARNING] [PARSE][rpm] Respuesta cruda no válida")
+    assert (nivel, ctx, msg) == ("WARNING", "PARSE/rpm", "Respuesta cruda no válida")
+    assert ts % 1 > 0.17
+    assert parsear_linea("2025-06-06 15:56:16,487 - OBD - ERROR - Formato inválido")[1:] == \
+        ("ERROR", "OBD", "Formato inválido")
+    assert parsear_linea("[2025-06-06 15:56:16] ADVERTENCIA: BUFFER FULL | Contexto: lectura_rpm")[1:] == \
+        ("WARNING", "lectura_rpm", "BUFFER FULL")
+    assert parsear_linea("Traceback (most recent call last):") is None
+
+
+def test_indexado_incremental_busqueda_y_rango(tmp_path):
+    log = tmp_path / "log_20250606_150000.txt"
+    log.write_text(
+        "2025-06-06 15:00:00,000 [INFO] --- INICIO DE SESIÓN ---\n"
+        "2025-06-06 15:00:01,000 [ERROR] [OBD] BUFFER FULL en lectura\n"
+        "Traceback (most recent call last):\n"
+        "  File \"x.py\", line 1\n"
+        "2025-06-06 15:10:00,000 [WARNING] PID 010C sin respuesta\n",
+        encoding="utf-8",
+    )
+    otro = tmp_path / "obd_connection.log"
+    otro.write_text("2025-06-07 09:00:00,000 - OBD - ERROR - BUFFER FULL\n", encoding="utf-8")
+    indice = IndiceLogs(str(tmp_path / "indice.db"))
+    try:
+        assert indice.indexar([str(log), str(otro)], procesos=2) == {"archivos": 2, "entradas": 4}
+        assert indice.indexar([str(log), str(otro)]) == {"archivos": 0, "entradas": 0}
+
+        hallados = indice.buscar("buffer full")
+        assert [os.path.basename(e["archivo"]) for e in hallados] == [log.name, otro.name]
+        assert "Traceback" in hallados[0]["texto"] and hallados[0]["contexto"] == "OBD"
+        assert indice.contar("BUFFER FULL", desde="2025-06-07") == 1
+        assert indice.contar(nivel="warning") == 1
+
+        # Solo se parsea lo agregado, incluida una línea que estaba incompleta
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("2025-06-06 15:20:00,000 [INFO] fin")
+        assert indice.indexar([str(log)])["entradas"] == 0
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(" de sesión\n")
+        assert indice.indexar([str(log)])["entradas"] == 1
+        rango = list(indice.rango("2025-06-06 15:05", "2025-06-06 15:30", archivo=str(log)))
+        assert [e["mensaje"] for e in rango] == ["PID 010C sin respuesta", "fin de sesión"]
+
+        # Truncado: se reindexa el archivo desde cero
+        log.write_text("2025-06-08 10:00:00,000 [INFO] nuevo\n", encoding="utf-8")
+        indice.indexar([str(log)])
+        assert indice.contar(archivo=str(log)) == 1
+        assert indice.contar("BUFFER FULL") == 1
+    finally:
+        indice.cerrar()
+
+
+def test_resumen_por_rango_y_por_entradas(tmp_path):
+    from resumir_log_automatico import summarize_log
+
+    log = tmp_path / "log_20250606_150000.txt"
+    with open(log, "w", encoding="utf-8") as f:
+        for i in range(200):
+            f.write(f"2025-06-06 15:{i // 60:02d}:{i % 60:02d},000 [INFO] lectura {i}\n")
+            f.write("  detalle de la lectura\n")
+    db = str(tmp_path / "indice.db")
+    salida = summarize_log(str(log), desde="2025-06-06 15:01:00", hasta="2025-06-06 15:01:59", indice_db=db)
+    lineas = open(salida, encoding="utf-8").read().splitlines()
+    assert len(lineas) == 120 and lineas[0].endswith("lectura 60")
+
+    salida = summarize_log(str(log), max_bytes=500, indice_db=db)
+    texto = open(salida, encoding="utf-8").read()
+    assert len(texto.encode("utf-8")) <= 500
+    assert texto.endswith("lectura 199\n  detalle de la lectura\n")
+    assert texto.startswith("2025-06-06")  # sin entradas partidas
+
+
+def test_rango_por_lotes_sin_retener_el_lock(tmp_path):
+    import threading
+
+    log = tmp_path / "log_20250606_150000.txt"
+    with open(log, "w", encoding="utf-8") as f:
+        f.write("cabecera sin fecha\n")
+        for i in range(25):
+            f.write(f"2025-06-06 15:00:{i // 5:02d},000 [INFO] lectura {i}\n")  # ts repetidos
+    indice = IndiceLogs(str(tmp_path / "indice.db"))
+    try:
+        indice.indexar([str(log)])
+        asc = [e["id"] for e in indice.rango(lote=4)]
+        assert len(asc) == 26 and asc == [e["id"] for e in indice.rango(lote=1000)]
+        assert [e["id"] for e in indice.rango(descendente=True, lote=3)] == asc[::-1]
+
+        recorrido = indice.rango(lote=4)
+        next(recorrido)
+        otro = tmp_path / "obd_connection.log"
+        otro.write_text("2025-06-07 09:00:00,000 - OBD - ERROR - BUFFER FULL\n", encoding="utf-8")
+        hilo = threading.Thread(target=indice.indexar, args=([str(otro)],))
+        hilo.start()
+        hilo.join(2)
+        assert not hilo.is_alive()  # el generador pausado no bloquea la indexación
+        recorrido.close()
+    finally:
+        indice.cerrar()
+
+
+def test_resumen_guarda_el_indice_junto_al_log(tmp_path, monkeypatch):
+    from resumir_log_automatico import summarize_log
+
+    carpeta = tmp_path / "logs"
+    carpeta.mkdir()
+    log = carpeta / "log_20250606_150000.txt"
+    log.write_text("2025-06-06 15:00:00,000 [INFO] hola\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    summarize_log(str(log), desde="2025-06-06")
+    assert (carpeta / "logs_indice.db").exists()
+    assert not (tmp_path / "logs_indice.db").exists()
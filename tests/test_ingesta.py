@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+import time
+
+from src.storage.ingesta import ServidorIngesta
+from src.storage.sesiones import SessionStore
+from src.storage.uplink import Uplink
+
+
+def test_uplink_store_and_forward(tmp_path):
+    store = SessionStore(str(tmp_path / "sesiones.db"))
+    # Sin servidor: los chunks se acumulan en el spool
+    uplink = Uplink(str(tmp_path / "spool"), "http://127.0.0.1:9", "hilux", max_muestras=1000, timeout=0.5)
+    uplink.nueva_sesion("hilux-s1")
+    t0 = time.time()
+    for i in range(5000):
+        uplink.agregar("rpm", 800 + i % 100, ts=t0 + i * 0.01)
+    uplink.agregar("vin", "MR0HA3CD200000001")  # no numérico: se ignora
+    assert len(uplink.pendientes()) == 5
+    assert uplink.enviar_pendientes() == 0
+    assert uplink.stats["fallos_envio"] == 1
+
+    servidor = ServidorIngesta(store, "127.0.0.1", 0).iniciar_en_hilo()
+    try:
+        uplink.url = servidor.url
+        assert uplink.enviar_pendientes() == 5
+        assert uplink.pendientes() == []
+        sesion = store.sesiones()[0]
+        assert sesion["id"] == "hilux-s1" and sesion["vehiculo"] == "hilux"
+        assert sesion["n_muestras"] == 5000
+        assert store.muestras("hilux-s1", "rpm", t0, t0 + 0.025) == [(t0, 800), (t0 + 0.01, 801), (t0 + 0.02, 802)]
+
+        # Reenviar el mismo chunk (p. ej. tras un corte antes del ACK) no duplica
+        uplink._secuencia = 0
+        for i in range(1000):
+            uplink.agregar("rpm", 0, ts=t0)
+        uplink.sellar()
+        assert uplink.enviar_pendientes() == 1
+        assert uplink.stats["duplicados"] == 1
+        assert store.sesiones()[0]["n_muestras"] == 5000
+        assert servidor.stats["duplicados"] == 1
+    finally:
+        servidor.detener()
+        store.cerrar()
+
+
+def test_spool_acotado(tmp_path):
+    uplink = Uplink(str(tmp_path), None, "v1", max_muestras=200, max_spool_bytes=4096)
+    for i in range(20000):
+        uplink.agregar("rpm", i * 1.37)
+    uplink.sellar()
+    total = sum((tmp_path / n).stat().st_size for n in uplink.pendientes())
+    assert total <= 4096
+    assert uplink.stats["descartados"] > 0
+
+
+def test_chunk_malformado_se_rechaza_y_no_bloquea(tmp_path):
+    store = SessionStore(str(tmp_path / "sesiones.db"))
+    servidor = ServidorIngesta(store, "127.0.0.1", 0).iniciar_en_hilo()
+    try:
+        uplink = Uplink(str(tmp_path / "spool"), servidor.url, "hilux")
+        uplink.nueva_sesion("hilux-s1")
+        uplink.agregar("rpm", 800, ts=1.0)
+        malo = uplink.sellar()
+        # Corromper las filas conservando un sobre válido
+        with gzip.open(malo, "rt") as f:
+            documento = json.load(f)
+        documento["filas"] = [[1.0, "rpm"], ["x", "rpm", 1]]
+        with gzip.open(malo, "wt") as f:
+            json.dump(documento, f)
+        uplink.agregar("rpm", 900, ts=2.0)
+        uplink.sellar()
+
+        assert uplink.enviar_pendientes() == 2
+        assert uplink.pendientes() == []
+        assert [os.path.basename(r) for r in uplink.rechazados()] == [os.path.basename(malo)]
+        assert uplink.stats["rechazados"] == 1 and uplink.stats["enviados"] == 1
+        assert servidor.stats["rechazados"] == 1
+        assert store.sesiones()[0]["n_muestras"] == 1
+    finally:
+        servidor.detener()
+        store.cerrar()
+
+
+def test_pendientes_con_descartes_concurrentes(tmp_path):
+    import threading
+
+    uplink = Uplink(str(tmp_path), None, "v1", max_muestras=20, max_spool_bytes=2048)
+    errores = []
+    parar = threading.Event()
+
+    def listar():
+        while not parar.is_set():
+            try:
+                uplink.pendientes()
+            except Exception as e:  # pragma: no cover - lo que el lock evita
+                errores.append(e)
+
+    lector = threading.Thread(target=listar)
+    lector.start()
+    for i in range(20000):
+        uplink.agregar("rpm", i * 1.37)
+    parar.set()
+    lector.join()
+    assert not errores and uplink.stats["descartados"] > 0
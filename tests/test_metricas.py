@@ -0,0 +1,74 @@
+import urllib.request
+
+from src.obd.connection_base import OBD2Connection
+from src.utils.metricas import REGISTRO, Registro, cronometrar, servir_metricas
+
+
+def test_histograma_y_formato_prometheus():
+    registro = Registro()
+    for ms in (0.05, 0.3, 0.3, 4, 40):
+        registro.etapa("parseo").observar(ms / 1000)
+    registro.contador("obd_no_data_total", "NO DATA").inc(3)
+    registro.medidor("obd_cola_profundidad").set(7)
+    texto = registro.exportar_prometheus()
+    assert "# TYPE obd_etapa_segundos histogram" in texto
+    assert 'obd_etapa_segundos_bucket{etapa="parseo",le="0.0001"} 1' in texto
+    assert 'obd_etapa_segundos_bucket{etapa="parseo",le="+Inf"} 5' in texto
+    assert 'obd_etapa_segundos_count{etapa="parseo"} 5' in texto
+    assert "obd_no_data_total 3" in texto
+    assert "obd_cola_profundidad 7" in texto
+    resumen = registro.resumen()['obd_etapa_segundos{etapa="parseo"}']
+    assert resumen["n"] == 5 and resumen["p50_ms"] == 0.5 and resumen["p95_ms"] == 50
+
+
+def test_cronometrar_desactivado_no_registra():
+    registro = Registro()
+    registro.activo = False
+    with cronometrar("disco", registro):
+        pass
+    assert registro.resumen() == {}
+
+
+def test_endpoint_local():
+    registro = Registro()
+    registro.contador("obd_reintentos_total").inc()
+    servidor = servir_metricas(0, registro=registro)
+    try:
+        puerto = servidor.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/metrics", timeout=5) as r:
+            assert r.headers["Content-Type"].startswith("text/plain")
+            assert "obd_reintentos_total 1" in r.read().decode()
+    finally:
+        servidor.shutdown()
+
+
+class _ConexionMemoria(OBD2Connection):
+    """Adaptador en memoria: responde NO DATA a todo."""
+
+    def _connect_internal(self):
+        return True
+
+    def _disconnect_internal(self):
+        pass
+
+    def _write_internal(self, data):
+        self._pendiente = b"NO DATA\r\r>"
+        return True
+
+    def _read_internal(self, size):
+        datos, self._pendiente = self._pendiente, b""
+        return datos
+
+
+def test_send_command_instrumentado():
+    REGISTRO.limpiar()
+    conexion = _ConexionMemoria(timeout=0.2)
+    conexion.min_command_interval = 0
+    conexion.connect()
+    for _ in range(3):
+        assert conexion.send_command("010C") == (True, "NO DATA\r\r>")
+    resumen = REGISTRO.resumen()
+    assert resumen["obd_no_data_total"]["valor"] == 3
+    assert resumen['obd_etapa_segundos{etapa="envio"}']["n"] == 3
+    assert resumen['obd_etapa_segundos{etapa="espera"}']["n"] == 3
+    assert "obd_timeouts_total" not in resumen
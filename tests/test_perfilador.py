@@ -0,0 +1,81 @@
+import json
+import os
+import signal
+import threading
+import time
+
+from src.utils.perfilador import PerfiladorMuestreo, instalar_senal
+
+
+def _trabajo_ocupado(parar):
+    while not parar.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_muestrea_todos_los_hilos_y_escribe(tmp_path):
+    parar = threading.Event()
+    hilo = threading.Thread(target=_trabajo_ocupado, args=(parar,), name="adquisicion")
+    hilo.start()
+    perfilador = PerfiladorMuestreo(hz=200, directorio=str(tmp_path))
+    assert perfilador.iniciar()
+    time.sleep(0.3)
+    rutas = perfilador.detener()
+    parar.set()
+    hilo.join()
+
+    assert perfilador.n_muestras > 10
+    # Cota holgada: solo detecta un muestreador que se coma el hilo entero
+    assert 0 < perfilador.fraccion_muestreo() < 0.5
+    folded = open(rutas["folded"], encoding="utf-8").read()
+    assert any(l.startswith("adquisicion;") and "_trabajo_ocupado" in l for l in folded.splitlines())
+    assert "MainThread;" in folded
+    assert "perfilador;" not in folded
+    perfil = json.load(open(rutas["speedscope"], encoding="utf-8"))
+    nombres = {p["name"] for p in perfil["profiles"]}
+    assert {"adquisicion", "MainThread"} <= nombres
+    frames = perfil["shared"]["frames"]
+    for p in perfil["profiles"]:
+        assert len(p["samples"]) == len(p["weights"])
+        assert all(0 <= i < len(frames) for muestra in p["samples"] for i in muestra)
+
+
+def _esperar(condicion, segundos=2.0):
+    limite = time.monotonic() + segundos
+    while not condicion():
+        if time.monotonic() > limite:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_alternar_por_senal(tmp_path):
+    if not hasattr(signal, "SIGUSR2"):
+        return
+    perfilador = PerfiladorMuestreo(hz=100, directorio=str(tmp_path))
+    anterior = signal.getsignal(signal.SIGUSR2)
+    try:
+        assert instalar_senal(perfilador)
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert _esperar(lambda: perfilador.activo)
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert _esperar(lambda: any(f.endswith(".speedscope.json") for f in os.listdir(tmp_path)))
+        assert not perfilador.activo
+    finally:
+        signal.signal(signal.SIGUSR2, anterior)
+
+
+def test_senal_con_el_lock_tomado_no_traba(tmp_path):
+    """La señal llega mientras el hilo principal tiene el lock del perfilador."""
+    if not hasattr(signal, "SIGUSR2"):
+        return
+    perfilador = PerfiladorMuestreo(hz=100, directorio=str(tmp_path))
+    anterior = signal.getsignal(signal.SIGUSR2)
+    try:
+        assert instalar_senal(perfilador)
+        with perfilador._lock:
+            os.kill(os.getpid(), signal.SIGUSR2)  # el manejador corre aquí mismo
+            assert not perfilador.activo
+        assert _esperar(lambda: perfilador.activo)
+        perfilador.detener(escribir=False)
+    finally:
+        signal.signal(signal.SIGUSR2, anterior)
@@ -0,0 +1,65 @@
+import asyncio
+
+from src.obd.proxy_elm327 import ProxyELM327
+from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+
+async def _abrir(proxy):
+    reader, writer = await asyncio.open_connection("127.0.0.1", proxy.puerto)
+    return reader, writer
+
+
+async def _enviar(conexion, cmd):
+    reader, writer = conexion
+    writer.write((cmd + "\r").encode("ascii"))
+    await writer.drain()
+    return (await reader.readuntil(b">")).decode("ascii")
+
+
+def _lanzar(prueba):
+    async def _run():
+        vehiculo = VehiculoSimulado(dtcs=["P0300"])
+        vehiculo.fijar(rpm=1000, vel=40)
+        # Un solo cliente TCP, como un adaptador WiFi real
+        async with SimuladorELM327(puerto=0, vehiculo=vehiculo, latencia=0.05, max_clientes=1) as sim:
+            async with ProxyELM327("127.0.0.1", sim.puerto, ("127.0.0.1", 0), ventana_frescura=0.2) as proxy:
+                await prueba(sim, proxy)
+
+    asyncio.run(_run())
+
+
+def test_varios_clientes_comparten_adaptador_y_agrupan():
+    async def prueba(sim, proxy):
+        conexiones = [await _abrir(proxy) for _ in range(4)]
+        respuestas = await asyncio.gather(*(_enviar(c, "010C") for c in conexiones))
+        assert all("41 0C 0F A0" in r for r in respuestas)
+        assert sim.peticiones_obd == 1
+        assert proxy.stats["agrupadas"] + proxy.stats["cache"] == 3
+        # El modo 03 no se agrupa; el 04 nunca se cachea
+        assert "43 01 03 00" in await _enviar(conexiones[0], "03")
+        for _, writer in conexiones:
+            writer.close()
+
+    _lanzar(prueba)
+
+
+def test_estado_at_por_cliente():
+    async def prueba(sim, proxy):
+        a = await _abrir(proxy)
+        b = await _abrir(proxy)
+        await _enviar(a, "ATE0")
+        await _enviar(a, "ATS0")
+        await _enviar(a, "ATH1")
+        await _enviar(b, "ATE0")
+        ra = await _enviar(a, "010D")
+        rb = await _enviar(b, "010D")
+        assert ra.strip("\r>") == "7E803410D28"
+        assert rb.strip("\r>") == "41 0D 28"
+        # ATZ de un cliente no resetea el adaptador ni afecta al otro
+        assert "ELM327" in await _enviar(b, "ATZ")
+        assert (await _enviar(a, "010D")).strip("\r>") == "7E803410D28"
+        assert "ATZ" not in list(sim.comandos)[-4:]
+        for _, writer in (a, b):
+            writer.close()
+
+    _lanzar(prueba)
@@ -0,0 +1,123 @@
+import asyncio
+
+from src.daemon.adquisicion import DaemonAdquisicion, cargar_config
+from src.obd.dtc import es_can, mensajes_obd, parsear_dtc_freeze_frame, parsear_dtcs
+from src.obd.servicio_dtc import ServicioDTC, normalizar_respuesta
+from src.obd.simulador_elm327 import SimuladorELM327, VehiculoSimulado
+
+
+def test_parsear_dtcs_formatos():
+    # CAN con contador, sin espacios y con cabeceras
+    assert parsear_dtcs(["43 02 01 33 C1 00"]) == ["P0133", "U0100"]
+    assert parsear_dtcs(["7E8 06 43 02 01 33 03 00"]) == ["P0133", "P0300"]
+    # Protocolos anteriores: sin contador y relleno con 0000
+    assert parsear_dtcs(["43 01 33 00 00 00 00"]) == ["P0133"]
+    # Multi-trama ISO-TP
+    lineas = ["00A", "0: 47 04 01 33 03 00", "1: 04 20 C1 00 00 00"]
+    assert parsear_dtcs(lineas, "07") == ["P0133", "P0300", "P0420", "U0100"]
+    # Modo distinto o sin datos
+    assert parsear_dtcs(["47 01 01 33"], "03") == []
+    assert parsear_dtcs(normalizar_respuesta("NO DATA\r\r>"), "0A") == []
+
+
+def test_parsear_dtcs_respeta_longitud_y_relleno():
+    # Trama única con cabeceras y relleno ISO-TP: el PCI dice 4 bytes
+    assert parsear_dtcs(["7E8 04 43 01 01 33 00 00 00"]) == ["P0133"]
+    assert parsear_dtcs(["18DAF110 04 43 01 01 33 AA AA AA"]) == ["P0133"]
+    # Multi-trama sin cabeceras: '008' recorta el relleno de la última trama
+    lineas = ["008", "0: 47 03 01 33 03 00", "1: 04 20 00 00 00 00 00"]
+    assert parsear_dtcs(lineas, "07") == ["P0133", "P0300", "P0420"]
+    # Multi-trama con cabeceras: primera trama (10 08) y consecutiva (21)
+    lineas = ["7E8 10 08 43 03 01 33 03 00", "7E8 21 04 20 00 00 00 00 00"]
+    assert mensajes_obd(lineas) == [bytes.fromhex("4303013303000420")]
+    assert parsear_dtcs(lineas) == ["P0133", "P0300", "P0420"]
+    # El contador manda aunque la trama traiga códigos de más
+    assert parsear_dtcs(["43 01 01 33 03 00"], can=True) == ["P0133"]
+    assert parsear_dtcs(["43 01 33 00 00 00 00"], can=False) == ["P0133"]
+
+
+def test_es_can():
+    assert es_can("6") is True and es_can("A6") is True and es_can("3") is False
+    assert es_can(None) is None and es_can("0") is None
+
+
+def test_parsear_dtc_freeze_frame():
+    assert parsear_dtc_freeze_frame(["42 02 00 01 33"]) == "P0133"
+    assert parsear_dtc_freeze_frame(["42 02 00 00 00"]) is None
+    assert parsear_dtc_freeze_frame(["NO DATA"]) is None
+
+
+def test_servicio_sincrono_pausa_y_reanuda():
+    respuestas = {"03": "43 01 01 33\r\r>", "07": "47 00\r\r>", "0A": "NO DATA\r\r>",
+                  "020200": "42 02 00 01 33\r\r>", "020C00": "42 0C 00 1A F8\r\r>"}
+    enviados, eventos = [], []
+
+    def enviar(cmd):
+        enviados.append(cmd)
+        return respuestas.get(cmd, "NO DATA\r\r>")
+
+    servicio = ServicioDTC(enviar, pausar=lambda: eventos.append("pausa"),
+                           reanudar=lambda: eventos.append("reanuda"))
+    resultado = servicio.leer()
+    assert eventos == ["pausa", "reanuda"]
+    assert "AT D" not in enviados and "ATD" not in enviados
+    assert resultado["almacenados"] == ["P0133"]
+    assert resultado["pendientes"] == [] and resultado["permanentes"] == []
+    assert resultado["freeze_frame"] == {"dtc": "P0133", "valores": {"010C": 1726.0}}
+    assert resultado["comandos"] == len(enviados) == 4 + len(servicio.freeze_pids)
+
+
+def test_servicio_reanuda_ante_error():
+    eventos = []
+
+    def enviar(cmd):
+        raise OSError("socket cerrado")
+
+    servicio = ServicioDTC(enviar, pausar=lambda: eventos.append("pausa"),
+                           reanudar=lambda: eventos.append("reanuda"))
+    try:
+        servicio.leer()
+    except OSError:
+        pass
+    assert eventos == ["pausa", "reanuda"]
+
+
+def test_daemon_lee_dtc_sin_intercalar_sondeo(tmp_path):
+    async def _run():
+        vehiculo = VehiculoSimulado(dtcs=["P0133"], dtcs_pendientes=["P0420"],
+                                    dtcs_permanentes=["P0300"])
+        vehiculo.fijar(rpm=1500, vel=60)
+        async with SimuladorELM327(puerto=0, vehiculo=vehiculo) as sim:
+            config = cargar_config(None)
+            config["adaptador"] = {"host": "127.0.0.1", "puerto": sim.puerto}
+            config["pids"] = {"rpm": 0.01, "vel": 0.01}
+            config["registro"] = {"directorio": str(tmp_path), "intervalo": 0.05}
+            config["estado"] = {"host": "127.0.0.1", "puerto": 0}
+            daemon = DaemonAdquisicion(config)
+            parar = asyncio.Event()
+            tarea = asyncio.create_task(daemon.ejecutar(parar))
+            await asyncio.sleep(0.3)
+            resultado = await daemon.vehiculo.leer_dtc()
+            await asyncio.sleep(0.1)
+            lecturas = daemon.vehiculo.contadores["lecturas"]
+            parar.set()
+            await asyncio.wait_for(tarea, 5)
+            return resultado, list(sim.comandos), lecturas
+
+    resultado, comandos, lecturas = asyncio.run(_run())
+    assert resultado["almacenados"] == ["P0133"]
+    assert resultado["pendientes"] == ["P0420"]
+    assert resultado["permanentes"] == ["P0300"]
+    assert resultado["freeze_frame"]["dtc"] == "P0133"
+    assert resultado["freeze_frame"]["valores"]["010C"] == 1500.0
+    assert resultado["freeze_frame"]["valores"]["010D"] == 60
+    assert resultado["duracion_ms"] < 1000
+    # La ráfaga es contigua: ninguna lectura de PIDs entre el 03 y el último 02xx
+    comandos = [c.replace(" ", "").upper() for c in comandos]
+    inicio = comandos.index("03")
+    rafaga = comandos[inicio:inicio + resultado["comandos"]]
+    assert rafaga[:4] == ["03", "07", "0A", "020200"]
+    assert all(c.startswith("02") for c in rafaga[3:])
+    assert not any(c in ("ATD", "AT D") for c in comandos)
+    # El sondeo se reanuda tras la ráfaga
+    assert lecturas > 0
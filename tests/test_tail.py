@@ -0,0 +1,102 @@
+import os
+
+from src.utils.tail import SeguidorArchivo, SeguidorDirectorio
+
+
+def test_lee_solo_lo_agregado_y_lineas_parciales(tmp_path):
+    ruta = tmp_path / "log.csv"
+    ruta.write_text("timestamp,rpm\n2025-06-06 10:00:00,800\n")
+    seguidor = SeguidorArchivo(str(ruta))
+    assert seguidor.leer() == ["timestamp,rpm", "2025-06-06 10:00:00,800"]
+    assert seguidor.registros == 1
+    assert seguidor.leer() == []
+
+    with open(ruta, "a") as f:
+        f.write("2025-06-06 10:00:01,900\n2025-06-06 10:00:0")
+    assert seguidor.leer() == ["2025-06-06 10:00:01,900"]
+    with open(ruta, "a") as f:
+        f.write("2,950\r\n")
+    assert seguidor.leer() == ["2025-06-06 10:00:02,950"]
+    assert seguidor.registros == 3
+    assert seguidor.offset == os.path.getsize(ruta)
+
+
+def test_truncado_y_rotacion(tmp_path):
+    ruta = tmp_path / "log.csv"
+    ruta.write_text("timestamp,rpm\n" + "t,1\n" * 50)
+    seguidor = SeguidorArchivo(str(ruta))
+    seguidor.leer()
+    assert seguidor.registros == 50
+
+    ruta.write_text("timestamp,rpm\nt,2\n")  # truncado en el lugar
+    assert seguidor.leer() == ["timestamp,rpm", "t,2"]
+    assert seguidor.registros == 1 and seguidor.reinicios == 1
+
+    os.rename(ruta, tmp_path / "log.csv.1")  # rotación: archivo nuevo, otro inode
+    (tmp_path / "otro.tmp").write_text("x")  # evita que el inode se reutilice
+    ruta.write_text("timestamp,rpm\nt,3\nt,4\nt,5\n")
+    assert seguidor.leer()[-1] == "t,5"
+    assert seguidor.registros == 3 and seguidor.reinicios == 2
+
+
+def test_seguidor_directorio(tmp_path):
+    (tmp_path / "a.csv").write_text("timestamp,rpm\nt,1\n")
+    (tmp_path / "notas.txt").write_text("no es csv\n")
+    seguidor = SeguidorDirectorio(str(tmp_path), "*.csv", desde_final=True)
+    eventos = seguidor.sondear()
+    assert [(e.nombre, e.nuevo, e.lineas) for e in eventos] == [("a.csv", True, [])]
+    assert seguidor.sondear() == []
+
+    with open(tmp_path / "a.csv", "a") as f:
+        f.write("t,2\n")
+    (tmp_path / "b.csv").write_text("timestamp,rpm\n")
+    eventos = {e.nombre: e for e in seguidor.sondear()}
+    assert eventos["a.csv"].lineas == ["t,2"] and eventos["a.csv"].registros == 1
+    assert seguidor.archivos["a.csv"].cabecera == "timestamp,rpm"
+    assert eventos["b.csv"].nuevo
+    assert set(seguidor.resumen()) == {"a.csv", "b.csv"}
+
+
+def test_desde_final_lee_la_cabecera_del_principio(tmp_path):
+    ruta = tmp_path / "log.csv"
+    ruta.write_text("timestamp,rpm\nt,1\n")
+    seguidor = SeguidorArchivo(str(ruta), desde_final=True)
+    assert seguidor.leer() == []
+    assert seguidor.cabecera == "timestamp,rpm" and seguidor.registros == 0
+    with open(ruta, "a") as f:
+        f.write("t,2\nt,3\n")
+    assert seguidor.leer() == ["t,2", "t,3"]
+    assert seguidor.cabecera == "timestamp,rpm" and seguidor.registros == 2
+
+    vacio = tmp_path / "vacio.csv"
+    vacio.write_text("")
+    seguidor = SeguidorArchivo(str(vacio), desde_final=True)
+    seguidor.leer()
+    vacio.write_text("timestamp,rpm\nt,1\n")
+    assert seguidor.leer() == ["timestamp,rpm", "t,1"]
+    assert seguidor.cabecera == "timestamp,rpm" and seguidor.registros == 1
+
+
+def test_primera_lectura_por_bloques(tmp_path):
+    ruta = tmp_path / "log.csv"
+    ruta.write_text("timestamp,rpm\n" + "t,1000\n" * 1000)
+    seguidor = SeguidorArchivo(str(ruta), max_bytes=1024)
+    lineas = []
+    lectura = seguidor.leer()
+    while lectura or seguidor.pendiente:
+        assert len("\n".join(lectura)) <= 1024 + len("t,1000")  # más el resto de la lectura anterior
+        lineas.extend(lectura)
+        lectura = seguidor.leer()
+    assert len(lineas) == 1001 and seguidor.registros == 1000
+    assert seguidor.offset == os.path.getsize(ruta)
+
+
+def test_desde_final_solo_en_la_primera_pasada(tmp_path):
+    (tmp_path / "a.csv").write_text("timestamp,rpm\n" + "t,1\n" * 1000)
+    seguidor = SeguidorDirectorio(str(tmp_path), "*.csv", desde_final=True)
+    assert [e.lineas for e in seguidor.sondear()] == [[]]
+    seguidor.desde_final = False  # como monitor_logs: lo que aparece después, entero
+    (tmp_path / "b.csv").write_text("timestamp,rpm\nt,2\n")
+    eventos = seguidor.sondear()
+    assert [(e.nombre, e.lineas, e.registros) for e in eventos] == [("b.csv", ["timestamp,rpm", "t,2"], 1)]
+    assert seguidor.sondear() == []
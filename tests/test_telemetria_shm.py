@@ -0,0 +1,66 @@
+import multiprocessing
+import time
+
+import pytest
+
+from src.obd import telemetria_shm
+from src.obd.telemetria_shm import AnilloTelemetria, AnilloTelemetriaError
+
+
+def _productor(nombre, n):
+    anillo = AnilloTelemetria.adjuntar(nombre)
+    for i in range(n):
+        anillo.publicar((time.time(), 800 + i, i % 200))
+    anillo.cerrar()
+
+
+def test_publicar_y_leer_ultimo():
+    with AnilloTelemetria.crear(("ts", "rpm", "vel"), capacidad=8) as anillo:
+        assert anillo.ultimo() is None
+        anillo.publicar({"ts": 1.0, "rpm": 850, "vel": 12})
+        assert anillo.ultimo() == {"ts": 1.0, "rpm": 850.0, "vel": 12.0}
+        assert anillo.escritos == 1
+
+
+def test_leer_nuevos_reporta_perdidas():
+    with AnilloTelemetria.crear(("rpm",), capacidad=4) as anillo:
+        for i in range(10):
+            anillo.publicar([i])
+        filas, cursor, perdidas = anillo.leer_nuevos(0)
+        assert [f[0] for f in filas] == [6.0, 7.0, 8.0, 9.0]
+        assert cursor == 10
+        assert perdidas == 6
+        assert anillo.leer_nuevos(cursor) == ([], 10, 0)
+
+
+def test_ventana_y_errores():
+    with AnilloTelemetria.crear(("rpm", "vel"), capacidad=16) as anillo:
+        for i in range(5):
+            anillo.publicar({"rpm": i})
+        ventana = anillo.ventana(3)
+        assert ventana["rpm"] == [2.0, 3.0, 4.0]
+        assert all(v != v for v in ventana["vel"])  # campo faltante -> NaN
+        with pytest.raises(AnilloTelemetriaError):
+            anillo.publicar([1, 2, 3])
+        with pytest.raises(AnilloTelemetriaError):
+            anillo.columna("temp")
+
+
+def test_lector_en_otro_proceso():
+    with AnilloTelemetria.crear(("ts", "rpm", "vel"), capacidad=64) as anillo:
+        proc = multiprocessing.Process(target=_productor, args=(anillo.nombre, 200))
+        proc.start()
+        proc.join(10)
+        assert proc.exitcode == 0
+        assert anillo.escritos == 200
+        assert anillo.ultimo()["rpm"] == 999.0
+        filas, _, perdidas = anillo.leer_nuevos(0)
+        assert len(filas) == 64 and perdidas == 136
+
+
+def test_respaldo_sin_numpy(monkeypatch):
+    monkeypatch.setattr(telemetria_shm, "np", None)
+    with AnilloTelemetria.crear(("rpm", "vel"), capacidad=4) as anillo:
+        anillo.publicar({"rpm": 900, "vel": 30})
+        assert anillo.ultimo() == {"rpm": 900.0, "vel": 30.0}
+        assert isinstance(anillo.columna("rpm"), memoryview)
@@ -0,0 +1,75 @@
+import tracemalloc
+
+import pytest
+
+from src.storage.validador import validar_csv_streaming, validar_log_csv
+
+
+def _escribir(ruta, filas):
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        f.write("timestamp,escenario,rpm,vel,maf\n")
+        for fila in filas:
+            f.write(fila + "\n")
+
+
+def test_errores_basicos_y_orden(tmp_path):
+    ruta = tmp_path / "log.csv"
+    _escribir(ruta, [
+        "2025-06-06 10:00:00,ralenti,800,0,",
+        ",,,,",
+        "2025-06-06 10:00:02,,12000,abc,",
+    ])
+    valido, errores = validar_log_csv(str(ruta), ["rpm", "vel", "maf", "temp"])
+    assert not valido
+    assert errores == [
+        "Faltan columnas obligatorias: ['temp']",
+        "Fila 3 completamente vacía.",
+        "Fila 3 sin valor válido en 'escenario'.",
+        "Fila 4 sin valor válido en 'escenario'.",
+        "El PID 'maf' está en el encabezado pero no tiene datos en ningún registro.",
+        "El PID 'temp' no está en el encabezado.",
+        "Fila 4: valor de 'rpm' fuera de rango (0-10000).",
+        "Fila 4: valor no numérico en 'vel'.",
+    ]
+    vacio = tmp_path / "vacio.csv"
+    _escribir(vacio, [])
+    assert validar_log_csv(str(vacio), ["rpm"]) == (False, [
+        "El archivo no contiene registros.",
+        "El PID 'rpm' está en el encabezado pero no tiene datos en ningún registro.",
+    ])
+
+
+@pytest.mark.parametrize("usar_numpy", [False, True])
+def test_sesion_grande_con_tope_de_errores(tmp_path, usar_numpy):
+    if usar_numpy:
+        pytest.importorskip("numpy")
+    ruta = tmp_path / "grande.csv"
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("timestamp,escenario,rpm,vel\n")
+        for i in range(50_000):
+            rpm = 20000 if i % 10 == 0 else 800 + i % 3000
+            f.write(f"2025-06-06 10:00:00,ciudad,{rpm},{i % 120}\n")
+    tracemalloc.start()
+    resultado = validar_csv_streaming(str(ruta), ["rpm", "vel"], usar_numpy=usar_numpy,
+                                      filas_por_bloque=10_000)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert resultado.filas == 50_000
+    assert resultado.columnas["rpm"] == {"con_datos": 50_000, "no_numericos": 0, "fuera_de_rango": 5_000}
+    assert resultado.conteo_errores == {"rango:rpm": 5_000}
+    assert len(resultado.errores) == 21
+    assert resultado.errores[0] == "Fila 2: valor de 'rpm' fuera de rango (0-10000)."
+    assert resultado.errores[-1] == "Valores de 'rpm' fuera de rango (0-10000): 5000 filas en total (se muestran 20)."
+    assert pico < 20 * 1024 * 1024  # el archivo completo no se carga en memoria
+
+
+@pytest.mark.parametrize("usar_numpy", [False, True])
+def test_tope_cero_no_oculta_errores(tmp_path, usar_numpy):
+    if usar_numpy:
+        pytest.importorskip("numpy")
+    ruta = tmp_path / "log.csv"
+    _escribir(ruta, ["2025-06-06 10:00:00,ralenti,800,0,1", "2025-06-06 10:00:01,ralenti,20000,0,1"])
+    resultado = validar_csv_streaming(str(ruta), ["rpm"], max_errores_por_tipo=0, usar_numpy=usar_numpy)
+    assert not resultado.valido
+    assert resultado.conteo_errores == {"rango:rpm": 1}
+    assert resultado.errores == ["Valores de 'rpm' fuera de rango (0-10000): 1 filas en total (se muestran 0)."]